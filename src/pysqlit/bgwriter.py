@@ -0,0 +1,179 @@
+"""后台写线程模块，提前把脏页写回磁盘。
+
+没有后台写线程时，事务提交要同步写出缓冲池中所有的脏页，
+缓冲池淘汰脏页时也要在前台同步写回。后台写线程定期醒来，
+当脏页占缓冲池容量的比例超过阈值时，按页号顺序（从上次停下的位置继续，
+循环扫描）把一批脏页写回文件，每秒写回的页数受速率限制。
+提交时只剩下最近修改的少量页面需要写出，淘汰也很少再遇到脏页。
+
+提前写回的页面与淘汰写回一样需要连接持有EXCLUSIVE锁；
+后台线程只在锁可以立即获得时写回，否则跳过这一轮，绝不让前台等待。
+文件头页和被B树操作固定的页面不会被后台写回。
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from .concurrent_storage import LockState
+from .constants import (BGWRITER_DIRTY_RATIO, BGWRITER_INTERVAL, BGWRITER_PAGES_PER_SECOND,
+                        HEADER_PAGE_NUM)
+from .exceptions import LockError
+
+
+class BackgroundWriter:
+    """分页管理器的后台写线程。
+
+    Attributes:
+        pager: 所属的分页管理器
+        pages_per_second: 每秒最多写回的页数
+        dirty_ratio: 开始写回的脏页比例阈值
+        interval: 唤醒间隔（秒）
+        rounds: 执行写回的轮数
+        pages_written: 写回的页数
+        busy_rounds: 因无法立即获得EXCLUSIVE锁而跳过的轮数
+
+    Examples:
+        >>> writer = BackgroundWriter(pager, pages_per_second=1000, dirty_ratio=0.2)
+        >>> writer.start()
+        >>> writer.stop()
+    """
+
+    def __init__(self, pager, pages_per_second: int = BGWRITER_PAGES_PER_SECOND,
+                 dirty_ratio: float = BGWRITER_DIRTY_RATIO,
+                 interval: float = BGWRITER_INTERVAL) -> None:
+        """初始化后台写线程（不会自动启动）。
+
+        Args:
+            pager: 所属的分页管理器（ConcurrentPager及其子类）
+            pages_per_second: 每秒最多写回的页数
+            dirty_ratio: 脏页占缓冲池容量的比例达到该值时才开始写回
+            interval: 唤醒间隔（秒）
+        """
+        self.pager = pager
+        self.pages_per_second = pages_per_second
+        self.dirty_ratio = dirty_ratio
+        self.interval = interval
+        self.rounds = 0
+        self.pages_written = 0
+        self.busy_rounds = 0
+        self._cursor = 0  # 下一轮从该页号开始扫描
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def batch_size(self) -> int:
+        """每轮最多写回的页数。"""
+        return max(1, int(self.pages_per_second * self.interval))
+
+    @property
+    def running(self) -> bool:
+        """后台线程是否在运行。"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动后台线程（已在运行时不做任何事）。"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pysqlit-bgwriter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并等待其退出。"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+    def wake(self) -> None:
+        """立即唤醒后台线程执行一轮写回。"""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        """后台线程主循环。"""
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.run_once()
+            except (OSError, ValueError):
+                # 文件已关闭或暂时不可写，脏页留给前台刷新
+                continue
+
+    def _select_batch(self, dirty_pages: List[int]) -> List[int]:
+        """从上次停下的位置起按页号顺序选出一批页面。
+
+        Args:
+            dirty_pages: 按页号排序的可写回脏页
+
+        Returns:
+            本轮要写回的页号（按页号排序）
+        """
+        ahead = [page_num for page_num in dirty_pages if page_num >= self._cursor]
+        behind = [page_num for page_num in dirty_pages if page_num < self._cursor]
+        batch = (ahead + behind)[:self.batch_size]
+        self._cursor = batch[-1] + 1
+        return sorted(batch)
+
+    def run_once(self) -> int:
+        """执行一轮写回。
+
+        Returns:
+            int: 本轮写回的页数
+        """
+        pager = self.pager
+        pool = pager.buffer_pool
+        with pool.lock:
+            # 没有进行中的写事务时不会有需要写回的数据页
+            if pager.file_descriptor is None or pager.lock_state.value < LockState.RESERVED.value:
+                return 0
+
+            dirty_count = 0
+            candidates = []
+            for page_num, frame in pool.frames.items():
+                if not frame.dirty:
+                    continue
+                dirty_count += 1
+                if frame.pin_count == 0 and page_num != HEADER_PAGE_NUM:
+                    candidates.append(page_num)
+
+            limit = pool.capacity or len(pool.frames)
+            if not candidates or dirty_count < self.dirty_ratio * limit:
+                return 0
+
+            try:
+                pager.file_lock.acquire(LockState.EXCLUSIVE, timeout=0)
+            except LockError:
+                self.busy_rounds += 1
+                return 0
+
+            batch = self._select_batch(sorted(candidates))
+            # 先复制并清除脏标记：写回期间再被修改的页面会重新标记为脏页
+            snapshot: Dict[int, bytes] = {}
+            for page_num in batch:
+                frame = pool.frames[page_num]
+                snapshot[page_num] = bytes(frame.data)
+                frame.dirty = False
+            pager._written_back.update(batch)
+            pager._write_pages(batch, snapshot.__getitem__)
+
+            self.rounds += 1
+            self.pages_written += len(batch)
+            return len(batch)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取后台写线程统计信息。
+
+        Returns:
+            包含轮数、写回页数和跳过轮数的字典
+        """
+        return {
+            'rounds': self.rounds,
+            'pages_written': self.pages_written,
+            'busy_rounds': self.busy_rounds,
+        }
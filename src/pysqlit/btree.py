@@ -7,26 +7,39 @@
 - 节点分裂和合并
 """
 
-from typing import List, Optional, Tuple, Dict, Any
+from collections import deque
+from typing import List, Optional, Tuple, Dict, Any, Union
 import struct
 from .constants import (
     PAGE_SIZE, INVALID_PAGE_NUM,
     NODE_TYPE_SIZE, IS_ROOT_SIZE, PARENT_POINTER_SIZE,
     COMMON_NODE_HEADER_SIZE,
     LEAF_NODE_NUM_CELLS_SIZE, LEAF_NODE_NEXT_LEAF_SIZE,
-    LEAF_NODE_HEADER_SIZE, LEAF_NODE_CELL_SIZE,
-    LEAF_NODE_MAX_CELLS, LEAF_NODE_RIGHT_SPLIT_COUNT, LEAF_NODE_LEFT_SPLIT_COUNT,
+    LEAF_NODE_HEADER_SIZE, LEAF_NODE_CELL_SIZE, LEAF_NODE_KEY_SIZE,
     INTERNAL_NODE_NUM_KEYS_SIZE, INTERNAL_NODE_RIGHT_CHILD_SIZE,
     INTERNAL_NODE_HEADER_SIZE, INTERNAL_NODE_CELL_SIZE,
     INTERNAL_NODE_MAX_KEYS, INTERNAL_NODE_KEY_SIZE, INTERNAL_NODE_CHILD_SIZE,
     ROW_SIZE, NODE_LEAF, NODE_INTERNAL,
     LEAF_NODE_NUM_CELLS_OFFSET, LEAF_NODE_NEXT_LEAF_OFFSET,
+    LEAF_NODE_CONTENT_START_OFFSET, LEAF_NODE_FRAGMENTED_OFFSET,
+    LEAF_NODE_CELL_POINTER_SIZE, LEAF_NODE_CELL_HEADER_SIZE,
+    LEAF_NODE_MAX_LOCAL_FRACTION, LEAF_NODE_MIN_LOCAL_FRACTION, LEAF_NODE_OVERFLOW_POINTER_SIZE,
+    BTREE_MIN_FILL_FACTOR,
     INTERNAL_NODE_NUM_KEYS_OFFSET, INTERNAL_NODE_RIGHT_CHILD_OFFSET
 )
 from .models import Row
 from .exceptions import BTreeError
+from .overflow import OverflowValue, free_overflow, overflow_chain, write_overflow
 from .storage import Pager
 
+# 预编译的结构体：页号、键等32位无符号整数，叶子节点的单元格指针、
+# 内容区信息（起始偏移 + 碎片字节数）和单元格头部（键 + 值长度），以及内部节点单元格（子节点页号 + 键）
+U32 = struct.Struct('<I')
+U16 = struct.Struct('<H')
+LEAF_CONTENT = struct.Struct('<II')
+LEAF_CELL_HEADER = struct.Struct('<II')
+INTERNAL_CELL = struct.Struct('<II')
+
 
 class EnhancedBTreeNode:
     """增强型B树节点基类，提供节点基本操作。
@@ -44,7 +57,25 @@ class EnhancedBTreeNode:
         """
         self.pager = pager
         self.page_num = page_num
-        self.page = pager.get_page(page_num)  # 获取页面对应的字节数组
+        self.page = pager.get_page(page_num)  # 获取页面对应的字节数组（或只读视图）
+    
+    def mark_dirty(self) -> None:
+        """将节点所在页面标记为脏页，使其在下次刷新时写回磁盘。"""
+        self.pager.mark_dirty(self.page_num)
+    
+    def _write(self, offset: int, data: bytes) -> None:
+        """向节点页面写入数据并标记为脏页。
+        
+        如果页面是内存映射的只读视图，先向分页管理器换取可写副本（写时复制）。
+        
+        Args:
+            offset: 页内偏移量
+            data: 要写入的数据
+        """
+        if getattr(self.page, 'readonly', False):
+            self.page = self.pager.get_writable_page(self.page_num)
+        self.page[offset:offset + len(data)] = data
+        self.mark_dirty()
     
     def get_node_type(self) -> int:
         """获取节点类型（叶子节点或内部节点）。
@@ -60,7 +91,7 @@ class EnhancedBTreeNode:
         Args:
             node_type: 节点类型标识符
         """
-        self.page[0] = node_type
+        self._write(0, bytes((node_type,)))
     
     def is_root(self) -> bool:
         """检查是否为根节点。
@@ -76,7 +107,7 @@ class EnhancedBTreeNode:
         Args:
             is_root: 是否为根节点
         """
-        self.page[1] = 1 if is_root else 0
+        self._write(1, b'\x01' if is_root else b'\x00')
     
     def get_parent(self) -> int:
         """获取父节点的页号。
@@ -92,14 +123,20 @@ class EnhancedBTreeNode:
         Args:
             parent_page: 父节点页号
         """
-        self.page[2:6] = struct.pack('<I', parent_page)
+        self._write(2, struct.pack('<I', parent_page))
 
 
 class EnhancedLeafNode(EnhancedBTreeNode):
-    """增强型叶子节点，支持删除操作。
+    """增强型叶子节点，使用槽页格式存储变长单元格。
+    
+    头部之后是按键排序的单元格指针数组（每个指针2字节），单元格内容
+    从页面可用区域的末尾向前存放。每个单元格由键、值长度和值组成，
+    行只占用其实际编码长度。删除单元格留下的空洞记为碎片字节，
+    连续空闲区不足时在页内整理（压缩）后再插入。
     
-    叶子节点存储实际的数据记录，每个记录包含键和对应的值。
-    支持插入、删除、更新和查询操作。
+    超过内联上限（max_local）的值在单元格中只保存min_local字节的前缀和
+    第一个溢出页的页号，其余部分存放在溢出页链中（见overflow模块）。
+    单元格的本地部分（local）指实际存放在页面中的字节。
     """
     
     def __init__(self, pager: Pager, page_num: int) -> None:
@@ -111,13 +148,76 @@ class EnhancedLeafNode(EnhancedBTreeNode):
         """
         super().__init__(pager, page_num)
     
+    def capacity(self) -> int:
+        """获取可用于单元格指针和单元格内容的总字节数。
+        
+        Returns:
+            int: 页面可用区域减去叶子节点头部的字节数
+        """
+        return self.pager.usable_size - LEAF_NODE_HEADER_SIZE
+    
+    @staticmethod
+    def cell_space(value_size: int) -> int:
+        """计算存储一个单元格占用的字节数（包括单元格指针）。
+        
+        Args:
+            value_size: 值的长度
+            
+        Returns:
+            int: 占用的字节数
+        """
+        return LEAF_NODE_CELL_POINTER_SIZE + LEAF_NODE_CELL_HEADER_SIZE + value_size
+    
+    def max_local(self) -> int:
+        """获取单元格中内联存储的值的最大长度，更长的值溢出到溢出页链。
+        
+        Returns:
+            int: 内联上限（字节）
+        """
+        return (self.capacity() // LEAF_NODE_MAX_LOCAL_FRACTION
+                - LEAF_NODE_CELL_POINTER_SIZE - LEAF_NODE_CELL_HEADER_SIZE)
+    
+    def min_local(self) -> int:
+        """获取值溢出时单元格中保留的内联前缀长度。
+        
+        Returns:
+            int: 内联前缀长度（字节）
+        """
+        return (self.capacity() // LEAF_NODE_MIN_LOCAL_FRACTION - LEAF_NODE_CELL_POINTER_SIZE
+                - LEAF_NODE_CELL_HEADER_SIZE - LEAF_NODE_OVERFLOW_POINTER_SIZE)
+    
+    def local_size(self, value_size: int) -> int:
+        """计算指定长度的值在单元格中占用的本地字节数。
+        
+        Args:
+            value_size: 值的长度
+            
+        Returns:
+            int: 内联的值为其长度，溢出的值为内联前缀加溢出页号的长度
+        """
+        if value_size <= self.max_local():
+            return value_size
+        return self.min_local() + LEAF_NODE_OVERFLOW_POINTER_SIZE
+    
+    def max_cells(self, row_size: int = None) -> int:
+        """计算叶子节点能容纳的指定大小单元格的最大数量。
+        
+        Args:
+            row_size: 值的长度，默认为ROW_SIZE
+            
+        Returns:
+            int: 页面大小下能容纳的单元格数量
+        """
+        row_size = row_size or ROW_SIZE
+        return self.capacity() // self.cell_space(row_size)
+    
     def num_cells(self) -> int:
         """获取叶子节点中的单元格数量。
         
         Returns:
             单元格数量
         """
-        return struct.unpack('<I', self.page[LEAF_NODE_NUM_CELLS_OFFSET:LEAF_NODE_NUM_CELLS_OFFSET + 4])[0]
+        return U32.unpack_from(self.page, LEAF_NODE_NUM_CELLS_OFFSET)[0]
     
     def set_num_cells(self, num: int) -> None:
         """设置叶子节点中的单元格数量。
@@ -125,7 +225,7 @@ class EnhancedLeafNode(EnhancedBTreeNode):
         Args:
             num: 单元格数量
         """
-        self.page[LEAF_NODE_NUM_CELLS_OFFSET:LEAF_NODE_NUM_CELLS_OFFSET + 4] = struct.pack('<I', num)
+        self._write(LEAF_NODE_NUM_CELLS_OFFSET, U32.pack(num))
     
     def next_leaf(self) -> int:
         """获取下一个叶子节点的页号。
@@ -133,7 +233,7 @@ class EnhancedLeafNode(EnhancedBTreeNode):
         Returns:
             下一个叶子节点页号，如果没有下一个返回0
         """
-        return struct.unpack('<I', self.page[LEAF_NODE_NEXT_LEAF_OFFSET:LEAF_NODE_NEXT_LEAF_OFFSET + 4])[0]
+        return U32.unpack_from(self.page, LEAF_NODE_NEXT_LEAF_OFFSET)[0]
     
     def set_next_leaf(self, next_page: int) -> None:
         """设置下一个叶子节点的页号。
@@ -141,151 +241,342 @@ class EnhancedLeafNode(EnhancedBTreeNode):
         Args:
             next_page: 下一个叶子节点页号
         """
-        self.page[LEAF_NODE_NEXT_LEAF_OFFSET:LEAF_NODE_NEXT_LEAF_OFFSET + 4] = struct.pack('<I', next_page)
+        self._write(LEAF_NODE_NEXT_LEAF_OFFSET, U32.pack(next_page))
     
-    def cell(self, cell_num: int, row_size: int = None) -> int:
-        """计算指定单元格的偏移量。
+    def content_start(self) -> int:
+        """获取单元格内容区的起始偏移。
+        
+        Returns:
+            int: 内容区起始偏移，内容区为空时为页面可用区域的末尾
+        """
+        return U32.unpack_from(self.page, LEAF_NODE_CONTENT_START_OFFSET)[0] or self.pager.usable_size
+    
+    def fragmented_bytes(self) -> int:
+        """获取内容区中已删除单元格留下的碎片字节数。
+        
+        Returns:
+            int: 碎片字节数
+        """
+        return U32.unpack_from(self.page, LEAF_NODE_FRAGMENTED_OFFSET)[0]
+    
+    def _set_content(self, content_start: int, fragmented: int) -> None:
+        """设置内容区起始偏移和碎片字节数。
+        
+        Args:
+            content_start: 内容区起始偏移
+            fragmented: 碎片字节数
+        """
+        if content_start >= self.pager.usable_size:
+            content_start = 0
+        self._write(LEAF_NODE_CONTENT_START_OFFSET, LEAF_CONTENT.pack(content_start, fragmented))
+    
+    def free_space(self) -> int:
+        """获取可用于新单元格的字节数（包括碎片，整理后可用）。
+        
+        Returns:
+            int: 空闲字节数
+        """
+        pointers_end = LEAF_NODE_HEADER_SIZE + self.num_cells() * LEAF_NODE_CELL_POINTER_SIZE
+        return self.content_start() - pointers_end + self.fragmented_bytes()
+    
+    def has_room(self, value_size: int) -> bool:
+        """检查是否还能插入指定长度的值。
+        
+        Args:
+            value_size: 值的长度（溢出的值只计算其本地部分）
+            
+        Returns:
+            bool: 整理后能够容纳时返回True
+        """
+        return self.cell_space(self.local_size(value_size)) <= self.free_space()
+    
+    def cell(self, cell_num: int) -> int:
+        """获取指定单元格内容的偏移量。
         
         Args:
             cell_num: 单元格索引
-            row_size: 行大小，默认为291字节
             
         Returns:
             单元格在页面中的偏移量
         """
-        row_size = row_size or 291
-        leaf_node_cell_size = 4 + row_size
-        return LEAF_NODE_HEADER_SIZE + cell_num * leaf_node_cell_size
+        return U16.unpack_from(self.page, LEAF_NODE_HEADER_SIZE + cell_num * LEAF_NODE_CELL_POINTER_SIZE)[0]
     
-    def key(self, cell_num: int, row_size: int = None) -> int:
+    def key(self, cell_num: int) -> int:
         """获取指定单元格的键值。
         
         Args:
             cell_num: 单元格索引
-            row_size: 行大小
             
         Returns:
             键值
         """
-        offset = self.cell(cell_num, row_size)
-        return struct.unpack('<I', self.page[offset:offset + 4])[0]
+        return U32.unpack_from(self.page, self.cell(cell_num))[0]
     
-    def set_key(self, cell_num: int, key: int, row_size: int = None) -> None:
-        """设置指定单元格的键值。
+    def set_key(self, cell_num: int, key: int) -> None:
+        """就地修改指定单元格的键值。
         
         Args:
             cell_num: 单元格索引
             key: 键值
-            row_size: 行大小
         """
-        offset = self.cell(cell_num, row_size)
-        self.page[offset:offset + 4] = struct.pack('<I', key)
+        self._write(self.cell(cell_num), U32.pack(key))
     
-    def value(self, cell_num: int, row_size: int = None) -> bytes:
-        """获取指定单元格的值。
+    def value_size(self, cell_num: int) -> int:
+        """获取指定单元格中值的长度（溢出的值为完整长度）。
         
         Args:
             cell_num: 单元格索引
-            row_size: 行大小
             
         Returns:
-            值的字节数组
+            值的字节数
         """
-        offset = self.cell(cell_num, row_size) + 4
-        row_size = row_size or 291  # 默认使用旧的ROW_SIZE
-        return bytes(self.page[offset:offset + row_size])
+        return U32.unpack_from(self.page, self.cell(cell_num) + LEAF_NODE_KEY_SIZE)[0]
     
-    def set_value(self, cell_num: int, value: bytes, row_size: int = None) -> None:
-        """设置指定单元格的值。
+    def is_overflow(self, cell_num: int) -> bool:
+        """检查指定单元格的值是否溢出到了溢出页链。
         
         Args:
             cell_num: 单元格索引
-            value: 值的字节数组
-            row_size: 行大小
+            
+        Returns:
+            bool: 值溢出时返回True
         """
-        offset = self.cell(cell_num, row_size) + 4
-        row_size = row_size or 291  # 默认使用旧的ROW_SIZE
-        # 确保不会写入超出实际值长度的数据
-        actual_size = min(len(value), row_size)
-        self.page[offset:offset + actual_size] = value[:actual_size]
-        # 如果需要，用零填充剩余空间
-        if actual_size < row_size:
-            self.page[offset + actual_size:offset + row_size] = b'\x00' * (row_size - actual_size)
+        return self.value_size(cell_num) > self.max_local()
     
-    def insert_cell(self, cell_num: int, key: int, value: bytes, row_size: int = None) -> None:
+    def overflow_page(self, cell_num: int) -> int:
+        """获取溢出单元格的第一个溢出页页号。
+        
+        Args:
+            cell_num: 单元格索引（必须是溢出单元格）
+            
+        Returns:
+            int: 第一个溢出页的页号
+        """
+        return U32.unpack_from(self.page, self.cell(cell_num) + LEAF_NODE_CELL_HEADER_SIZE
+                               + self.min_local())[0]
+    
+    def set_overflow_page(self, cell_num: int, page_num: int) -> None:
+        """设置溢出单元格的第一个溢出页页号。
+        
+        Args:
+            cell_num: 单元格索引（必须是溢出单元格）
+            page_num: 第一个溢出页的页号
+        """
+        self._write(self.cell(cell_num) + LEAF_NODE_CELL_HEADER_SIZE + self.min_local(),
+                    U32.pack(page_num))
+    
+    def value(self, cell_num: int) -> Union[bytes, OverflowValue]:
+        """获取指定单元格的值。
+        
+        Args:
+            cell_num: 单元格索引
+            
+        Returns:
+            值的字节数组；溢出的值返回按需读取溢出页链的OverflowValue
+        """
+        offset = self.cell(cell_num)
+        size = U32.unpack_from(self.page, offset + LEAF_NODE_KEY_SIZE)[0]
+        return self._load_value(offset + LEAF_NODE_CELL_HEADER_SIZE, size, self.max_local())
+    
+    def _load_value(self, offset: int, size: int, max_local: int) -> Union[bytes, OverflowValue]:
+        """从单元格的本地部分构造值。
+        
+        Args:
+            offset: 本地部分在页面中的偏移量
+            size: 值的完整长度
+            max_local: 内联上限
+            
+        Returns:
+            内联的值或OverflowValue
+        """
+        if size <= max_local:
+            return bytes(self.page[offset:offset + size])
+        min_local = self.min_local()
+        first_page = U32.unpack_from(self.page, offset + min_local)[0]
+        return OverflowValue(self.pager, bytes(self.page[offset:offset + min_local]), size, first_page)
+    
+    def cells(self) -> List[Tuple[int, Union[bytes, OverflowValue]]]:
+        """获取所有单元格。
+        
+        Returns:
+            按键排序的(键, 值)列表，溢出的值为OverflowValue
+        """
+        page = self.page
+        max_local = self.max_local()
+        result = []
+        for (offset,) in U16.iter_unpack(page[LEAF_NODE_HEADER_SIZE:LEAF_NODE_HEADER_SIZE
+                                              + self.num_cells() * LEAF_NODE_CELL_POINTER_SIZE]):
+            key, size = LEAF_CELL_HEADER.unpack_from(page, offset)
+            result.append((key, self._load_value(offset + LEAF_NODE_CELL_HEADER_SIZE, size, max_local)))
+        return result
+    
+    def records(self) -> List[Tuple[int, int, bytes]]:
+        """获取所有单元格的原始记录（不读取溢出页链）。
+        
+        Returns:
+            按键排序的(键, 值长度, 本地部分)列表
+        """
+        page = self.page
+        result = []
+        for (offset,) in U16.iter_unpack(page[LEAF_NODE_HEADER_SIZE:LEAF_NODE_HEADER_SIZE
+                                              + self.num_cells() * LEAF_NODE_CELL_POINTER_SIZE]):
+            key, size = LEAF_CELL_HEADER.unpack_from(page, offset)
+            offset += LEAF_NODE_CELL_HEADER_SIZE
+            result.append((key, size, bytes(page[offset:offset + self.local_size(size)])))
+        return result
+    
+    def set_cells(self, records: List[Tuple[int, int, bytes]]) -> None:
+        """用给定的单元格记录重写整个叶子节点的单元格区域（内容区紧凑排列）。
+        
+        Args:
+            records: 按键排序的(键, 值长度, 本地部分)列表
+            
+        Raises:
+            BTreeError: 如果单元格总大小超过页面容量
+        """
+        if sum(self.cell_space(len(local)) for _, _, local in records) > self.capacity():
+            raise BTreeError("叶子节点已满")
+        
+        # 第一个单元格放在页尾，后面的单元格依次向前
+        content_start = self.pager.usable_size
+        pointers = []
+        contents = []
+        for key, size, local in records:
+            content = LEAF_CELL_HEADER.pack(key, size) + local
+            content_start -= len(content)
+            pointers.append(U16.pack(content_start))
+            contents.append(content)
+        contents.reverse()
+        
+        pointers_end = LEAF_NODE_HEADER_SIZE + len(records) * LEAF_NODE_CELL_POINTER_SIZE
+        self._write(LEAF_NODE_HEADER_SIZE,
+                    b''.join(pointers) + bytes(content_start - pointers_end) + b''.join(contents))
+        self.set_num_cells(len(records))
+        self._set_content(content_start, 0)
+    
+    def defragment(self) -> None:
+        """页内整理：把所有单元格紧凑排列到内容区末尾，消除碎片。"""
+        self.set_cells(self.records())
+    
+    def _allocate(self, size: int) -> int:
+        """在内容区中为新单元格分配空间。
+        
+        调用方需要保证单元格指针数组增长一项后仍有足够空间。
+        
+        Args:
+            size: 单元格内容的字节数
+            
+        Returns:
+            int: 分配到的偏移量
+        """
+        pointers_end = LEAF_NODE_HEADER_SIZE + (self.num_cells() + 1) * LEAF_NODE_CELL_POINTER_SIZE
+        if self.content_start() - size < pointers_end:
+            self.defragment()
+        content_start = self.content_start() - size
+        self._set_content(content_start, self.fragmented_bytes())
+        return content_start
+    
+    def insert_cell(self, cell_num: int, key: int, local: bytes, value_size: Optional[int] = None) -> None:
         """插入新单元格。
         
         Args:
             cell_num: 插入位置的索引
             key: 键值
-            value: 值的字节数组
-            row_size: 行大小
+            local: 单元格的本地部分（内联的值，或内联前缀加第一个溢出页页号）
+            value_size: 值的完整长度，默认为本地部分的长度（内联的值）
             
         Raises:
-            BTreeError: 如果叶子节点已满
+            BTreeError: 如果叶子节点没有足够空间
         """
-        if self.num_cells() >= LEAF_NODE_MAX_CELLS:
+        if value_size is None:
+            value_size = len(local)
+        if self.cell_space(len(local)) > self.free_space():
             raise BTreeError("叶子节点已满")
         
-        row_size = row_size or 291
+        offset = self._allocate(LEAF_NODE_CELL_HEADER_SIZE + len(local))
+        self._write(offset, LEAF_CELL_HEADER.pack(key, value_size) + local)
         
-        # 移动单元格以腾出空间
-        leaf_node_cell_size = 4 + row_size
-        for i in range(self.num_cells(), cell_num, -1):
-            src = self.cell(i - 1, row_size)
-            dst = self.cell(i, row_size)
-            self.page[dst:dst + leaf_node_cell_size] = self.page[src:src + leaf_node_cell_size]
-        
-        # 插入新单元格
-        self.set_key(cell_num, key, row_size)
-        self.set_value(cell_num, value, row_size)
-        self.set_num_cells(self.num_cells() + 1)
+        # 指针数组中插入位置之后的指针后移一项
+        num_cells = self.num_cells()
+        pointer = LEAF_NODE_HEADER_SIZE + cell_num * LEAF_NODE_CELL_POINTER_SIZE
+        pointers_end = LEAF_NODE_HEADER_SIZE + num_cells * LEAF_NODE_CELL_POINTER_SIZE
+        self._write(pointer, U16.pack(offset) + bytes(self.page[pointer:pointers_end]))
+        self.set_num_cells(num_cells + 1)
     
-    def delete_cell(self, cell_num: int, row_size: int = None) -> None:
+    def delete_cell(self, cell_num: int) -> None:
         """从叶子节点删除单元格。
         
         Args:
             cell_num: 要删除的单元格索引
-            row_size: 行大小
             
         Raises:
             BTreeError: 如果单元格索引超出范围
         """
-        if cell_num >= self.num_cells():
+        num_cells = self.num_cells()
+        if cell_num >= num_cells:
             raise BTreeError("单元格索引超出范围")
         
-        row_size = row_size or 291
-        leaf_node_cell_size = 4 + row_size
+        offset = self.cell(cell_num)
+        size = LEAF_NODE_CELL_HEADER_SIZE + self.local_size(self.value_size(cell_num))
         
-        # 移动单元格填补空缺
-        for i in range(cell_num, self.num_cells() - 1):
-            src = self.cell(i + 1, row_size)
-            dst = self.cell(i, row_size)
-            self.page[dst:dst + leaf_node_cell_size] = self.page[src:src + leaf_node_cell_size]
+        # 清空单元格内容以避免数据残留
+        self._write(offset, bytes(size))
         
-        # 清空最后一个单元格以避免数据残留
-        last_cell_offset = self.cell(self.num_cells() - 1, row_size)
-        self.page[last_cell_offset:last_cell_offset + leaf_node_cell_size] = b'\x00' * leaf_node_cell_size
+        # 指针数组中删除位置之后的指针前移一项
+        pointer = LEAF_NODE_HEADER_SIZE + cell_num * LEAF_NODE_CELL_POINTER_SIZE
+        pointers_end = LEAF_NODE_HEADER_SIZE + num_cells * LEAF_NODE_CELL_POINTER_SIZE
+        self._write(pointer, bytes(self.page[pointer + LEAF_NODE_CELL_POINTER_SIZE:pointers_end])
+                    + bytes(LEAF_NODE_CELL_POINTER_SIZE))
+        self.set_num_cells(num_cells - 1)
         
-        self.set_num_cells(self.num_cells() - 1)
+        if num_cells == 1:
+            self._set_content(0, 0)
+        elif offset == self.content_start():
+            # 删除的是内容区最前面的单元格，直接收缩内容区
+            self._set_content(offset + size, self.fragmented_bytes())
+        else:
+            self._set_content(self.content_start(), self.fragmented_bytes() + size)
     
-    def update_cell(self, cell_num: int, key: int, value: bytes, row_size: int = None) -> None:
+    def can_update(self, cell_num: int, value_size: int) -> bool:
+        """检查单元格的值能否在本节点中替换为指定长度的新值。
+        
+        Args:
+            cell_num: 单元格索引
+            value_size: 新值的完整长度
+            
+        Returns:
+            bool: 能够容纳时返回True
+        """
+        growth = self.local_size(value_size) - self.local_size(self.value_size(cell_num))
+        return growth <= self.free_space()
+    
+    def update_cell(self, cell_num: int, key: int, local: bytes, value_size: Optional[int] = None) -> None:
         """更新现有单元格。
         
+        本地部分与原来等长时就地改写，否则删除旧单元格后在原位置插入新单元格。
+        旧值的溢出页链由调用方释放。
+        
         Args:
             cell_num: 要更新的单元格索引
             key: 新的键值
-            value: 新的值的字节数组
-            row_size: 行大小
+            local: 新的本地部分
+            value_size: 新值的完整长度，默认为本地部分的长度
             
         Raises:
-            BTreeError: 如果单元格索引超出范围
+            BTreeError: 如果单元格索引超出范围或新值放不下
         """
+        if value_size is None:
+            value_size = len(local)
         if cell_num >= self.num_cells():
             raise BTreeError("单元格索引超出范围")
+        if not self.can_update(cell_num, value_size):
+            raise BTreeError("叶子节点已满")
         
-        self.set_key(cell_num, key)
-        self.set_value(cell_num, value, row_size)
+        if self.local_size(self.value_size(cell_num)) == len(local):
+            self._write(self.cell(cell_num), LEAF_CELL_HEADER.pack(key, value_size) + local)
+        else:
+            self.delete_cell(cell_num)
+            self.insert_cell(cell_num, key, local, value_size)
 
 
 class EnhancedInternalNode(EnhancedBTreeNode):
@@ -310,7 +601,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         Returns:
             键数量
         """
-        return struct.unpack('<I', self.page[INTERNAL_NODE_NUM_KEYS_OFFSET:INTERNAL_NODE_NUM_KEYS_OFFSET + 4])[0]
+        return U32.unpack_from(self.page, INTERNAL_NODE_NUM_KEYS_OFFSET)[0]
     
     def set_num_keys(self, num: int) -> None:
         """设置内部节点中的键数量。
@@ -318,7 +609,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         Args:
             num: 键数量
         """
-        self.page[INTERNAL_NODE_NUM_KEYS_OFFSET:INTERNAL_NODE_NUM_KEYS_OFFSET + 4] = struct.pack('<I', num)
+        self._write(INTERNAL_NODE_NUM_KEYS_OFFSET, U32.pack(num))
     
     def right_child(self) -> int:
         """获取右子节点的页号。
@@ -326,7 +617,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         Returns:
             右子节点页号
         """
-        return struct.unpack('<I', self.page[INTERNAL_NODE_RIGHT_CHILD_OFFSET:INTERNAL_NODE_RIGHT_CHILD_OFFSET + 4])[0]
+        return U32.unpack_from(self.page, INTERNAL_NODE_RIGHT_CHILD_OFFSET)[0]
     
     def set_right_child(self, child_page: int) -> None:
         """设置右子节点的页号。
@@ -334,7 +625,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         Args:
             child_page: 右子节点页号
         """
-        self.page[INTERNAL_NODE_RIGHT_CHILD_OFFSET:INTERNAL_NODE_RIGHT_CHILD_OFFSET + 4] = struct.pack('<I', child_page)
+        self._write(INTERNAL_NODE_RIGHT_CHILD_OFFSET, U32.pack(child_page))
     
     def cell(self, cell_num: int) -> int:
         """计算指定单元格的偏移量。
@@ -358,8 +649,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         """
         if child_num == self.num_keys():
             return self.right_child()
-        offset = self.cell(child_num)
-        return struct.unpack('<I', self.page[offset:offset + 4])[0]
+        return U32.unpack_from(self.page, self.cell(child_num))[0]
     
     def set_child(self, child_num: int, child_page: int) -> None:
         """设置指定子节点的页号。
@@ -371,8 +661,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         if child_num == self.num_keys():
             self.set_right_child(child_page)
         else:
-            offset = self.cell(child_num)
-            self.page[offset:offset + 4] = struct.pack('<I', child_page)
+            self._write(self.cell(child_num), U32.pack(child_page))
     
     def key(self, key_num: int) -> int:
         """获取指定键的值。
@@ -383,8 +672,7 @@ class EnhancedInternalNode(EnhancedBTreeNode):
         Returns:
             键值
         """
-        offset = self.cell(key_num) + 4
-        return struct.unpack('<I', self.page[offset:offset + 4])[0]
+        return U32.unpack_from(self.page, self.cell(key_num) + INTERNAL_NODE_CHILD_SIZE)[0]
     
     def set_key(self, key_num: int, key: int) -> None:
         """设置指定键的值。
@@ -393,8 +681,77 @@ class EnhancedInternalNode(EnhancedBTreeNode):
             key_num: 键索引
             key: 键值
         """
-        offset = self.cell(key_num) + 4
-        self.page[offset:offset + 4] = struct.pack('<I', key)
+        self._write(self.cell(key_num) + INTERNAL_NODE_CHILD_SIZE, U32.pack(key))
+    
+    def max_keys(self) -> int:
+        """获取内部节点能容纳的最大键数量。
+        
+        每个键占一个8字节单元格，容量由数据库的页面大小决定
+        （4KB页面可容纳510个键）。
+        
+        Returns:
+            int: 页面大小下能容纳的最大键数量
+        """
+        return (self.pager.usable_size - INTERNAL_NODE_HEADER_SIZE) // INTERNAL_NODE_CELL_SIZE
+    
+    def find_child_index(self, key: int) -> int:
+        """二分查找键所属子树的索引。
+        
+        直接从页面缓冲区按偏移量解包键，不创建切片副本。
+        
+        Args:
+            key: 要查找的键
+            
+        Returns:
+            int: 第一个不小于key的分隔键的索引，key大于所有分隔键时为键数量（右子节点）
+        """
+        page = self.page
+        unpack_from = U32.unpack_from
+        key_offset = INTERNAL_NODE_HEADER_SIZE + INTERNAL_NODE_CHILD_SIZE
+        min_index = 0
+        max_index = self.num_keys()
+        while min_index != max_index:
+            index = (min_index + max_index) // 2
+            if unpack_from(page, key_offset + index * INTERNAL_NODE_CELL_SIZE)[0] >= key:
+                max_index = index
+            else:
+                min_index = index + 1
+        return min_index
+    
+    def children(self) -> List[int]:
+        """获取所有子节点的页号（包括右子节点）。
+        
+        Returns:
+            子节点页号列表，长度为键数量加一
+        """
+        num_keys = self.num_keys()
+        children = [child for child, _ in INTERNAL_CELL.iter_unpack(
+            self.page[INTERNAL_NODE_HEADER_SIZE:self.cell(num_keys)])]
+        children.append(self.right_child())
+        return children
+    
+    def keys(self) -> List[int]:
+        """获取所有分隔键。
+        
+        Returns:
+            按升序排列的分隔键列表
+        """
+        return [key for _, key in INTERNAL_CELL.iter_unpack(
+            self.page[INTERNAL_NODE_HEADER_SIZE:self.cell(self.num_keys())])]
+    
+    def set_cells(self, keys: List[int], children: List[int]) -> None:
+        """用给定的键和子节点重写整个内部节点。
+        
+        第i个键是第i个子树中的最大键，最后一个子节点作为右子节点。
+        
+        Args:
+            keys: 按升序排列的分隔键
+            children: 子节点页号，比键多一个
+        """
+        self.set_num_keys(len(keys))
+        self._write(INTERNAL_NODE_HEADER_SIZE,
+                    b''.join(INTERNAL_CELL.pack(child, key) for child, key in zip(children, keys)))
+        self.set_right_child(children[-1])
 
 
 class EnhancedBTree:
@@ -402,33 +759,63 @@ class EnhancedBTree:
     
     完整的B树实现，提供高效的键值存储和检索功能。
     支持插入、删除、更新、查询等操作，并保证数据的有序性。
+    删除后占用低于最低填充率的节点与兄弟节点合并或从兄弟节点借用，
+    合并释放的页面归还给分页管理器，根节点只剩一个子节点时树降低一层。
     """
     
-    def __init__(self, pager: Pager, row_size: int = 291) -> None:
+    def __init__(self, pager: Pager, row_size: int = ROW_SIZE, root_page_num: Optional[int] = None,
+                 fill_factor: float = BTREE_MIN_FILL_FACTOR) -> None:
         """初始化B树。
         
         Args:
             pager: 页面管理器
-            row_size: 行大小，默认为291字节
+            row_size: 表模式估算的行大小（叶子单元格按值的实际长度存储，
+                该值只作为调用方信息保留）
+            root_page_num: 根节点页号，默认为分页管理器的首个数据页
+            fill_factor: 节点的最低填充率（0到0.5之间），删除后低于该比例的节点
+                与兄弟节点合并或借用；0表示只回收空节点
+            
+        Raises:
+            BTreeError: 如果填充率超出范围
         """
+        if not 0 <= fill_factor <= 0.5:
+            raise BTreeError(f"填充率必须在0到0.5之间: {fill_factor}")
         self.pager = pager
-        self.root_page_num = 0
+        self.root_page_num = pager.first_data_page if root_page_num is None else root_page_num
         self.row_size = row_size
+        self.fill_factor = fill_factor
         
-        # 如果数据库为空，创建新的根节点
-        if pager.num_pages == 0:
+        # 如果根页面尚未分配，分配页面并创建新的根节点
+        if self.root_page_num >= pager.num_pages:
+            self.root_page_num = pager.allocate_page()
             self.create_new_root()
     
+    @classmethod
+    def create(cls, pager: Pager, row_size: int = ROW_SIZE,
+               fill_factor: float = BTREE_MIN_FILL_FACTOR) -> 'EnhancedBTree':
+        """在新分配的页面上创建一棵空B树。
+        
+        Args:
+            pager: 页面管理器
+            row_size: 行大小
+            fill_factor: 节点的最低填充率
+            
+        Returns:
+            新的B树，根节点为空叶子节点
+        """
+        root_page_num = pager.allocate_page()
+        btree = cls(pager, row_size=row_size, root_page_num=root_page_num, fill_factor=fill_factor)
+        btree.create_new_root()
+        return btree
+    
     def create_new_root(self) -> None:
         """创建新的根节点。"""
-        root = EnhancedLeafNode(self.pager, 0)
+        root = EnhancedLeafNode(self.pager, self.root_page_num)
+        root._write(0, bytes(len(root.page)))  # 清除页面上原有的内容
         root.set_node_type(NODE_LEAF)  # 设置为叶子节点
         root.set_root(True)  # 设置为根节点
         root.set_num_cells(0)  # 初始单元格数量为0
-        root.set_next_leaf(0)  # 没有下一个叶子节点
-        
-        # 将根节点写入磁盘
-        self.pager.write_page(0, bytes(root.page))
+        root.set_next_leaf(0)  # 没有下一个叶子节点（_write已将根页标记为脏页）
     
     def find(self, key: int) -> Tuple[int, int]:
         """查找键的位置。
@@ -441,17 +828,15 @@ class EnhancedBTree:
         """
         page_num = self.root_page_num
         
-        while True:
-            node = EnhancedBTreeNode(self.pager, page_num)
-            node_type = node.get_node_type()
-            
-            if node_type == NODE_LEAF:
-                # 到达叶子节点，在叶子节点中查找
-                leaf = EnhancedLeafNode(self.pager, page_num)
-                return self._find_in_leaf(leaf, key)
-            else:
-                # 内部节点，继续向下查找
+        with self.pager.pinned():
+            while True:
                 internal = EnhancedInternalNode(self.pager, page_num)
+                
+                if internal.get_node_type() == NODE_LEAF:
+                    # 到达叶子节点，在叶子节点中查找
+                    leaf = EnhancedLeafNode(self.pager, page_num)
+                    return self._find_in_leaf(leaf, key)
+                # 内部节点，继续向下查找
                 page_num = self._find_child(internal, key)
     
     def _find_in_leaf(self, leaf: EnhancedLeafNode, key: int) -> Tuple[int, int]:
@@ -472,7 +857,7 @@ class EnhancedBTree:
         
         while one_past_max_index != min_index:
             index = (min_index + one_past_max_index) // 2
-            key_at_index = leaf.key(index, self.row_size)
+            key_at_index = leaf.key(index)
             
             if key == key_at_index:
                 return (leaf.page_num, index)
@@ -493,26 +878,13 @@ class EnhancedBTree:
         Returns:
             子节点页号
         """
-        num_keys = internal.num_keys()
-        
-        # 二分查找
-        min_index = 0
-        max_index = num_keys
-        
-        while min_index != max_index:
-            index = (min_index + max_index) // 2
-            key_at_index = internal.key(index)
-            
-            if key_at_index >= key:
-                max_index = index
-            else:
-                min_index = index + 1
-        
-        return internal.child(min_index)
+        return internal.child(internal.find_child_index(key))
     
     def insert(self, key: int, value: bytes) -> None:
         """插入键值对。
         
+        修改的页面只被标记为脏页，由调用方（通常是事务提交）统一刷新到磁盘。
+        
         Args:
             key: 键
             value: 值的字节数组
@@ -520,59 +892,222 @@ class EnhancedBTree:
         Raises:
             BTreeError: 如果键已存在
         """
-        page_num, cell_num = self.find(key)
-        leaf = EnhancedLeafNode(self.pager, page_num)
-        
-        if leaf.num_cells() < LEAF_NODE_MAX_CELLS:
-            # 叶子节点未满，直接插入
-            self._insert_into_leaf(leaf, cell_num, key, value)
-        else:
-            # 叶子节点已满，需要分裂
-            self._split_and_insert_leaf(leaf, cell_num, key, value)
-        
-        # 确保数据刷新到磁盘
-        self.pager.flush()
+        # 在整个插入过程中固定涉及的页面，防止被缓冲池淘汰
+        with self.pager.pinned():
+            page_num, cell_num = self.find(key)
+            leaf = EnhancedLeafNode(self.pager, page_num)
+            
+            if cell_num < leaf.num_cells() and leaf.key(cell_num) == key:
+                raise BTreeError("重复的键")
+            
+            local = self._store_value(leaf, value)
+            if leaf.has_room(len(value)):
+                # 叶子节点未满，直接插入；单元格直接写入缓冲池页帧并标记为脏页，无需整页复制
+                leaf.insert_cell(cell_num, key, local, len(value))
+            else:
+                # 叶子节点已满，需要分裂
+                self._split_and_insert_leaf(leaf, cell_num, (key, len(value), local))
     
-    def _insert_into_leaf(self, leaf: EnhancedLeafNode, cell_num: int, key: int, value: bytes) -> None:
-        """向叶子节点插入数据。
+    def _store_value(self, leaf: EnhancedLeafNode, value: bytes) -> bytes:
+        """生成值在单元格中的本地部分，超过内联上限的部分写入新的溢出页链。
         
         Args:
-            leaf: 叶子节点
-            cell_num: 插入位置
-            key: 键
-            value: 值的字节数组
+            leaf: 目标叶子节点（用于计算内联上限）
+            value: 完整的值
             
-        Raises:
-            BTreeError: 如果键已存在
+        Returns:
+            单元格的本地部分
         """
-        if cell_num < leaf.num_cells() and leaf.key(cell_num, self.row_size) == key:
-            raise BTreeError("重复的键")
+        if len(value) <= leaf.max_local():
+            return value
+        min_local = leaf.min_local()
+        first_page = write_overflow(self.pager, value[min_local:])
+        return value[:min_local] + U32.pack(first_page)
+    
+    def _free_value(self, leaf: EnhancedLeafNode, cell_num: int) -> None:
+        """释放单元格的值占用的溢出页链（值未溢出时不做任何事）。
         
-        leaf.insert_cell(cell_num, key, value, self.row_size)
-        # 将修改后的页面写回磁盘
-        self.pager.write_page(leaf.page_num, bytes(leaf.page))
+        Args:
+            leaf: 叶子节点
+            cell_num: 单元格索引
+        """
+        if leaf.is_overflow(cell_num):
+            free_overflow(self.pager, leaf.overflow_page(cell_num))
     
     def delete(self, key: int) -> bool:
         """删除键值对。
         
+        删除后叶子节点占用低于最低填充率时与兄弟节点合并或借用单元格。
+        
         Args:
             key: 要删除的键
             
         Returns:
             删除成功返回True，键不存在返回False
         """
-        page_num, cell_num = self.find(key)
-        leaf = EnhancedLeafNode(self.pager, page_num)
+        with self.pager.pinned():
+            page_num, cell_num = self.find(key)
+            leaf = EnhancedLeafNode(self.pager, page_num)
+            
+            if cell_num >= leaf.num_cells() or leaf.key(cell_num) != key:
+                return False
+            
+            self._free_value(leaf, cell_num)
+            leaf.delete_cell(cell_num)
+            self._rebalance_leaf(leaf)
+            return True
+    
+    def _is_underfull_leaf(self, leaf: EnhancedLeafNode) -> bool:
+        """检查叶子节点的占用是否低于最低填充率。
         
-        if cell_num >= leaf.num_cells() or leaf.key(cell_num, self.row_size) != key:
-            return False
+        Args:
+            leaf: 叶子节点
+            
+        Returns:
+            bool: 叶子节点为空或占用低于最低填充率时返回True
+        """
+        used = leaf.capacity() - leaf.free_space()
+        return leaf.num_cells() == 0 or used < self.fill_factor * leaf.capacity()
+    
+    def _is_underfull_internal(self, node: EnhancedInternalNode) -> bool:
+        """检查内部节点的键数量是否低于最低填充率。
         
-        leaf.delete_cell(cell_num, self.row_size)
+        Args:
+            node: 内部节点
+            
+        Returns:
+            bool: 节点只剩一个子节点或键数量低于最低填充率时返回True
+        """
+        return node.num_keys() == 0 or node.num_keys() < self.fill_factor * node.max_keys()
+    
+    def _sibling(self, node: EnhancedBTreeNode) -> Tuple[EnhancedInternalNode, int]:
+        """选择与节点合并或借用的兄弟节点（优先左侧兄弟）。
         
-        # 将修改后的页面写回磁盘
-        self.pager.write_page(leaf.page_num, bytes(leaf.page))
+        Args:
+            node: 非根节点
+            
+        Returns:
+            (父节点, 左侧节点在父节点中的子节点索引)，右侧节点的索引为其加一
+        """
+        parent = EnhancedInternalNode(self.pager, node.get_parent())
+        index = parent.children().index(node.page_num)
+        return parent, index - 1 if index > 0 else index
+    
+    def _rebalance_leaf(self, leaf: EnhancedLeafNode) -> None:
+        """处理删除后占用过低的叶子节点。
+        
+        两个相邻叶子的单元格能放进一页时合并到左侧叶子并释放右侧叶子，
+        否则在两者之间按字节数重新平分单元格。溢出页链随单元格移动，无需读取。
+        
+        Args:
+            leaf: 刚删除过单元格的叶子节点
+        """
+        if leaf.is_root() or not self._is_underfull_leaf(leaf):
+            return
+        
+        parent, index = self._sibling(leaf)
+        children = parent.children()
+        left = EnhancedLeafNode(self.pager, children[index])
+        right = EnhancedLeafNode(self.pager, children[index + 1])
+        records = left.records() + right.records()
+        
+        if sum(left.cell_space(len(local)) for _, _, local in records) <= left.capacity():
+            left.set_cells(records)
+            left.set_next_leaf(right.next_leaf())
+            self._remove_child(parent, index)
+            self.pager.free_page(right.page_num)
+            self._rebalance_internal(parent)
+            return
+        
+        # 两个叶子合起来放不下一页，平分后两边都高于最低填充率
+        left_records, right_records = self._partition_cells(records, left.capacity())
+        left.set_cells(left_records)
+        right.set_cells(right_records)
+        parent.set_key(index, left_records[-1][0])
+    
+    def _remove_child(self, parent: EnhancedInternalNode, index: int) -> None:
+        """右侧节点合并到左侧节点后，从父节点中删除右侧节点。
+        
+        合并后的左侧节点的上界键是原右侧节点的上界键（右侧节点是
+        右子节点时左侧节点成为新的右子节点）。
+        
+        Args:
+            parent: 父节点
+            index: 左侧节点在父节点中的子节点索引
+        """
+        keys = parent.keys()
+        children = parent.children()
+        del keys[index]
+        del children[index + 1]
+        parent.set_cells(keys, children)
+    
+    def _rebalance_internal(self, node: EnhancedInternalNode) -> None:
+        """处理子节点合并后键数量过低的内部节点。
+        
+        根节点只剩一个子节点时把子节点移到根页上，树降低一层；
+        其他节点与兄弟节点合并（父节点中的分隔键下移）或重新平分子节点。
+        
+        Args:
+            node: 刚删除过子节点的内部节点
+        """
+        if node.is_root():
+            if node.num_keys() == 0:
+                self._collapse_root(node)
+            return
+        if not self._is_underfull_internal(node):
+            return
+        
+        parent, index = self._sibling(node)
+        children = parent.children()
+        left = EnhancedInternalNode(self.pager, children[index])
+        right = EnhancedInternalNode(self.pager, children[index + 1])
+        # 父节点中的分隔键是左侧子树的上界，合并后成为左侧最后一个子节点的键
+        keys = left.keys() + [parent.key(index)] + right.keys()
+        grandchildren = left.children() + right.children()
+        
+        if len(keys) <= left.max_keys():
+            left.set_cells(keys, grandchildren)
+            self._adopt(left, right.children())
+            self._remove_child(parent, index)
+            self.pager.free_page(right.page_num)
+            self._rebalance_internal(parent)
+            return
+        
+        middle = len(keys) // 2
+        moved = set(right.children())
+        left.set_cells(keys[:middle], grandchildren[:middle + 1])
+        right.set_cells(keys[middle + 1:], grandchildren[middle + 1:])
+        self._adopt(left, [child for child in grandchildren[:middle + 1] if child in moved])
+        self._adopt(right, [child for child in grandchildren[middle + 1:] if child not in moved])
+        parent.set_key(index, keys[middle])
+    
+    def _adopt(self, node: EnhancedInternalNode, children: List[int]) -> None:
+        """把子节点的父指针改为指定节点。
         
-        return True
+        Args:
+            node: 新的父节点
+            children: 子节点页号列表
+        """
+        for child_page in children:
+            EnhancedBTreeNode(self.pager, child_page).set_parent(node.page_num)
+    
+    def _collapse_root(self, root: EnhancedInternalNode) -> None:
+        """根节点只剩一个子节点时把子节点的内容移到根页上并释放子节点页。
+        
+        根页号保持不变，目录中记录的根页号无需更新。
+        
+        Args:
+            root: 没有键的内部根节点
+        """
+        child_page = root.right_child()
+        child = EnhancedBTreeNode(self.pager, child_page)
+        root._write(0, bytes(child.page))
+        root.set_root(True)
+        root.set_parent(INVALID_PAGE_NUM)
+        if root.get_node_type() == NODE_INTERNAL:
+            self._adopt(EnhancedInternalNode(self.pager, root.page_num),
+                        EnhancedInternalNode(self.pager, root.page_num).children())
+        self.pager.free_page(child_page)
     
     def update(self, key: int, new_value: bytes) -> bool:
         """更新键值对。
@@ -584,100 +1119,264 @@ class EnhancedBTree:
         Returns:
             更新成功返回True，键不存在返回False
         """
-        page_num, cell_num = self.find(key)
-        leaf = EnhancedLeafNode(self.pager, page_num)
-        
-        if cell_num >= leaf.num_cells() or leaf.key(cell_num, self.row_size) != key:
-            return False
-        
-        leaf.update_cell(cell_num, key, new_value, self.row_size)
+        with self.pager.pinned():
+            page_num, cell_num = self.find(key)
+            leaf = EnhancedLeafNode(self.pager, page_num)
+            
+            if cell_num >= leaf.num_cells() or leaf.key(cell_num) != key:
+                return False
+            
+            self._free_value(leaf, cell_num)
+            if leaf.can_update(cell_num, len(new_value)):
+                leaf.update_cell(cell_num, key, self._store_value(leaf, new_value), len(new_value))
+            else:
+                # 变长后的行放不下，按插入路径重新放置（必要时分裂叶子）
+                leaf.delete_cell(cell_num)
+                self.insert(key, new_value)
+            return True
+    
+    def node_pages(self) -> Tuple[List[int], List[int]]:
+        """获取树中所有节点所在的页号。
         
-        # 将修改后的页面写回磁盘
-        self.pager.write_page(leaf.page_num, bytes(leaf.page))
+        Returns:
+            (内部节点页号列表, 叶子节点页号列表)，内部节点按层序排列，
+            叶子节点按叶子链表顺序排列
+            
+        Raises:
+            BTreeError: 如果节点之间存在环
+        """
+        internal_pages = []
+        leaf_pages = []
+        seen = set()
+        queue = deque([self.root_page_num])
+        
+        with self.pager.pinned():
+            while queue:
+                page_num = queue.popleft()
+                if page_num in seen:
+                    raise BTreeError(f"Page {page_num} is referenced more than once")
+                seen.add(page_num)
+                
+                if EnhancedBTreeNode(self.pager, page_num).get_node_type() == NODE_LEAF:
+                    leaf_pages.append(page_num)
+                    continue
+                
+                internal_pages.append(page_num)
+                internal = EnhancedInternalNode(self.pager, page_num)
+                for i in range(internal.num_keys() + 1):
+                    queue.append(internal.child(i))
+            
+            # 沿叶子链表收集叶子，包括只通过链表可达的叶子
+            chain = []
+            page_num = leaf_pages[0] if leaf_pages else 0
+            while page_num and page_num not in chain:
+                chain.append(page_num)
+                page_num = EnhancedLeafNode(self.pager, page_num).next_leaf()
+        
+        chained = set(chain)
+        return internal_pages, chain + [p for p in leaf_pages if p not in chained]
+    
+    def overflow_pages(self, leaf_pages: Optional[List[int]] = None) -> List[int]:
+        """获取树中所有溢出页的页号。
         
-        return True
+        Args:
+            leaf_pages: 叶子节点页号列表，默认通过node_pages获取
+            
+        Returns:
+            按叶子和单元格顺序排列的溢出页页号
+        """
+        if leaf_pages is None:
+            leaf_pages = self.node_pages()[1]
+        pages = []
+        with self.pager.pinned():
+            for page_num in leaf_pages:
+                leaf = EnhancedLeafNode(self.pager, page_num)
+                for cell_num in range(leaf.num_cells()):
+                    if leaf.is_overflow(cell_num):
+                        pages.extend(overflow_chain(self.pager, leaf.overflow_page(cell_num)))
+        return pages
     
-    def _split_and_insert_leaf(self, leaf: EnhancedLeafNode, cell_num: int, key: int, value: bytes) -> None:
+    def clear(self) -> None:
+        """删除树中所有数据，保留根页并释放其他页面（包括溢出页）。"""
+        internal_pages, leaf_pages = self.node_pages()
+        for page_num in internal_pages + leaf_pages + self.overflow_pages(leaf_pages):
+            if page_num != self.root_page_num:
+                self.pager.free_page(page_num)
+        self.create_new_root()
+    
+    def destroy(self) -> None:
+        """释放树占用的所有页面（包括根页和溢出页），之后该树不能再使用。"""
+        internal_pages, leaf_pages = self.node_pages()
+        for page_num in internal_pages + leaf_pages + self.overflow_pages(leaf_pages):
+            self.pager.free_page(page_num)
+    
+    def _split_and_insert_leaf(self, leaf: EnhancedLeafNode, cell_num: int,
+                               record: Tuple[int, int, bytes]) -> None:
         """分裂已满的叶子节点并插入数据。
         
+        按字节数而不是单元格数平分：旧叶子保留左半部分单元格，其余单元格
+        移到新分配的叶子并接入叶子链表，然后把新叶子连同左侧的最大键插入
+        父节点（必要时逐层向上分裂）。变长单元格无法两等分时分到多个叶子。
+        
         Args:
             leaf: 已满的叶子节点
             cell_num: 插入位置
-            key: 键
-            value: 值的字节数组
+            record: 新单元格的(键, 值长度, 本地部分)
         """
-        # 创建新的叶子节点
-        new_page_num = self.pager.num_pages
-        new_leaf = EnhancedLeafNode(self.pager, new_page_num)
-        new_leaf.set_root(False)
-        
-        # 在旧叶子节点和新叶子节点之间分配单元格
-        old_max = LEAF_NODE_MAX_CELLS
-        new_max = LEAF_NODE_MAX_CELLS + 1
-        
-        # 创建临时数组存储所有单元格
-        temp_cells = []
-        
-        # 复制现有单元格
-        for i in range(old_max):
-            temp_cells.append((leaf.key(i, self.row_size), leaf.value(i, self.row_size)))
-        
-        # 插入新单元格
-        temp_cells.insert(cell_num, (key, value))
-        
-        # 分裂单元格
-        split_index = LEAF_NODE_LEFT_SPLIT_COUNT
-        
-        # 更新旧叶子节点
-        leaf.set_num_cells(split_index)
+        # 所有单元格（包括新单元格）按键排序；溢出页链随单元格移动，无需读取
+        records = leaf.records()
+        records.insert(cell_num, record)
+        groups = self._partition_cells(records, leaf.capacity())
+        
+        left = leaf
+        next_leaf = leaf.next_leaf()
+        leaf.set_cells(groups[0])
+        for group in groups[1:]:
+            new_leaf = self._new_node(EnhancedLeafNode, NODE_LEAF)
+            new_leaf.set_cells(group)
+            new_leaf.set_next_leaf(next_leaf)
+            left.set_next_leaf(new_leaf.page_num)
+            # 父节点可能在上一次插入时分裂，按左侧节点当前的父指针设置
+            new_leaf.set_parent(EnhancedBTreeNode(self.pager, left.page_num).get_parent())
+            self._insert_into_parent(left, left.key(left.num_cells() - 1), new_leaf.page_num)
+            left = new_leaf
+    
+    @staticmethod
+    def _partition_cells(records: List[Tuple[int, int, bytes]],
+                         capacity: int) -> List[List[Tuple[int, int, bytes]]]:
+        """把分裂时的全部单元格分成若干组，每组都能放进一个叶子。
         
-        # 更新新叶子节点
-        new_leaf.set_num_cells(new_max - split_index)
-        new_leaf.set_next_leaf(leaf.next_leaf())
+        优先分成字节数尽量接近的两组；单元格大小悬殊、两组放不下时
+        按顺序尽量装满每个叶子。
         
-        # 将单元格复制到新叶子节点
-        for i in range(split_index, new_max):
-            new_leaf.set_key(i - split_index, temp_cells[i][0])
-            new_leaf.set_value(i - split_index, temp_cells[i][1], self.row_size)
+        Args:
+            records: 按键排序的(键, 值长度, 本地部分)列表
+            capacity: 叶子节点的单元格容量（字节）
+            
+        Returns:
+            单元格记录分组列表
+        """
+        sizes = [EnhancedLeafNode.cell_space(len(local)) for _, _, local in records]
+        total = sum(sizes)
+        best = None
+        left_size = 0
+        for index in range(1, len(records)):
+            left_size += sizes[index - 1]
+            right_size = total - left_size
+            if left_size <= capacity and right_size <= capacity:
+                larger = max(left_size, right_size)
+                if best is None or larger < best[0]:
+                    best = (larger, index)
+        if best is not None:
+            return [records[:best[1]], records[best[1]:]]
+        
+        groups = [[]]
+        group_size = 0
+        for record, size in zip(records, sizes):
+            if groups[-1] and group_size + size > capacity:
+                groups.append([])
+                group_size = 0
+            groups[-1].append(record)
+            group_size += size
+        return groups
+    
+    def _new_node(self, node_class, node_type: int) -> EnhancedBTreeNode:
+        """分配一个新页面并初始化为空的非根节点。
         
-        # 更新旧叶子节点的下一个叶子节点
-        leaf.set_next_leaf(new_page_num)
+        Args:
+            node_class: 节点类（EnhancedLeafNode或EnhancedInternalNode）
+            node_type: 节点类型标识符
+            
+        Returns:
+            新节点
+        """
+        node = node_class(self.pager, self.pager.allocate_page())
+        node._write(0, bytes(len(node.page)))  # 清除页面上原有的内容
+        node.set_node_type(node_type)
+        return node
+    
+    def _insert_into_parent(self, left: EnhancedBTreeNode, key: int, right_page_num: int) -> None:
+        """分裂后把新的右侧节点插入父节点。
         
-        # 如果需要，创建新的根节点
-        if leaf.is_root():
-            self._create_new_root_after_split(leaf, new_leaf, temp_cells[split_index][0])
+        Args:
+            left: 分裂后的左侧节点（原节点）
+            key: 左侧子树中的最大键
+            right_page_num: 新的右侧节点页号
+        """
+        left = EnhancedBTreeNode(self.pager, left.page_num)
+        if left.is_root():
+            self._create_new_root_after_split(left, key, right_page_num)
+            return
+        
+        parent = EnhancedInternalNode(self.pager, left.get_parent())
+        keys = parent.keys()
+        children = parent.children()
+        index = children.index(left.page_num)
+        # 左侧节点原来的上界键现在属于右侧节点
+        keys.insert(index, key)
+        children.insert(index + 1, right_page_num)
+        
+        if len(keys) <= parent.max_keys():
+            parent.set_cells(keys, children)
         else:
-            # 插入到父节点（简化实现）
-            pass
+            self._split_internal(parent, keys, children)
     
-    def _create_new_root_after_split(self, old_leaf: EnhancedLeafNode, new_leaf: EnhancedLeafNode, key: int) -> None:
-        """分裂后创建新的根节点。
+    def _split_internal(self, node: EnhancedInternalNode, keys: List[int], children: List[int]) -> None:
+        """分裂溢出的内部节点并把中间键提升到父节点。
         
         Args:
-            old_leaf: 旧的叶子节点
-            new_leaf: 新的叶子节点
-            key: 分裂键
+            node: 要分裂的内部节点
+            keys: 插入后的全部键（比节点容量多一个）
+            children: 插入后的全部子节点页号
         """
-        new_root_page = self.pager.num_pages
-        new_root = EnhancedInternalNode(self.pager, new_root_page)
+        middle = len(keys) // 2
+        
+        right = self._new_node(EnhancedInternalNode, NODE_INTERNAL)
+        right.set_parent(node.get_parent())
+        right.set_cells(keys[middle + 1:], children[middle + 1:])
+        for child_page in children[middle + 1:]:
+            EnhancedBTreeNode(self.pager, child_page).set_parent(right.page_num)
         
-        new_root.set_root(True)
-        new_root.set_num_keys(1)
-        new_root.set_child(0, old_leaf.page_num)
-        new_root.set_key(0, key)
-        new_root.set_right_child(new_leaf.page_num)
+        node.set_cells(keys[:middle], children[:middle + 1])
         
-        old_leaf.set_root(False)
-        old_leaf.set_parent(new_root_page)
-        new_leaf.set_root(False)
-        new_leaf.set_parent(new_root_page)
+        self._insert_into_parent(node, keys[middle], right.page_num)
+    
+    def _create_new_root_after_split(self, old_root: EnhancedBTreeNode, key: int, right_page_num: int) -> None:
+        """分裂后在原根页上建立新的根节点。
         
-        self.root_page_num = new_root_page
+        根页号保持不变：旧根（分裂后的左半部分）的内容复制到新分配的左子页，
+        原根页改写为指向左右两个子节点的内部节点。这样目录中记录的根页号
+        在树长高时无需更新。
         
-        # 将所有修改后的页面写回磁盘
-        self.pager.write_page(old_leaf.page_num, bytes(old_leaf.page))
-        self.pager.write_page(new_leaf.page_num, bytes(new_leaf.page))
-        self.pager.write_page(new_root.page_num, bytes(new_root.page))
+        Args:
+            old_root: 分裂后的旧根节点（左半部分）
+            key: 左侧子树中的最大键
+            right_page_num: 新的右侧节点页号
+        """
+        root_page_num = old_root.page_num
+        
+        # 将旧根的内容移到新的左子页
+        left_page_num = self.pager.allocate_page()
+        left = EnhancedBTreeNode(self.pager, left_page_num)
+        left._write(0, bytes(old_root.page))
+        left.set_root(False)
+        left.set_parent(root_page_num)
+        if left.get_node_type() == NODE_INTERNAL:
+            # 旧根是内部节点时，其子节点的父指针改为新的左子页
+            for child_page in EnhancedInternalNode(self.pager, left_page_num).children():
+                EnhancedBTreeNode(self.pager, child_page).set_parent(left_page_num)
+        
+        EnhancedBTreeNode(self.pager, right_page_num).set_parent(root_page_num)
+        
+        # 原根页改写为内部节点
+        root = EnhancedInternalNode(self.pager, root_page_num)
+        root._write(0, bytes(len(root.page)))
+        root.set_node_type(NODE_INTERNAL)
+        root.set_root(True)
+        root.set_parent(INVALID_PAGE_NUM)
+        root.set_cells([key], [left_page_num, right_page_num])
+        
+        self.root_page_num = root_page_num
     
     def select_all(self) -> List[Tuple[int, bytes]]:
         """选择所有键值对。
@@ -696,23 +1395,23 @@ class EnhancedBTree:
         results = []
         page_num = self.root_page_num
         
-        # 从最左边的叶子节点开始
-        while True:
-            node = EnhancedBTreeNode(self.pager, page_num)
-            if node.get_node_type() == NODE_LEAF:
-                leaf = EnhancedLeafNode(self.pager, page_num)
-                for i in range(leaf.num_cells()):
-                    key = leaf.key(i, self.row_size)
-                    value = leaf.value(i, self.row_size)
-                    results.append((key, value))
-                
-                next_leaf = leaf.next_leaf()
-                if next_leaf == 0:
-                    break
-                page_num = next_leaf
-            else:
-                internal = EnhancedInternalNode(self.pager, page_num)
-                page_num = internal.child(0)
+        # 从最左边的叶子节点开始，提示分页管理器沿叶子链表预读
+        with self.pager.sequential_scan():
+            while True:
+                # 每个页面只在读取期间固定，扫描不会长期占用缓冲池
+                with self.pager.pinned():
+                    node = EnhancedBTreeNode(self.pager, page_num)
+                    if node.get_node_type() == NODE_LEAF:
+                        leaf = EnhancedLeafNode(self.pager, page_num)
+                        results.extend(leaf.cells())
+                        
+                        next_leaf = leaf.next_leaf()
+                        if next_leaf == 0:
+                            break
+                        page_num = next_leaf
+                    else:
+                        internal = EnhancedInternalNode(self.pager, page_num)
+                        page_num = internal.child(0)
         
         return results
     
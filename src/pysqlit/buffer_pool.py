@@ -0,0 +1,468 @@
+"""缓冲池模块，提供有界的页面缓存和可替换的页面淘汰策略。
+
+该模块实现了数据库页面的缓冲池，包括：
+- 按页数或字节数配置的缓存容量
+- 页面固定（pin）和释放（unpin）语义
+- 有界缓冲池的页帧来自一块预先分配的内存区，淘汰后复用，缓存未命中不分配内存
+- 按替换策略（LRU、2Q或ARC，见replacement模块）淘汰页面，仅回写脏页
+- 命中/未命中统计和命中率，以及替换策略按队列统计的命中次数
+
+主要特性：
+1. 缓存大小有界，内存占用不随访问过的页面数无限增长
+2. 被B树操作固定的页面不会被淘汰
+3. 淘汰干净页面时无需任何磁盘I/O
+4. 线程安全
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .exceptions import StorageError
+from .replacement import create_policy
+
+
+class BufferFrame:
+    """缓冲池中的页帧。
+
+    Attributes:
+        page_num: 页号
+        data: 页面数据
+        dirty: 是否为脏页（已修改但未写回磁盘）
+        pin_count: 固定计数，大于0时页面不可被淘汰
+        slot: 页帧在缓冲池内存区中的槽位，None表示独立分配的内存
+    """
+
+    __slots__ = ('page_num', 'data', 'dirty', 'pin_count', 'slot')
+
+    def __init__(self, page_num: int, data: bytearray, slot: Optional[int] = None) -> None:
+        """初始化页帧。
+
+        Args:
+            page_num: 页号
+            data: 页面数据
+            slot: 页帧在缓冲池内存区中的槽位
+        """
+        self.page_num = page_num
+        self.data = data
+        self.dirty = False
+        self.pin_count = 0
+        self.slot = slot
+
+
+class BufferPool:
+    """有界LRU缓冲池。
+
+    页面按最近使用顺序保存在有序字典中。当缓存页数超过容量时，
+    从最久未使用的一端开始淘汰未被固定的页面；脏页在淘汰前通过
+    回写函数写回磁盘，干净页面直接丢弃。
+
+    当所有页面都被固定时，缓冲池允许暂时超出容量，待页面释放后
+    再进行淘汰，而不是让正在进行的B树操作失败。
+
+    有界缓冲池在创建时一次性分配容量大小的内存区，页帧是其中槽位的
+    memoryview，页面被淘汰或丢弃后槽位留给下一个页面使用。被淘汰页帧的视图
+    会被释放，之后仍持有它的代码会立即出错，而不是读写到另一个页面的数据。
+    只有超出容量的页帧才单独分配内存。
+
+    Attributes:
+        page_size: 页面大小（字节）
+        capacity: 最大缓存页数，None表示不限制
+        policy: 页面替换策略
+        hits: 缓存命中次数
+        misses: 缓存未命中次数
+        evictions: 淘汰的页面数
+        writebacks: 淘汰时回写的脏页数
+
+    Examples:
+        >>> pool = BufferPool(4096, loader=load_page, writer=write_page, max_pages=256)
+        >>> with pool.pinned():
+        ...     page = pool.get(3)
+        ...     page[0] = 1
+        ...     pool.mark_dirty(3)
+    """
+
+    def __init__(self, page_size: int,
+                 loader: Callable[[int], bytearray],
+                 writer: Optional[Callable[[int, bytearray], None]] = None,
+                 max_pages: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 allocator: Optional[Callable[[int], memoryview]] = None,
+                 policy: Optional[str] = None) -> None:
+        """初始化缓冲池。
+
+        Args:
+            page_size: 页面大小（字节）
+            loader: 缓存未命中时加载页面的函数
+            writer: 淘汰脏页时回写页面的函数，None表示脏页不可淘汰
+            max_pages: 最大缓存页数
+            max_bytes: 最大缓存字节数，优先于max_pages
+            allocator: 为新页帧分配页面内存的函数（此时loader直接返回该内存），
+                None表示由缓冲池从自己的内存区分配
+            policy: 页面替换策略名称（'lru'、'2q'或'arc'），None表示LRU；
+                不限制容量时始终使用LRU
+
+        Raises:
+            StorageError: 如果容量配置无效或替换策略未知
+        """
+        if max_bytes is not None:
+            max_pages = max_bytes // page_size
+        if max_pages is not None and max_pages < 1:
+            raise StorageError(f"Buffer pool capacity must be at least one page, got {max_pages}")
+
+        self.page_size = page_size
+        self.capacity = max_pages
+        self.loader = loader
+        self.writer = writer
+        self.allocator = allocator
+        self.frames: Dict[int, BufferFrame] = {}
+        self.policy = create_policy(policy, max_pages)
+        # 有界缓冲池的页帧内存区和空闲槽位（栈顶为编号最小的槽位）
+        self._arena: Optional[memoryview] = None
+        self._free_slots: List[int] = []
+        if allocator is None and max_pages is not None:
+            self._arena = memoryview(bytearray(max_pages * page_size))
+            self._free_slots = list(range(max_pages - 1, -1, -1))
+        self.lock = threading.RLock()
+        self._scope = threading.local()  # 线程内的固定作用域
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+
+    def get(self, page_num: int) -> bytearray:
+        """获取页面，未命中时加载并可能触发淘汰。
+
+        如果当前线程处于固定作用域内，页面会被自动固定直到作用域结束。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            页面数据
+        """
+        with self.lock:
+            frame = self.frames.get(page_num)
+            if frame is not None:
+                self.hits += 1
+                self.policy.touch(page_num)
+            else:
+                self.misses += 1
+                data = self.loader(page_num)
+                self.policy.admit(page_num)
+                self._evict_if_needed(keep=page_num, reserve=1)  # 先腾出槽位再建立页帧
+                if self.allocator is not None:
+                    frame = BufferFrame(page_num, data)  # loader返回的就是页帧内存
+                else:
+                    frame = self._new_frame(page_num, data)
+                self.frames[page_num] = frame
+
+            self._pin_in_scope(frame)
+            self._evict_if_needed(keep=page_num)
+            return frame.data
+
+    def put(self, page_num: int, data: bytes, dirty: bool = True) -> bytearray:
+        """将数据写入页帧。
+
+        已缓存的页面会就地更新，以保证持有该页面引用的节点看到最新数据。
+
+        Args:
+            page_num: 页号
+            data: 页面数据
+            dirty: 是否标记为脏页
+
+        Returns:
+            页帧中的页面数据
+        """
+        with self.lock:
+            frame = self.frames.get(page_num)
+            if frame is None:
+                self.policy.admit(page_num)
+                self._evict_if_needed(keep=page_num, reserve=1)
+                frame = self._new_frame(page_num, data)
+                self.frames[page_num] = frame
+            else:
+                if frame.data is not data:
+                    frame.data[:] = data
+                self.policy.touch(page_num)
+
+            if dirty:
+                frame.dirty = True
+            self._pin_in_scope(frame)
+            self._evict_if_needed(keep=page_num)
+            return frame.data
+
+    def prefetch(self, page_num: int, data: bytes) -> bool:
+        """把预读的页面作为干净页帧放入缓冲池。
+
+        已缓存的页面保持不变（可能已被修改），预读不计入命中/未命中统计。
+
+        Args:
+            page_num: 页号
+            data: 页面数据
+
+        Returns:
+            bool: 页面被放入缓冲池时返回True
+        """
+        with self.lock:
+            if page_num in self.frames:
+                return False
+            self.policy.admit(page_num)
+            self._evict_if_needed(keep=page_num, reserve=1)
+            self.frames[page_num] = self._new_frame(page_num, data)
+            self._evict_if_needed(keep=page_num)
+            return True
+
+    def _new_frame(self, page_num: int, data: bytes) -> BufferFrame:
+        """创建页帧并填入数据，页帧内存优先取自内存区的空闲槽位。
+
+        Args:
+            page_num: 页号
+            data: 页面数据
+
+        Returns:
+            BufferFrame: 新页帧
+        """
+        if self.allocator is not None:
+            frame_data = self.allocator(page_num)
+        elif self._free_slots:
+            slot = self._free_slots.pop()
+            offset = slot * self.page_size
+            frame_data = self._arena[offset:offset + self.page_size]
+            frame_data[:] = data
+            return BufferFrame(page_num, frame_data, slot)
+        else:
+            return BufferFrame(page_num, bytearray(data))  # 超出容量（页面都被固定）
+        frame_data[:] = data
+        return BufferFrame(page_num, frame_data)
+
+    def _release_frame(self, frame: BufferFrame) -> None:
+        """页帧离开缓冲池后归还其槽位。
+
+        Args:
+            frame: 页帧
+        """
+        if frame.slot is None:
+            return
+        frame.data.release()
+        self._free_slots.append(frame.slot)
+        frame.slot = None
+
+    def mark_dirty(self, page_num: int) -> None:
+        """将已缓存的页面标记为脏页。
+
+        Args:
+            page_num: 页号
+        """
+        with self.lock:
+            frame = self.frames.get(page_num)
+            if frame is not None:
+                frame.dirty = True
+
+    def is_dirty(self, page_num: int) -> bool:
+        """检查页面是否为脏页。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            是脏页返回True
+        """
+        with self.lock:
+            frame = self.frames.get(page_num)
+            return frame is not None and frame.dirty
+
+    def dirty_pages(self) -> List[int]:
+        """获取所有脏页的页号。
+
+        Returns:
+            按页号排序的脏页列表
+        """
+        with self.lock:
+            return sorted(num for num, frame in self.frames.items() if frame.dirty)
+
+    def clear_dirty(self, page_num: int) -> None:
+        """清除页面的脏标记（页面已写回磁盘后调用）。
+
+        Args:
+            page_num: 页号
+        """
+        with self.lock:
+            frame = self.frames.get(page_num)
+            if frame is not None:
+                frame.dirty = False
+
+    def pin(self, page_num: int) -> bytearray:
+        """固定页面，使其在释放前不会被淘汰。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            页面数据
+        """
+        with self.lock:
+            data = self.get(page_num)
+            self.frames[page_num].pin_count += 1
+            return data
+
+    def unpin(self, page_num: int) -> None:
+        """释放对页面的一次固定。
+
+        Args:
+            page_num: 页号
+        """
+        with self.lock:
+            frame = self.frames.get(page_num)
+            if frame is not None and frame.pin_count > 0:
+                frame.pin_count -= 1
+            self._evict_if_needed()
+
+    @contextmanager
+    def pinned(self) -> Iterator[None]:
+        """固定作用域：作用域内通过get获取的页面在退出前保持固定。
+
+        作用域可以嵌套，只有最外层作用域退出时才释放页面。
+
+        Examples:
+            >>> with pool.pinned():
+            ...     leaf = pool.get(5)   # 在作用域结束前不会被淘汰
+        """
+        pins = getattr(self._scope, 'pins', None)
+        if pins is not None:
+            # 嵌套作用域，由最外层负责释放
+            yield
+            return
+
+        self._scope.pins = set()
+        try:
+            yield
+        finally:
+            pins = self._scope.pins
+            self._scope.pins = None
+            for page_num in pins:
+                self.unpin(page_num)
+
+    def _pin_in_scope(self, frame: BufferFrame) -> None:
+        """在当前线程的固定作用域内固定页帧（每个作用域每页只固定一次）。
+
+        Args:
+            frame: 页帧
+        """
+        pins = getattr(self._scope, 'pins', None)
+        if pins is not None and frame.page_num not in pins:
+            frame.pin_count += 1
+            pins.add(frame.page_num)
+
+    def _evict_if_needed(self, keep: Optional[int] = None, reserve: int = 0) -> None:
+        """当缓存页数超过容量时按替换策略给出的顺序淘汰未固定的页面。
+
+        Args:
+            keep: 本次访问的页号，即使未固定也不会被淘汰
+            reserve: 需要额外腾出的页帧数（建立新页帧之前为其空出槽位）
+        """
+        if self.capacity is None:
+            return
+
+        excess = len(self.frames) + reserve - self.capacity
+        if excess <= 0:
+            return
+
+        victims = []
+        for page_num in self.policy.victims():
+            if excess <= 0:
+                break
+            frame = self.frames.get(page_num)
+            if frame is None or frame.pin_count > 0 or page_num == keep:
+                continue  # 尚未建立页帧的新页面或被固定的页面
+            if frame.dirty and self.writer is None:
+                continue  # 没有后备存储的脏页不能丢弃
+            victims.append(frame)
+            excess -= 1
+
+        for frame in victims:
+            if frame.dirty:
+                self.writer(frame.page_num, frame.data)
+                frame.dirty = False
+                self.writebacks += 1
+            del self.frames[frame.page_num]
+            self.policy.evicted(frame.page_num)
+            self._release_frame(frame)
+            self.evictions += 1
+
+    def discard(self, page_num: int) -> None:
+        """从缓冲池中丢弃页面（不回写）。
+
+        Args:
+            page_num: 页号
+        """
+        with self.lock:
+            frame = self.frames.pop(page_num, None)
+            if frame is not None:
+                self.policy.forget(page_num)
+                self._release_frame(frame)
+
+    def clear(self) -> None:
+        """清空缓冲池（不回写）。"""
+        with self.lock:
+            for frame in self.frames.values():
+                self._release_frame(frame)
+            self.frames.clear()
+            self.policy.clear()
+
+    def hot_pages(self, limit: Optional[int] = None) -> List[int]:
+        """按替换策略的保留优先级获取已缓存的最热页面。
+
+        Args:
+            limit: 最多返回的页数，None表示缓冲池容量（不限容量时为全部）
+
+        Returns:
+            页号列表，最热的页面在前
+        """
+        with self.lock:
+            if limit is None:
+                limit = self.capacity or len(self.frames)
+            return [page_num for page_num in self.policy.hot_pages(len(self.frames))
+                    if page_num in self.frames][:limit]
+
+    def reset_stats(self) -> None:
+        """重置命中统计信息。"""
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.writebacks = 0
+            self.policy.reset_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓冲池统计信息。
+
+        Returns:
+            包含容量、已缓存页数、脏页数、命中/未命中、命中率等统计的字典，
+            policy_stats为替换策略的队列长度和按队列统计的命中次数
+        """
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'capacity': self.capacity or 0,
+                'cached_pages': len(self.frames),
+                'dirty_pages': sum(1 for frame in self.frames.values() if frame.dirty),
+                'pinned_pages': sum(1 for frame in self.frames.values() if frame.pin_count > 0),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'writebacks': self.writebacks,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'policy': self.policy.name,
+                'policy_stats': self.policy.get_stats(),
+            }
+
+    def __contains__(self, page_num: int) -> bool:
+        """检查页面是否已缓存。"""
+        return page_num in self.frames
+
+    def __len__(self) -> int:
+        """获取已缓存的页数。"""
+        return len(self.frames)
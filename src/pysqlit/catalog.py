@@ -0,0 +1,350 @@
+"""系统目录模块，将表的元数据保存在数据库文件内部。
+
+该模块包含两部分：
+- SystemCatalog：系统目录B树，将表名/索引名映射到各自B树的根页号
+  和自增序列计数器，根页记录在文件头的catalog_root中
+- SchemaStore：模式页链，保存所有表模式序列化后的JSON数据，
+  起始页记录在文件头的schema_root中
+
+模式页链中每页的结构为：
+- 下一页页号(4字节)，0表示链表结束
+- 本页有效载荷长度(4字节)
+- 有效载荷：JSON数据片段
+
+目录和模式变更只修改普通页面和文件头页，它们与数据页一起在提交时刷新，
+因此元数据与数据保持原子一致，也不再需要额外的.schema文件。
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .btree import EnhancedBTree
+from .constants import CATALOG_NAME_MAX_BYTES
+from .exceptions import StorageError
+
+
+# 模式页头结构：下一页页号(4) + 有效载荷长度(4)
+CATALOG_PAGE_HEADER = struct.Struct('<II')
+
+# 目录记录结构：类型(1) + 名称(CATALOG_NAME_MAX_BYTES) + 根页号(4) + 序列计数器(8) + 所属表名(CATALOG_NAME_MAX_BYTES)
+CATALOG_ROW_STRUCT = struct.Struct(f'<B{CATALOG_NAME_MAX_BYTES}sIQ{CATALOG_NAME_MAX_BYTES}s')
+
+# 目录记录类型
+CATALOG_TABLE = 1
+CATALOG_INDEX = 2
+
+
+@dataclass
+class CatalogEntry:
+    """系统目录中的一条记录。
+
+    Attributes:
+        key: 记录在目录B树中的键
+        kind: 记录类型（CATALOG_TABLE或CATALOG_INDEX）
+        name: 表名或索引名
+        root_page: 对应B树的根页号
+        sequence: 已分配的最大自增值（仅表使用）
+        table_name: 索引所属的表名（仅索引使用）
+    """
+    key: int
+    kind: int
+    name: str
+    root_page: int
+    sequence: int = 0
+    table_name: str = ''
+
+    def pack(self) -> bytes:
+        """序列化为目录B树中的值。
+
+        Returns:
+            bytes: 定长记录
+        """
+        return CATALOG_ROW_STRUCT.pack(self.kind, self.name.encode('utf-8'), self.root_page,
+                                       self.sequence, self.table_name.encode('utf-8'))
+
+    @classmethod
+    def unpack(cls, key: int, data: bytes) -> 'CatalogEntry':
+        """从目录B树中的值解析记录。
+
+        Args:
+            key: 记录的键
+            data: 定长记录
+
+        Returns:
+            CatalogEntry: 目录记录
+        """
+        kind, name, root_page, sequence, table_name = CATALOG_ROW_STRUCT.unpack_from(data)
+        return cls(key, kind, name.rstrip(b'\x00').decode('utf-8'), root_page, sequence,
+                   table_name.rstrip(b'\x00').decode('utf-8'))
+
+
+class SystemCatalog:
+    """系统目录B树。
+
+    目录在第一次查询时才从磁盘加载，之后保存在内存中，直到分页管理器
+    因其他连接的提交丢弃缓存；每个表只通过目录找到自己的根页，
+    扫描和查找不会触及其他表的页面。
+
+    Attributes:
+        pager: 带文件头的分页管理器
+
+    Examples:
+        >>> catalog = SystemCatalog(pager)
+        >>> entry = catalog.add_table("users", root_page=5)
+        >>> catalog.get_table("users").root_page
+        5
+    """
+
+    def __init__(self, pager) -> None:
+        """初始化系统目录。
+
+        Args:
+            pager: 带文件头的分页管理器（ConcurrentPager及其子类）
+        """
+        self.pager = pager
+        self._btree: Optional[EnhancedBTree] = None
+        self._entries: Optional[Dict[tuple, CatalogEntry]] = None
+        self._cache_epoch = getattr(pager, 'cache_epoch', 0)
+
+    @property
+    def btree(self) -> EnhancedBTree:
+        """目录B树，不存在时创建并登记到文件头。"""
+        if self._btree is None:
+            root_page = self.pager.header.catalog_root
+            if root_page:
+                self._btree = EnhancedBTree(self.pager, row_size=CATALOG_ROW_STRUCT.size,
+                                            root_page_num=root_page)
+            else:
+                self._btree = EnhancedBTree.create(self.pager, row_size=CATALOG_ROW_STRUCT.size)
+                self.pager.header.catalog_root = self._btree.root_page_num
+                self.pager.update_header()
+        return self._btree
+
+    def _load(self) -> Dict[tuple, CatalogEntry]:
+        """加载全部目录记录（只在第一次访问或其他连接提交之后读取磁盘）。
+
+        Returns:
+            (类型, 名称)到目录记录的映射
+        """
+        epoch = getattr(self.pager, 'cache_epoch', 0)
+        if epoch != self._cache_epoch:
+            self._cache_epoch = epoch
+            self._btree = None
+            self._entries = None
+        if self._entries is None:
+            entries = {}
+            if self.pager.header.catalog_root:
+                for key, value in self.btree.scan():
+                    entry = CatalogEntry.unpack(key, value)
+                    entries[(entry.kind, entry.name)] = entry
+            self._entries = entries
+        return self._entries
+
+    def _add(self, entry_kind: int, name: str, root_page: int, table_name: str = '') -> CatalogEntry:
+        """添加目录记录。
+
+        Args:
+            entry_kind: 记录类型
+            name: 表名或索引名
+            root_page: 根页号
+            table_name: 索引所属的表名
+
+        Returns:
+            CatalogEntry: 新的目录记录
+
+        Raises:
+            StorageError: 如果名称过长或已存在
+        """
+        if len(name.encode('utf-8')) > CATALOG_NAME_MAX_BYTES:
+            raise StorageError(f"Name too long for system catalog: {name}")
+        entries = self._load()
+        if (entry_kind, name) in entries:
+            raise StorageError(f"Catalog entry already exists: {name}")
+
+        key = max((entry.key for entry in entries.values()), default=0) + 1
+        entry = CatalogEntry(key, entry_kind, name, root_page, table_name=table_name)
+        self.btree.insert(key, entry.pack())
+        entries[(entry_kind, name)] = entry
+        return entry
+
+    def add_table(self, name: str, root_page: int) -> CatalogEntry:
+        """登记一个表。
+
+        Args:
+            name: 表名
+            root_page: 表B树的根页号
+
+        Returns:
+            CatalogEntry: 新的目录记录
+
+        Raises:
+            StorageError: 如果表名过长或已存在
+        """
+        return self._add(CATALOG_TABLE, name, root_page)
+
+    def add_index(self, name: str, table_name: str, root_page: int) -> CatalogEntry:
+        """登记一个索引。
+
+        Args:
+            name: 索引名
+            table_name: 索引所属的表名
+            root_page: 索引B树的根页号
+
+        Returns:
+            CatalogEntry: 新的目录记录
+
+        Raises:
+            StorageError: 如果索引名过长或已存在
+        """
+        return self._add(CATALOG_INDEX, name, root_page, table_name)
+
+    def get_table(self, name: str) -> Optional[CatalogEntry]:
+        """查找表的目录记录。
+
+        Args:
+            name: 表名
+
+        Returns:
+            目录记录，不存在时返回None
+        """
+        return self._load().get((CATALOG_TABLE, name))
+
+    def get_index(self, name: str) -> Optional[CatalogEntry]:
+        """查找索引的目录记录。
+
+        Args:
+            name: 索引名
+
+        Returns:
+            目录记录，不存在时返回None
+        """
+        return self._load().get((CATALOG_INDEX, name))
+
+    def indexes_for(self, table_name: str) -> List[CatalogEntry]:
+        """获取表的所有索引记录。
+
+        Args:
+            table_name: 表名
+
+        Returns:
+            索引目录记录列表
+        """
+        return [entry for entry in self._load().values()
+                if entry.kind == CATALOG_INDEX and entry.table_name == table_name]
+
+    def entries(self) -> List[CatalogEntry]:
+        """获取所有目录记录。
+
+        Returns:
+            按键排序的目录记录列表
+        """
+        return sorted(self._load().values(), key=lambda entry: entry.key)
+
+    def update(self, entry: CatalogEntry) -> None:
+        """将修改后的目录记录写回目录B树。
+
+        Args:
+            entry: 目录记录
+        """
+        self.btree.update(entry.key, entry.pack())
+
+    def remove(self, entry: CatalogEntry) -> None:
+        """删除目录记录。
+
+        Args:
+            entry: 目录记录
+        """
+        self.btree.delete(entry.key)
+        self._load().pop((entry.kind, entry.name), None)
+
+
+class SchemaStore:
+    """存储在数据库文件中的模式页链。
+
+    Attributes:
+        pager: 带文件头的分页管理器
+
+    Examples:
+        >>> store = SchemaStore(pager)
+        >>> store.save({"users": schema.to_dict()})
+        >>> store.load()["users"]
+    """
+
+    def __init__(self, pager) -> None:
+        """初始化模式页链。
+
+        Args:
+            pager: 带文件头的分页管理器（ConcurrentPager及其子类）
+        """
+        self.pager = pager
+
+    def _chain(self) -> List[int]:
+        """获取模式页链上的所有页号。
+
+        Returns:
+            List[int]: 按链表顺序排列的页号
+
+        Raises:
+            StorageError: 如果模式页链存在环
+        """
+        pages = []
+        page_num = self.pager.header.schema_root
+        while page_num:
+            if page_num in pages:
+                raise StorageError("Schema page chain contains a cycle")
+            pages.append(page_num)
+            next_page, _ = CATALOG_PAGE_HEADER.unpack_from(self.pager.get_page(page_num))
+            page_num = next_page
+        return pages
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """读取所有表模式。
+
+        Returns:
+            表名到模式字典的映射，模式页链不存在时返回空字典
+
+        Raises:
+            StorageError: 如果模式数据损坏
+        """
+        chunks = []
+        for page_num in self._chain():
+            page = self.pager.get_page(page_num)
+            _, length = CATALOG_PAGE_HEADER.unpack_from(page)
+            start = CATALOG_PAGE_HEADER.size
+            chunks.append(bytes(page[start:start + length]))
+
+        payload = b''.join(chunks)
+        if not payload:
+            return {}
+        try:
+            return json.loads(payload.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise StorageError(f"Schema pages are corrupt: {e}")
+
+    def save(self, schemas: Dict[str, Dict[str, Any]]) -> None:
+        """写入所有表模式。
+
+        复用已有的模式页，不足时分配新页；多余的页保留在链上并写入空载荷，
+        以便之后模式增大时复用。
+
+        Args:
+            schemas: 表名到模式字典的映射
+        """
+        payload = json.dumps(schemas, ensure_ascii=False).encode('utf-8')
+        capacity = self.pager.usable_size - CATALOG_PAGE_HEADER.size
+        chunks = [payload[i:i + capacity] for i in range(0, len(payload), capacity)] or [b'']
+
+        pages = self._chain()
+        while len(pages) < len(chunks):
+            pages.append(self.pager.allocate_page())
+
+        for index, page_num in enumerate(pages):
+            chunk = chunks[index] if index < len(chunks) else b''
+            next_page = pages[index + 1] if index + 1 < len(pages) else 0
+            self.pager.write_page(page_num, CATALOG_PAGE_HEADER.pack(next_page, len(chunk)) + chunk)
+
+        self.pager.header.schema_root = pages[0]
+        self.pager.header.schema_version += 1
+        self.pager.update_header()
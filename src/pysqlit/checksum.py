@@ -0,0 +1,62 @@
+"""页面校验和模块，检测写撕裂和文件损坏。
+
+以校验和模式创建的数据库在每页末尾保留PAGE_CHECKSUM_SIZE字节，
+存放页面其余部分的CRC32。页面在写回时生成校验和，缓存未命中
+从文件读取时按分页管理器的校验模式验证：
+
+- always：每次读取都校验
+- sampled：每CHECKSUM_SAMPLE_INTERVAL次读取校验一次，以极小的开销发现损坏
+- off：不校验
+
+校验只发生在页面第一次从文件读入缓存时，打开数据库时不需要扫描整个文件。
+"""
+
+import struct
+import zlib
+
+from .constants import PAGE_CHECKSUM_SIZE
+
+
+# 页尾校验和：页面前page_size - 4字节的CRC32
+PAGE_CHECKSUM = struct.Struct('<I')
+
+
+def page_checksum(data: bytes) -> int:
+    """计算页面（不含页尾校验和）的CRC32。
+
+    Args:
+        data: 完整的页面数据
+
+    Returns:
+        int: CRC32校验和
+    """
+    return zlib.crc32(memoryview(data)[:len(data) - PAGE_CHECKSUM_SIZE])
+
+
+def stamp_checksum(data: bytes) -> bytearray:
+    """返回写入了页尾校验和的页面副本。
+
+    Args:
+        data: 完整的页面数据
+
+    Returns:
+        bytearray: 带校验和的页面数据
+    """
+    page = bytearray(data)
+    PAGE_CHECKSUM.pack_into(page, len(page) - PAGE_CHECKSUM_SIZE, page_checksum(page))
+    return page
+
+
+def checksum_valid(data: bytes) -> bool:
+    """检查页面与页尾记录的校验和是否一致。
+
+    Args:
+        data: 从文件读取的完整页面数据
+
+    Returns:
+        bool: 校验和一致或页面从未写出（全零）时返回True
+    """
+    stored = PAGE_CHECKSUM.unpack_from(data, len(data) - PAGE_CHECKSUM_SIZE)[0]
+    if stored == page_checksum(data):
+        return True
+    return stored == 0 and bytes(data).count(0) == len(data)
@@ -0,0 +1,448 @@
+"""页面压缩模块，以压缩形式在文件中保存页面。
+
+数据库以压缩模式创建时（压缩算法记录在文件头中），除文件头页外的每个页面
+在写回时压缩，缓存未命中时解压。压缩后的页面长度不一，文件不再按页号直接
+寻址，而是划分为COMPRESSION_SECTOR_SIZE字节的扇区：
+
+- 第0页（文件头）不压缩，占据文件开头的扇区
+- 页面映射块记录逻辑页在文件中的位置，每块占一个页面大小且不压缩，
+  各映射块的起始扇区记录在文件头的目录中
+- 每个页面的压缩数据占据若干连续扇区；压缩后不比原页面小的页面按原样保存
+
+映射块中每个条目为起始扇区(4字节) + 存储长度(4字节)：存储长度为0表示页面
+从未写出（读取为全零），等于页面大小表示未压缩。第i个映射块记录页号在
+[i * entries_per_chunk, (i + 1) * entries_per_chunk)范围内的页面。
+
+空闲扇区不持久化：打开文件或其他连接提交后重新加载映射时，由已使用的扇区
+推算空闲区段。页面重写时原位置放得下就原地写入，否则移到第一个足够大的
+空闲区段或文件末尾。
+"""
+
+import bisect
+import os
+import struct
+import time
+import zlib
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import lzma
+except ImportError:  # 部分Python构建不包含lzma模块
+    lzma = None
+
+from .constants import (COMPRESSION_LZMA, COMPRESSION_NONE, COMPRESSION_SECTOR_SIZE,
+                        COMPRESSION_ZLIB)
+from .exceptions import StorageError
+from .storage import IOV_MAX, write_page_run
+
+
+# 页面映射条目：起始扇区(4) + 存储长度(4)
+PAGE_MAP_ENTRY = struct.Struct('<II')
+
+# 可选的压缩算法名称
+COMPRESSION_ALGORITHMS = {'zlib': COMPRESSION_ZLIB, 'lzma': COMPRESSION_LZMA}
+
+# 使用不带容器头的原始LZMA2流，避免每页数十字节的格式开销
+_LZMA_FILTERS = [{'id': lzma.FILTER_LZMA2, 'preset': 6}] if lzma else None
+_DECOMPRESS_ERRORS = (zlib.error,) + ((lzma.LZMAError,) if lzma else ())
+
+
+def compression_id(name: Optional[str]) -> int:
+    """将压缩算法名称转换为文件头中记录的编号。
+
+    Args:
+        name: 压缩算法名称（'zlib'或'lzma'），None表示不压缩
+
+    Returns:
+        int: 压缩算法编号
+
+    Raises:
+        StorageError: 如果算法不受支持或当前Python构建不可用
+    """
+    if name is None:
+        return COMPRESSION_NONE
+    if name not in COMPRESSION_ALGORITHMS:
+        raise StorageError(f"Unsupported compression algorithm {name!r}")
+    if COMPRESSION_ALGORITHMS[name] == COMPRESSION_LZMA and lzma is None:
+        raise StorageError("lzma compression is not available in this Python build")
+    return COMPRESSION_ALGORITHMS[name]
+
+
+def compression_name(algorithm: int) -> Optional[str]:
+    """将压缩算法编号转换为名称。
+
+    Args:
+        algorithm: 压缩算法编号
+
+    Returns:
+        压缩算法名称，不压缩时返回None
+    """
+    for name, value in COMPRESSION_ALGORITHMS.items():
+        if value == algorithm:
+            return name
+    return None
+
+
+def compress_page(algorithm: int, data: bytes) -> bytes:
+    """压缩页面数据。
+
+    Args:
+        algorithm: 压缩算法编号
+        data: 页面数据
+
+    Returns:
+        bytes: 压缩后的数据
+
+    Raises:
+        StorageError: 如果算法不受支持
+    """
+    if algorithm == COMPRESSION_ZLIB:
+        return zlib.compress(data)
+    if algorithm == COMPRESSION_LZMA and lzma is not None:
+        return lzma.compress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    raise StorageError(f"Unsupported compression algorithm {algorithm}")
+
+
+def decompress_page(algorithm: int, data: bytes) -> bytes:
+    """解压页面数据。
+
+    Args:
+        algorithm: 压缩算法编号
+        data: 压缩后的数据
+
+    Returns:
+        bytes: 页面数据
+
+    Raises:
+        StorageError: 如果算法不受支持或数据损坏
+    """
+    try:
+        if algorithm == COMPRESSION_ZLIB:
+            return zlib.decompress(data)
+        if algorithm == COMPRESSION_LZMA and lzma is not None:
+            return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    except _DECOMPRESS_ERRORS as e:
+        raise StorageError(f"Corrupt compressed page: {e}")
+    raise StorageError(f"Unsupported compression algorithm {algorithm}")
+
+
+class PageMap:
+    """压缩数据库中逻辑页到文件扇区的映射。
+
+    映射整体缓存在内存中，修改过的映射块随页面一起写回。
+
+    Attributes:
+        pager: 带文件头的分页管理器
+
+    Examples:
+        >>> page_map = PageMap(pager)
+        >>> page_map.load()
+        >>> page = page_map.read_page(3)
+    """
+
+    def __init__(self, pager) -> None:
+        """初始化页面映射。
+
+        Args:
+            pager: 带文件头的分页管理器（ConcurrentPager及其子类）
+        """
+        self.pager = pager
+        self._sectors = array('I')  # 页号 -> 起始扇区
+        self._lengths = array('I')  # 页号 -> 存储长度
+        self._dirty_chunks = set()
+        self._free: List[List[int]] = []  # 空闲区段[起始扇区, 扇区数]，按起始扇区排序
+        self._end = 0  # 已使用扇区的末尾
+
+    @property
+    def enabled(self) -> bool:
+        """文件是否以压缩模式创建。"""
+        return self.pager.header.compression != COMPRESSION_NONE
+
+    @property
+    def entries_per_chunk(self) -> int:
+        """每个映射块记录的页面数。"""
+        return self.pager.page_size // PAGE_MAP_ENTRY.size
+
+    @property
+    def sectors_per_page(self) -> int:
+        """一个完整页面占用的扇区数。"""
+        return self.pager.page_size // COMPRESSION_SECTOR_SIZE
+
+    @property
+    def physical_size(self) -> int:
+        """已使用扇区末尾的文件偏移（字节）。"""
+        return self._end * COMPRESSION_SECTOR_SIZE
+
+    @staticmethod
+    def _sectors_for(length: int) -> int:
+        """存储指定长度的数据需要的扇区数。"""
+        return (length + COMPRESSION_SECTOR_SIZE - 1) // COMPRESSION_SECTOR_SIZE
+
+    def _pread(self, sector: int, length: int) -> bytes:
+        """从指定扇区读取数据并计入I/O统计。"""
+        started = time.perf_counter()
+        data = os.pread(self.pager.file_descriptor.fileno(), length,
+                        sector * COMPRESSION_SECTOR_SIZE)
+        self.pager.io_stats.record_read(len(data), time.perf_counter() - started)
+        return data
+
+    def load(self) -> None:
+        """从文件重新加载页面映射，并由已使用的扇区推算空闲区段。
+
+        Raises:
+            StorageError: 如果映射块不完整
+        """
+        page_size = self.pager.page_size
+        self._sectors = array('I')
+        self._lengths = array('I')
+        self._dirty_chunks.clear()
+        used = [(0, self.sectors_per_page)]  # 文件头页
+        for chunk_sector in self.pager.header.page_map:
+            data = self._pread(chunk_sector, page_size)
+            if len(data) != page_size:
+                raise StorageError("Compressed database has a truncated page map")
+            used.append((chunk_sector, self.sectors_per_page))
+            for sector, length in PAGE_MAP_ENTRY.iter_unpack(data):
+                self._sectors.append(sector)
+                self._lengths.append(length)
+                if length:
+                    used.append((sector, self._sectors_for(length)))
+
+        used.sort()
+        self._free = []
+        end = 0
+        for start, count in used:
+            if start > end:
+                self._free.append([end, start - end])
+            end = max(end, start + count)
+        self._end = end
+
+    def locate(self, page_num: int) -> Tuple[int, int]:
+        """获取页面在文件中的位置。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            (起始扇区, 存储长度)，页面从未写出时存储长度为0
+        """
+        if page_num >= len(self._lengths):
+            return 0, 0
+        return self._sectors[page_num], self._lengths[page_num]
+
+    def read_page(self, page_num: int) -> bytes:
+        """从文件读取并解压页面。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            bytes: 页面数据，从未写出的页面为全零
+
+        Raises:
+            StorageError: 如果压缩数据损坏
+        """
+        page_size = self.pager.page_size
+        sector, length = self.locate(page_num)
+        if not length:
+            return bytes(page_size)
+        data = self._pread(sector, length)
+        if length == page_size:
+            return data
+        page = decompress_page(self.pager.header.compression, data)
+        if len(page) != page_size:
+            raise StorageError(f"Corrupt compressed page {page_num}")
+        return page
+
+    def write_pages(self, page_nums: Iterable[int], get_data: Callable[[int], bytes]) -> int:
+        """压缩页面并连同修改过的映射块一起写入文件。
+
+        Args:
+            page_nums: 要写入的页号（不含文件头页）
+            get_data: 根据页号返回页面数据的函数
+
+        Returns:
+            int: 执行的写入次数（文件中连续的记录合并为一次向量写入）
+
+        Raises:
+            StorageError: 如果页面映射目录已满
+        """
+        page_size = self.pager.page_size
+        algorithm = self.pager.header.compression
+        records: Dict[int, bytes] = {}
+        for page_num in page_nums:
+            data = bytes(get_data(page_num))
+            stored = compress_page(algorithm, data)
+            if len(stored) >= page_size:
+                stored = data  # 压缩无收益的页面按原样保存
+            records[self._place(page_num, len(stored))] = stored
+
+        for chunk_index in self._dirty_chunks:
+            records[self.pager.header.page_map[chunk_index]] = self._pack_chunk(chunk_index)
+        self._dirty_chunks.clear()
+        return self._write_records(records)
+
+    def truncate(self, num_pages: int) -> None:
+        """释放页号不小于num_pages的页面占用的扇区。
+
+        Args:
+            num_pages: 新的页数（高水位线）
+        """
+        for page_num in range(num_pages, len(self._lengths)):
+            length = self._lengths[page_num]
+            if length:
+                self._release(self._sectors[page_num], self._sectors_for(length))
+                self._sectors[page_num] = 0
+                self._lengths[page_num] = 0
+                self._dirty_chunks.add(page_num // self.entries_per_chunk)
+
+    def _place(self, page_num: int, length: int) -> int:
+        """为页面的新数据分配扇区并更新映射。
+
+        Args:
+            page_num: 页号
+            length: 存储长度
+
+        Returns:
+            int: 起始扇区
+        """
+        self._ensure_chunk(page_num)
+        needed = self._sectors_for(length)
+        old_sector, old_length = self._sectors[page_num], self._lengths[page_num]
+        old_count = self._sectors_for(old_length)
+        if old_length and needed <= old_count:
+            sector = old_sector  # 原位置放得下，原地写入并归还多余的扇区
+            if needed < old_count:
+                self._release(old_sector + needed, old_count - needed)
+        else:
+            if old_length:
+                self._release(old_sector, old_count)
+            sector = self._allocate(needed)
+
+        self._sectors[page_num] = sector
+        self._lengths[page_num] = length
+        self._dirty_chunks.add(page_num // self.entries_per_chunk)
+        return sector
+
+    def _ensure_chunk(self, page_num: int) -> None:
+        """确保存在记录该页的映射块，必要时分配新的映射块并更新文件头目录。
+
+        Args:
+            page_num: 页号
+
+        Raises:
+            StorageError: 如果页面映射目录已满
+        """
+        header = self.pager.header
+        chunk_index = page_num // self.entries_per_chunk
+        while len(header.page_map) <= chunk_index:
+            if len(header.page_map) >= header.max_page_map_chunks:
+                raise StorageError("Compressed database is too large for its page map directory")
+            header.page_map.append(self._allocate(self.sectors_per_page))
+            self._sectors.extend([0] * self.entries_per_chunk)
+            self._lengths.extend([0] * self.entries_per_chunk)
+            self._dirty_chunks.add(len(header.page_map) - 1)
+            self.pager.update_header()
+
+    def _pack_chunk(self, chunk_index: int) -> bytes:
+        """序列化一个映射块。"""
+        start = chunk_index * self.entries_per_chunk
+        end = start + self.entries_per_chunk
+        return b''.join(PAGE_MAP_ENTRY.pack(sector, length) for sector, length
+                        in zip(self._sectors[start:end], self._lengths[start:end]))
+
+    def _allocate(self, count: int) -> int:
+        """分配连续的扇区：优先使用第一个足够大的空闲区段，否则从文件末尾分配。
+
+        Args:
+            count: 扇区数
+
+        Returns:
+            int: 起始扇区
+        """
+        for index, extent in enumerate(self._free):
+            if extent[1] >= count:
+                start = extent[0]
+                if extent[1] == count:
+                    del self._free[index]
+                else:
+                    extent[0] += count
+                    extent[1] -= count
+                return start
+        start = self._end
+        self._end += count
+        return start
+
+    def _release(self, start: int, count: int) -> None:
+        """归还扇区，与相邻的空闲区段合并。
+
+        Args:
+            start: 起始扇区
+            count: 扇区数
+        """
+        if start + count == self._end:
+            self._end = start
+            if self._free and sum(self._free[-1]) == self._end:
+                self._end = self._free.pop()[0]
+            return
+
+        index = bisect.bisect_left(self._free, [start, 0])
+        self._free.insert(index, [start, count])
+        if index + 1 < len(self._free) and start + count == self._free[index + 1][0]:
+            self._free[index][1] += self._free.pop(index + 1)[1]
+        if index > 0 and sum(self._free[index - 1]) == start:
+            self._free[index - 1][1] += self._free.pop(index)[1]
+
+    def _write_records(self, records: Dict[int, bytes]) -> int:
+        """按扇区顺序写入记录，文件中连续的记录合并为一次向量写入。
+
+        Args:
+            records: 起始扇区 -> 数据
+
+        Returns:
+            int: 执行的写入次数
+        """
+        fileno = self.pager.file_descriptor.fileno()
+        writes = 0
+        run_start = 0
+        next_sector = -1
+        buffers: List[bytes] = []
+
+        def write_run() -> None:
+            nonlocal writes
+            started = time.perf_counter()
+            write_page_run(fileno, run_start * COMPRESSION_SECTOR_SIZE, buffers)
+            self.pager.io_stats.record_write(sum(len(buf) for buf in buffers),
+                                             time.perf_counter() - started)
+            writes += 1
+
+        for sector in sorted(records):
+            count = self._sectors_for(len(records[sector]))
+            if buffers and (sector != next_sector or len(buffers) >= IOV_MAX):
+                write_run()
+                buffers = []
+            if not buffers:
+                run_start = sector
+            # 补齐到扇区边界，使相邻记录可以合并写入
+            buffers.append(records[sector].ljust(count * COMPRESSION_SECTOR_SIZE, b'\x00'))
+            next_sector = sector + count
+        if buffers:
+            write_run()
+        self.pager.file_length = max(self.pager.file_length, self.physical_size)
+        return writes
+
+    def get_stats(self) -> Dict[str, object]:
+        """获取压缩统计信息。
+
+        Returns:
+            包含压缩算法、已写出的页数、逻辑字节数、压缩后存储字节数和空闲字节数的字典
+        """
+        pages = sum(1 for length in self._lengths if length)
+        return {
+            'algorithm': compression_name(self.pager.header.compression),
+            'pages': pages,
+            'logical_bytes': pages * self.pager.page_size,
+            'stored_bytes': sum(self._lengths),
+            'free_bytes': sum(count for _, count in self._free) * COMPRESSION_SECTOR_SIZE,
+        }
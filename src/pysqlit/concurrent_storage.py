@@ -4,180 +4,287 @@
 确保在多线程和多进程环境下的数据一致性。
 """
 
+import errno
 import os
 import struct
 import threading
-import os
-import platform
-if platform.system() != 'Windows':
+import time
+from contextlib import contextmanager, nullcontext
+from enum import Enum
+try:
     import fcntl
+except ImportError:  # Windows没有fcntl，只在进程内跟踪锁状态
+    fcntl = None
 import tempfile
-from typing import Optional, BinaryIO
-from .exceptions import DatabaseError, StorageError
+from typing import List, Optional, BinaryIO
+from .exceptions import DatabaseError, StorageError, LockError, BusyError, ChecksumError
 from .storage import Pager
+from .buffer_pool import BufferPool
+from .header import DatabaseHeader, HEADER_STRUCT, check_page_size
+from .freelist import Freelist
+from .page_versions import PageVersionTable
+from .legacy import check_legacy_format
+from .compression import PageMap, compression_id, compression_name
+from .checksum import checksum_valid, stamp_checksum
+from .iostats import IOStats
+from .constants import (PAGE_SIZE, DEFAULT_CACHE_SIZE, HEADER_PAGE_NUM, ALLOCATION_EXTENT_PAGES,
+                        ALLOCATION_GROWTH_RATIO, ALLOCATION_EXTENT_MAX_BYTES, LOCK_TIMEOUT,
+                        COMPRESSION_NONE, CHECKSUM_VERIFY_ALWAYS, CHECKSUM_VERIFY_SAMPLED,
+                        CHECKSUM_VERIFY_OFF, CHECKSUM_SAMPLE_INTERVAL, READAHEAD_PAGES,
+                        REPLACEMENT_LRU, VACUUM_COPY_BYTES, WARMUP_SUFFIX)
+
+class LockState(Enum):
+    """连接持有的文件锁状态（与SQLite的锁状态对应）。
+    
+    Attributes:
+        UNLOCKED: 未持有任何锁
+        SHARED: 共享锁，可以读取，多个连接可同时持有
+        RESERVED: 保留锁，准备写入；同一时刻只有一个连接持有，其他连接仍可读取
+        EXCLUSIVE: 独占锁，正在写回数据库文件，其他连接不能读取
+    """
+    UNLOCKED = 0
+    SHARED = 1
+    RESERVED = 2
+    EXCLUSIVE = 3
+
 
 class FileLock:
-    """跨平台文件锁定实现。
+    """连接持有的读写锁，采用SQLite风格的锁状态。
+    
+    锁在连接的生命周期内只打开一次锁文件描述符，状态只在需要时升级：
+    读事务开始时获取SHARED，第一次修改页面时升级为RESERVED，
+    写回数据库文件时升级为EXCLUSIVE，提交后降级。已持有所需状态时
+    acquire不产生任何系统调用，因此读路径上的缓存未命中不再加锁解锁。
     
-    支持Windows和Unix-like系统的文件锁定，提供共享锁和独占锁功能。
-    使用回退机制确保在锁定失败时仍能提供基本的并发保护。
+    Unix系统上使用flock实现：SHARED/EXCLUSIVE锁定数据库文件本身，
+    RESERVED锁定旁路文件"<数据库文件>.lock"。flock按打开的文件描述锁定，
+    同一进程内的多个连接之间同样互斥。没有fcntl的平台只在进程内跟踪状态。
+    内存数据库（file_path为None）不需要加锁，只跟踪状态。
+    
+    Attributes:
+        file_path: 数据库文件路径，None表示不加锁
+        timeout: 等待其他连接释放锁的超时时间（秒），None表示无限等待
+        state: 当前锁状态
+        lock_operations: 实际执行的加锁/解锁系统调用次数
+    
+    Examples:
+        >>> lock = FileLock("example.db")
+        >>> lock.acquire(LockState.SHARED)
+        >>> lock.acquire(LockState.RESERVED)
+        >>> lock.release()
     """
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Optional[str], timeout: Optional[float] = LOCK_TIMEOUT):
         """初始化文件锁。
         
         Args:
-            file_path: 要锁定的文件路径
+            file_path: 要锁定的数据库文件路径，None表示不加锁
+            timeout: 等待锁的超时时间（秒），None表示无限等待
         """
         self.file_path = file_path
-        self.lock_file = None
+        self.timeout = timeout
+        self.state = LockState.UNLOCKED
+        self.lock_operations = 0
+        self._lock_fd: Optional[int] = None  # 数据库文件，SHARED/EXCLUSIVE
+        self._reserved_fd: Optional[int] = None  # 旁路文件，RESERVED
         self._lock = threading.RLock()  # 线程级别的锁
-        self._locked = False
-        
-    def acquire_shared(self, timeout: Optional[float] = None) -> bool:
-        """获取共享锁（读锁）。
+    
+    @property
+    def _enabled(self) -> bool:
+        """是否执行实际的文件加锁。"""
+        return self.file_path is not None and fcntl is not None
+    
+    def _flock(self, fd: int, operation: int, timeout: Optional[float]) -> None:
+        """对文件描述符执行flock，超时后抛出异常。
         
         Args:
+            fd: 文件描述符
+            operation: fcntl.LOCK_SH、fcntl.LOCK_EX或fcntl.LOCK_UN
             timeout: 超时时间（秒），None表示无限等待
             
-        Returns:
-            成功获取锁返回True，超时返回False
+        Raises:
+            LockError: 如果在超时时间内无法获得锁
         """
-        return self._acquire_lock(False, timeout)
+        self.lock_operations += 1
+        if timeout is None or operation == fcntl.LOCK_UN:
+            fcntl.flock(fd, operation)
+            return
         
-    def acquire_exclusive(self, timeout: Optional[float] = None) -> bool:
-        """获取独占锁（写锁）。
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            try:
+                fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise LockError(f"database is locked: {self.file_path}")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+    
+    def acquire(self, state: LockState, timeout: Optional[float] = None) -> None:
+        """将锁升级到指定状态，已持有同级或更高的锁时不做任何事。
         
         Args:
-            timeout: 超时时间（秒），None表示无限等待
+            state: 需要的锁状态（SHARED、RESERVED或EXCLUSIVE）
+            timeout: 超时时间（秒），默认使用构造时的timeout
             
-        Returns:
-            成功获取锁返回True，超时返回False
+        Raises:
+            LockError: 如果在超时时间内无法获得锁
         """
-        return self._acquire_lock(True, timeout)
+        if self.state.value >= state.value:
+            return
+        
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            if not self._enabled:
+                self.state = max(self.state, state, key=lambda s: s.value)
+                return
+            
+            previous = self.state
+            try:
+                self._escalate(state, timeout)
+            except LockError:
+                # 获取失败时恢复到原来的状态，不留下部分升级的锁
+                self.downgrade(previous)
+                raise
+    
+    def _escalate(self, state: LockState, timeout: Optional[float]) -> None:
+        """逐级升级锁状态。
         
-    def _acquire_lock(self, exclusive: bool, timeout: Optional[float]) -> bool:
-        """获取锁的跨平台实现。
+        从未加锁状态直接获取RESERVED时先取RESERVED再取SHARED，等待其他写入者期间
+        不持有SHARED锁。已持有SHARED时RESERVED只尝试一次：另一个连接持有RESERVED时
+        它在等待本连接释放SHARED，阻塞等待只会互相等到超时，因此立即抛出BusyError。
         
         Args:
-            exclusive: 是否为独占锁
-            timeout: 超时时间
+            state: 目标锁状态
+            timeout: 每一级的超时时间（秒）
             
-        Returns:
-            成功获取锁返回True，失败返回False
+        Raises:
+            BusyError: 如果持有SHARED时另一个连接已持有RESERVED
+            LockError: 如果某一级在超时时间内无法获得
         """
-        with self._lock:
-            if self._locked:
-                return True
-                
-            try:
-                if not self.lock_file or self.lock_file.closed:
-                    self.lock_file = open(self.file_path, 'rb+')
-                
-                if os.name == 'nt':  # Windows系统
-                    return self._acquire_windows_lock(exclusive, timeout)
-                else:  # Unix-like系统
-                    return self._acquire_unix_lock(exclusive, timeout)
-                    
-            except Exception as e:
-                # 回退到简单的基于文件的锁定
-                lock_file_path = f"{self.file_path}.lock"
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.file_path, os.O_RDONLY)
+        if state.value >= LockState.RESERVED.value and self._reserved_fd is None:
+            self._reserved_fd = os.open(f"{self.file_path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        
+        if self.state == LockState.UNLOCKED:
+            if state.value >= LockState.RESERVED.value:
+                self._flock(self._reserved_fd, fcntl.LOCK_EX, timeout)
                 try:
-                    with open(lock_file_path, 'w') as f:
-                        f.write(str(os.getpid()))
-                    self._locked = True
-                    return True
-                except:
-                    return False
-                    
-    def _acquire_unix_lock(self, exclusive: bool, timeout: Optional[float]) -> bool:
-        """获取Unix文件锁。
+                    self._flock(self._lock_fd, fcntl.LOCK_SH, timeout)
+                except LockError:
+                    self._flock(self._reserved_fd, fcntl.LOCK_UN, None)
+                    raise
+                self.state = LockState.RESERVED
+            else:
+                self._flock(self._lock_fd, fcntl.LOCK_SH, timeout)
+                self.state = LockState.SHARED
+        
+        if state.value >= LockState.RESERVED.value and self.state == LockState.SHARED:
+            try:
+                self._flock(self._reserved_fd, fcntl.LOCK_EX, 0)
+            except LockError:
+                raise BusyError(f"database is locked by another writer: {self.file_path}")
+            self.state = LockState.RESERVED
+        
+        if state == LockState.EXCLUSIVE and self.state == LockState.RESERVED:
+            try:
+                self._flock(self._lock_fd, fcntl.LOCK_EX, timeout)
+            except LockError:
+                # flock的锁转换不是原子的，失败时共享锁可能已被移除，重新获取
+                self._flock(self._lock_fd, fcntl.LOCK_SH, None)
+                raise
+            self.state = LockState.EXCLUSIVE
+    
+    def downgrade(self, state: LockState) -> None:
+        """将锁降级到指定状态，当前状态不高于目标状态时不做任何事。
         
         Args:
-            exclusive: 是否为独占锁
-            timeout: 超时时间
-            
-        Returns:
-            成功获取锁返回True，失败返回False
+            state: 目标锁状态
         """
-        import fcntl
-        lock_type = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        if self.state.value <= state.value:
+            return
         
-        if timeout is None:
-            # 无限等待
-            if self.lock_file is not None and not self.lock_file.closed:
-                fcntl.flock(self.lock_file.fileno(), lock_type)
-                self._locked = True
-                return True
-            return False
-        else:
-            # 带超时的非阻塞尝试
-            import time
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                try:
-                    if self.lock_file is not None and not self.lock_file.closed:
-                        fcntl.flock(self.lock_file.fileno(), lock_type | fcntl.LOCK_NB)
-                        self._locked = True
-                        return True
-                    else:
-                        return False
-                except BlockingIOError:
-                    time.sleep(0.1)
-            return False
+        with self._lock:
+            if not self._enabled:
+                self.state = state
+                return
             
-    def _acquire_windows_lock(self, exclusive: bool, timeout: Optional[float]) -> bool:
-        """获取Windows文件锁。
+            # 数据库文件上的锁：EXCLUSIVE降为SHARED，或者直接解锁
+            if state == LockState.UNLOCKED:
+                self._flock(self._lock_fd, fcntl.LOCK_UN, None)
+            elif self.state == LockState.EXCLUSIVE:
+                self._flock(self._lock_fd, fcntl.LOCK_SH, None)
+            
+            # 旁路文件上的RESERVED锁
+            if self.state.value >= LockState.RESERVED.value and state.value < LockState.RESERVED.value:
+                self._flock(self._reserved_fd, fcntl.LOCK_UN, None)
+            self.state = state
+    
+    @contextmanager
+    def holding(self, state: LockState):
+        """在作用域内至少持有指定的锁，退出时恢复原来的状态。
+        
+        Args:
+            state: 需要的锁状态
+        """
+        previous = self.state
+        self.acquire(state)
+        try:
+            yield self
+        finally:
+            self.downgrade(previous)
+    
+    def acquire_shared(self, timeout: Optional[float] = None) -> bool:
+        """获取共享锁（读锁）。
         
         Args:
-            exclusive: 是否为独占锁
-            timeout: 超时时间
+            timeout: 超时时间（秒），None表示使用默认超时
             
         Returns:
-            成功获取锁返回True，失败返回False
+            成功获取锁返回True，超时返回False
         """
-        # Windows系统使用基于文件的锁定
-        lock_file_path = f"{self.file_path}.lock"
         try:
-            with open(lock_file_path, 'w') as f:
-                f.write(str(os.getpid()))
-            self._locked = True
+            self.acquire(LockState.SHARED, timeout)
             return True
-        except:
+        except LockError:
             return False
+    
+    def acquire_exclusive(self, timeout: Optional[float] = None) -> bool:
+        """获取独占锁（写锁）。
         
+        Args:
+            timeout: 超时时间（秒），None表示使用默认超时
+            
+        Returns:
+            成功获取锁返回True，超时返回False
+        """
+        try:
+            self.acquire(LockState.EXCLUSIVE, timeout)
+            return True
+        except LockError:
+            return False
+    
     def release(self):
-        """释放锁。"""
+        """释放所有锁，锁文件描述符保持打开以便再次加锁。"""
+        self.downgrade(LockState.UNLOCKED)
+    
+    def close(self):
+        """释放所有锁并关闭锁文件描述符。"""
         with self._lock:
-            if not self._locked:
-                return
-                
-            try:
-                if os.name == 'nt':
-                    # Windows系统：删除锁文件
-                    lock_file_path = f"{self.file_path}.lock"
-                    if os.path.exists(lock_file_path):
-                        os.remove(lock_file_path)
-                else:
-                    # Unix系统：释放文件锁
-                    if self.lock_file and not self.lock_file.closed:
-                        import fcntl
-                        fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
-                        
-                self._locked = False
-                
-                if self.lock_file and not self.lock_file.closed:
-                    self.lock_file.close()
-                    self.lock_file = None
-                    
-            except Exception as e:
-                # 忽略清理错误
-                pass
-        
+            self.release()
+            for fd in (self._lock_fd, self._reserved_fd):
+                if fd is not None:
+                    os.close(fd)
+            self._lock_fd = None
+            self._reserved_fd = None
+    
     def __enter__(self):
         """上下文管理器入口。"""
         return self
-        
+    
     def __exit__(self, exc_type, exc_val, exc_tb):
         """上下文管理器出口，自动释放锁。"""
         self.release()
@@ -187,185 +294,999 @@ class ConcurrentPager(Pager):
     """线程安全和进程安全的页面管理器，支持文件锁定。
     
     提供跨平台的页面管理功能，确保在多线程和多进程环境下的
-    数据一致性和并发安全性。
+    数据一致性和并发安全性。页面缓存由有界的LRU缓冲池管理，
+    超出容量时淘汰最久未使用的页面，脏页在淘汰前写回磁盘。
+    
+    第0页保存数据库文件头，数据页从第1页开始，新页面通过allocate_page分配，
+    不再使用的页面通过free_page放回空闲页链表，之后的分配优先复用。
+    
+    文件锁由连接持有：从文件读取页面时获取SHARED，修改页面时升级为RESERVED，
+    刷新写回时升级为EXCLUSIVE，刷新后降回静止状态（读事务中为SHARED，否则解锁）。
+    
+    每次写回都会递增文件头中的变更计数器。连接从未加锁状态获取SHARED锁时
+    重新读取文件头，计数器变化说明其他连接提交过，此时丢弃过期的缓存页面：
+    文件启用了页面版本表时只丢弃被修改过的页面，否则清空整个缓存。
+    
+    以压缩模式创建的数据库中，页面在写回时压缩、缓存未命中时解压，
+    文件位置由页面映射（见compression模块）确定。
+    
+    按页号顺序的缓存未命中由预读器（见readahead模块）合并为大块读取。
+    启用缓存预热时，关闭连接会记下缓冲池中最热的页面，下次打开时
+    由后台线程（见warmup模块）把它们读回缓冲池。
+    
+    文件按区段增长：区段至少为extent_size字节，并随文件变大按当前大小的比例增大，
+    批量加载时扩展文件的次数随数据量对数增长。支持时用posix_fallocate为区段
+    真正分配磁盘块，避免稀疏文件在之后的写入中产生碎片。文件头同时记录
+    逻辑页数（高水位线）和文件的物理页数。
     """
     
-    def __init__(self, filename: str):
+    first_data_page = HEADER_PAGE_NUM + 1  # 第0页为文件头
+    allocation_extent_pages = ALLOCATION_EXTENT_PAGES  # 文件增长的区段大小（页数）
+    
+    def __init__(self, filename: str, cache_size: Optional[int] = DEFAULT_CACHE_SIZE,
+                 cache_bytes: Optional[int] = None, track_page_versions: bool = False,
+                 background_writer: bool = False, page_size: Optional[int] = None,
+                 compression: Optional[str] = None, checksums: bool = False,
+                 verify_checksums: str = CHECKSUM_VERIFY_ALWAYS,
+                 read_ahead: int = READAHEAD_PAGES, read_ahead_background: bool = False,
+                 extent_size: Optional[int] = None,
+                 extent_growth: float = ALLOCATION_GROWTH_RATIO, preallocate: bool = True,
+                 replacement_policy: str = REPLACEMENT_LRU, warm_cache: bool = False):
         """初始化并发页面管理器。
         
         Args:
             filename: 数据库文件名，":memory:"表示内存数据库
+            cache_size: 缓冲池容量（页数），None表示不限制
+            cache_bytes: 缓冲池容量（字节），优先于cache_size
+            track_page_versions: 是否在文件中启用页面版本表，使其他进程的提交
+                只让被修改的缓存页面失效（启用后对该文件永久有效）
+            background_writer: 是否启动后台写线程，提前把脏页写回磁盘（内存数据库忽略）
+            page_size: 新建数据库的页面大小（1KB到64KB之间的2的幂），默认为PAGE_SIZE；
+                已有数据库始终使用文件头中记录的页面大小
+            compression: 新建数据库的页面压缩算法（'zlib'或'lzma'），None表示不压缩；
+                已有数据库始终使用文件头中记录的算法（内存数据库忽略）
+            checksums: 新建数据库是否在每页末尾保留CRC32校验和（内存数据库忽略）
+            verify_checksums: 从文件读取页面时的校验模式：'always'、'sampled'或'off'
+            read_ahead: 顺序访问时一次预读的最大页数，0表示不预读
+                （内存数据库和压缩数据库不预读）
+            read_ahead_background: 是否由工作线程读取预读窗口
+            extent_size: 文件增长时一次扩展的最少字节数（向上取整到整页），
+                默认为allocation_extent_pages页
+            extent_growth: 区段至少为当前文件大小的该比例（不超过ALLOCATION_EXTENT_MAX_BYTES），
+                0表示固定大小的区段
+            preallocate: 是否用posix_fallocate为新区段分配磁盘块，
+                False或系统不支持时扩展为稀疏文件
+            replacement_policy: 缓冲池的页面替换策略：'lru'、'2q'或'arc'
+                （后两者抗扫描，全表扫描不会挤出点查询的热点页面）
+            warm_cache: 是否在关闭时保存热点页列表，并在打开时由后台线程按列表预热缓冲池
+                （内存数据库和压缩数据库忽略）
+            
+        Raises:
+            StorageError: 如果页面大小、压缩算法、校验模式、区段配置或替换策略无效，
+                或文件不是有效的PySQLit数据库文件
         """
+        if verify_checksums not in (CHECKSUM_VERIFY_ALWAYS, CHECKSUM_VERIFY_SAMPLED,
+                                    CHECKSUM_VERIFY_OFF):
+            raise StorageError(f"Invalid checksum verification mode {verify_checksums!r}")
+        if (extent_size is not None and extent_size < 1) or extent_growth < 0:
+            raise StorageError(
+                f"Invalid file extent configuration: size={extent_size}, growth={extent_growth}"
+            )
         self.is_memory_db = (filename == ":memory:")
+        self.filename = filename
+        self.file_descriptor = None
+        self.file_length = 0
+        self.num_pages = 0
+        self.pages = {}  # 父类的页面缓存不再使用，页面由缓冲池管理
         
-        # 对于内存数据库，我们仍然需要初始化父类，但要特殊处理文件操作
+        self.page_size = self._detect_page_size(page_size)
+        self._zero_page = bytes(self.page_size)  # 新页面和短页补零用的共享全零页
+        if extent_size is not None:
+            self.allocation_extent_pages = -(-extent_size // self.page_size)
+        self.extent_growth = extent_growth
+        self._preallocate = preallocate and hasattr(os, 'posix_fallocate')
+        self.file_lock = self._create_file_lock()  # 连接持有的文件锁
+        self._read_transaction = False  # 读事务期间刷新后保留SHARED锁
+        self._new_compression = COMPRESSION_NONE if self.is_memory_db else compression_id(compression)
+        self._new_checksums = checksums and not self.is_memory_db
+        self.verify_checksums = verify_checksums
+        self._checksum_reads = 0  # 抽样校验的读取计数
+        self.header = DatabaseHeader(page_size=self.page_size)
+        self._header_dirty = False
+        self.freelist = Freelist(self)
+        self.page_versions = PageVersionTable(self)
+        self.page_map = PageMap(self)  # 压缩数据库中逻辑页到文件位置的映射
+        self.cache_epoch = 0  # 每次因其他连接的提交而丢弃缓存时递增
+        self.cache_invalidations = 0  # 丢弃的缓存页面总数
+        self.io_stats = IOStats()  # 命中/未命中以缓冲池统计为准
+        self._written_back = set()  # 刷新之前被淘汰写回的页面，同样需要记录版本
+        self.write_generation = 0  # 每次写入文件时递增，用于作废并发的后台预读
+        self.read_ahead = None
+        self.cache_warmer = None
+        self.warm_cache = False
+        self._replacement_policy = replacement_policy
+        self.buffer_pool = self._create_buffer_pool(cache_size, cache_bytes)
+        self._open_file_concurrent()
+        
+        if track_page_versions and not self.is_memory_db and not self.page_versions.enabled:
+            self.page_versions.enable()
+            self.flush()
+        
+        self.background_writer = None
+        if background_writer and not self.is_memory_db:
+            from .bgwriter import BackgroundWriter
+            self.background_writer = BackgroundWriter(self)
+            self.background_writer.start()
+        
+        if read_ahead > 1 and not self.is_memory_db and not self.page_map.enabled:
+            from .readahead import ReadAhead
+            self.read_ahead = ReadAhead(self, max_pages=read_ahead, background=read_ahead_background)
+        
+        self.warm_cache = warm_cache and not self.is_memory_db and not self.page_map.enabled
+        if self.warm_cache:
+            from .warmup import CacheWarmer, load_hot_pages
+            pages = load_hot_pages(self.hot_pages_path, self.page_size)
+            if pages:
+                self.cache_warmer = CacheWarmer(self, pages)
+                self.cache_warmer.start()
+    
+    def _detect_page_size(self, requested: Optional[int]) -> int:
+        """确定本连接使用的页面大小。
+        
+        页面大小在创建数据库时选定并记录在文件头中，之后不再改变，
+        因此已有文件直接读取文件头开头的固定字段，不需要持有文件锁。
+        
+        Args:
+            requested: 调用方要求的页面大小，None表示默认值
+            
+        Returns:
+            int: 页面大小（字节）
+            
+        Raises:
+            StorageError: 如果页面大小无效或文件不是有效的PySQLit数据库文件
+            LegacyFormatError: 如果文件是引入文件头之前的旧版数据库
+        """
+        page_size = check_page_size(PAGE_SIZE if requested is None else requested)
         if self.is_memory_db:
-            # 手动设置父类属性
-            self.filename = filename
-            self.file_descriptor = None
-            self.file_length = 0
-            self.num_pages = 0
-            self.pages = [None] * 100  # 使用默认大小
-        else:
-            # 初始化父类Pager
-            super().__init__(filename)
+            return page_size
+        try:
+            with open(self.filename, 'rb') as f:
+                data = f.read(HEADER_STRUCT.size)
+        except FileNotFoundError:
+            return page_size
+        except IOError as e:
+            raise StorageError(f"Unable to open database file: {e}")
+        if not DatabaseHeader.is_valid(data):
+            check_legacy_format(self.filename)  # 引入文件头之前的文件需要先转换
+        if not data:
+            return page_size  # 空文件按新数据库处理
+        return DatabaseHeader.peek_page_size(data)
+    
+    def _create_file_lock(self) -> Optional[FileLock]:
+        """创建连接持有的文件锁。
+        
+        Returns:
+            文件锁，内存数据库的锁只跟踪状态
+        """
+        return FileLock(None if self.is_memory_db else self.filename)
+    
+    def _create_buffer_pool(self, cache_size: Optional[int],
+                            cache_bytes: Optional[int]) -> BufferPool:
+        """创建缓冲池。
         
-        self.file_lock = FileLock(filename)  # 文件锁
-        from .constants import PAGE_SIZE
-        self.page_size = PAGE_SIZE
-        self.page_cache = {}  # 简单的内存缓存
-        self.cache_lock = threading.RLock()  # 缓存访问锁
-        if not self.is_memory_db:
-            self._open_file_concurrent()
+        Args:
+            cache_size: 缓冲池容量（页数）
+            cache_bytes: 缓冲池容量（字节）
+            
+        Returns:
+            BufferPool: 缓冲池
+        """
+        # 内存数据库没有后备存储，页面一旦淘汰就会丢失，因此不限制容量
+        return BufferPool(
+            self.page_size,
+            loader=self._load_page,
+            writer=None if self.is_memory_db else self._write_back_page,
+            max_pages=None if self.is_memory_db else cache_size,
+            max_bytes=None if self.is_memory_db else cache_bytes,
+            policy=self._replacement_policy
+        )
     
     def _open_file_concurrent(self):
-        """打开数据库文件（并发版本）。"""
+        """打开数据库文件（并发版本）。
+        
+        新文件（或空文件）会写入文件头页；已有文件从第0页读取文件头，
+        并以其中记录的高水位线作为页数。
+        
+        Raises:
+            StorageError: 如果文件不是有效的PySQLit数据库文件
+        """
         if self.is_memory_db:
+            # 内存数据库同样以文件头页开始，使页号布局与文件数据库一致
+            self._init_header()
             return
-            
-        if not os.path.exists(self.filename):
+        
+        try:
+            mode = 'rb+' if os.path.exists(self.filename) else 'wb+'
+            # 不使用用户态缓冲，页面缓存由缓冲池负责，脏页通过向量写入直接落盘
+            self.file_descriptor = open(self.filename, mode, buffering=0)
+        except IOError as e:
+            raise StorageError(f"Unable to open database file: {e}")
+        
+        self.file_descriptor.seek(0, 2)  # 移动到文件末尾
+        self.file_length = self.file_descriptor.tell()
+        
+        if self.file_length == 0:
             # 创建新文件
-            self.file_descriptor = open(self.filename, 'wb+')
-            self.file_descriptor.write(b'\x00' * self.page_size)  # 写入初始页面
-            self.file_descriptor.flush()
-            self.file_length = self.page_size
-            # 直接设置父类的num_pages属性
-            super().__setattr__('num_pages', 1)
+            self._init_header()
+            self.flush()
+            return
+        
+        with self.file_lock.holding(LockState.SHARED):
+            data = self._read_from_file(HEADER_PAGE_NUM)
+            self.header = DatabaseHeader.unpack(data)
+            self._verify_page(HEADER_PAGE_NUM, data)
+            if self.header.page_size != self.page_size:
+                raise StorageError(
+                    f"Database page size {self.header.page_size} does not match {self.page_size}"
+                )
+            if self.page_map.enabled:
+                self.page_map.load()
+            elif self.file_length % self.page_size != 0:
+                raise StorageError("Database file is not a whole number of pages")
+        self.num_pages = self.header.page_count
+    
+    def _init_header(self) -> None:
+        """为新数据库初始化文件头页。"""
+        self.num_pages = HEADER_PAGE_NUM + 1
+        self.header = DatabaseHeader(page_size=self.page_size, page_count=self.num_pages,
+                                     compression=self._new_compression,
+                                     checksums=int(self._new_checksums))
+        if self.page_map.enabled:
+            self.page_map.load()  # 空映射：只有文件头页占用扇区
+        self.buffer_pool.put(HEADER_PAGE_NUM, self.header.pack(), dirty=True)
+    
+    @property
+    def compression(self) -> Optional[str]:
+        """文件使用的页面压缩算法名称，不压缩时为None。"""
+        return compression_name(self.header.compression)
+    
+    @property
+    def checksums(self) -> bool:
+        """文件是否在每页末尾保留CRC32校验和。"""
+        return bool(self.header.checksums)
+    
+    @property
+    def usable_size(self) -> int:
+        """每页可供存放数据的字节数（页面大小减去页尾校验和）。"""
+        return self.header.usable_size
+    
+    @property
+    def lock_state(self) -> LockState:
+        """连接当前持有的文件锁状态。"""
+        return self.file_lock.state
+    
+    def _lock(self, state: LockState) -> None:
+        """确保持有指定的锁（已持有时不产生系统调用）。
+        
+        从未加锁状态获取锁时检查其他连接是否提交过，必要时丢弃过期的缓存。
+        
+        Args:
+            state: 需要的锁状态
+            
+        Raises:
+            LockError: 如果在超时时间内无法获得锁
+        """
+        if self.file_lock.state.value >= state.value:
+            return
+        was_unlocked = self.file_lock.state == LockState.UNLOCKED
+        self.file_lock.acquire(state)
+        if was_unlocked and not self.is_memory_db:
+            self._validate_cache()
+    
+    def _read_from_file(self, page_num: int) -> bytes:
+        """绕过缓冲池直接从文件读取页面。
+        
+        压缩数据库中除文件头页外的页面通过页面映射定位并解压。
+        启用了校验和的文件按校验模式验证读到的页面。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            页面数据
+            
+        Raises:
+            ChecksumError: 如果页面与页尾校验和不一致
+        """
+        if page_num != HEADER_PAGE_NUM and self.page_map.enabled:
+            data = self.page_map.read_page(page_num)
         else:
-            self.file_descriptor = open(self.filename, 'rb+')
-            self.file_descriptor.seek(0, 2)  # 移动到文件末尾
-            self.file_length = self.file_descriptor.tell()
-            # 直接设置父类的num_pages属性
-            super().__setattr__('num_pages', self.file_length // self.page_size)
+            started = time.perf_counter()
+            data = os.pread(self.file_descriptor.fileno(), self.page_size, page_num * self.page_size)
+            self.io_stats.record_read(len(data), time.perf_counter() - started)
+        self._verify_page(page_num, data)
+        return data
+    
+    def _read_run(self, start: int, count: int) -> List[bytes]:
+        """一次读取页号连续的多个页面（不做校验）。
+        
+        Args:
+            start: 第一个页面的页号
+            count: 页数
             
-            if self.file_length % self.page_size != 0:
-                raise StorageError("Database file is not a whole number of pages")
+        Returns:
+            页面数据列表，读到文件末尾时可能少于count个
+        """
+        started = time.perf_counter()
+        data = os.pread(self.file_descriptor.fileno(), count * self.page_size,
+                        start * self.page_size)
+        self.io_stats.record_read(len(data), time.perf_counter() - started)
+        return [data[offset:offset + self.page_size]
+                for offset in range(0, len(data), self.page_size)]
     
-    def get_page(self, page_num: int) -> bytearray:
-        """线程安全地获取页面。
+    def _verify_page(self, page_num: int, data: bytes) -> None:
+        """按校验模式验证从文件读取的页面。
         
         Args:
             page_num: 页号
+            data: 页面数据
             
+        Raises:
+            ChecksumError: 如果页面与页尾校验和不一致
+        """
+        if not self.header.checksums or self.verify_checksums == CHECKSUM_VERIFY_OFF \
+                or len(data) != self.page_size:
+            return
+        if self.verify_checksums == CHECKSUM_VERIFY_SAMPLED:
+            self._checksum_reads += 1
+            if (self._checksum_reads - 1) % CHECKSUM_SAMPLE_INTERVAL:
+                return
+        
+        started = time.perf_counter()
+        valid = checksum_valid(data)
+        self.io_stats.record_verify(time.perf_counter() - started)
+        if not valid:
+            self.io_stats.checksum_failures += 1
+            raise ChecksumError(f"Page {page_num} failed checksum verification "
+                                f"(torn write or file corruption)")
+    
+    def _validate_cache(self) -> None:
+        """检查文件头的变更计数器，丢弃被其他连接修改过的缓存页面。"""
+        if self.file_descriptor is None:
+            return
+        
+        disk_header = DatabaseHeader.unpack(self._read_from_file(HEADER_PAGE_NUM))
+        if disk_header.change_counter == self.header.change_counter:
+            return
+        
+        with self.buffer_pool.lock:
+            cached_pages = list(self.buffer_pool.frames)
+            previous = self.header
+            self.header = disk_header
+            if self.page_map.enabled:
+                self.page_map.load()  # 其他连接可能移动了页面
+            if previous.page_versions_root and disk_header.page_versions_root:
+                # 只丢弃在上次所见的计数器之后被修改过的页面
+                stale = self.page_versions.stale_pages(cached_pages, previous.change_counter,
+                                                       self._read_from_file)
+                stale.add(HEADER_PAGE_NUM)
+            else:
+                stale = set(cached_pages)
+            stale.update(page_num for page_num in cached_pages if page_num >= disk_header.page_count)
+            
+            for page_num in stale:
+                self.buffer_pool.discard(page_num)
+            self.num_pages = disk_header.page_count
+            self.file_length = os.fstat(self.file_descriptor.fileno()).st_size
+            self._header_dirty = False
+            self.cache_epoch += 1
+            self.cache_invalidations += len(stale)
+    
+    def _reserve(self) -> None:
+        """修改页面前确保持有RESERVED锁（已持有时不产生系统调用）。
+        
+        读事务之外升级失败时同时释放SHARED锁，让持有RESERVED的连接可以提交；
+        读事务中的SHARED锁由调用方回滚事务时释放。
+        
+        Raises:
+            BusyError: 如果持有SHARED锁时另一个连接已持有RESERVED
+            LockError: 如果其他连接正在写入且超时仍未释放
+        """
+        try:
+            self._lock(LockState.RESERVED)
+        except BusyError:
+            if not self._read_transaction:
+                self.file_lock.release()
+            raise
+    
+    def _resting_lock_state(self) -> LockState:
+        """刷新之后应保留的锁状态。"""
+        return LockState.SHARED if self._read_transaction else LockState.UNLOCKED
+    
+    def begin_read(self) -> None:
+        """开始读事务：获取SHARED锁并在事务结束前一直持有。
+        
+        Raises:
+            LockError: 如果其他连接持有EXCLUSIVE锁且超时仍未释放
+        """
+        self._lock(LockState.SHARED)
+        self._read_transaction = True
+    
+    def begin_write(self) -> None:
+        """开始写事务：读取任何页面之前获取RESERVED锁并在事务结束前一直持有。
+        
+        写事务之间因此在开始时排队，不会出现两个持有SHARED的连接同时升级。
+        
+        Raises:
+            LockError: 如果其他连接的写事务超时仍未结束
+        """
+        self._lock(LockState.RESERVED)
+        self._read_transaction = True
+    
+    def end_read(self) -> None:
+        """结束读事务或自动提交的读操作，释放锁。
+        
+        仍有未刷新的脏页时保留RESERVED锁，由之后的刷新释放。
+        """
+        self._read_transaction = False
+        if self.file_lock.state.value <= LockState.SHARED.value:
+            self.file_lock.release()
+    
+    def discard_changes(self) -> None:
+        """丢弃未提交的修改并降回静止的锁状态（回滚或提交失败时调用）。
+        
+        丢弃所有脏页，从文件重新读取文件头（高水位线、空闲页链表、表根页），
+        之后的读取从文件取回提交前的页面。缓冲池淘汰或后台写线程已经提前写回
+        文件的页面无法恢复；内存数据库的页面只存在于内存中，只释放锁。
+        """
+        if self.is_memory_db:
+            if self.file_lock is not None:
+                self.file_lock.downgrade(self._resting_lock_state())
+            return
+        
+        with self.buffer_pool.lock:
+            for page_num in self.buffer_pool.dirty_pages():
+                self.buffer_pool.discard(page_num)
+            self.buffer_pool.discard(HEADER_PAGE_NUM)
+            if self.file_descriptor is not None:
+                with self.file_lock.holding(LockState.SHARED):
+                    self.header = DatabaseHeader.unpack(self._read_from_file(HEADER_PAGE_NUM))
+                    if self.page_map.enabled:
+                        self.page_map.load()
+                self.num_pages = self.header.page_count
+                self.file_length = os.fstat(self.file_descriptor.fileno()).st_size
+            self._header_dirty = False
+            self._written_back.clear()
+            self.cache_epoch += 1
+        self.file_lock.downgrade(self._resting_lock_state())
+    
+    def update_header(self) -> None:
+        """标记文件头已修改（表根页、序列计数器、模式目录等）。
+        
+        文件头在下一次刷新时重新序列化并与其他脏页一起写回，
+        多次修改只产生一次写入。
+        """
+        self._header_dirty = True
+    
+    @property
+    def hot_pages_path(self) -> str:
+        """热点页列表文件的路径。"""
+        return self.filename + WARMUP_SUFFIX
+    
+    def save_hot_pages(self) -> int:
+        """把缓冲池中最热的页号写入热点页列表文件，供下次打开时预热。
+        
         Returns:
-            页面对应的字节数组
+            int: 写入列表的页数
+            
+        Raises:
+            StorageError: 如果无法写入列表文件
         """
-        with self.cache_lock:
-            if page_num in self.page_cache:
-                return self.page_cache[page_num]
-                
+        if self.is_memory_db or self.file_descriptor is None:
+            return 0
+        from .warmup import save_hot_pages
+        pages = [page_num for page_num in self.buffer_pool.hot_pages()
+                 if HEADER_PAGE_NUM < page_num < self.num_pages]
+        save_hot_pages(self.hot_pages_path, self.page_size, pages)
+        return len(pages)
+    
+    @property
+    def physical_pages(self) -> int:
+        """文件的物理页数，包含高水位线之后预分配的区段（刷新后不少于逻辑页数）。"""
         if self.is_memory_db:
-            # 在内存中初始化新页面
-            page = bytearray(b'\x00' * self.page_size)
-            with self.cache_lock:
-                self.page_cache[page_num] = page
-            return page
+            return self.num_pages
+        if self.page_map.enabled:
+            return -(-self.file_length // self.page_size)  # 压缩页面按扇区存放，文件可能小于逻辑页数
+        return max(self.file_length // self.page_size, self.num_pages)
+    
+    def _sync_header(self) -> None:
+        """如果文件头、高水位线或文件物理大小发生变化，将其写入文件头页。"""
+        physical_pages = self.physical_pages
+        if self._header_dirty or self.header.page_count != self.num_pages \
+                or self.header.physical_pages != physical_pages:
+            self.header.page_count = self.num_pages
+            self.header.physical_pages = physical_pages
+            self.buffer_pool.put(HEADER_PAGE_NUM, self.header.pack(), dirty=True)
+            self._header_dirty = False
+    
+    def allocate_page(self) -> int:
+        """分配一个新页面。
+        
+        优先复用空闲页链表中的页面；没有空闲页时新页面位于高水位线处。
+        新页面以全零的脏页形式放入缓冲池；文件按区段预先扩展，
+        避免每分配一页就扩展一次文件。
+        
+        Returns:
+            int: 新页面的页号
+        """
+        self._reserve()
+        with self.buffer_pool.lock:
+            page_num = self.freelist.pop()
+            if page_num is not None:
+                self.buffer_pool.put(page_num, bytes(self.page_size), dirty=True)
+                return page_num
             
-        # 获取共享锁用于读取
-        self.file_lock.acquire_shared()
-        try:
-            # 调用父类方法获取页面
-            page = super().get_page(page_num)
+            page_num = self.num_pages
+            self.num_pages += 1
+            self._ensure_file_capacity(self.num_pages)
+            self.buffer_pool.put(page_num, bytes(self.page_size), dirty=True)
+            return page_num
+    
+    def free_page(self, page_num: int) -> None:
+        """释放页面，将其放入空闲页链表供之后的分配复用。
+        
+        Args:
+            page_num: 页号
             
-            # 缓存页面
-            with self.cache_lock:
-                self.page_cache[page_num] = page
-                
-            return page
+        Raises:
+            StorageError: 如果页号无效
+        """
+        self._reserve()
+        with self.buffer_pool.lock:
+            self.freelist.push(page_num)
+    
+    def shrink(self, num_pages: int) -> None:
+        """将数据库缩小到指定页数并截断文件。
+        
+        调用方需保证被截掉的页面都不再使用，也不在空闲页链表中。
+        
+        Args:
+            num_pages: 新的页数（高水位线）
+        """
+        with self.buffer_pool.lock:
+            for page_num in [p for p in self.buffer_pool.frames if p >= num_pages]:
+                self.buffer_pool.discard(page_num)
+            self.num_pages = num_pages
+            self.update_header()
+            if self.page_map.enabled:
+                self.page_map.truncate(num_pages)
+            self.flush()
+            if self.is_memory_db:
+                return
+            if self.page_map.enabled:
+                # 压缩数据库的文件长度取决于已使用的扇区而不是页数
+                with self.file_lock.holding(LockState.EXCLUSIVE):
+                    self.file_descriptor.truncate(self.page_map.physical_size)
+                self.file_length = self.page_map.physical_size
+            else:
+                self.truncate(num_pages * self.page_size)
+                self.file_length = num_pages * self.page_size
+            self.flush()  # 在文件头中记录缩小后的物理页数
+    
+    def _extent_bytes(self) -> int:
+        """计算下一次扩展文件的区段大小。
+        
+        Returns:
+            int: 区段字节数（整页）
+        """
+        minimum = self.allocation_extent_pages * self.page_size
+        proportional = min(int(self.file_length * self.extent_growth), ALLOCATION_EXTENT_MAX_BYTES)
+        return max(minimum, proportional // self.page_size * self.page_size)
+    
+    def _ensure_file_capacity(self, num_pages: int) -> None:
+        """确保文件至少能容纳指定页数，不足时按区段扩展。
+        
+        Args:
+            num_pages: 需要容纳的页数
             
-        finally:
-            self.file_lock.release()
+        Raises:
+            StorageError: 如果磁盘空间不足
+        """
+        if self.is_memory_db or self.page_map.enabled:
+            return  # 压缩数据库在写回时按实际大小分配扇区
+        
+        required = num_pages * self.page_size
+        if required <= self.file_length:
+            return
+        
+        extent = self._extent_bytes()
+        new_length = (required + extent - 1) // extent * extent
+        # 只扩展高水位线之外的区域，读者不会读取这些页面，持有RESERVED即可
+        self._reserve()
+        self._extend_file(new_length)
+        self.file_length = new_length
+        self.io_stats.file_extensions += 1
+    
+    def _extend_file(self, new_length: int) -> None:
+        """把文件扩展到指定长度，优先为新区域分配磁盘块。
+        
+        Args:
+            new_length: 新的文件长度（字节）
+            
+        Raises:
+            StorageError: 如果磁盘空间不足
+        """
+        fd = self.file_descriptor.fileno()
+        if self._preallocate:
+            try:
+                os.posix_fallocate(fd, self.file_length, new_length - self.file_length)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL, errno.ENOSYS):
+                    raise StorageError(f"Unable to extend database file: {e}")
+                self._preallocate = False  # 文件系统不支持，之后直接扩展为稀疏文件
+        os.ftruncate(fd, new_length)
+    
+    def _load_page(self, page_num: int) -> bytes:
+        """缓冲池未命中时从文件加载页面。
+        
+        返回的数据由缓冲池复制到页帧中，因此这里不再为每次未命中分配一个页面缓冲区。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            页面数据，新页面为全零
+        """
+        page = self._zero_page
+        
+        if not self.is_memory_db and page_num < self.num_pages:
+            # 已持有SHARED或更高的锁时不产生加锁系统调用
+            self.file_lock.acquire(LockState.SHARED)
+            if self.read_ahead is not None:
+                page = self.read_ahead.read(page_num)
+            else:
+                page = self._read_from_file(page_num)
+            if len(page) < self.page_size:
+                page = bytes(page) + self._zero_page[len(page):]
+        
+        if page_num >= self.num_pages:
+            self.num_pages = page_num + 1
+        return page
+    
+    def _write_back_page(self, page_num: int, data: bytearray) -> None:
+        """缓冲池淘汰脏页时将其写回磁盘。
+        
+        Args:
+            page_num: 页号
+            data: 页面数据
+        """
+        # 事务中途写回数据库文件需要EXCLUSIVE锁，直到下一次刷新结束
+        self.file_lock.acquire(LockState.EXCLUSIVE)
+        self._written_back.add(page_num)
+        self._write_pages([page_num], lambda _: data)
+    
+    def get_page(self, page_num: int) -> bytearray:
+        """线程安全地获取页面。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            页面对应的字节数组
+        """
+        self.io_stats.page_requests += 1
+        self._lock(LockState.SHARED)
+        return self.buffer_pool.get(page_num)
     
     def write_page(self, page_num: int, data: bytes):
         """线程安全地写入页面。
         
+        数据写入缓冲池中的页帧并标记为脏页，在刷新或淘汰时写回磁盘。
+        
         Args:
             page_num: 页号
             data: 要写入的数据
         """
         if len(data) != self.page_size:
-            from .integrity import IntegrityChecker
             # 尝试修复数据长度
             if len(data) < self.page_size:
                 data = data.ljust(self.page_size, b'\x00')
             else:
                 data = data[:self.page_size]
-                
-        # 内存数据库：仅更新缓存
-        if self.is_memory_db:
-            with self.cache_lock:
-                self.page_cache[page_num] = bytearray(data)
-            return
+        
+        self._reserve()
+        if page_num >= self.num_pages:
+            self._ensure_file_capacity(page_num + 1)
+        self.buffer_pool.put(page_num, data, dirty=True)
+        if page_num >= self.num_pages:
+            self.num_pages = page_num + 1
+    
+    def mark_dirty(self, page_num: int) -> None:
+        """将已就地修改的页面标记为脏页。
+        
+        Args:
+            page_num: 页号
+        """
+        self._reserve()
+        self.buffer_pool.mark_dirty(page_num)
+    
+    def get_writable_page(self, page_num: int) -> bytearray:
+        """获取可就地修改的页面。
+        
+        Args:
+            page_num: 页号
             
-        # 获取独占锁用于写入
-        self.file_lock.acquire_exclusive()
-        try:
-            # 调用父类方法写入页面
-            super().flush_page(page_num)
+        Returns:
+            缓冲池中的页帧数据
+        """
+        self.io_stats.page_requests += 1
+        self._reserve()
+        return self.buffer_pool.get(page_num)
+    
+    def pin(self, page_num: int) -> bytearray:
+        """固定页面，在unpin之前不会被缓冲池淘汰。
+        
+        Args:
+            page_num: 页号
             
-            # 更新缓存
-            with self.cache_lock:
-                self.page_cache[page_num] = bytearray(data)
-                
+        Returns:
+            页面对应的字节数组
+        """
+        self.io_stats.page_requests += 1
+        self._lock(LockState.SHARED)
+        return self.buffer_pool.pin(page_num)
+    
+    def unpin(self, page_num: int) -> None:
+        """释放对页面的固定。
+        
+        Args:
+            page_num: 页号
+        """
+        self.buffer_pool.unpin(page_num)
+    
+    def pinned(self):
+        """返回固定作用域，作用域内访问的页面在退出前不会被淘汰。
+        
+        Returns:
+            上下文管理器
+        """
+        return self.buffer_pool.pinned()
+    
+    def sequential_scan(self):
+        """返回顺序扫描提示作用域，作用域内未命中的页面立即按最大窗口预读。
+        
+        Returns:
+            上下文管理器
+        """
+        if self.read_ahead is None:
+            return nullcontext()
+        return self.read_ahead.hint()
+    
+    @contextmanager
+    def reading(self):
+        """返回读取作用域：作用域内的读取按需获取SHARED锁，
+        作用域开始前未持有锁时，退出时释放作用域内获取的锁。
+        
+        用于在自动提交的读操作结束后再补充读取页面（例如延迟读取的溢出页）。
+        没有文件锁时（私有内存数据库）作用域不做任何事情。
+        """
+        if self.file_lock is None:
+            yield
+            return
+        held = self.file_lock.state != LockState.UNLOCKED
+        try:
+            yield
         finally:
-            self.file_lock.release()
+            if not held and not self._read_transaction and self.file_lock.state == LockState.SHARED:
+                self.file_lock.release()
+    
+    def get_cache_stats(self) -> dict:
+        """获取缓冲池统计信息。
+        
+        Returns:
+            包含容量、命中、未命中、淘汰等统计的字典
+        """
+        return self.buffer_pool.get_stats()
+    
+    def _bump_change_counter(self) -> None:
+        """递增变更计数器，并在版本表中记录本次写回的页面。
+        
+        记录版本本身会弄脏版本页（甚至分配新的版本页），因此重复记录直到没有新的脏页。
+        """
+        self.header.change_counter = (self.header.change_counter + 1) & 0xFFFFFFFF
+        self.update_header()
+        written_back, self._written_back = self._written_back, set()
+        if not self.page_versions.enabled:
+            return
+        
+        recorded = set()
+        while True:
+            version_pages = set(self.page_versions.chain())
+            pending = [page_num for page_num in set(self.buffer_pool.dirty_pages()) | written_back
+                       if page_num not in recorded and page_num not in version_pages
+                       and page_num != HEADER_PAGE_NUM]
+            if not pending:
+                return
+            self.page_versions.record(pending, self.header.change_counter)
+            recorded.update(pending)
+    
+    def _write_pages(self, page_nums, get_data) -> int:
+        """将页面写入文件。
+        
+        启用了校验和的文件在写入前为每页生成页尾校验和；
+        压缩数据库中的页面压缩后按页面映射写入。
+        
+        Args:
+            page_nums: 要写入的页号
+            get_data: 根据页号返回页面数据的函数
+            
+        Returns:
+            int: 执行的写入次数
+        """
+        self.write_generation += 1
+        if self.header.checksums:
+            unstamped = get_data
+            get_data = lambda page_num: stamp_checksum(unstamped(page_num))
+        if not self.page_map.enabled:
+            return super()._write_pages(page_nums, get_data)
+        
+        page_nums = list(page_nums)
+        writes = self.page_map.write_pages(
+            [page_num for page_num in page_nums if page_num != HEADER_PAGE_NUM], get_data)
+        if HEADER_PAGE_NUM in page_nums:
+            # 写出数据页时可能新增了映射块，文件头按最新的目录重新序列化
+            self.header.page_count = self.num_pages
+            header_data = self.header.pack()
+            self._header_dirty = False
+            frame = self.buffer_pool.frames.get(HEADER_PAGE_NUM)
+            if frame is not None:
+                frame.data[:] = header_data
+            if self.header.checksums:
+                header_data = stamp_checksum(header_data)
+            writes += super()._write_pages([HEADER_PAGE_NUM], lambda _: header_data)
+        return writes
     
     def flush(self):
-        """将所有更改刷新到磁盘。"""
+        """将所有脏页刷新到磁盘。
+        
+        只写脏页：脏页按页号排序，页号连续的脏页合并为一次向量写入，
+        干净页面不产生任何I/O。
+        """
         if self.is_memory_db:
+            self.file_lock.downgrade(self._resting_lock_state())
             return
-            
-        self.file_lock.acquire_exclusive()
-        try:
-            # 调用父类方法刷新所有页面
-            super().flush_all_pages()
-        finally:
-            self.file_lock.release()
+        
+        with self.buffer_pool.lock:
+            if self._header_dirty or self.header.page_count != self.num_pages \
+                    or self.buffer_pool.dirty_pages():
+                self._bump_change_counter()
+            self._sync_header()
+            frames = self.buffer_pool.frames
+            dirty_pages = self.buffer_pool.dirty_pages()
+            if dirty_pages:
+                self.file_lock.acquire(LockState.EXCLUSIVE)
+                self._write_pages(dirty_pages, lambda page_num: frames[page_num].data)
+                for page_num in dirty_pages:
+                    frames[page_num].dirty = False
+                self.io_stats.flushes += 1
+            self.file_lock.downgrade(self._resting_lock_state())
+    
+    def overwrite_from(self, path: str) -> None:
+        """用另一个数据库文件的内容原地改写本文件（VACUUM写回整理结果）。
+        
+        调用方需持有EXCLUSIVE锁且没有未提交的修改。内容按块写回后截断多余的尾部并fsync；
+        文件的inode不变，其他连接已打开的文件描述符继续指向同一个文件。新内容中的
+        变更计数器必须大于当前值，本连接在这里、其他连接在下次加锁时都按此丢弃过期的缓存。
+        
+        Args:
+            path: 新内容所在的数据库文件
+        """
+        fd = self.file_descriptor.fileno()
+        offset = 0
+        with open(path, 'rb') as source:
+            while True:
+                chunk = source.read(VACUUM_COPY_BYTES)
+                if not chunk:
+                    break
+                started = time.perf_counter()
+                os.pwrite(fd, chunk, offset)
+                self.io_stats.record_write(len(chunk), time.perf_counter() - started)
+                offset += len(chunk)
+        self.truncate(offset)
+        started = time.perf_counter()
+        os.fsync(fd)
+        self.io_stats.record_fsync(time.perf_counter() - started)
+        self.write_generation += 1
+        self._validate_cache()
+    
+    def sync(self) -> None:
+        """刷新脏页并调用fsync，确保已提交的数据到达持久存储。"""
+        self.flush()
+        if self.file_descriptor is None:
+            return
+        started = time.perf_counter()
+        os.fsync(self.file_descriptor.fileno())
+        self.io_stats.record_fsync(time.perf_counter() - started)
+    
+    def get_io_stats(self) -> dict:
+        """获取I/O统计信息。
+        
+        Returns:
+            计数器和延迟直方图快照（见IOStats.snapshot），命中/未命中取自缓冲池
+        """
+        stats = self.io_stats.snapshot()
+        pool_stats = self.buffer_pool.get_stats()
+        stats['cache_hits'] = pool_stats['hits']
+        stats['cache_misses'] = pool_stats['misses']
+        stats['cache_policy'] = pool_stats['policy']
+        if self.background_writer is not None:
+            stats['background_writer'] = self.background_writer.get_stats()
+        if self.page_map.enabled:
+            stats['compression'] = self.page_map.get_stats()
+        if self.read_ahead is not None:
+            stats['read_ahead'] = self.read_ahead.get_stats()
+        if self.cache_warmer is not None:
+            stats['warmup'] = self.cache_warmer.get_stats()
+        return stats
+    
+    def reset_io_stats(self) -> None:
+        """将I/O统计信息和缓冲池命中统计清零。"""
+        self.io_stats.reset()
+        self.buffer_pool.reset_stats()
     
     def close(self):
         """关闭文件。"""
-        self.file_lock.acquire_exclusive()
-        try:
-            # 调用父类方法关闭
-            super().close()
-            
+        if self.is_memory_db:
             # 清除内存数据库的缓存
-            if self.is_memory_db:
-                with self.cache_lock:
-                    self.page_cache.clear()
-        finally:
-            self.file_lock.release()
-            
+            self.buffer_pool.clear()
+            return
+        
+        if self.file_descriptor is None:
+            return
+        
+        if self.background_writer is not None:
+            self.background_writer.stop()
+        if self.read_ahead is not None:
+            self.read_ahead.stop()
+        if self.cache_warmer is not None:
+            self.cache_warmer.stop()
+        self.flush()
+        if self.warm_cache:
+            try:
+                self.save_hot_pages()
+            except StorageError:
+                pass  # 列表只是优化提示，不影响关闭
+        self.file_descriptor.close()
+        self.file_descriptor = None
+        self.buffer_pool.clear()
+        self._read_transaction = False
+        self.file_lock.close()
+    
+
     def create_backup(self, backup_path: str):
         """创建数据库文件的备份。
         
         Args:
             backup_path: 备份文件路径
         """
-        self.file_lock.acquire_shared()
-        try:
-            if self.file_descriptor is not None:
-                self.file_descriptor.flush()
-                import shutil
-                shutil.copy2(self.filename, backup_path)
-        finally:
-            self.file_lock.release()
-            
+        if self.file_descriptor is None:
+            return
+        
+        with self.file_lock.holding(LockState.SHARED):
+            import shutil
+            shutil.copy2(self.filename, backup_path)
+    
+
     def get_file_size(self) -> int:
         """获取文件大小。
         
         Returns:
             文件大小（字节）
         """
-        self.file_lock.acquire_shared()
-        try:
-            if self.file_descriptor is not None:
-                self.file_descriptor.seek(0, 2)
-                return self.file_descriptor.tell()
-            else:
-                return 0
-        finally:
-            self.file_lock.release()
+        if self.file_descriptor is None:
+            return 0
+        return os.fstat(self.file_descriptor.fileno()).st_size
     
     def truncate(self, new_size: int):
         """截断文件到指定大小。
@@ -373,17 +1294,16 @@ class ConcurrentPager(Pager):
         Args:
             new_size: 新的文件大小
         """
-        self.file_lock.acquire_exclusive()
-        try:
-            if self.file_descriptor is not None:
-                self.file_descriptor.truncate(new_size)
-                # 清除被截断页面的缓存
-                with self.cache_lock:
-                    pages_to_remove = [
-                        page_num for page_num in self.page_cache
-                        if page_num * self.page_size >= new_size
-                    ]
-                    for page_num in pages_to_remove:
-                        del self.page_cache[page_num]
-        finally:
-            self.file_lock.release()
\ No newline at end of file
+        if self.file_descriptor is None:
+            return
+        
+        with self.file_lock.holding(LockState.EXCLUSIVE):
+            self.file_descriptor.truncate(new_size)
+            # 清除被截断页面的缓存
+            with self.buffer_pool.lock:
+                pages_to_remove = [
+                    page_num for page_num in self.buffer_pool.frames
+                    if page_num * self.page_size >= new_size
+                ]
+                for page_num in pages_to_remove:
+                    self.buffer_pool.discard(page_num)
\ No newline at end of file
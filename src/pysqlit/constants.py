@@ -18,8 +18,79 @@ USERNAME_OFFSET = ID_OFFSET + ID_SIZE  # 用户名字段偏移量
 EMAIL_OFFSET = USERNAME_OFFSET + USERNAME_SIZE  # 邮箱字段偏移量
 ROW_SIZE = ID_SIZE + USERNAME_SIZE + EMAIL_SIZE  # 单行总大小（291字节）
 
-# 页面大小（4KB）
+# 页面大小（4KB，新建数据库的默认值）
 PAGE_SIZE = 4096
+MIN_PAGE_SIZE = 1024  # 可配置的最小页面大小（1KB）
+MAX_PAGE_SIZE = 65536  # 可配置的最大页面大小（64KB）
+
+# 缓冲池
+DEFAULT_CACHE_SIZE = 2000  # 默认缓冲池容量（页数，约8MB）
+
+# 缓冲池页面替换策略
+REPLACEMENT_LRU = 'lru'  # 最近最少使用
+REPLACEMENT_2Q = '2q'  # 2Q：首次访问的页面先进入试用队列，抗扫描
+REPLACEMENT_ARC = 'arc'  # 自适应替换缓存，抗扫描
+TWOQ_KIN_RATIO = 0.25  # 2Q试用队列A1in占缓冲池容量的比例
+TWOQ_KOUT_RATIO = 0.5  # 2Q幽灵队列A1out记住的页号数占缓冲池容量的比例
+
+# 数据库文件头（第0页）
+HEADER_MAGIC = b"PySQLit format\x00\x00"  # 文件头魔数（16字节）
+FORMAT_VERSION = 9  # 文件格式版本
+HEADER_PAGE_NUM = 0  # 文件头所在页号
+ALLOCATION_EXTENT_PAGES = 16  # 文件增长时一次预分配的最少页数（64KB）
+ALLOCATION_GROWTH_RATIO = 0.25  # 文件增长时的区段至少为当前文件大小的该比例
+ALLOCATION_EXTENT_MAX_BYTES = 64 * 1024 * 1024  # 按比例增长时单个区段的上限（64MB）
+CATALOG_NAME_MAX_BYTES = 64  # 系统目录中表名/索引名的最大字节数
+
+# 文件锁
+LOCK_TIMEOUT = 5.0  # 等待其他连接释放文件锁的默认超时时间（秒）
+
+# 内存映射
+MMAP_GROWTH_PAGES = 256  # 内存映射模式下文件增长与重新映射的步长（页数，1MB）
+
+# 数据库整理
+AUTO_VACUUM_MAX_PAGES = 64  # auto_vacuum模式下每次提交后最多回收的页数
+VACUUM_COPY_BYTES = 1024 * 1024  # VACUUM把整理结果写回原文件时每次写入的字节数
+
+# 内存数据库
+MEMORY_SEGMENT_PAGES = 256  # 内存数据库页面区每次增长的页数（一个段）
+MEMORY_SHARED_PREFIX = 'pysqlit_'  # 共享内存数据库的共享内存段名称前缀
+
+# 后台写线程
+BGWRITER_INTERVAL = 0.05  # 后台写线程的唤醒间隔（秒）
+BGWRITER_PAGES_PER_SECOND = 2000  # 后台写线程每秒最多写回的页数
+BGWRITER_DIRTY_RATIO = 0.1  # 脏页占缓冲池容量的比例达到该值时才开始写回
+
+# 顺序预读
+READAHEAD_PAGES = 32  # 一次预读的最大页数（128KB）
+READAHEAD_MIN_PAGES = 4  # 判定为顺序访问后的初始预读窗口（页数）
+READAHEAD_TRIGGER = 2  # 页号首尾相接的未命中达到该次数后开始预读
+
+# 缓存预热
+WARMUP_SUFFIX = '.warm'  # 热点页列表文件的后缀（位于数据库文件旁）
+WARMUP_MAGIC = b'PySQLitW'  # 热点页列表文件的魔数（8字节）
+WARMUP_READ_PAGES = 32  # 预热时一次合并读取的最大页数
+
+# 旧版数据库格式（引入文件头之前：没有第0页文件头，模式保存在数据库文件旁的JSON文件中）
+LEGACY_PAGE_SIZE = 4096  # 旧版格式固定的页面大小
+LEGACY_SCHEMA_SUFFIX = '.schema'  # 旧版模式文件的后缀（位于数据库文件旁）
+LEGACY_BACKUP_SUFFIX = '.legacy'  # 转换时为保留的原文件添加的后缀
+
+# 页面压缩
+COMPRESSION_NONE = 0  # 不压缩
+COMPRESSION_ZLIB = 1  # zlib压缩
+COMPRESSION_LZMA = 2  # lzma压缩（压缩率更高，速度较慢）
+COMPRESSION_SECTOR_SIZE = 512  # 压缩页面在文件中的分配单位（字节）
+
+# 页面校验和
+PAGE_CHECKSUM_SIZE = 4  # 页尾CRC32校验和的大小（字节），启用后每页末尾保留
+CHECKSUM_VERIFY_ALWAYS = 'always'  # 每次从文件读取页面时校验
+CHECKSUM_VERIFY_SAMPLED = 'sampled'  # 按间隔抽样校验
+CHECKSUM_VERIFY_OFF = 'off'  # 不校验（写入时仍然生成校验和）
+CHECKSUM_SAMPLE_INTERVAL = 16  # 抽样模式下每隔多少次读取校验一次
+
+# I/O统计
+IO_HISTOGRAM_BUCKETS = 24  # 延迟直方图的桶数，第i个桶统计不超过2**i微秒的操作（最后一个桶不设上限）
 
 # 通用节点头部结构
 NODE_TYPE_SIZE = 1  # 节点类型大小（1字节）
@@ -30,19 +101,37 @@ COMMON_NODE_HEADER_SIZE = NODE_TYPE_SIZE + IS_ROOT_SIZE + PARENT_POINTER_SIZE  #
 # 叶子节点头部结构
 LEAF_NODE_NUM_CELLS_SIZE = 4  # 单元格数量大小（4字节）
 LEAF_NODE_NEXT_LEAF_SIZE = 4  # 下一个叶子节点指针大小（4字节）
-LEAF_NODE_HEADER_SIZE = COMMON_NODE_HEADER_SIZE + LEAF_NODE_NUM_CELLS_SIZE + LEAF_NODE_NEXT_LEAF_SIZE  # 叶子节点头部总大小（14字节）
+LEAF_NODE_CONTENT_START_SIZE = 4  # 单元格内容区起始偏移大小（4字节，0表示内容区为空）
+LEAF_NODE_FRAGMENTED_SIZE = 4  # 内容区中已删除单元格留下的碎片字节数大小（4字节）
+LEAF_NODE_HEADER_SIZE = (COMMON_NODE_HEADER_SIZE + LEAF_NODE_NUM_CELLS_SIZE + LEAF_NODE_NEXT_LEAF_SIZE
+                         + LEAF_NODE_CONTENT_START_SIZE + LEAF_NODE_FRAGMENTED_SIZE)  # 叶子节点头部总大小（22字节）
+
+# 叶子节点槽页结构：头部之后是单元格指针数组，单元格内容从页尾向前存放
+LEAF_NODE_CELL_POINTER_SIZE = 2  # 单元格指针大小（2字节，页内偏移）
+LEAF_NODE_CELL_HEADER_SIZE = 8  # 单元格头部大小：键(4) + 值长度(4)
+LEAF_NODE_MAX_LOCAL_FRACTION = 4  # 单元格内联存储的值不超过叶子容量的1/4，更大的值溢出到溢出页链
+LEAF_NODE_MIN_LOCAL_FRACTION = 16  # 值溢出时单元格保留约为叶子容量1/16的内联前缀
+LEAF_NODE_OVERFLOW_POINTER_SIZE = 4  # 溢出单元格中第一个溢出页页号的大小（4字节）
+
+# 溢出页结构：页面类型(1) + 保留(1) + 下一个溢出页页号(4) + 数据
+OVERFLOW_PAGE_HEADER_SIZE = 6  # 溢出页头部大小（6字节）
 
 # 叶子节点单元格结构
 LEAF_NODE_KEY_SIZE = 4  # 键大小（4字节）
 LEAF_NODE_VALUE_SIZE = ROW_SIZE  # 值大小（等于行大小）
 LEAF_NODE_CELL_SIZE = LEAF_NODE_KEY_SIZE + LEAF_NODE_VALUE_SIZE  # 单元格总大小（295字节）
-LEAF_NODE_SPACE_FOR_CELLS = PAGE_SIZE - LEAF_NODE_HEADER_SIZE  # 可用于存储单元格的空间（4082字节）
-LEAF_NODE_MAX_CELLS = LEAF_NODE_SPACE_FOR_CELLS // LEAF_NODE_CELL_SIZE  # 最大单元格数量（13个）
+LEAF_NODE_SPACE_FOR_CELLS = PAGE_SIZE - LEAF_NODE_HEADER_SIZE  # 默认页面大小下可用于存储单元格的空间（4074字节）
+LEAF_NODE_MAX_CELLS = LEAF_NODE_SPACE_FOR_CELLS // LEAF_NODE_CELL_SIZE  # 默认页面和行大小下的最大单元格数量（13个，实际容量由B树按页面大小计算）
 
 # 叶子节点分裂
 LEAF_NODE_RIGHT_SPLIT_COUNT = (LEAF_NODE_MAX_CELLS + 1) // 2  # 右分裂数量（7个）
 LEAF_NODE_LEFT_SPLIT_COUNT = (LEAF_NODE_MAX_CELLS + 1) - LEAF_NODE_RIGHT_SPLIT_COUNT  # 左分裂数量（7个）
 
+# 节点合并与借用
+# 删除后占用低于该比例的节点与兄弟节点合并或从兄弟节点借用；单元格不超过叶子容量的1/4，
+# 借用后的两个叶子都至少占用3/8，因此默认值取略低于3/8，避免每次删除都重新分配
+BTREE_MIN_FILL_FACTOR = 0.35
+
 # 内部节点头部结构
 INTERNAL_NODE_NUM_KEYS_SIZE = 4  # 键数量大小（4字节）
 INTERNAL_NODE_RIGHT_CHILD_SIZE = 4  # 右子节点指针大小（4字节）
@@ -52,16 +141,18 @@ INTERNAL_NODE_HEADER_SIZE = COMMON_NODE_HEADER_SIZE + INTERNAL_NODE_NUM_KEYS_SIZ
 INTERNAL_NODE_KEY_SIZE = 4  # 键大小（4字节）
 INTERNAL_NODE_CHILD_SIZE = 4  # 子节点指针大小（4字节）
 INTERNAL_NODE_CELL_SIZE = INTERNAL_NODE_KEY_SIZE + INTERNAL_NODE_CHILD_SIZE  # 单元格总大小（8字节）
-INTERNAL_NODE_MAX_KEYS = 3  # 最大键数量（简化实现）
+INTERNAL_NODE_SPACE_FOR_CELLS = PAGE_SIZE - INTERNAL_NODE_HEADER_SIZE  # 默认页面大小下可用于存储单元格的空间（4082字节）
+INTERNAL_NODE_MAX_KEYS = INTERNAL_NODE_SPACE_FOR_CELLS // INTERNAL_NODE_CELL_SIZE  # 默认页面大小下的最大键数量（510个，实际容量由B树按页面大小计算）
 
 # 表结构
-TABLE_MAX_PAGES = 100  # 表最大页数
+TABLE_MAX_PAGES = 100  # 旧版固定页数上限（分页管理器已改为动态分配，仅为兼容保留）
 ROWS_PER_PAGE = PAGE_SIZE // ROW_SIZE  # 每页行数（14行）
 TABLE_MAX_ROWS = TABLE_MAX_PAGES * ROWS_PER_PAGE  # 表最大行数（1400行）
 
 # 节点类型
 NODE_INTERNAL = 1  # 内部节点类型
 NODE_LEAF = 0  # 叶子节点类型
+NODE_OVERFLOW = 2  # 溢出页类型
 
 # 页号定义
 INVALID_PAGE_NUM = 0  # 无效页号
@@ -69,6 +160,8 @@ INVALID_PAGE_NUM = 0  # 无效页号
 # 偏移量定义
 LEAF_NODE_NUM_CELLS_OFFSET = COMMON_NODE_HEADER_SIZE  # 叶子节点单元格数量偏移量
 LEAF_NODE_NEXT_LEAF_OFFSET = LEAF_NODE_NUM_CELLS_OFFSET + LEAF_NODE_NUM_CELLS_SIZE  # 下一个叶子节点偏移量
+LEAF_NODE_CONTENT_START_OFFSET = LEAF_NODE_NEXT_LEAF_OFFSET + LEAF_NODE_NEXT_LEAF_SIZE  # 单元格内容区起始偏移的偏移量
+LEAF_NODE_FRAGMENTED_OFFSET = LEAF_NODE_CONTENT_START_OFFSET + LEAF_NODE_CONTENT_START_SIZE  # 碎片字节数偏移量
 
 INTERNAL_NODE_NUM_KEYS_OFFSET = COMMON_NODE_HEADER_SIZE  # 内部节点键数量偏移量
 INTERNAL_NODE_RIGHT_CHILD_OFFSET = INTERNAL_NODE_NUM_KEYS_OFFSET + INTERNAL_NODE_NUM_KEYS_SIZE  # 右子节点偏移量
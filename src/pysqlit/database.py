@@ -13,17 +13,23 @@ import os
 import threading
 from typing import List, Optional, Dict, Any, Tuple
 from .concurrent_storage import ConcurrentPager
+from .mmap_storage import MmapPager
+from .memory_storage import MemoryPager
+from .catalog import SchemaStore, SystemCatalog
 from .btree import EnhancedBTree, EnhancedLeafNode
 from .parser import (
     EnhancedSQLParser, InsertStatement, SelectStatement, 
     UpdateStatement, DeleteStatement, WhereCondition,
-    CreateTableStatement, DropTableStatement
+    CreateTableStatement, DropTableStatement, VacuumStatement
 )
 from .ddl import DDLManager, TableSchema
 from .transaction import TransactionManager, IsolationLevel
 from .backup import BackupManager, RecoveryManager
+from .vacuum import VacuumManager
 from .models import Row, DataType, ColumnDefinition, TransactionLog, PrepareResult
-from .constants import EXECUTE_SUCCESS, EXECUTE_DUPLICATE_KEY
+from .constants import (EXECUTE_SUCCESS, EXECUTE_DUPLICATE_KEY, DEFAULT_CACHE_SIZE, AUTO_VACUUM_MAX_PAGES,
+                        CHECKSUM_VERIFY_ALWAYS, READAHEAD_PAGES, ALLOCATION_GROWTH_RATIO,
+                        REPLACEMENT_LRU, BTREE_MIN_FILL_FACTOR)
 from .exceptions import DatabaseError, TransactionError
 
 
@@ -47,7 +53,61 @@ class EnhancedTable:
         self.table_name = table_name
         self.schema = schema
         self.database = database  # 保存数据库引用用于外键验证和事务日志
-        self.btree = EnhancedBTree(pager, row_size=schema.get_row_size())
+        self.catalog = database.catalog if database is not None else SystemCatalog(pager)
+        self._btree: Optional[EnhancedBTree] = None
+    
+    @property
+    def btree(self) -> EnhancedBTree:
+        """表的B树，第一次访问时才通过系统目录打开。"""
+        self.ensure_storage()
+        return self._btree
+    
+    def ensure_storage(self) -> None:
+        """确保表的B树已打开；新表会立即分配根页并登记到系统目录。"""
+        if self._btree is None:
+            self._btree = self._open_btree()
+    
+    def _open_btree(self) -> EnhancedBTree:
+        """打开表的B树。
+        
+        已有表从系统目录中读取根页号；新表在新分配的页面上创建
+        根节点，并登记到系统目录。根页号在树长高时保持不变。
+        
+        Returns:
+            表的B树
+        """
+        row_size = self.schema.get_row_size()
+        fill_factor = self.database.fill_factor if self.database is not None else BTREE_MIN_FILL_FACTOR
+        entry = self.catalog.get_table(self.table_name)
+        if entry is not None:
+            return EnhancedBTree(self.pager, row_size=row_size, root_page_num=entry.root_page,
+                                 fill_factor=fill_factor)
+        
+        btree = EnhancedBTree.create(self.pager, row_size=row_size, fill_factor=fill_factor)
+        self.catalog.add_table(self.table_name, btree.root_page_num)
+        return btree
+    
+    def _next_sequence(self) -> int:
+        """获取下一个自增值。
+        
+        序列计数器保存在系统目录中，无需扫描表数据。
+        
+        Returns:
+            下一个可用的自增值
+        """
+        entry = self.catalog.get_table(self.table_name)
+        return (entry.sequence if entry is not None else 0) + 1
+    
+    def _record_insert(self, key: Any) -> None:
+        """插入后推进系统目录中的序列计数器。
+        
+        Args:
+            key: 插入行的主键值
+        """
+        entry = self.catalog.get_table(self.table_name)
+        if entry is not None and isinstance(key, int) and key > entry.sequence:
+            entry.sequence = key
+            self.catalog.update(entry)
     
     def insert_row(self, row: Row) -> int:
         """向表中插入一行数据。
@@ -72,36 +132,15 @@ class EnhancedTable:
                                 primary_col.is_primary and
                                 primary_col.data_type == DataType.INTEGER)
             
-            # 处理自增主键 - 始终基于实际最大ID生成下一个ID
+            # 处理自增主键 - 基于文件头中的序列计数器生成下一个ID
             if is_integer_primary and primary_col and primary_col.is_autoincrement:
-                # 始终基于实际最大ID生成下一个自增值
-                all_data = self.btree.select_all()
-                max_id = 0
-                for key, value in all_data:
-                    try:
-                        # key是主键值
-                        if isinstance(key, int) and key > max_id:
-                            max_id = key
-                    except (ValueError, TypeError):
-                        continue
-                
-                next_id = max_id + 1
-                row_data[primary_key] = next_id
+                row_data[primary_key] = self._next_sequence()
                 row = Row(**row_data)
             # 对于非自增INTEGER主键，仅在未提供时自动生成值
             elif primary_key not in row_data or row_data[primary_key] is None:
                 if is_integer_primary:
                     # 自动生成主键值
-                    max_id = 0
-                    # 扫描现有键以找到最大ID
-                    for key, _ in self.btree.scan():
-                        try:
-                            if isinstance(key, int) and key > max_id:
-                                max_id = key
-                        except (ValueError, TypeError):
-                            continue
-                    next_id = max_id + 1
-                    row_data[primary_key] = next_id
+                    row_data[primary_key] = self._next_sequence()
                     row = Row(**row_data)
                 else:
                     raise DatabaseError(f"主键 '{primary_key}' 必须提供")
@@ -115,7 +154,7 @@ class EnhancedTable:
             try:
                 page_num, cell_num = self.btree.find(primary_key_value)
                 leaf = EnhancedLeafNode(self.btree.pager, page_num)
-                if cell_num < leaf.num_cells() and leaf.key(cell_num, self.schema.get_row_size()) == primary_key_value:
+                if cell_num < leaf.num_cells() and leaf.key(cell_num) == primary_key_value:
                     raise DatabaseError(f"重复的主键值: {primary_key_value}")
             except Exception:
                 # 键未找到，这是新插入的预期情况
@@ -244,6 +283,7 @@ class EnhancedTable:
             actual_primary_key = row_data[primary_key]
             serialized = row.serialize(self.schema)
             self.btree.insert(actual_primary_key, serialized)
+            self._record_insert(actual_primary_key)
             
             # 记录事务日志
             if self.database and self.database.transaction_log:
@@ -258,8 +298,8 @@ class EnhancedTable:
                     # 日志记录失败不应该影响主要操作
                     print(f"警告: 事务日志记录失败: {log_error}")
             
-            # 确保数据刷新到磁盘
-            self.pager.flush()
+            # 事务外立即刷新，事务内的修改在提交时统一刷新
+            self._flush_unless_in_transaction()
             
             return EXECUTE_SUCCESS
         except Exception as e:
@@ -269,6 +309,20 @@ class EnhancedTable:
             else:
                 raise DatabaseError(f"插入失败: {e}")
     
+    def _read_all(self) -> List[Tuple[int, bytes]]:
+        """读取表中所有键值对。
+        
+        不在事务中时读取完成后立即释放共享锁，事务中的锁保持到提交或回滚。
+        
+        Returns:
+            按键排序的键值对列表
+        """
+        try:
+            return self.btree.select_all()
+        finally:
+            if self.database is None or not self.database.in_transaction:
+                self.pager.end_read()
+    
     def select_all(self) -> List[Row]:
         """从表中选择所有行。
         
@@ -276,7 +330,7 @@ class EnhancedTable:
             所有数据行的列表
         """
         results = []
-        data = self.btree.select_all()
+        data = self._read_all()
         
         for key, value in data:
             row = Row.deserialize(value, self.schema)
@@ -294,7 +348,7 @@ class EnhancedTable:
             满足条件的行列表
         """
         results = []
-        data = self.btree.select_all()
+        data = self._read_all()
         
         for key, value in data:
             row = Row.deserialize(value, self.schema)
@@ -330,10 +384,6 @@ class EnhancedTable:
                 if row is None:
                     continue
                 
-                # 确保行有所有必需的列
-                if not hasattr(row, 'data') or row.data is None:
-                    row.data = {}
-                
                 if condition is None or condition.evaluate(row):
                     # 保存更新前的数据用于日志记录
                     old_data = row.to_dict().copy()
@@ -365,8 +415,8 @@ class EnhancedTable:
                 print(f"警告: 更新期间跳过行: {e}")
                 continue
         
-        # 确保数据刷新到磁盘
-        self.pager.flush()
+        # 事务外立即刷新，事务内的修改在提交时统一刷新
+        self._flush_unless_in_transaction()
         
         return updated_count
     
@@ -395,10 +445,6 @@ class EnhancedTable:
                     if row is None:
                         continue
                     
-                    # 确保行有所有必需的列
-                    if not hasattr(row, 'data') or row.data is None:
-                        row.data = {}
-                    
                     # 仅在有效行上评估条件
                     if condition is None or condition.evaluate(row):
                         rows_to_delete.append((key, row))
@@ -406,21 +452,19 @@ class EnhancedTable:
                     # 跳过无效行但不计为已删除
                     continue
             
+            if condition is None and len(rows_to_delete) == len(all_data):
+                # 删除所有行：清空B树，除根页外的页面全部放回空闲页链表
+                for key, row in rows_to_delete:
+                    self._log_delete(row)
+                self.btree.clear()
+                deleted_count = len(rows_to_delete)
+                rows_to_delete = []
+            
             # 在单次遍历中删除行并进行验证
             for key, row in rows_to_delete:
                 try:
                     # 删除前记录日志
-                    if self.database and self.database.transaction_log:
-                        try:
-                            self.database.transaction_log.write_record(
-                                transaction_id=0,  # 使用默认事务ID，实际应该从当前事务获取
-                                operation="DELETE",
-                                table_name=self.table_name,
-                                row_data=row.to_dict()
-                            )
-                        except Exception as log_error:
-                            # 日志记录失败不应该影响主要操作
-                            print(f"警告: 事务日志记录失败: {log_error}")
+                    self._log_delete(row)
                     
                     # 删除前再次检查键是否存在
                     if self.btree.delete(key):
@@ -431,8 +475,8 @@ class EnhancedTable:
                     print(f"删除键 {key} 时出错: {e}")
                     continue
             
-            # 确保数据刷新到磁盘
-            self.pager.flush()
+            # 事务外立即刷新，事务内的修改在提交时统一刷新
+            self._flush_unless_in_transaction()
             
         except Exception as e:
             print(f"删除操作期间出错: {e}")
@@ -440,17 +484,44 @@ class EnhancedTable:
         
         return deleted_count
     
+    def _log_delete(self, row: Row) -> None:
+        """将删除的行写入事务日志。
+        
+        Args:
+            row: 被删除的行
+        """
+        if self.database and self.database.transaction_log:
+            try:
+                self.database.transaction_log.write_record(
+                    transaction_id=0,  # 使用默认事务ID，实际应该从当前事务获取
+                    operation="DELETE",
+                    table_name=self.table_name,
+                    row_data=row.to_dict()
+                )
+            except Exception as log_error:
+                # 日志记录失败不应该影响主要操作
+                print(f"警告: 事务日志记录失败: {log_error}")
+    
     def get_row_count(self) -> int:
         """获取表中的行数。
         
         Returns:
             行数
         """
-        return len(self.btree.select_all())
+        return len(self._read_all())
     
     def flush(self) -> None:
         """将更改刷新到磁盘。"""
         self.pager.flush()
+    
+    def _flush_unless_in_transaction(self) -> None:
+        """不在事务中时将更改刷新到磁盘。
+        
+        事务中产生的脏页保留在缓冲池中，由提交时的一次刷新统一写回，
+        避免每行一次刷新。
+        """
+        if self.database is None or not self.database.in_transaction:
+            self.pager.flush()
 
 
 class EnhancedDatabase:
@@ -464,17 +535,81 @@ class EnhancedDatabase:
     - 备份和恢复功能
     """
     
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, cache_size: Optional[int] = DEFAULT_CACHE_SIZE,
+                 cache_bytes: Optional[int] = None, use_mmap: bool = False,
+                 auto_vacuum: bool = False, track_page_versions: bool = False,
+                 background_writer: bool = False, page_size: Optional[int] = None,
+                 compression: Optional[str] = None, checksums: bool = False,
+                 verify_checksums: str = CHECKSUM_VERIFY_ALWAYS,
+                 read_ahead: int = READAHEAD_PAGES, read_ahead_background: bool = False,
+                 shared_memory: Optional[str] = None, extent_size: Optional[int] = None,
+                 extent_growth: float = ALLOCATION_GROWTH_RATIO,
+                 replacement_policy: str = REPLACEMENT_LRU, warm_cache: bool = False,
+                 fill_factor: float = BTREE_MIN_FILL_FACTOR):
         """初始化增强型数据库。
         
         Args:
             filename: 数据库文件名，":memory:"表示内存数据库
+            cache_size: 缓冲池容量（页数），None表示不限制
+            cache_bytes: 缓冲池容量（字节），优先于cache_size
+            use_mmap: 是否使用内存映射分页管理器（适合读密集型负载，内存数据库忽略此选项）
+            auto_vacuum: 是否在每次提交后增量整理，回收文件末尾的空闲页
+            track_page_versions: 是否在文件中启用页面版本表，其他连接提交后
+                只丢弃被修改过的缓存页面而不是整个缓存（内存数据库忽略此选项）
+            background_writer: 是否启动后台写线程，在提交之前按页号顺序把脏页
+                写回磁盘，缩短提交时的同步写入（内存数据库忽略此选项）
+            page_size: 新建数据库的页面大小（1KB到64KB之间的2的幂），默认4KB；
+                大页面适合扫描为主的分析型表，小页面适合点查询；
+                已有数据库始终使用创建时记录在文件中的页面大小
+            compression: 新建数据库的页面压缩算法（'zlib'或'lzma'），页面在写回时压缩、
+                缓存未命中时解压，适合以冷数据为主的历史表；已有数据库始终使用
+                创建时选定的算法（内存数据库忽略此选项，不能与use_mmap同时使用）
+            checksums: 新建数据库是否在每页末尾保留CRC32校验和，用于发现写撕裂和
+                文件损坏；已有数据库始终沿用创建时的设置（内存数据库忽略此选项）
+            verify_checksums: 页面从文件读入缓存时的校验模式：'always'每次校验，
+                'sampled'抽样校验，'off'不校验
+            read_ahead: 顺序访问（如全表扫描）时一次预读的最大页数，0表示不预读；
+                页号连续的缓存未命中合并为一次大块读取
+            read_ahead_background: 是否由工作线程读取预读窗口，使扫描与读取重叠
+            shared_memory: 内存数据库的共享名称，其他进程以同一名称打开即可共享该数据库；
+                None表示进程私有的内存数据库（文件数据库忽略此选项）
+            extent_size: 文件增长时一次扩展的最少字节数（如1MB），批量加载时减少扩展文件
+                的次数；默认64KB（内存映射模式1MB）
+            extent_growth: 扩展区段至少为当前文件大小的该比例，0表示固定大小的区段
+            replacement_policy: 缓冲池的页面替换策略：'lru'、'2q'或'arc'；点查询与周期性
+                全表扫描（select_all、计数、导出）混合的负载应选择抗扫描的'2q'或'arc'
+                （内存数据库不淘汰页面，忽略此选项）
+            warm_cache: 是否在关闭和检查点时把缓冲池中的热点页号保存到数据库文件旁的
+                "<数据库文件>.warm"，并在打开时由后台线程按页号顺序把这些页面读回缓冲池，
+                缩短重启后的冷缓存阶段（内存数据库和压缩数据库忽略此选项）
+            fill_factor: 表B树节点的最低填充率（0到0.5之间），删除后占用低于该比例的
+                节点与兄弟节点合并或借用，合并释放的页面进入空闲页链表；
+                较高的值让大量删除后的扫描经过更少的页面，较低的值减少删除时的节点调整
         """
         # 为内存数据库保留":memory:"标识符
         self.filename = filename if filename == ":memory:" else os.path.abspath(filename)
-        self.pager = ConcurrentPager(self.filename)
+        self._pager_class = MmapPager if use_mmap and filename != ":memory:" else ConcurrentPager
+        self.auto_vacuum = auto_vacuum
+        self.fill_factor = fill_factor
+        if filename == ":memory:":
+            # 内存数据库使用专用的页面管理器：没有文件和锁，页帧位于页面区中
+            self.pager = MemoryPager(shared_name=shared_memory, page_size=page_size)
+        else:
+            self.pager = self._pager_class(self.filename, cache_size=cache_size,
+                                           cache_bytes=cache_bytes,
+                                           track_page_versions=track_page_versions,
+                                           background_writer=background_writer, page_size=page_size,
+                                           compression=compression, checksums=checksums,
+                                           verify_checksums=verify_checksums, read_ahead=read_ahead,
+                                           read_ahead_background=read_ahead_background,
+                                           extent_size=extent_size, extent_growth=extent_growth,
+                                           replacement_policy=replacement_policy,
+                                           warm_cache=warm_cache)
+        self.catalog = SystemCatalog(self.pager)  # 表名 -> 根页号，首次查询时加载
+        self.schema_store = SchemaStore(self.pager)  # 模式保存在数据库文件内部
         self.transaction_manager = TransactionManager(self.pager)  # TransactionManager需要Pager类型的参数
         self.ddl_manager = DDLManager(self)
+        self.vacuum_manager = VacuumManager(self)
         self.backup_manager = BackupManager(self.filename)
         self.recovery_manager = RecoveryManager(self.filename)
         
@@ -500,76 +635,119 @@ class EnhancedDatabase:
         
         # 加载或创建默认模式
         self._load_schema()
+        self._schema_version = self.pager.header.schema_version  # 用于发现其他连接的模式变更
         self._initialize_default_schema()
+        self.pager.end_read()  # 打开数据库时的读取不保留锁
     
     def _load_schema(self):
-        """从磁盘加载模式。"""
-        import json
-        schema_file = f"{self.filename}.schema"
+        """从数据库文件内的模式页链加载模式。
         
-        if os.path.exists(schema_file):
-            try:
-                with open(schema_file, 'r') as f:
-                    schema_data = json.load(f)
-                
-                for table_name, schema_dict in schema_data.items():
-                    schema = TableSchema.from_dict(schema_dict)
-                    self.schemas[table_name] = schema
-                    self.tables[table_name] = EnhancedTable(self.pager, table_name, schema, self)
-                        
-            except Exception as e:
-                print(f"警告: 加载模式失败: {e}")
+        表的B树在第一次访问时才通过系统目录打开。
+        """
+        try:
+            schema_data = self.schema_store.load()
+            for table_name, schema_dict in schema_data.items():
+                schema = TableSchema.from_dict(schema_dict)
+                self.schemas[table_name] = schema
+                self.tables[table_name] = EnhancedTable(self.pager, table_name, schema, self)
+                    
+        except Exception as e:
+            print(f"警告: 加载模式失败: {e}")
     
     def _save_schema(self):
-        """将模式保存到磁盘。"""
-        import json
-        schema_file = f"{self.filename}.schema"
+        """将模式写入数据库文件内的模式页链。
         
+        模式页和文件头页只被标记为脏页，与数据页一起在提交时刷新。
+        """
         try:
             schema_data = {}
             for table_name, schema in self.schemas.items():
                 schema_data[table_name] = schema.to_dict()
             
-            with open(schema_file, 'w') as f:
-                json.dump(schema_data, f, indent=2)
+            self.schema_store.save(schema_data)
+            self._schema_version = self.pager.header.schema_version
+            if not self.in_transaction:
+                self.pager.flush()
                 
         except Exception as e:
             print(f"警告: 保存模式失败: {e}")
     
+    def refresh_schema(self) -> None:
+        """其他连接修改过模式时重新加载所有表模式。
+        
+        需要在持有共享锁之后调用，此时分页管理器已经读取了最新的文件头。
+        """
+        if self.pager.header.schema_version == self._schema_version:
+            return
+        self.tables.clear()
+        self.schemas.clear()
+        self._reopen_catalog()
+        self._load_schema()
+        self._schema_version = self.pager.header.schema_version
+    
     def _initialize_default_schema(self):
         """初始化默认表模式。"""
         # 不自动创建默认表
         pass
     
-    def begin_transaction(self, isolation_level: IsolationLevel = IsolationLevel.REPEATABLE_READ) -> int:
+    def begin_transaction(self, isolation_level: IsolationLevel = IsolationLevel.REPEATABLE_READ,
+                          write: bool = False) -> int:
         """开始新事务。
         
         Args:
             isolation_level: 事务隔离级别
+            write: 是否为写事务，写事务在读取之前获取RESERVED锁，
+                不会在第一次写入时因为其他写入者而失败
             
         Returns:
             事务ID
+            
+        Raises:
+            LockError: 如果在超时时间内无法获得锁
         """
+        if write:
+            self.pager.begin_write()  # RESERVED锁持有到提交或回滚
+        else:
+            self.pager.begin_read()  # 共享锁持有到提交或回滚
+        self.refresh_schema()
         self.in_transaction = True
         return self.transaction_manager.begin_transaction(isolation_level)
     
     def commit_transaction(self, transaction_id: int):
         """提交事务。
         
+        提交失败时丢弃事务的脏页并释放锁，连接回到事务之外的状态。
+        
         Args:
             transaction_id: 事务ID
+            
+        Raises:
+            TransactionError: 如果提交失败（事务已被回滚）
         """
-        self.transaction_manager.commit_transaction(transaction_id)
-        self.in_transaction = False
+        try:
+            self.transaction_manager.commit_transaction(transaction_id)
+        except Exception:
+            self.pager.discard_changes()
+            raise
+        finally:
+            self.in_transaction = False
+            self.pager.end_read()
+        
+        if self.auto_vacuum and self.pager.header.freelist_count:
+            self.vacuum_manager.incremental_vacuum(AUTO_VACUUM_MAX_PAGES)
     
     def rollback_transaction(self, transaction_id: int):
-        """回滚事务。
+        """回滚事务，丢弃事务的脏页并释放锁。
         
         Args:
             transaction_id: 事务ID
         """
-        self.transaction_manager.rollback_transaction(transaction_id)
-        self.in_transaction = False
+        try:
+            self.transaction_manager.rollback_transaction(transaction_id)
+        finally:
+            self.pager.discard_changes()
+            self.in_transaction = False
+            self.pager.end_read()
     
     def create_table(self, table_name: str, columns: Dict[str, str],
                     primary_key: Optional[str] = None,
@@ -664,6 +842,7 @@ class EnhancedDatabase:
         
         # 创建表实例
         table = EnhancedTable(self.pager, table_name, schema, self)  # 传递数据库引用
+        table.ensure_storage()
         self.tables[table_name] = table
         
         # 记录事务日志
@@ -718,8 +897,12 @@ class EnhancedDatabase:
         if table_name in self.schemas:
             del self.schemas[table_name]
         
-        # 从表字典中移除
+        # 从表字典和系统目录中移除，表的页面放回空闲页链表
         del self.tables[table_name]
+        entry = self.catalog.get_table(table_name)
+        if entry is not None:
+            table.btree.destroy()
+            self.catalog.remove(entry)
         
         # 记录事务日志
         if self.transaction_log:
@@ -786,6 +969,13 @@ class EnhancedDatabase:
             
         # 获取页数
         info['num_pages'] = self.pager.num_pages  # 使用num_pages属性而不是get_num_pages方法
+        info['physical_pages'] = self.pager.physical_pages  # 包含按区段预分配的页面
+        info['page_size'] = self.pager.page_size
+        info['compression'] = self.pager.compression
+        info['checksums'] = self.pager.checksums
+        
+        # 分页管理器的I/O统计（逻辑请求、命中、物理读写和延迟直方图）
+        info['io_stats'] = self.pager.get_io_stats()
         
         # 获取备份信息
         try:
@@ -796,6 +986,10 @@ class EnhancedDatabase:
         return info
 
 
+    def reset_io_stats(self) -> None:
+        """将分页管理器的I/O统计清零。"""
+        self.pager.reset_io_stats()
+    
     def create_backup(self, backup_name: Optional[str] = None) -> str:
         """创建数据库备份。
         
@@ -831,9 +1025,52 @@ class EnhancedDatabase:
         return self.backup_manager.restore_backup(backup_name)  # 使用BackupManager的restore_backup方法
 
 
+    def vacuum(self) -> None:
+        """完全整理数据库，重建文件并丢弃所有空闲页。
+        
+        Raises:
+            DatabaseError: 如果有活动事务
+        """
+        self.vacuum_manager.vacuum()
+    
+    def incremental_vacuum(self, max_pages: Optional[int] = None) -> int:
+        """增量整理数据库，回收文件末尾的空闲页。
+        
+        Args:
+            max_pages: 最多回收的页数，None表示全部回收
+            
+        Returns:
+            回收的页数
+            
+        Raises:
+            DatabaseError: 如果有活动事务
+        """
+        return self.vacuum_manager.incremental_vacuum(max_pages)
+    
+    def _reopen_catalog(self) -> None:
+        """页面被整理移动后重新打开系统目录和模式页链，各表的B树重新从目录打开。"""
+        self.catalog = SystemCatalog(self.pager)
+        self.schema_store = SchemaStore(self.pager)
+        for table in self.tables.values():
+            table.pager = self.pager
+            table.catalog = self.catalog
+            table._btree = None
+    
     def close(self) -> None:
         """关闭数据库连接。"""
         self.pager.close()
+    
+    def checkpoint(self) -> None:
+        """检查点：把已提交的数据同步到持久存储，启用缓存预热时同时保存热点页列表。
+        
+        Raises:
+            DatabaseError: 如果有活动事务
+        """
+        if self.in_transaction:
+            raise DatabaseError("Cannot checkpoint inside a transaction")
+        self.pager.sync()
+        if self.pager.warm_cache:
+            self.pager.save_hot_pages()
 
 
     def flush(self) -> None:
@@ -874,8 +1111,9 @@ class SQLExecutor:
             
             # 如果没有提供事务ID，对于非SELECT语句创建自动事务
             auto_transaction = False
-            if transaction_id is None and not isinstance(statement, SelectStatement):
-                transaction_id = self.database.begin_transaction()
+            # VACUUM会移动页面，不能在事务中执行
+            if transaction_id is None and not isinstance(statement, (SelectStatement, VacuumStatement)):
+                transaction_id = self.database.begin_transaction(write=True)
                 auto_transaction = True
             
             try:
@@ -892,12 +1130,15 @@ class SQLExecutor:
                     return self._execute_create_table(statement)
                 elif isinstance(statement, DropTableStatement):
                     return self._execute_drop_table(statement)
+                elif isinstance(statement, VacuumStatement):
+                    return self._execute_vacuum(statement)
                 else:
                     return PrepareResult.SYNTAX_ERROR, "不支持的语句类型"
                     
             except Exception as e:
-                # 如果是自动事务且发生错误，回滚事务
+                # 如果是自动事务且发生错误，回滚事务（之后不再提交）
                 if auto_transaction and transaction_id is not None:
+                    auto_transaction = False
                     self.database.rollback_transaction(transaction_id)
                 # 检查是否是特定的PrepareResult错误
                 if isinstance(e, tuple) and len(e) == 2 and isinstance(e[0], PrepareResult):
@@ -953,6 +1194,14 @@ class SQLExecutor:
         Returns:
             执行结果和字典列表（包含别名映射）
         """
+        if not self.database.in_transaction:
+            # 自动提交的查询：先获取共享锁，使其他连接创建或删除的表可见
+            self.database.pager.begin_read()
+            try:
+                self.database.refresh_schema()
+            finally:
+                self.database.pager.end_read()
+        
         table_name = statement.table_name
         if table_name not in self.database.tables:
             return PrepareResult(4), []  # TABLE_NOT_FOUND = 4, 返回空列表
@@ -1077,3 +1326,15 @@ class SQLExecutor:
         except Exception as e:
             # 重新抛出异常，让上层处理具体的错误信息
             raise e
+    
+    def _execute_vacuum(self, statement: VacuumStatement) -> Tuple[PrepareResult, bool]:
+        """执行VACUUM语句。
+        
+        Args:
+            statement: VACUUM语句对象
+            
+        Returns:
+            执行结果和成功标志的元组
+        """
+        self.database.vacuum()
+        return PrepareResult(0), True  # SUCCESS = 0
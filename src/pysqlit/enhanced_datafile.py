@@ -26,7 +26,7 @@ from .models import Row, DataType, TableSchema, ColumnDefinition
 from .exceptions import DatabaseError
 from .transaction import IsolationLevel
 from .backup import BackupManager
-from .constants import EXECUTE_SUCCESS
+from .constants import EXECUTE_SUCCESS, DEFAULT_CACHE_SIZE
 
 
 class EnhancedDataFile:
@@ -60,12 +60,19 @@ class EnhancedDataFile:
         >>> edf.delete("users", where="id = 1")
     """
 
-    def __init__(self, filename: str, auto_commit: bool = True):
+    def __init__(self, filename: str, auto_commit: bool = True,
+                 cache_size: Optional[int] = DEFAULT_CACHE_SIZE,
+                 cache_bytes: Optional[int] = None,
+                 use_mmap: bool = False, auto_vacuum: bool = False):
         """初始化增强版数据文件操作对象。
 
         Args:
             filename: 数据库文件名，":memory:"表示内存数据库
             auto_commit: 是否自动提交事务
+            cache_size: 缓冲池容量（页数），None表示不限制
+            cache_bytes: 缓冲池容量（字节），优先于cache_size
+            use_mmap: 是否使用内存映射分页管理器（适合读密集型负载）
+            auto_vacuum: 是否在每次提交后增量整理，回收文件末尾的空闲页
         """
         # 确保文件名是绝对路径，以保证日志文件在正确的目录中创建
         if filename != ":memory:":
@@ -73,15 +80,18 @@ class EnhancedDataFile:
         else:
             self.filename = filename
         self.auto_commit = auto_commit
-        self.db = EnhancedDatabase(self.filename)
+        self.db = EnhancedDatabase(self.filename, cache_size=cache_size, cache_bytes=cache_bytes,
+                                   use_mmap=use_mmap, auto_vacuum=auto_vacuum)
         self.executor = SQLExecutor(self.db)
         self.current_transaction = None
 
-    def begin_transaction(self, isolation_level: IsolationLevel = IsolationLevel.REPEATABLE_READ) -> int:
+    def begin_transaction(self, isolation_level: IsolationLevel = IsolationLevel.REPEATABLE_READ,
+                          write: bool = False) -> int:
         """开始新事务。
 
         Args:
             isolation_level: 事务隔离级别
+            write: 是否为写事务（在读取之前获取RESERVED锁）
 
         Returns:
             事务ID
@@ -89,7 +99,7 @@ class EnhancedDataFile:
         if self.current_transaction is not None:
             raise DatabaseError("事务已在进行中")
         
-        transaction_id = self.db.begin_transaction(isolation_level)
+        transaction_id = self.db.begin_transaction(isolation_level, write)
         self.current_transaction = transaction_id
         return transaction_id
 
@@ -215,7 +225,7 @@ class EnhancedDataFile:
         # 开始事务（如果需要）
         auto_transaction = False
         if self.auto_commit and self.current_transaction is None:
-            self.begin_transaction()
+            self.begin_transaction(write=True)
             auto_transaction = True
 
         try:
@@ -455,7 +465,7 @@ class EnhancedDataFile:
         # 开始事务（如果需要）
         auto_transaction = False
         if self.auto_commit and self.current_transaction is None:
-            self.begin_transaction()
+            self.begin_transaction(write=True)
             auto_transaction = True
 
         try:
@@ -511,7 +521,7 @@ class EnhancedDataFile:
         # 开始事务（如果需要）
         auto_transaction = False
         if self.auto_commit and self.current_transaction is None:
-            self.begin_transaction()
+            self.begin_transaction(write=True)
             auto_transaction = True
 
         try:
@@ -7,11 +7,13 @@
 - PySQLitError: 所有PySQLit异常的基类
   ├── DatabaseError: 数据库相关错误
   │   ├── StorageError: 存储和文件I/O错误
+  │   │   └── LegacyFormatError: 旧版数据库文件格式
   │   ├── ExecutionError: 查询执行错误
   │   ├── BTreeError: B树操作错误
   │   ├── TransactionError: 事务相关错误
   │   ├── BackupError: 备份和恢复错误
   │   └── LockError: 文件锁定错误
+  │       └── BusyError: 锁升级冲突
   ├── ParseError: SQL解析错误
   └── ValidationError: 数据验证错误
 """
@@ -63,6 +65,36 @@ class StorageError(DatabaseError):
     pass
 
 
+class ChecksumError(StorageError):
+    """页面校验和不匹配。
+    
+    从文件读取的页面与页尾记录的CRC32校验和不一致时抛出，
+    通常说明页面写入不完整（写撕裂）或文件被损坏。
+    
+    Examples:
+        >>> try:
+        ...     pager.get_page(7)
+        ... except ChecksumError as e:
+        ...     print(f"页面损坏: {e}")
+    """
+    pass
+
+
+class LegacyFormatError(StorageError):
+    """数据库文件使用引入文件头之前的旧版格式。
+    
+    旧版文件没有第0页文件头，模式保存在数据库文件旁的"<数据库文件>.schema"中，
+    当前版本不能直接打开，需要先用``python -m pysqlit.legacy <数据库文件>``转换。
+    
+    Examples:
+        >>> try:
+        ...     db = EnhancedDatabase("old.db")
+        ... except LegacyFormatError:
+        ...     convert_legacy_database("old.db")
+    """
+    pass
+
+
 class ParseError(PySQLitError):
     """SQL解析错误。
     
@@ -177,4 +209,20 @@ class LockError(DatabaseError):
         ... except LockError as e:
         ...     print(f"锁定错误: {e}")
     """
-    pass
\ No newline at end of file
+    pass
+
+
+class BusyError(LockError):
+    """锁升级冲突（SQLITE_BUSY）。
+    
+    持有SHARED锁的连接要升级为RESERVED，而另一个连接已持有RESERVED时立即抛出，
+    不等待超时：对方提交需要等本连接释放SHARED，等待只会互相阻塞。
+    调用方应回滚当前事务（释放SHARED锁）后重试。
+    
+    Examples:
+        >>> try:
+        ...     db.commit_transaction(tx_id)
+        ... except BusyError:
+        ...     db.rollback_transaction(tx_id)
+    """
+    pass
@@ -0,0 +1,186 @@
+"""空闲页链表模块。
+
+被释放的页面记录在持久化的空闲页链表中，分配新页面时优先复用，
+从而使有删除的数据库文件不会无限增长。链表采用主干页/叶子页结构：
+
+- 文件头的freelist_head指向第一个主干页，freelist_count记录空闲页总数
+- 主干页结构：下一个主干页页号(4字节) + 叶子页数量(4字节) + 叶子页号数组
+- 叶子页本身不保存任何内容
+
+释放页面时优先追加到第一个主干页的叶子页数组；主干页已满时，
+被释放的页面成为新的第一个主干页。分配时先取叶子页，叶子页用尽后复用主干页本身。
+"""
+
+import struct
+from typing import Iterable, List, Optional
+
+from .exceptions import StorageError
+
+
+# 主干页头结构：下一个主干页页号(4) + 叶子页数量(4)
+FREELIST_TRUNK_HEADER = struct.Struct('<II')
+FREELIST_LEAF_STRUCT = struct.Struct('<I')
+
+
+class Freelist:
+    """持久化的空闲页链表。
+
+    Attributes:
+        pager: 带文件头的分页管理器
+
+    Examples:
+        >>> freelist = Freelist(pager)
+        >>> freelist.push(7)
+        >>> freelist.pop()
+        7
+    """
+
+    def __init__(self, pager) -> None:
+        """初始化空闲页链表。
+
+        Args:
+            pager: 带文件头的分页管理器（ConcurrentPager及其子类）
+        """
+        self.pager = pager
+
+    @property
+    def capacity(self) -> int:
+        """每个主干页能记录的叶子页数量。"""
+        return (self.pager.usable_size - FREELIST_TRUNK_HEADER.size) // FREELIST_LEAF_STRUCT.size
+
+    def __len__(self) -> int:
+        """获取空闲页数量（包括主干页）。"""
+        return self.pager.header.freelist_count
+
+    def _write_trunk(self, trunk: int, next_trunk: int, leaves: List[int]) -> None:
+        """写入一个主干页。
+
+        Args:
+            trunk: 主干页页号
+            next_trunk: 下一个主干页页号
+            leaves: 叶子页号列表
+        """
+        data = FREELIST_TRUNK_HEADER.pack(next_trunk, len(leaves))
+        data += b''.join(FREELIST_LEAF_STRUCT.pack(leaf) for leaf in leaves)
+        self.pager.write_page(trunk, data)
+
+    def _read_trunk(self, trunk: int):
+        """读取一个主干页。
+
+        Args:
+            trunk: 主干页页号
+
+        Returns:
+            (下一个主干页页号, 叶子页号列表)
+
+        Raises:
+            StorageError: 如果主干页数据损坏
+        """
+        page = self.pager.get_page(trunk)
+        next_trunk, count = FREELIST_TRUNK_HEADER.unpack_from(page)
+        if count > self.capacity:
+            raise StorageError(f"Freelist trunk page {trunk} is corrupt")
+        offset = FREELIST_TRUNK_HEADER.size
+        leaves = [FREELIST_LEAF_STRUCT.unpack_from(page, offset + i * FREELIST_LEAF_STRUCT.size)[0]
+                  for i in range(count)]
+        return next_trunk, leaves
+
+    def push(self, page_num: int) -> None:
+        """将页面加入空闲页链表。
+
+        Args:
+            page_num: 被释放的页号
+
+        Raises:
+            StorageError: 如果页号无效
+        """
+        header = self.pager.header
+        if page_num < self.pager.first_data_page or page_num >= self.pager.num_pages:
+            raise StorageError(f"Cannot free page {page_num}")
+
+        head = header.freelist_head
+        if head:
+            next_trunk, leaves = self._read_trunk(head)
+            if len(leaves) < self.capacity:
+                leaves.append(page_num)
+                self._write_trunk(head, next_trunk, leaves)
+                header.freelist_count += 1
+                self.pager.update_header()
+                return
+
+        # 没有主干页或主干页已满：被释放的页面成为新的第一个主干页
+        self._write_trunk(page_num, head, [])
+        header.freelist_head = page_num
+        header.freelist_count += 1
+        self.pager.update_header()
+
+    def pop(self) -> Optional[int]:
+        """从空闲页链表取出一个页面。
+
+        Returns:
+            可复用的页号，链表为空时返回None
+        """
+        header = self.pager.header
+        head = header.freelist_head
+        if not head:
+            return None
+
+        next_trunk, leaves = self._read_trunk(head)
+        if leaves:
+            page_num = leaves.pop()
+            self._write_trunk(head, next_trunk, leaves)
+        else:
+            # 叶子页已用尽，复用主干页本身
+            page_num = head
+            header.freelist_head = next_trunk
+
+        header.freelist_count -= 1
+        self.pager.update_header()
+        return page_num
+
+    def pages(self) -> List[int]:
+        """获取所有空闲页（主干页和叶子页）。
+
+        Returns:
+            空闲页号列表
+
+        Raises:
+            StorageError: 如果主干页链存在环
+        """
+        result = []
+        seen = set()
+        trunk = self.pager.header.freelist_head
+        while trunk:
+            if trunk in seen:
+                raise StorageError("Freelist trunk chain contains a cycle")
+            seen.add(trunk)
+            next_trunk, leaves = self._read_trunk(trunk)
+            result.append(trunk)
+            result.extend(leaves)
+            trunk = next_trunk
+        return result
+
+    def rebuild(self, page_nums: Iterable[int]) -> None:
+        """用给定的空闲页重新构建链表。
+
+        页号较小的页面放在链表前端，使之后的分配优先填充文件前部。
+
+        Args:
+            page_nums: 空闲页号
+        """
+        header = self.pager.header
+        pages = sorted(page_nums)
+        count = len(pages)
+        group = self.capacity + 1
+        head = 0
+        # 每组页面中最大的作为主干页，其余按降序作为叶子页（pop从末尾取出最小的）；
+        # 从页号最大的一组开始构建，使页号最小的一组位于链表头
+        for start in reversed(range(0, count, group)):
+            chunk = pages[start:start + group]
+            trunk = chunk.pop()
+            self._write_trunk(trunk, head, chunk[::-1])
+            head = trunk
+
+        header.freelist_head = head
+        header.freelist_count = count
+        self.pager.update_header()
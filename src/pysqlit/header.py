@@ -0,0 +1,187 @@
+"""数据库文件头模块。
+
+数据库文件的第0页保存文件头，描述整个文件的布局，包括：
+- 魔数和格式版本，用于识别PySQLit数据库文件
+- 页面大小（创建数据库时选定，1KB到64KB之间的2的幂，之后不再改变）
+- 已分配页面的高水位线（逻辑页数）和文件的物理页数（包含按区段预分配的空间）
+- 空闲页链表头和空闲页数
+- 系统目录B树的根页（表名/索引名到根页号和序列计数器的映射）
+- 模式页链的起始页和模式版本号
+- 变更计数器（每次提交递增）和可选的页面版本表起始页，用于跨进程的缓存失效
+- 页面压缩算法和页面映射块目录（压缩数据库中逻辑页到文件位置的映射，见compression模块）
+- 是否在每页末尾保留CRC32校验和（创建数据库时选定）
+
+文件头在打开数据库时一次读取，修改后随其他脏页一起在刷新时写回磁盘，
+因此目录和模式变更与数据一同落盘。
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import List
+
+from .constants import (PAGE_SIZE, MIN_PAGE_SIZE, MAX_PAGE_SIZE, HEADER_MAGIC, FORMAT_VERSION,
+                        PAGE_CHECKSUM_SIZE)
+from .exceptions import StorageError
+
+
+# 文件头结构：魔数(16) + 格式版本(2) + 页面大小(4) + 页数(4) + 空闲页链表头(4)
+# + 空闲页数(4) + 系统目录根页(4) + 模式页链起始页(4) + 模式版本(4)
+# + 变更计数器(4) + 页面版本表起始页(4) + 压缩算法(4) + 页面校验和标志(4)
+# + 物理页数(4) + 页面映射块数(4)，之后是页面映射块目录：每块的起始扇区(4)
+HEADER_STRUCT = struct.Struct('<16sHIIIIIIIIIIIII')
+PAGE_MAP_DIRECTORY_ENTRY = struct.Struct('<I')
+
+
+def check_page_size(page_size: int) -> int:
+    """检查页面大小是否受支持。
+
+    Args:
+        page_size: 页面大小（字节）
+
+    Returns:
+        int: 检查通过的页面大小
+
+    Raises:
+        StorageError: 如果页面大小不是MIN_PAGE_SIZE到MAX_PAGE_SIZE之间的2的幂
+    """
+    if (not isinstance(page_size, int) or page_size < MIN_PAGE_SIZE
+            or page_size > MAX_PAGE_SIZE or page_size & (page_size - 1)):
+        raise StorageError(
+            f"Invalid page size {page_size}: must be a power of two "
+            f"between {MIN_PAGE_SIZE} and {MAX_PAGE_SIZE}"
+        )
+    return page_size
+
+
+@dataclass
+class DatabaseHeader:
+    """数据库文件头。
+
+    Attributes:
+        page_size: 页面大小（字节）
+        page_count: 已分配页面的高水位线，包含文件头页本身
+        format_version: 文件格式版本
+        freelist_head: 空闲页链表的第一页，0表示没有空闲页
+        freelist_count: 空闲页数量
+        catalog_root: 系统目录B树的根页，0表示尚未创建
+        schema_root: 模式页链的起始页，0表示尚未创建
+        schema_version: 模式版本号，每次模式变更时递增
+        change_counter: 变更计数器，每次提交写回时递增
+        page_versions_root: 页面版本表的起始页，0表示未启用
+        compression: 页面压缩算法，0表示不压缩
+        checksums: 非0表示每页末尾保留PAGE_CHECKSUM_SIZE字节的CRC32校验和
+        physical_pages: 上次提交时文件的物理大小（页数），包含高水位线之后预分配的区段
+        page_map: 页面映射块目录（各映射块的起始扇区），仅压缩数据库使用
+
+    Examples:
+        >>> header = DatabaseHeader(page_size=4096, page_count=1)
+        >>> data = header.pack()
+        >>> DatabaseHeader.unpack(data).page_count
+        1
+    """
+    page_size: int = PAGE_SIZE
+    page_count: int = 1
+    format_version: int = FORMAT_VERSION
+    freelist_head: int = 0
+    freelist_count: int = 0
+    catalog_root: int = 0
+    schema_root: int = 0
+    schema_version: int = 0
+    change_counter: int = 0
+    page_versions_root: int = 0
+    compression: int = 0
+    checksums: int = 0
+    physical_pages: int = 0
+    page_map: List[int] = field(default_factory=list)
+
+    @property
+    def usable_size(self) -> int:
+        """每页可供存放数据的字节数（页面大小减去保留的校验和）。"""
+        return self.page_size - (PAGE_CHECKSUM_SIZE if self.checksums else 0)
+
+    @property
+    def max_page_map_chunks(self) -> int:
+        """文件头页能容纳的页面映射块目录项数。"""
+        return (self.usable_size - HEADER_STRUCT.size) // PAGE_MAP_DIRECTORY_ENTRY.size
+
+    def pack(self) -> bytes:
+        """将文件头序列化为一个完整的页面。
+
+        Returns:
+            bytes: 长度为page_size的页面数据
+        """
+        data = HEADER_STRUCT.pack(HEADER_MAGIC, self.format_version,
+                                  self.page_size, self.page_count,
+                                  self.freelist_head, self.freelist_count,
+                                  self.catalog_root, self.schema_root,
+                                  self.schema_version, self.change_counter,
+                                  self.page_versions_root, self.compression,
+                                  self.checksums, self.physical_pages, len(self.page_map))
+        data += b''.join(PAGE_MAP_DIRECTORY_ENTRY.pack(sector) for sector in self.page_map)
+        return data.ljust(self.page_size, b'\x00')
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'DatabaseHeader':
+        """从页面数据解析文件头。
+
+        Args:
+            data: 第0页的数据
+
+        Returns:
+            DatabaseHeader: 文件头对象
+
+        Raises:
+            StorageError: 如果魔数不匹配、格式版本或页面大小不受支持
+        """
+        cls.peek_page_size(data)  # 检查魔数、格式版本和页面大小
+        (magic, format_version, page_size, page_count, freelist_head, freelist_count,
+         catalog_root, schema_root, schema_version, change_counter,
+         page_versions_root, compression, checksums, physical_pages,
+         chunk_count) = HEADER_STRUCT.unpack_from(data)
+        header = cls(page_size=page_size, page_count=page_count, format_version=format_version,
+                     freelist_head=freelist_head, freelist_count=freelist_count,
+                     catalog_root=catalog_root, schema_root=schema_root,
+                     schema_version=schema_version, change_counter=change_counter,
+                     page_versions_root=page_versions_root, compression=compression,
+                     checksums=checksums, physical_pages=physical_pages)
+        if chunk_count > header.max_page_map_chunks \
+                or len(data) < HEADER_STRUCT.size + chunk_count * PAGE_MAP_DIRECTORY_ENTRY.size:
+            raise StorageError("Corrupt database header (bad page map directory)")
+        header.page_map = [PAGE_MAP_DIRECTORY_ENTRY.unpack_from(
+                               data, HEADER_STRUCT.size + i * PAGE_MAP_DIRECTORY_ENTRY.size)[0]
+                           for i in range(chunk_count)]
+        return header
+
+    @staticmethod
+    def peek_page_size(data: bytes) -> int:
+        """只根据文件头的固定字段读取页面大小。
+
+        打开文件时需要先知道页面大小才能读取完整的文件头页。
+
+        Args:
+            data: 文件开头的数据，至少包含HEADER_STRUCT.size字节
+
+        Returns:
+            int: 页面大小（字节）
+
+        Raises:
+            StorageError: 如果魔数不匹配、格式版本或页面大小不受支持
+        """
+        if not DatabaseHeader.is_valid(data):
+            raise StorageError("File is not a PySQLit database (bad header magic)")
+        format_version, page_size = HEADER_STRUCT.unpack_from(data)[1:3]
+        if format_version != FORMAT_VERSION:
+            raise StorageError(f"Unsupported database format version {format_version}")
+        return check_page_size(page_size)
+
+    @staticmethod
+    def is_valid(data: bytes) -> bool:
+        """检查页面数据是否以PySQLit文件头开始。
+
+        Args:
+            data: 第0页的数据
+
+        Returns:
+            bool: 魔数匹配返回True
+        """
+        return len(data) >= HEADER_STRUCT.size and bytes(data[:len(HEADER_MAGIC)]) == HEADER_MAGIC
@@ -8,7 +8,7 @@
 - 自动修复功能
 
 主要功能：
-1. 验证数据库文件是否符合预期的页面大小
+1. 验证数据库文件是否符合文件头中记录的页面大小
 2. 检测并修复页面大小不匹配的问题
 3. 执行全面的数据库完整性检查
 4. 提供详细的检查报告
@@ -16,8 +16,9 @@
 
 import os
 from typing import Optional
-from .constants import PAGE_SIZE
-from .exceptions import DatabaseError
+from .constants import PAGE_SIZE, COMPRESSION_NONE, COMPRESSION_SECTOR_SIZE
+from .exceptions import DatabaseError, StorageError
+from .header import DatabaseHeader, HEADER_STRUCT
 
 
 class IntegrityChecker:
@@ -39,6 +40,64 @@ class IntegrityChecker:
         ...     print("数据库文件结构正常")
     """
     
+    @staticmethod
+    def read_page_size(file_path: str) -> int:
+        """读取数据库文件使用的页面大小。
+        
+        页面大小在创建数据库时记录在文件头中；没有文件头的文件
+        （如基础分页管理器创建的文件）按默认页面大小处理。
+        
+        Args:
+            file_path: 数据库文件路径
+            
+        Returns:
+            int: 页面大小（字节）
+            
+        Raises:
+            DatabaseError: 如果文件头中记录的页面大小无效
+            
+        Examples:
+            >>> IntegrityChecker.read_page_size("test.db")
+            4096
+        """
+        header = IntegrityChecker._read_header(file_path)
+        return header.page_size if header is not None else PAGE_SIZE
+    
+    @staticmethod
+    def _read_header(file_path: str) -> Optional[DatabaseHeader]:
+        """读取数据库文件头。
+        
+        Args:
+            file_path: 数据库文件路径
+            
+        Returns:
+            文件头对象，文件不存在或没有文件头时返回None
+            
+        Raises:
+            DatabaseError: 如果文件头无效
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read(HEADER_STRUCT.size)
+                if not DatabaseHeader.is_valid(data):
+                    return None
+                f.seek(0)
+                return DatabaseHeader.unpack(f.read(DatabaseHeader.peek_page_size(data)))
+        except OSError:
+            return None
+        except StorageError as e:
+            raise DatabaseError(f"数据库文件头无效: {e}")
+    
+    @staticmethod
+    def _allocation_unit(file_path: str) -> int:
+        """数据库文件长度应当对齐的单位：压缩数据库为扇区，否则为页面。"""
+        header = IntegrityChecker._read_header(file_path)
+        if header is None:
+            return PAGE_SIZE
+        if header.compression != COMPRESSION_NONE:
+            return COMPRESSION_SECTOR_SIZE
+        return header.page_size
+    
     @staticmethod
     def validate_page_size(file_path: str) -> bool:
         """验证数据库文件的页面大小是否正确。
@@ -67,10 +126,11 @@ class IntegrityChecker:
         if file_size == 0:
             return True  # 空文件视为有效
             
-        if file_size % PAGE_SIZE != 0:
+        unit = IntegrityChecker._allocation_unit(file_path)
+        if file_size % unit != 0:
             raise DatabaseError(
-                f"数据库文件大小 {file_size} 不是页面大小 {PAGE_SIZE} 的整数倍。 "
-                f"余数: {file_size % PAGE_SIZE} 字节"
+                f"数据库文件大小 {file_size} 不是页面大小 {unit} 的整数倍。 "
+                f"余数: {file_size % unit} 字节"
             )
             
         return True
@@ -99,12 +159,13 @@ class IntegrityChecker:
             return False
             
         file_size = os.path.getsize(file_path)
-        remainder = file_size % PAGE_SIZE
+        unit = IntegrityChecker._allocation_unit(file_path)
+        remainder = file_size % unit
         
         if remainder == 0:
             return True  # 已经正确，无需修复
             
-        padding_needed = PAGE_SIZE - remainder
+        padding_needed = unit - remainder
         
         try:
             with open(file_path, 'ab') as f:
@@ -126,6 +187,7 @@ class IntegrityChecker:
             dict: 检查结果字典，包含：
                 - file_exists: 文件是否存在
                 - page_size_valid: 页面大小是否有效
+                - page_size: 文件使用的页面大小（字节）
                 - file_size: 文件大小（字节）
                 - num_pages: 页面数量
                 - errors: 错误信息列表
@@ -138,6 +200,7 @@ class IntegrityChecker:
         result = {
             'file_exists': False,
             'page_size_valid': False,
+            'page_size': PAGE_SIZE,
             'file_size': 0,
             'num_pages': 0,
             'errors': []
@@ -151,9 +214,15 @@ class IntegrityChecker:
         result['file_size'] = os.path.getsize(file_path)
         
         try:
+            header = IntegrityChecker._read_header(file_path)
+            if header is not None:
+                result['page_size'] = header.page_size
             IntegrityChecker.validate_page_size(file_path)
             result['page_size_valid'] = True
-            result['num_pages'] = result['file_size'] // PAGE_SIZE
+            if header is not None and header.compression != COMPRESSION_NONE:
+                result['num_pages'] = header.page_count  # 压缩数据库的文件长度与页数无关
+            else:
+                result['num_pages'] = result['file_size'] // result['page_size']
         except DatabaseError as e:
             result['errors'].append(str(e))
             
@@ -0,0 +1,207 @@
+"""分页管理器的I/O统计模块。
+
+分页管理器在每次逻辑页面请求、物理读写、刷新和fsync时更新这些计数器，
+并把物理读、写和fsync的耗时记录在按2的幂划分的延迟直方图中。
+结合缓冲池的命中统计，可以判断一次慢请求的时间是花在CPU
+（如行的反序列化）还是分页管理器的磁盘I/O上。
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+from .constants import IO_HISTOGRAM_BUCKETS
+
+
+class LatencyHistogram:
+    """按2的幂划分的延迟直方图。
+
+    第i个桶统计耗时不超过2**i微秒的操作，最后一个桶不设上限。
+    记录一次操作只需常数时间，分位数按桶的上界估算。
+
+    Attributes:
+        counts: 各桶的操作次数
+        count: 操作总次数
+        total: 总耗时（秒）
+        max: 最大耗时（秒）
+
+    Examples:
+        >>> histogram = LatencyHistogram()
+        >>> histogram.record(0.0003)
+        >>> histogram.percentile(0.5)
+        512
+    """
+
+    def __init__(self, buckets: int = IO_HISTOGRAM_BUCKETS) -> None:
+        """初始化直方图。
+
+        Args:
+            buckets: 桶的数量
+        """
+        self.counts: List[int] = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """记录一次操作的耗时。
+
+        Args:
+            seconds: 耗时（秒）
+        """
+        micros = math.ceil(seconds * 1_000_000)
+        index = min(max(micros - 1, 0).bit_length(), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """估算分位数。
+
+        Args:
+            fraction: 分位（0到1之间，如0.99）
+
+        Returns:
+            分位数所在桶的上界（微秒），落在最后一个桶时返回最大耗时；没有记录时返回None
+        """
+        if not self.count:
+            return None
+        target = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                if index == len(self.counts) - 1:
+                    return math.ceil(self.max * 1_000_000)
+                return 1 << index
+        return math.ceil(self.max * 1_000_000)
+
+    def reset(self) -> None:
+        """清空直方图。"""
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取直方图的快照。
+
+        Returns:
+            包含次数、总耗时、最大耗时、p50/p99（均为微秒）和非空桶的字典，
+            buckets中每项为(桶上界微秒, 次数)，最后一个桶的上界为None
+        """
+        last = len(self.counts) - 1
+        return {
+            'count': self.count,
+            'total_us': round(self.total * 1_000_000),
+            'max_us': math.ceil(self.max * 1_000_000),
+            'p50_us': self.percentile(0.5),
+            'p99_us': self.percentile(0.99),
+            'buckets': [(None if index == last else 1 << index, bucket_count)
+                        for index, bucket_count in enumerate(self.counts) if bucket_count],
+        }
+
+
+class IOStats:
+    """分页管理器的I/O计数器和延迟直方图。
+
+    Attributes:
+        page_requests: 逻辑页面请求次数（包括缓存命中）
+        cache_hits: 缓存命中次数（带缓冲池的分页管理器以缓冲池统计为准）
+        cache_misses: 缓存未命中次数
+        physical_reads: 从文件读取页面的次数
+        physical_writes: 写入文件的次数（连续页面合并为一次向量写入）
+        bytes_read: 从文件读取的字节数
+        bytes_written: 写入文件的字节数
+        flushes: 写出了脏页的刷新次数
+        fsyncs: fsync次数
+        checksum_verifications: 页面校验和的校验次数
+        checksum_failures: 校验失败的次数
+        file_extensions: 按区段扩展数据库文件的次数
+        read_latency: 物理读延迟直方图
+        write_latency: 物理写延迟直方图
+        fsync_latency: fsync延迟直方图
+        verify_latency: 校验和计算耗时直方图（total_us即校验总耗时）
+
+    Examples:
+        >>> stats = IOStats()
+        >>> stats.record_read(4096, 0.00002)
+        >>> stats.snapshot()['bytes_read']
+        4096
+    """
+
+    COUNTERS = ('page_requests', 'cache_hits', 'cache_misses', 'physical_reads',
+                'physical_writes', 'bytes_read', 'bytes_written', 'flushes', 'fsyncs',
+                'checksum_verifications', 'checksum_failures', 'file_extensions')
+
+    def __init__(self) -> None:
+        """初始化I/O统计。"""
+        self.read_latency = LatencyHistogram()
+        self.write_latency = LatencyHistogram()
+        self.fsync_latency = LatencyHistogram()
+        self.verify_latency = LatencyHistogram()
+        self.reset()
+
+    def record_read(self, nbytes: int, seconds: float) -> None:
+        """记录一次物理读。
+
+        Args:
+            nbytes: 读取的字节数
+            seconds: 耗时（秒）
+        """
+        self.physical_reads += 1
+        self.bytes_read += nbytes
+        self.read_latency.record(seconds)
+
+    def record_write(self, nbytes: int, seconds: float) -> None:
+        """记录一次物理写。
+
+        Args:
+            nbytes: 写入的字节数
+            seconds: 耗时（秒）
+        """
+        self.physical_writes += 1
+        self.bytes_written += nbytes
+        self.write_latency.record(seconds)
+
+    def record_fsync(self, seconds: float) -> None:
+        """记录一次fsync。
+
+        Args:
+            seconds: 耗时（秒）
+        """
+        self.fsyncs += 1
+        self.fsync_latency.record(seconds)
+
+    def record_verify(self, seconds: float) -> None:
+        """记录一次页面校验和校验。
+
+        Args:
+            seconds: 耗时（秒）
+        """
+        self.checksum_verifications += 1
+        self.verify_latency.record(seconds)
+
+    def reset(self) -> None:
+        """将所有计数器和直方图清零。"""
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.read_latency.reset()
+        self.write_latency.reset()
+        self.fsync_latency.reset()
+        self.verify_latency.reset()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取统计信息的快照。
+
+        Returns:
+            计数器名到值的映射，另含read_latency、write_latency、fsync_latency
+            和verify_latency直方图快照
+        """
+        stats: Dict[str, Any] = {name: getattr(self, name) for name in self.COUNTERS}
+        stats['read_latency'] = self.read_latency.snapshot()
+        stats['write_latency'] = self.write_latency.snapshot()
+        stats['fsync_latency'] = self.fsync_latency.snapshot()
+        stats['verify_latency'] = self.verify_latency.snapshot()
+        return stats
@@ -0,0 +1,281 @@
+"""旧版数据库文件的识别与转换。
+
+引入文件头之前的版本把B树节点直接写在第0页开始的4KB页面中，
+表模式保存在数据库文件旁的JSON文件（"<数据库文件>.schema"）里，
+所有表共用以第0页为根的同一棵B树。当前版本从第0页读取文件头，
+不能直接打开这种文件，分页管理器遇到它时抛出LegacyFormatError。
+
+转换按旧版本自己的读取方式（从第0页开始沿叶子节点链扫描）取出它能读回的行，
+在原路径上建立新格式的数据库，原文件和模式文件加上".legacy"后缀保留::
+
+    python -m pysqlit.legacy old.db
+"""
+
+import json
+import os
+import struct
+import sys
+from typing import Dict, List, Tuple
+
+from .constants import (HEADER_MAGIC, LEGACY_BACKUP_SUFFIX, LEGACY_PAGE_SIZE, LEGACY_SCHEMA_SUFFIX,
+                        NODE_INTERNAL, NODE_LEAF)
+from .exceptions import LegacyFormatError, StorageError
+from .models import Row, TableSchema
+
+# 旧版节点头部：节点类型(1) + 是否为根(1) + 父节点(4) +
+# 单元格数/键数(4) + 下一个叶子/最右子节点(4)
+LEGACY_NODE_HEADER = struct.Struct('<BBIII')
+LEGACY_KEY = struct.Struct('<I')
+
+
+def is_legacy_database(path: str) -> bool:
+    """检查文件是否为引入文件头之前的旧版数据库。
+
+    没有文件头魔数、旁边有旧版模式文件，或者第0页是旧版B树节点的文件视为旧版数据库。
+
+    Args:
+        path: 数据库文件路径
+
+    Returns:
+        bool: 是旧版数据库返回True
+    """
+    try:
+        with open(path, 'rb') as f:
+            page = f.read(LEGACY_PAGE_SIZE)
+            f.seek(0, 2)
+            size = f.tell()
+    except FileNotFoundError:
+        return False
+    if page.startswith(HEADER_MAGIC):
+        return False
+    if os.path.exists(path + LEGACY_SCHEMA_SUFFIX):
+        return True
+    if size == 0 or size % LEGACY_PAGE_SIZE != 0:
+        return False
+    node_type, is_root = page[0], page[1]
+    return node_type in (NODE_LEAF, NODE_INTERNAL) and is_root in (0, 1)
+
+
+def check_legacy_format(path: str) -> None:
+    """文件是旧版数据库时抛出说明转换方法的异常。
+
+    Args:
+        path: 数据库文件路径
+
+    Raises:
+        LegacyFormatError: 如果文件是旧版数据库
+    """
+    if is_legacy_database(path):
+        raise LegacyFormatError(
+            f"{path} uses the legacy PySQLit file format (no file header); "
+            f"convert it with: python -m pysqlit.legacy {path}"
+        )
+
+
+def _load_legacy_schemas(path: str) -> Dict[str, TableSchema]:
+    """读取旧版模式文件。
+
+    Args:
+        path: 数据库文件路径
+
+    Returns:
+        Dict[str, TableSchema]: 表名 -> 表模式，没有模式文件时为空
+
+    Raises:
+        StorageError: 如果模式文件无法解析
+    """
+    schema_file = path + LEGACY_SCHEMA_SUFFIX
+    if not os.path.exists(schema_file):
+        return {}
+    try:
+        with open(schema_file, 'r') as f:
+            schema_data = json.load(f)
+        return {name: TableSchema.from_dict(schema_dict) for name, schema_dict in schema_data.items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise StorageError(f"Unable to read legacy schema file {schema_file}: {e}")
+
+
+def _scan_legacy_tree(data: bytes, row_size: int) -> List[Tuple[int, bytes]]:
+    """按旧版本的扫描方式读取第0页开始的叶子节点链。
+
+    旧版本从第0页出发：内部节点走向第一个子节点，叶子节点读取全部单元格后
+    沿下一个叶子指针继续，直到指针为0。分裂产生的新根从未写回第0页，
+    因此只有这条链上的行是旧版本自己能读回的。
+
+    Args:
+        data: 旧版数据库文件的全部内容
+        row_size: 每个单元格中值的字节数
+
+    Returns:
+        List[Tuple[int, bytes]]: 按链上顺序排列的(键, 值)
+    """
+    page_count = len(data) // LEGACY_PAGE_SIZE
+    cell_size = LEGACY_KEY.size + row_size
+    max_cells = (LEGACY_PAGE_SIZE - LEGACY_NODE_HEADER.size) // cell_size
+    cells = []
+    visited = set()
+    page_num = 0
+    while page_num < page_count and page_num not in visited:
+        visited.add(page_num)
+        page = data[page_num * LEGACY_PAGE_SIZE:(page_num + 1) * LEGACY_PAGE_SIZE]
+        node_type, _, _, count, link = LEGACY_NODE_HEADER.unpack_from(page)
+        if node_type == NODE_INTERNAL:
+            # 第一个子节点；没有键时就是最右子节点
+            page_num = LEGACY_KEY.unpack_from(page, LEGACY_NODE_HEADER.size)[0] if count else link
+            continue
+        for i in range(min(count, max_cells)):
+            offset = LEGACY_NODE_HEADER.size + i * cell_size
+            key = LEGACY_KEY.unpack_from(page, offset)[0]
+            cells.append((key, page[offset + LEGACY_KEY.size:offset + cell_size]))
+        if link == 0:
+            break
+        page_num = link
+    return cells
+
+
+def _read_legacy_rows(path: str, schemas: Dict[str, TableSchema]) -> Dict[str, List[Row]]:
+    """读取旧版数据库中能读回的行。
+
+    Args:
+        path: 数据库文件路径
+        schemas: 旧版模式文件中的表模式
+
+    Returns:
+        Dict[str, List[Row]]: 表名 -> 行列表
+
+    Raises:
+        StorageError: 如果多个表的行混在共用的B树中，无法区分所属的表
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not schemas:
+        return {}
+    if len(schemas) > 1:
+        if _scan_legacy_tree(data, 0):
+            raise StorageError(
+                f"{path} stores rows of several tables ({', '.join(schemas)}) in one shared B-tree; "
+                "the rows cannot be attributed to their tables and must be re-inserted manually"
+            )
+        return {}
+    table_name, schema = next(iter(schemas.items()))
+    return {table_name: [Row.deserialize(value, schema)
+                         for _, value in _scan_legacy_tree(data, schema.get_row_size())]}
+
+
+def _build_database(path: str, schemas: Dict[str, TableSchema], rows: Dict[str, List[Row]]) -> Dict[str, int]:
+    """在原路径上建立新格式的数据库并写入表模式和行。
+
+    行保留原来的主键值（不重新分配自增值），重复的主键只保留链上的第一行。
+
+    Args:
+        path: 新数据库文件路径
+        schemas: 表名 -> 表模式
+        rows: 表名 -> 行列表
+
+    Returns:
+        Dict[str, int]: 表名 -> 写入的行数
+    """
+    from .database import EnhancedDatabase, EnhancedTable
+
+    counts = {}
+    db = EnhancedDatabase(path)
+    try:
+        transaction_id = db.begin_transaction(write=True)
+        try:
+            for table_name, schema in schemas.items():
+                table = EnhancedTable(db.pager, table_name, schema, db)
+                table.ensure_storage()
+                db.schemas[table_name] = schema
+                db.tables[table_name] = table
+                primary_key = schema.primary_key or 'id'
+                seen = set()
+                for row in rows.get(table_name, []):
+                    key = row.get_value(primary_key)
+                    if key is None or key in seen:
+                        continue
+                    seen.add(key)
+                    table.btree.insert(key, row.serialize(schema))
+                    table._record_insert(key)
+                counts[table_name] = len(seen)
+            db._save_schema()
+            db.commit_transaction(transaction_id)
+        except Exception:
+            db.rollback_transaction(transaction_id)
+            raise
+    finally:
+        db.close()
+    return counts
+
+
+def convert_legacy_database(path: str) -> Dict[str, int]:
+    """把旧版数据库转换为当前格式。
+
+    原文件和模式文件加上".legacy"后缀保留，新数据库写在原路径上；
+    转换失败时删除新文件并恢复原文件。
+
+    Args:
+        path: 旧版数据库文件路径
+
+    Returns:
+        Dict[str, int]: 表名 -> 转换的行数
+
+    Raises:
+        StorageError: 如果文件不是旧版数据库、保留原文件的路径已被占用或无法转换
+
+    Examples:
+        >>> convert_legacy_database("old.db")
+        {'users': 12}
+    """
+    path = os.path.abspath(path)
+    if not is_legacy_database(path):
+        raise StorageError(f"{path} is not a legacy PySQLit database")
+    schemas = _load_legacy_schemas(path)
+    rows = _read_legacy_rows(path, schemas)
+
+    schema_file = path + LEGACY_SCHEMA_SUFFIX
+    renames = [(path, path + LEGACY_BACKUP_SUFFIX)]
+    if os.path.exists(schema_file):
+        renames.append((schema_file, schema_file + LEGACY_BACKUP_SUFFIX))
+    for _, backup in renames:
+        if os.path.exists(backup):
+            raise StorageError(f"Cannot keep the original file: {backup} already exists")
+    for original, backup in renames:
+        os.replace(original, backup)
+    try:
+        return _build_database(path, schemas, rows)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        for original, backup in renames:
+            os.replace(backup, original)
+        raise
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口：python -m pysqlit.legacy <数据库文件>...
+
+    Args:
+        argv: 命令行参数（不含程序名），None表示sys.argv[1:]
+
+    Returns:
+        int: 退出码，全部转换成功为0
+    """
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("usage: python -m pysqlit.legacy <database file>...", file=sys.stderr)
+        return 2
+    status = 0
+    for path in paths:
+        try:
+            counts = convert_legacy_database(path)
+        except StorageError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        tables = ', '.join(f"{name} ({count} rows)" for name, count in counts.items()) or 'no tables'
+        print(f"{path}: converted {tables}; original kept as {path}{LEGACY_BACKUP_SUFFIX}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
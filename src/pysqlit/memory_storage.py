@@ -0,0 +1,529 @@
+"""内存数据库存储模块，为":memory:"数据库提供专用的页面管理器。
+
+该模块实现了内存数据库的页面管理，包括：
+- 页面保存在按段增长的页面区中，缓冲池的页帧直接是页面区的memoryview
+- 没有文件、锁文件和路径，私有内存数据库不加任何锁
+- 通过multiprocessing.shared_memory在进程之间共享命名的内存数据库
+
+共享内存数据库的页面直接在共享内存段中修改，连接之间用第一个段上的
+flock读写锁协调：读取持有共享锁，修改页面时获取独占锁直到提交。
+获取锁时按文件头的变更计数器重新加载文件头，与文件数据库的缓存失效方式一致。
+"""
+
+import time
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows没有fcntl，不支持共享内存数据库
+    fcntl = None
+
+from .buffer_pool import BufferPool
+from .concurrent_storage import ConcurrentPager, FileLock, LockState
+from .constants import HEADER_PAGE_NUM, LOCK_TIMEOUT, MEMORY_SEGMENT_PAGES, MEMORY_SHARED_PREFIX
+from .exceptions import BusyError, LockError, StorageError
+from .header import HEADER_STRUCT, DatabaseHeader
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0):
+    """创建或打开共享内存段，段的生命周期不交给resource_tracker管理。
+
+    段由拥有数据库的连接在关闭时删除；如果交给resource_tracker，
+    任何打开过该段的进程退出时都会删除它。
+
+    Args:
+        name: 段名称
+        create: 是否创建新段
+        size: 新段的大小（字节）
+
+    Returns:
+        SharedMemory: 共享内存段
+
+    Raises:
+        FileExistsError: 如果创建的段已存在
+        FileNotFoundError: 如果打开的段不存在
+    """
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:  # Python 3.13之前没有track参数
+        from multiprocessing import resource_tracker
+        segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _unlink_segment(segment) -> None:
+    """删除共享内存段（已映射的进程仍可继续使用，直到关闭映射）。
+
+    Args:
+        segment: 共享内存段
+    """
+    if getattr(segment, '_track', True):
+        # unlink会向resource_tracker注销该段，先补上_open_segment中取消的注册
+        from multiprocessing import resource_tracker
+        resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
+
+
+class SharedMemoryLock(FileLock):
+    """共享内存数据库的进程间读写锁。
+
+    锁定第一个共享内存段本身：SHARED对应flock共享锁，RESERVED和EXCLUSIVE
+    都对应独占锁，因为页面直接在共享内存中修改，修改期间不能有读者。
+    """
+
+    def __init__(self, name: str, fd: int, timeout: Optional[float] = LOCK_TIMEOUT):
+        """初始化共享内存锁。
+
+        Args:
+            name: 共享内存数据库名称（用于错误信息）
+            fd: 第一个共享内存段的文件描述符，由共享内存段负责关闭
+            timeout: 等待锁的超时时间（秒），None表示无限等待
+        """
+        super().__init__(name, timeout)
+        self._lock_fd = fd
+
+    def _escalate(self, state: LockState, timeout: Optional[float]) -> None:
+        """升级锁状态。
+
+        Args:
+            state: 目标锁状态
+            timeout: 超时时间（秒）
+
+        Raises:
+            LockError: 如果在超时时间内无法获得锁
+        """
+        if state == LockState.SHARED:
+            self._flock(self._lock_fd, fcntl.LOCK_SH, timeout)
+            self.state = state
+            return
+        if self.state == LockState.RESERVED:
+            self.state = state  # RESERVED已经持有独占锁
+            return
+
+        try:
+            self._flock(self._lock_fd, fcntl.LOCK_EX, timeout)
+        except LockError:
+            if self.state == LockState.SHARED:
+                # flock的锁转换不是原子的，失败时共享锁可能已被移除，重新获取
+                self._flock(self._lock_fd, fcntl.LOCK_SH, None)
+            raise
+        self.state = state
+
+    def downgrade(self, state: LockState) -> None:
+        """将锁降级到指定状态。
+
+        Args:
+            state: 目标锁状态
+        """
+        if self.state.value <= state.value:
+            return
+
+        with self._lock:
+            if state == LockState.UNLOCKED:
+                self._flock(self._lock_fd, fcntl.LOCK_UN, None)
+            elif state == LockState.SHARED:
+                self._flock(self._lock_fd, fcntl.LOCK_SH, None)
+            self.state = state
+
+    def close(self):
+        """释放锁（文件描述符属于共享内存段，不在这里关闭）。"""
+        with self._lock:
+            self.release()
+            self._lock_fd = None
+
+
+class PageArena:
+    """内存数据库的页面区。
+
+    页面区由固定大小的段组成，每段容纳segment_pages个页面，需要时追加新段，
+    已有的段从不移动，因此交给缓冲池的页面视图始终有效。私有页面区的段是
+    bytearray，共享页面区的段是以"<名称>_<序号>"命名的共享内存段。
+
+    Attributes:
+        page_size: 页面大小（字节）
+        segment_pages: 每段的页数
+        name: 共享内存数据库名称，None表示私有页面区
+    """
+
+    def __init__(self, page_size: int, segment_pages: int = MEMORY_SEGMENT_PAGES,
+                 name: Optional[str] = None, first_segment=None) -> None:
+        """初始化页面区。
+
+        Args:
+            page_size: 页面大小（字节）
+            segment_pages: 每段的页数
+            name: 共享内存数据库名称，None表示私有页面区
+            first_segment: 已打开的第一个共享内存段
+        """
+        self.page_size = page_size
+        self.segment_pages = segment_pages
+        self.name = name
+        self._segments: List[memoryview] = []
+        self._shared = []  # 共享页面区已打开的共享内存段
+        if first_segment is not None:
+            self._add_shared(first_segment)
+
+    @property
+    def segment_size(self) -> int:
+        """每段的字节数。"""
+        return self.segment_pages * self.page_size
+
+    @property
+    def nbytes(self) -> int:
+        """页面区已分配的字节数。"""
+        return len(self._segments) * self.segment_size
+
+    def segment_name(self, index: int) -> str:
+        """共享页面区中第index段的名称。
+
+        Args:
+            index: 段序号
+
+        Returns:
+            str: 共享内存段名称
+        """
+        return f"{self.name}_{index}"
+
+    def page(self, page_num: int) -> memoryview:
+        """返回页面的可写视图，页面区不够大时追加新段。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            memoryview: 页面视图
+        """
+        index, slot = divmod(page_num, self.segment_pages)
+        while len(self._segments) <= index:
+            self._grow()
+        offset = slot * self.page_size
+        return self._segments[index][offset:offset + self.page_size]
+
+    def _grow(self) -> None:
+        """追加一个段：私有页面区分配新内存，共享页面区打开或创建下一个共享内存段。"""
+        if self.name is None:
+            self._segments.append(memoryview(bytearray(self.segment_size)))
+            return
+
+        name = self.segment_name(len(self._segments))
+        try:
+            segment = _open_segment(name)
+        except FileNotFoundError:
+            segment = _open_segment(name, create=True, size=self.segment_size)
+        self._add_shared(segment)
+
+    def _add_shared(self, segment) -> None:
+        """记录已打开的共享内存段。
+
+        Args:
+            segment: 共享内存段
+        """
+        self._shared.append(segment)
+        self._segments.append(segment.buf[:self.segment_size])
+
+    def truncate(self, num_pages: int) -> None:
+        """释放私有页面区中完全位于num_pages之后的段。
+
+        共享页面区的段可能仍被其他进程映射，不会释放。
+
+        Args:
+            num_pages: 需要保留的页数
+        """
+        if self.name is not None:
+            return
+        keep = -(-num_pages // self.segment_pages)
+        del self._segments[keep:]
+
+    def close(self, unlink: bool = False) -> None:
+        """关闭页面区。
+
+        Args:
+            unlink: 是否删除该名称下的所有共享内存段（包括其他进程追加的段）
+        """
+        self._segments.clear()
+        for segment in self._shared:
+            try:
+                segment.close()
+            except BufferError:
+                pass  # 仍有页面视图被引用，映射在最后一个视图释放后自动关闭
+        self._shared.clear()
+        if not unlink or self.name is None:
+            return
+
+        index = 0
+        while True:
+            try:
+                segment = _open_segment(self.segment_name(index))
+            except FileNotFoundError:
+                return
+            _unlink_segment(segment)
+            segment.close()
+            index += 1
+
+
+class MemoryPager(ConcurrentPager):
+    """内存数据库的页面管理器。
+
+    页面保存在页面区（PageArena）中，缓冲池的页帧直接是页面区的视图，
+    缓存未命中不分配内存，页面也从不淘汰。私有内存数据库没有文件、
+    锁和路径，刷新只更新文件头页。
+
+    指定shared_name时页面区位于以该名称命名的共享内存段中，其他进程用同一
+    名称打开即可共享数据库。创建数据库的连接拥有它，关闭时删除所有共享内存段；
+    之后仍在使用的连接不受影响，但该名称不能再被打开。
+
+    Attributes:
+        shared_name: 共享内存数据库名称，None表示私有内存数据库
+        owner: 本连接是否创建（并拥有）该数据库
+        arena: 页面区
+
+    Examples:
+        >>> pager = MemoryPager()
+        >>> shared = MemoryPager(shared_name="cache")  # 另一个进程用同一名称打开
+    """
+
+    def __init__(self, shared_name: Optional[str] = None, page_size: Optional[int] = None):
+        """初始化内存页面管理器。
+
+        Args:
+            shared_name: 共享内存数据库名称，None表示私有内存数据库
+            page_size: 新建数据库的页面大小，打开已有的共享内存数据库时使用其中记录的值
+
+        Raises:
+            StorageError: 如果页面大小无效，或平台不支持共享内存数据库
+        """
+        if shared_name is not None and fcntl is None:
+            raise StorageError("Shared in-memory databases require POSIX shared memory")
+        self.shared_name = shared_name
+        self.owner = True
+        self.arena: Optional[PageArena] = None
+        self._shared_lock: Optional[SharedMemoryLock] = None
+        super().__init__(":memory:", cache_size=None, page_size=page_size, read_ahead=0)
+
+    def _detect_page_size(self, requested: Optional[int]) -> int:
+        """确定页面大小并打开页面区。
+
+        共享内存数据库先尝试创建第一个段：创建成功的连接在写入文件头之前
+        一直持有独占锁；段已存在时在共享锁下读取其中记录的页面大小。
+
+        Args:
+            requested: 调用方要求的页面大小，None表示默认值
+
+        Returns:
+            int: 页面大小（字节）
+        """
+        page_size = super()._detect_page_size(requested)
+        if self.shared_name is None:
+            self.arena = PageArena(page_size)
+            return page_size
+
+        name = MEMORY_SHARED_PREFIX + self.shared_name
+        first_name = f"{name}_0"
+        try:
+            first = _open_segment(first_name, create=True, size=MEMORY_SEGMENT_PAGES * page_size)
+            self._shared_lock = SharedMemoryLock(self.shared_name, first._fd)
+            self._shared_lock.acquire(LockState.EXCLUSIVE)
+        except FileExistsError:
+            first = _open_segment(first_name)
+            self._shared_lock = SharedMemoryLock(self.shared_name, first._fd)
+            self.owner = False
+            page_size = self._peek_shared_page_size(first)
+        self.arena = PageArena(page_size, name=name, first_segment=first)
+        return page_size
+
+    def _peek_shared_page_size(self, first) -> int:
+        """读取已有共享内存数据库的页面大小。
+
+        创建者在写入文件头之前持有独占锁，但打开者可能在它加锁之前就获得了共享锁，
+        此时文件头仍为全零，稍后重试。
+
+        Args:
+            first: 第一个共享内存段
+
+        Returns:
+            int: 页面大小（字节）
+
+        Raises:
+            StorageError: 如果超时后仍读不到有效的文件头
+        """
+        deadline = time.monotonic() + (self._shared_lock.timeout or LOCK_TIMEOUT)
+        while True:
+            with self._shared_lock.holding(LockState.SHARED):
+                data = bytes(first.buf[:HEADER_STRUCT.size])
+            if any(data):
+                return DatabaseHeader.peek_page_size(data)
+            if time.monotonic() >= deadline:
+                raise StorageError(f"Shared in-memory database {self.shared_name!r} is not initialized")
+            time.sleep(0.001)
+
+    def _create_file_lock(self) -> Optional[FileLock]:
+        """私有内存数据库不加锁，共享内存数据库使用共享内存段上的锁。
+
+        Returns:
+            共享内存锁，私有内存数据库为None
+        """
+        return self._shared_lock
+
+    def _create_buffer_pool(self, cache_size: Optional[int],
+                            cache_bytes: Optional[int]) -> BufferPool:
+        """创建页帧位于页面区中的缓冲池（不限容量，没有回写）。
+
+        Args:
+            cache_size: 忽略
+            cache_bytes: 忽略
+
+        Returns:
+            BufferPool: 缓冲池
+        """
+        return BufferPool(self.page_size, loader=self._load_page, allocator=self.arena.page)
+
+    def _open_file_concurrent(self):
+        """初始化文件头页，打开已有的共享内存数据库时从第0页读取文件头。"""
+        if self.owner:
+            self._init_header()
+            self.flush()  # 写入文件头并释放创建时持有的独占锁
+            return
+
+        with self.file_lock.holding(LockState.SHARED):
+            self.header = DatabaseHeader.unpack(bytes(self.arena.page(HEADER_PAGE_NUM)))
+        self.num_pages = self.header.page_count
+
+    @property
+    def lock_state(self) -> LockState:
+        """当前持有的锁状态，私有内存数据库始终为UNLOCKED。"""
+        return self.file_lock.state if self.file_lock is not None else LockState.UNLOCKED
+
+    def _lock(self, state: LockState) -> None:
+        """共享内存数据库按需升级锁，从未加锁状态获取锁时检查文件头。
+
+        flock把共享锁转换为独占锁时先释放共享锁，其他连接可能在这个间隙中提交，
+        本连接持有共享锁期间读到的页面和文件头随之过期。因此从SHARED升级之后
+        重新检查变更计数器，发现其他连接提交过时丢弃升级并抛出BusyError，
+        调用方回滚后重试，不在过期的数据上继续修改。
+
+        Args:
+            state: 需要的锁状态
+
+        Raises:
+            BusyError: 如果升级期间其他连接提交过
+            LockError: 如果在超时时间内无法获得锁
+        """
+        if self.file_lock is None or self.file_lock.state.value >= state.value:
+            return
+        previous = self.file_lock.state
+        self.file_lock.acquire(state)
+        if previous == LockState.UNLOCKED:
+            self._validate_cache()
+            return
+        header = DatabaseHeader.unpack(bytes(self.arena.page(HEADER_PAGE_NUM)))
+        if header.change_counter != self.header.change_counter:
+            self.file_lock.downgrade(previous)
+            self._validate_cache()
+            raise BusyError(f"database changed while upgrading the lock: {self.shared_name}")
+
+    def _reserve(self) -> None:
+        """修改页面前获取独占锁：页面直接在共享内存中修改，其他连接不能同时读取。
+
+        写事务（见begin_write）在开始时就已持有独占锁，这里不需要升级。
+
+        Raises:
+            BusyError: 如果从SHARED升级期间其他连接提交过
+            LockError: 如果在超时时间内无法获得锁
+        """
+        try:
+            self._lock(LockState.EXCLUSIVE)
+        except BusyError:
+            if not self._read_transaction:
+                self.file_lock.release()
+            raise
+
+    def _validate_cache(self) -> None:
+        """其他连接提交后重新加载文件头。
+
+        页帧就是共享内存本身，始终是最新数据，只需丢弃超出新高水位线的页帧。
+        """
+        header = DatabaseHeader.unpack(bytes(self.arena.page(HEADER_PAGE_NUM)))
+        if header.change_counter == self.header.change_counter:
+            return
+
+        with self.buffer_pool.lock:
+            stale = [page_num for page_num in self.buffer_pool.frames if page_num >= header.page_count]
+            for page_num in stale:
+                self.buffer_pool.discard(page_num)
+            self.header = header
+            self.num_pages = header.page_count
+            self._header_dirty = False
+            self.cache_epoch += 1
+            self.cache_invalidations += len(stale)
+
+    def end_read(self) -> None:
+        """结束读事务，释放共享锁。"""
+        self._read_transaction = False
+        if self.file_lock is not None and self.file_lock.state.value <= LockState.SHARED.value:
+            self.file_lock.release()
+
+    def _load_page(self, page_num: int) -> memoryview:
+        """缓冲池未命中时返回页面区中的页面，新页面清零。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            memoryview: 页面视图
+        """
+        page = self.arena.page(page_num)
+        if page_num >= self.num_pages:
+            page[:] = bytes(self.page_size)
+            self.num_pages = page_num + 1
+        return page
+
+    def shrink(self, num_pages: int) -> None:
+        """将数据库缩小到指定页数，释放私有页面区末尾不再使用的段。
+
+        Args:
+            num_pages: 新的页数（高水位线）
+        """
+        super().shrink(num_pages)
+        self.arena.truncate(num_pages)
+
+    def flush(self):
+        """提交：把文件头写入第0页并清除脏标记，共享内存数据库同时递增变更计数器。"""
+        with self.buffer_pool.lock:
+            dirty_pages = self.buffer_pool.dirty_pages()
+            if self.shared_name is not None and (self._header_dirty or dirty_pages
+                                                 or self.header.page_count != self.num_pages):
+                self._reserve()  # 文件头页同样直接写入共享内存
+                self._bump_change_counter()
+            self._sync_header()
+            for page_num in self.buffer_pool.dirty_pages():
+                self.buffer_pool.clear_dirty(page_num)
+        if self.file_lock is not None:
+            self.file_lock.downgrade(self._resting_lock_state())
+
+    def sync(self) -> None:
+        """内存数据库没有持久存储，只执行提交。"""
+        self.flush()
+
+    def get_cache_stats(self) -> dict:
+        """获取缓冲池和页面区统计信息。
+
+        Returns:
+            缓冲池统计信息，另含页面区已分配的字节数
+        """
+        stats = super().get_cache_stats()
+        stats['arena_bytes'] = self.arena.nbytes
+        return stats
+
+    def close(self):
+        """关闭数据库，拥有共享内存数据库的连接同时删除其共享内存段。"""
+        if self.arena is None:
+            return
+        if self.shared_name is not None:
+            self.flush()
+        self.buffer_pool.clear()
+        if self.file_lock is not None:
+            self.file_lock.close()
+        self.arena.close(unlink=self.shared_name is not None and self.owner)
+        self.arena = None
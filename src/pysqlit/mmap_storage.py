@@ -0,0 +1,262 @@
+"""内存映射存储模块，为读密集型负载提供零拷贝的页面访问。
+
+该模块实现了基于mmap的页面管理器，包括：
+- 以只读方式映射整个数据库文件
+- get_page直接返回映射区域的memoryview切片，读取无需拷贝
+- 写时复制：修改页面时复制到缓冲池的页帧并标记为脏页
+- 文件按大块增长并重新映射
+- 启用了校验和的文件在页面第一次从映射读取时验证
+
+写入仍然经过缓冲池的脏页路径，由flush统一写回磁盘，
+因此持久性语义与ConcurrentPager一致。
+"""
+
+import mmap
+import os
+import time
+from typing import Optional, Union
+
+from .concurrent_storage import ConcurrentPager, LockState
+from .constants import (DEFAULT_CACHE_SIZE, MMAP_GROWTH_PAGES, CHECKSUM_VERIFY_ALWAYS,
+                        READAHEAD_PAGES, ALLOCATION_GROWTH_RATIO, REPLACEMENT_LRU)
+from .exceptions import StorageError
+
+
+class MmapPager(ConcurrentPager):
+    """内存映射页面管理器。
+    
+    未被修改的页面以映射区域的只读视图返回，重复打开同一文件时
+    由操作系统的页面缓存提供数据。修改页面前需调用get_writable_page
+    换取可写副本，B树节点会自动完成这一步。
+    
+    注意：持有的只读视图在同一页面被修改后不会看到新数据，
+    需要重新调用get_page获取最新内容。
+    
+    Attributes:
+        mapped_pages: 当前映射覆盖的页数
+        mapped_reads: 直接由映射区域提供的页面读取次数
+    
+    Examples:
+        >>> pager = MmapPager("example.db")
+        >>> page = pager.get_page(1)          # 只读memoryview，零拷贝
+        >>> page = pager.get_writable_page(1) # 可写副本，位于缓冲池
+    """
+    
+    allocation_extent_pages = MMAP_GROWTH_PAGES  # 按大块增长，减少重新映射次数
+    
+    def __init__(self, filename: str, cache_size: Optional[int] = DEFAULT_CACHE_SIZE,
+                 cache_bytes: Optional[int] = None, track_page_versions: bool = False,
+                 background_writer: bool = False, page_size: Optional[int] = None,
+                 compression: Optional[str] = None, checksums: bool = False,
+                 verify_checksums: str = CHECKSUM_VERIFY_ALWAYS,
+                 read_ahead: int = READAHEAD_PAGES, read_ahead_background: bool = False,
+                 extent_size: Optional[int] = None,
+                 extent_growth: float = ALLOCATION_GROWTH_RATIO, preallocate: bool = True,
+                 replacement_policy: str = REPLACEMENT_LRU, warm_cache: bool = False):
+        """初始化内存映射页面管理器。
+        
+        Args:
+            filename: 数据库文件名
+            cache_size: 缓冲池容量（页数），None表示不限制
+            cache_bytes: 缓冲池容量（字节），优先于cache_size
+            track_page_versions: 是否在文件中启用页面版本表
+            background_writer: 是否启动后台写线程
+            page_size: 新建数据库的页面大小，已有数据库使用文件头中记录的值
+            compression: 页面压缩算法，内存映射模式不支持压缩，只能为None
+            checksums: 新建数据库是否在每页末尾保留CRC32校验和
+            verify_checksums: 读取页面时的校验模式：'always'、'sampled'或'off'
+            read_ahead: 映射范围之外的页面顺序访问时一次预读的最大页数，0表示不预读
+                （映射范围内的页面由操作系统预读）
+            read_ahead_background: 是否由工作线程读取预读窗口
+            extent_size: 文件增长时一次扩展的最少字节数，默认为MMAP_GROWTH_PAGES页
+            extent_growth: 区段至少为当前文件大小的该比例
+            preallocate: 是否用posix_fallocate为新区段分配磁盘块
+            replacement_policy: 缓冲池的页面替换策略：'lru'、'2q'或'arc'
+            warm_cache: 是否在关闭时保存热点页列表，并在打开时按列表预热缓冲池
+            
+        Raises:
+            StorageError: 如果是内存数据库或压缩数据库
+        """
+        if filename == ":memory:":
+            raise StorageError("Memory-mapped mode requires a file-backed database")
+        if compression is not None:
+            raise StorageError("Memory-mapped mode does not support compressed databases")
+        
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self.mapped_pages = 0
+        self.mapped_reads = 0
+        self._verified_pages = set()  # 当前映射中已通过校验的页面
+        self._verified_epoch = 0
+        super().__init__(filename, cache_size=cache_size, cache_bytes=cache_bytes,
+                         track_page_versions=track_page_versions,
+                         background_writer=background_writer, page_size=page_size,
+                         checksums=checksums, verify_checksums=verify_checksums,
+                         read_ahead=read_ahead, read_ahead_background=read_ahead_background,
+                         extent_size=extent_size, extent_growth=extent_growth,
+                         preallocate=preallocate, replacement_policy=replacement_policy,
+                         warm_cache=warm_cache)
+        if self.page_map.enabled:
+            # 压缩页面无法直接从映射区域读取
+            self.close()
+            raise StorageError("Memory-mapped mode does not support compressed databases")
+        self._remap()
+    
+    def _remap(self) -> None:
+        """按当前文件大小重新建立映射。
+        
+        旧映射不显式关闭：仍在使用的页面视图保持有效，
+        映射在最后一个视图释放后自动关闭。
+        """
+        with self.buffer_pool.lock:
+            length = os.fstat(self.file_descriptor.fileno()).st_size
+            length -= length % self.page_size
+            self._view = None
+            self._map = None
+            self.mapped_pages = 0
+            self._verified_pages.clear()
+            if length == 0:
+                return
+            
+            self._map = mmap.mmap(self.file_descriptor.fileno(), length, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+            self.mapped_pages = length // self.page_size
+    
+    def _is_mapped(self, page_num: int) -> bool:
+        """检查页面是否可以直接从映射区域读取。
+        
+        文件在映射之后被刷新写入扩展时会先重新映射。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            页面位于映射范围内且已分配时返回True
+        """
+        if page_num >= self.mapped_pages and page_num * self.page_size < self.file_length:
+            self._remap()
+        return page_num < self.mapped_pages and page_num < self.num_pages
+    
+    def _mapped_page(self, page_num: int) -> memoryview:
+        """返回映射区域中页面的只读视图。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            只读memoryview
+        """
+        offset = page_num * self.page_size
+        return self._view[offset:offset + self.page_size]
+    
+    def _ensure_file_capacity(self, num_pages: int) -> None:
+        """确保文件至少能容纳指定页数，文件增长后重新映射。
+        
+        Args:
+            num_pages: 需要容纳的页数
+        """
+        super()._ensure_file_capacity(num_pages)
+        if self.file_length // self.page_size > self.mapped_pages:
+            self._remap()
+    
+    def _load_page(self, page_num: int) -> Union[bytes, memoryview]:
+        """缓冲池未命中时加载页面，映射范围内的页面直接从映射复制。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            页面数据
+        """
+        if self._view is not None and self._is_mapped(page_num):
+            # 缓冲池直接从映射复制到页帧，复制时可能触发缺页，同样按物理读统计
+            started = time.perf_counter()
+            page = self._mapped_page(page_num)
+            self.io_stats.record_read(len(page), time.perf_counter() - started)
+            self._verify_page(page_num, page)
+            return page
+        return super()._load_page(page_num)
+    
+    def get_page(self, page_num: int) -> Union[bytearray, memoryview]:
+        """获取页面。
+        
+        缓冲池中已有的页面（包括已修改的页面）返回其页帧；
+        否则映射范围内的页面返回只读视图，不产生拷贝。
+        视图在当前映射中第一次返回前按校验模式验证。
+        
+        Args:
+            page_num: 页号
+            
+        Returns:
+            页帧数据或只读memoryview
+            
+        Raises:
+            ChecksumError: 如果页面与页尾校验和不一致
+        """
+        self.io_stats.page_requests += 1
+        self._lock(LockState.SHARED)  # 与从文件读取一样需要SHARED锁
+        with self.buffer_pool.lock:
+            if page_num in self.buffer_pool or not self._is_mapped(page_num):
+                return self.buffer_pool.get(page_num)
+            self.mapped_reads += 1
+            view = self._mapped_page(page_num)
+            if self._verified_epoch != self.cache_epoch:
+                # 其他连接提交后映射中的页面可能已被改写
+                self._verified_pages.clear()
+                self._verified_epoch = self.cache_epoch
+            if page_num not in self._verified_pages:
+                self._verify_page(page_num, view)
+                self._verified_pages.add(page_num)
+            return view
+    
+    def get_cache_stats(self) -> dict:
+        """获取缓冲池和映射统计信息。
+        
+        Returns:
+            缓冲池统计信息，另含映射页数和映射读取次数
+        """
+        stats = super().get_cache_stats()
+        stats['mapped_pages'] = self.mapped_pages
+        stats['mapped_reads'] = self.mapped_reads
+        return stats
+    
+    def get_io_stats(self) -> dict:
+        """获取I/O统计信息。
+        
+        Returns:
+            I/O统计信息，另含直接由映射区域提供的页面读取次数
+        """
+        stats = super().get_io_stats()
+        stats['mapped_reads'] = self.mapped_reads
+        return stats
+    
+    def reset_io_stats(self) -> None:
+        """将I/O统计信息和映射读取次数清零。"""
+        super().reset_io_stats()
+        self.mapped_reads = 0
+    
+    def truncate(self, new_size: int):
+        """截断文件到指定大小并重新映射。
+        
+        Args:
+            new_size: 新的文件大小
+        """
+        super().truncate(new_size)
+        self.file_length = min(self.file_length, new_size)
+        self._remap()
+    
+    def close(self):
+        """刷新脏页、解除映射并关闭文件。"""
+        if self.file_descriptor is None:
+            return
+        
+        super().close()
+        mapping = self._map
+        self._view = None
+        self._map = None
+        self.mapped_pages = 0
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # 仍有页面视图在使用，映射在视图释放后自动关闭
@@ -23,6 +23,8 @@ from enum import Enum
 from typing import Tuple, Dict, List, Any, Optional, Union
 from dataclasses import dataclass
 
+from .overflow import OverflowValue
+
 
 class MetaCommandResult(Enum):
     """元命令处理结果枚举。
@@ -598,8 +600,11 @@ class Row:
     
     表示数据库中的一行数据，支持动态列和序列化/反序列化功能。
     
+    从溢出页链反序列化的行只解码内联前缀中完整的列，其余列在第一次
+    访问时才读取溢出页链，只用到前面几列的查询不必读取大值。
+    
     Attributes:
-        data: 行数据字典（列名 -> 值）
+        data: 行数据字典（列名 -> 值），访问时加载尚未读取的列
     
     Examples:
         >>> row = Row(id=1, name="张三", email="zhangsan@example.com")
@@ -614,6 +619,39 @@ class Row:
             **kwargs: 列名和值的键值对
         """
         self.data = kwargs
+    
+    @property
+    def data(self) -> Dict[str, Any]:
+        """行数据字典，必要时先读取溢出页链中的列。"""
+        return self._load()
+    
+    @data.setter
+    def data(self, value: Dict[str, Any]) -> None:
+        """替换全部行数据（丢弃尚未读取的列）。"""
+        super().__setattr__('_values', value)
+        super().__setattr__('_overflow', None)
+    
+    @property
+    def loaded(self) -> bool:
+        """所有列是否都已解码。"""
+        return self.__dict__.get('_overflow') is None
+    
+    def _load(self) -> Dict[str, Any]:
+        """读取溢出页链中尚未解码的列。
+        
+        直接访问实例字典，加载过程中的AttributeError不会经由__getattr__重新进入data属性。
+        
+        Returns:
+            Dict[str, Any]: 完整的行数据字典
+        """
+        state = self.__dict__
+        if state.get('_overflow') is not None:
+            value, schema = state['_overflow']
+            values = Row.deserialize(value.read(), schema).__dict__['_values']
+            values.update(state['_values'])
+            state['_values'] = values
+            state['_overflow'] = None
+        return state.setdefault('_values', {})
         
     def __getattr__(self, name):
         """动态属性访问。
@@ -629,8 +667,15 @@ class Row:
         Raises:
             AttributeError: 如果列不存在
         """
-        if name in self.data:
-            return self.data[name]
+        if name == 'data' or name.startswith('_'):
+            raise AttributeError(name)
+        state = self.__dict__
+        if name in state.get('_values', {}):
+            return state['_values'][name]
+        if state.get('_overflow') is not None:
+            values = self._load()
+            if name in values:
+                return values[name]
         raise AttributeError(f"Column '{name}' not found")
         
     def __setattr__(self, name, value):
@@ -677,6 +722,9 @@ class Row:
         Returns:
             Any: 列值，不存在返回None
         """
+        values = self.__dict__.get('_values', {})
+        if column_name in values:
+            return values[column_name]
         return self.data.get(column_name)
         
     def set_value(self, column_name: str, value: Any):
@@ -742,10 +790,9 @@ class Row:
                     result += struct.pack('<d', float(value))
                 elif col_def.data_type == DataType.TEXT:
                     text_value = str(value)
-                    max_len = col_def.max_length or 255
-                    # 必要时截断
-                    if len(text_value) > max_len:
-                        text_value = text_value[:max_len]
+                    # 只按列定义的最大长度截断，长文本由B树溢出页链存放
+                    if col_def.max_length and len(text_value) > col_def.max_length:
+                        text_value = text_value[:col_def.max_length]
                     # 转换为字节
                     text_bytes = text_value.encode('utf-8')
                     result += struct.pack('<I', len(text_bytes))
@@ -765,16 +812,21 @@ class Row:
         """根据表模式将字节流反序列化为行数据。
         
         Args:
-            data: 序列化后的字节数据
+            data: 序列化后的字节数据，或叶子节点返回的OverflowValue
             schema: 表模式对象
             
         Returns:
-            Row: 反序列化后的行对象
+            Row: 反序列化后的行对象（溢出的行延迟解码内联前缀之后的列）
             
         Examples:
             >>> row = Row.deserialize(data, schema)
             >>> print(row.id)  # 1
         """
+        if isinstance(data, OverflowValue):
+            if data.loaded:
+                return cls.deserialize(data.read(), schema)
+            return cls._deserialize_prefix(data, schema)
+        
         # 空数据返回空行
         if not data or len(data) == 0:
             return cls()
@@ -850,6 +902,47 @@ class Row:
                 row_data[col_name] = None
         
         return cls(**row_data)
+    
+    @classmethod
+    def _deserialize_prefix(cls, value: OverflowValue, schema: TableSchema) -> 'Row':
+        """只解码溢出行内联前缀中完整的前导列，其余列留待访问时读取。
+        
+        Args:
+            value: 溢出的行数据
+            schema: 表模式对象
+            
+        Returns:
+            Row: 部分解码的行对象
+        """
+        prefix = value.prefix
+        offset = 0
+        complete = []
+        for col_name, col_def in schema.columns.items():
+            # NULL标记需要4个字节才能判断，前缀不足时和完整数据的解码结果可能不同
+            if offset + 4 > len(prefix):
+                break
+            # 列宽与deserialize的解码规则一致
+            data_type = col_def.data_type.value
+            if prefix[offset:offset + 4] == b'\x00\x00\x00\x00':
+                size = 4
+            elif data_type == 'REAL':
+                size = 8
+            elif data_type == 'TEXT':
+                size = 4 + struct.unpack_from('<I', prefix, offset)[0]
+            elif data_type == 'BOOLEAN':
+                size = 1
+            else:
+                size = 4
+            if offset + size > len(prefix):
+                break
+            offset += size
+            complete.append(col_name)
+        
+        decoded = cls.deserialize(prefix[:offset], schema).__dict__['_values']
+        row = cls(**{col_name: decoded[col_name] for col_name in complete})
+        if len(complete) < len(schema.columns):
+            super(Row, row).__setattr__('_overflow', (value, schema))
+        return row
 
 
 # 验证常量定义
@@ -0,0 +1,200 @@
+"""溢出页模块，存储放不进叶子单元格的大值。
+
+超过叶子节点内联上限的值只在单元格中保留一段内联前缀和第一个溢出页的页号，
+其余部分依次写入溢出页链：
+
+- 溢出页结构：页面类型(1字节，NODE_OVERFLOW) + 保留(1字节) + 下一个溢出页页号(4字节) + 数据
+- 最后一个溢出页的下一页页号为0
+
+读取时返回OverflowValue：内联前缀立即可用，溢出页链只在真正需要完整值时才读取。
+"""
+
+import struct
+from typing import List, Optional
+
+from .constants import NODE_OVERFLOW, OVERFLOW_PAGE_HEADER_SIZE
+from .exceptions import StorageError
+
+# 溢出页头结构：页面类型(1) + 保留(1) + 下一个溢出页页号(4)
+OVERFLOW_PAGE_HEADER = struct.Struct('<BxI')
+
+
+def overflow_capacity(pager) -> int:
+    """获取每个溢出页可存放的数据字节数。
+
+    Args:
+        pager: 分页管理器
+
+    Returns:
+        int: 页面可用区域减去溢出页头部的字节数
+    """
+    return pager.usable_size - OVERFLOW_PAGE_HEADER_SIZE
+
+
+def write_overflow(pager, data: bytes) -> int:
+    """把数据写入新分配的溢出页链。
+
+    Args:
+        pager: 分页管理器
+        data: 要写入的数据（非空）
+
+    Returns:
+        int: 第一个溢出页的页号
+    """
+    chunk = overflow_capacity(pager)
+    pages = [pager.allocate_page() for _ in range(0, len(data), chunk)]
+    for i, page_num in enumerate(pages):
+        next_page = pages[i + 1] if i + 1 < len(pages) else 0
+        part = data[i * chunk:(i + 1) * chunk]
+        page = pager.get_writable_page(page_num)
+        OVERFLOW_PAGE_HEADER.pack_into(page, 0, NODE_OVERFLOW, next_page)
+        page[OVERFLOW_PAGE_HEADER_SIZE:OVERFLOW_PAGE_HEADER_SIZE + len(part)] = part
+        pager.mark_dirty(page_num)
+    return pages[0]
+
+
+def overflow_chain(pager, first_page: int) -> List[int]:
+    """获取溢出页链上的全部页号。
+
+    Args:
+        pager: 分页管理器
+        first_page: 第一个溢出页的页号
+
+    Returns:
+        按链表顺序排列的页号
+
+    Raises:
+        StorageError: 如果链上的页面不是溢出页或链表有环
+    """
+    pages = []
+    seen = set()
+    page_num = first_page
+    while page_num:
+        if page_num in seen:
+            raise StorageError(f"Overflow chain starting at page {first_page} has a cycle")
+        page_type, next_page = OVERFLOW_PAGE_HEADER.unpack_from(pager.get_page(page_num))
+        if page_type != NODE_OVERFLOW:
+            raise StorageError(f"Page {page_num} is not an overflow page")
+        seen.add(page_num)
+        pages.append(page_num)
+        page_num = next_page
+    return pages
+
+
+def read_overflow(pager, first_page: int, size: int) -> bytes:
+    """读取溢出页链中的数据。
+
+    Args:
+        pager: 分页管理器
+        first_page: 第一个溢出页的页号
+        size: 溢出部分的字节数
+
+    Returns:
+        溢出部分的数据
+
+    Raises:
+        StorageError: 如果链表比记录的长度短或已损坏
+    """
+    chunk = overflow_capacity(pager)
+    parts = []
+    remaining = size
+    page_num = first_page
+    with pager.pinned():
+        while remaining > 0:
+            if not page_num:
+                raise StorageError(f"Overflow chain starting at page {first_page} is truncated")
+            page = pager.get_page(page_num)
+            page_type, next_page = OVERFLOW_PAGE_HEADER.unpack_from(page)
+            if page_type != NODE_OVERFLOW:
+                raise StorageError(f"Page {page_num} is not an overflow page")
+            length = min(chunk, remaining)
+            parts.append(bytes(page[OVERFLOW_PAGE_HEADER_SIZE:OVERFLOW_PAGE_HEADER_SIZE + length]))
+            remaining -= length
+            page_num = next_page
+    return b''.join(parts)
+
+
+def free_overflow(pager, first_page: int) -> int:
+    """释放整个溢出页链。
+
+    Args:
+        pager: 分页管理器
+        first_page: 第一个溢出页的页号
+
+    Returns:
+        int: 释放的页数
+    """
+    pages = overflow_chain(pager, first_page)
+    for page_num in pages:
+        pager.free_page(page_num)
+    return len(pages)
+
+
+class OverflowValue:
+    """溢出到页链的值：叶子中的内联前缀加上按需读取的剩余部分。
+
+    对象创建时记录分页管理器的缓存纪元；读取溢出页链时如果其他连接
+    已经提交过修改（缓存被整体作废），链上的页面可能已被释放或复用，
+    此时抛出异常而不是返回错误的数据。
+
+    Attributes:
+        pager: 分页管理器
+        prefix: 内联在叶子单元格中的前缀
+        size: 完整值的字节数
+        first_page: 第一个溢出页的页号
+
+    Examples:
+        >>> value = leaf.value(0)
+        >>> value.prefix[:4]
+        >>> data = value.read()
+    """
+
+    def __init__(self, pager, prefix: bytes, size: int, first_page: int) -> None:
+        """初始化溢出值。
+
+        Args:
+            pager: 分页管理器
+            prefix: 内联前缀
+            size: 完整值的字节数
+            first_page: 第一个溢出页的页号
+        """
+        self.pager = pager
+        self.prefix = prefix
+        self.size = size
+        self.first_page = first_page
+        self._epoch = getattr(pager, 'cache_epoch', 0)
+        self._data: Optional[bytes] = None
+
+    def __len__(self) -> int:
+        """完整值的字节数。"""
+        return self.size
+
+    def __bytes__(self) -> bytes:
+        """完整值。"""
+        return self.read()
+
+    def __repr__(self) -> str:
+        """字符串表示。"""
+        return f"OverflowValue(size={self.size}, first_page={self.first_page})"
+
+    @property
+    def loaded(self) -> bool:
+        """溢出页链是否已经读取过。"""
+        return self._data is not None
+
+    def read(self) -> bytes:
+        """读取完整值（结果会被缓存）。
+
+        Returns:
+            完整值
+
+        Raises:
+            StorageError: 如果值被读出后数据库已被其他连接修改，或溢出页链已损坏
+        """
+        if self._data is None:
+            with self.pager.reading():
+                rest = read_overflow(self.pager, self.first_page, self.size - len(self.prefix))
+                if getattr(self.pager, 'cache_epoch', 0) != self._epoch:
+                    raise StorageError("Database changed before the overflow pages of a row were read")
+            self._data = self.prefix + rest
+        return self._data
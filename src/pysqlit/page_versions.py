@@ -0,0 +1,164 @@
+"""页面版本表模块，支持跨进程的选择性缓存失效。
+
+每次提交时文件头中的变更计数器递增，本次提交写回的每个页面在版本表中
+记录为新的计数器值。另一个进程获取共享锁时如果发现计数器变化，
+只需丢弃版本号大于自己上次所见计数器的缓存页面，其余缓存保持有效。
+
+版本表是一条页链，起始页记录在文件头的page_versions_root中，每页的结构为：
+- 下一页页号(4字节)，0表示链表结束
+- 本页已使用的条目数(4字节)
+- 条目数组：每个条目是对应页面的版本号(4字节)
+
+第i个版本页记录页号在[i * entries_per_page, (i + 1) * entries_per_page)范围内的页面。
+页头布局与模式页链相同，整理数据库时可以用同样的方式改写next指针。
+"""
+
+import struct
+from typing import Callable, Iterable, List, Set
+
+from .exceptions import StorageError
+
+
+# 版本页头结构：下一页页号(4) + 已使用条目数(4)
+PAGE_VERSIONS_PAGE_HEADER = struct.Struct('<II')
+PAGE_VERSION_ENTRY = struct.Struct('<I')
+
+
+class PageVersionTable:
+    """持久化的页面版本表。
+
+    版本表一旦在文件中启用，所有写入该文件的连接都会维护它。
+
+    Attributes:
+        pager: 带文件头的分页管理器
+
+    Examples:
+        >>> versions = PageVersionTable(pager)
+        >>> versions.enable()
+        >>> versions.record([3, 7], version=12)
+    """
+
+    def __init__(self, pager) -> None:
+        """初始化页面版本表。
+
+        Args:
+            pager: 带文件头的分页管理器（ConcurrentPager及其子类）
+        """
+        self.pager = pager
+
+    @property
+    def entries_per_page(self) -> int:
+        """每个版本页能记录的页面数。"""
+        return (self.pager.usable_size - PAGE_VERSIONS_PAGE_HEADER.size) // PAGE_VERSION_ENTRY.size
+
+    @property
+    def enabled(self) -> bool:
+        """文件是否启用了页面版本表。"""
+        return self.pager.header.page_versions_root != 0
+
+    def enable(self) -> None:
+        """在文件中启用页面版本表（已启用时不做任何事）。"""
+        if self.enabled:
+            return
+        root = self.pager.allocate_page()
+        self.pager.write_page(root, PAGE_VERSIONS_PAGE_HEADER.pack(0, 0))
+        self.pager.header.page_versions_root = root
+        self.pager.update_header()
+
+    def _walk(self, read_page: Callable[[int], bytes]) -> List[int]:
+        """获取版本页链上的所有页号。
+
+        Args:
+            read_page: 读取页面数据的函数
+
+        Returns:
+            按链表顺序排列的页号
+
+        Raises:
+            StorageError: 如果版本页链存在环
+        """
+        pages = []
+        page_num = self.pager.header.page_versions_root
+        while page_num:
+            if page_num in pages:
+                raise StorageError("Page version chain contains a cycle")
+            pages.append(page_num)
+            page_num, _ = PAGE_VERSIONS_PAGE_HEADER.unpack_from(read_page(page_num))
+        return pages
+
+    def chain(self) -> List[int]:
+        """获取版本页链上的所有页号（通过缓冲池读取）。
+
+        Returns:
+            按链表顺序排列的页号
+        """
+        return self._walk(self.pager.get_page)
+
+    def record(self, page_nums: Iterable[int], version: int) -> None:
+        """记录页面在指定版本被修改。
+
+        版本页链不够长时分配新的版本页并链接到末尾。
+
+        Args:
+            page_nums: 被修改的页号
+            version: 新的变更计数器值
+        """
+        page_nums = sorted(page_nums)
+        if not page_nums or not self.enabled:
+            return
+
+        chain = self.chain()
+        needed = page_nums[-1] // self.entries_per_page + 1
+        while len(chain) < needed:
+            new_page = self.pager.allocate_page()
+            self.pager.write_page(new_page, PAGE_VERSIONS_PAGE_HEADER.pack(0, 0))
+            tail = self.pager.get_writable_page(chain[-1])
+            _, count = PAGE_VERSIONS_PAGE_HEADER.unpack_from(tail)
+            PAGE_VERSIONS_PAGE_HEADER.pack_into(tail, 0, new_page, count)
+            self.pager.mark_dirty(chain[-1])
+            chain.append(new_page)
+
+        for page_num in page_nums:
+            index, slot = divmod(page_num, self.entries_per_page)
+            version_page = chain[index]
+            page = self.pager.get_writable_page(version_page)
+            next_page, count = PAGE_VERSIONS_PAGE_HEADER.unpack_from(page)
+            PAGE_VERSION_ENTRY.pack_into(page, PAGE_VERSIONS_PAGE_HEADER.size + slot * PAGE_VERSION_ENTRY.size,
+                                         version)
+            if slot >= count:
+                PAGE_VERSIONS_PAGE_HEADER.pack_into(page, 0, next_page, slot + 1)
+            self.pager.mark_dirty(version_page)
+
+    def stale_pages(self, cached_pages: Iterable[int], since: int,
+                    read_page: Callable[[int], bytes]) -> Set[int]:
+        """找出在指定版本之后被其他连接修改过的缓存页面。
+
+        版本页本身和版本表没有覆盖到的页面总是视为过期。
+
+        Args:
+            cached_pages: 缓存中的页号
+            since: 上次所见的变更计数器值
+            read_page: 直接从文件读取页面数据的函数（不能经过缓存）
+
+        Returns:
+            需要丢弃的页号集合
+        """
+        chain = self._walk(read_page)
+        chain_set = set(chain)
+        pages = {}
+        stale = set()
+        for page_num in cached_pages:
+            index, slot = divmod(page_num, self.entries_per_page)
+            if page_num in chain_set or index >= len(chain):
+                stale.add(page_num)
+                continue
+            if index not in pages:
+                pages[index] = read_page(chain[index])
+            page = pages[index]
+            _, count = PAGE_VERSIONS_PAGE_HEADER.unpack_from(page)
+            if slot >= count:
+                continue  # 从未被记录修改过
+            offset = PAGE_VERSIONS_PAGE_HEADER.size + slot * PAGE_VERSION_ENTRY.size
+            if PAGE_VERSION_ENTRY.unpack_from(page, offset)[0] > since:
+                stale.add(page_num)
+        return stale
@@ -7,6 +7,7 @@
 - DELETE语句（支持WHERE子句）
 - CREATE TABLE语句（支持列定义）
 - DROP TABLE语句
+- VACUUM语句
 
 主要特性：
 1. 完整的SQL语法解析
@@ -36,6 +37,7 @@ class StatementType(Enum):
         DELETE: 删除语句
         CREATE_TABLE: 创建表语句
         DROP_TABLE: 删除表语句
+        VACUUM: 整理数据库语句
     """
     INSERT = "INSERT"
     SELECT = "SELECT"
@@ -43,6 +45,7 @@ class StatementType(Enum):
     DELETE = "DELETE"
     CREATE_TABLE = "CREATE_TABLE"
     DROP_TABLE = "DROP_TABLE"
+    VACUUM = "VACUUM"
 
 
 class WhereCondition:
@@ -458,10 +461,25 @@ class DropTableStatement:
         return f"DropTableStatement(table_name='{self.table_name}')"
 
 
+class VacuumStatement:
+    """VACUUM语句。
+    
+    表示SQL VACUUM整理数据库语句，重建数据库文件并回收空闲页。
+    """
+    
+    def __repr__(self):
+        """字符串表示。
+        
+        Returns:
+            str: 语句的字符串表示
+        """
+        return "VacuumStatement()"
+
+
 class EnhancedSQLParser:
     """增强型SQL解析器，提供完整的SQL语法解析功能。
     
-    支持INSERT、SELECT、UPDATE、DELETE、CREATE TABLE、DROP TABLE等语句的解析，
+    支持INSERT、SELECT、UPDATE、DELETE、CREATE TABLE、DROP TABLE、VACUUM等语句的解析，
     并提供详细的错误处理和语法验证。
     
     Examples:
@@ -503,6 +521,8 @@ class EnhancedSQLParser:
             return EnhancedSQLParser._parse_create_table(input_buffer)
         elif upper_buffer.startswith("DROP TABLE"):
             return EnhancedSQLParser._parse_drop_table(input_buffer)
+        elif upper_buffer.startswith("VACUUM"):
+            return EnhancedSQLParser._parse_vacuum(input_buffer)
         else:
             return PrepareResult.UNRECOGNIZED_STATEMENT, None
     
@@ -1052,6 +1072,20 @@ class EnhancedSQLParser:
                 return PrepareResult.SUCCESS, DropTableStatement(table_name)
             return PrepareResult.SYNTAX_ERROR, None
     
+    @staticmethod
+    def _parse_vacuum(input_buffer: str) -> Tuple[PrepareResult, Optional[VacuumStatement]]:
+        """解析VACUUM语句。
+        
+        Args:
+            input_buffer: VACUUM语句字符串
+            
+        Returns:
+            Tuple[PrepareResult, Optional[VacuumStatement]]: (解析结果, VACUUM语句对象)
+        """
+        if re.fullmatch(r'(?i)VACUUM\s*;?', input_buffer):
+            return PrepareResult.SUCCESS, VacuumStatement()
+        return PrepareResult.SYNTAX_ERROR, None
+    
     @staticmethod
     def _parse_where(where_str: str) -> WhereCondition:
         """解析WHERE条件字符串为WhereCondition对象。
@@ -0,0 +1,225 @@
+"""顺序预读模块，把按页号顺序的缓存未命中合并为大块读取。
+
+全表扫描沿叶子链表逐页读取，每次缓存未命中都是一次单独的小读取，
+扫描速度受磁盘延迟而不是带宽限制。预读器观察缓冲池的未命中序列：
+连续READAHEAD_TRIGGER次未命中的页号首尾相接时判定为顺序访问，
+之后的未命中一次读取一个窗口的页面（一次pread），多读的页面作为
+干净页帧放入缓冲池。窗口从READAHEAD_MIN_PAGES页开始，每次预读后加倍，
+直到上限；访问一旦不再连续就回到单页读取。
+
+B树扫描通过分页管理器的sequential_scan()给出提示，提示期间第一次
+未命中即开始预读，并直接使用最大窗口。
+
+后台模式下请求的页面仍同步读取，窗口内其余页面交给工作线程读取；
+读取期间其他连接的提交或本连接的写回会让这次预读作废。
+
+压缩数据库的页面在文件中不连续存放，不做预读。
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .concurrent_storage import LockState
+from .constants import READAHEAD_MIN_PAGES, READAHEAD_PAGES, READAHEAD_TRIGGER
+from .exceptions import ChecksumError
+
+
+class ReadAhead:
+    """分页管理器的顺序预读器。
+
+    Attributes:
+        pager: 所属的分页管理器
+        max_pages: 一次预读的最大页数
+        trigger: 开始预读所需的连续顺序未命中次数
+        background: 是否由工作线程读取预读窗口
+        reads: 执行的预读次数（每次为一次合并读取）
+        pages_prefetched: 预读放入缓冲池的页数
+        discarded: 因读取期间缓存失效而作废的后台预读次数
+
+    Examples:
+        >>> pager = ConcurrentPager("example.db", read_ahead=64)
+        >>> with pager.sequential_scan():
+        ...     for page_num in leaf_chain:
+        ...         pager.get_page(page_num)
+    """
+
+    def __init__(self, pager, max_pages: int = READAHEAD_PAGES,
+                 trigger: int = READAHEAD_TRIGGER, background: bool = False) -> None:
+        """初始化预读器（后台模式的工作线程在第一次预读时启动）。
+
+        Args:
+            pager: 所属的分页管理器（ConcurrentPager及其子类）
+            max_pages: 一次预读的最大页数
+            trigger: 页号首尾相接的未命中达到该次数后开始预读
+            background: 是否由工作线程读取预读窗口
+        """
+        self.pager = pager
+        self.max_pages = max_pages
+        self.trigger = trigger
+        self.background = background
+        self.reads = 0
+        self.pages_prefetched = 0
+        self.discarded = 0
+        self._next: Optional[int] = None  # 顺序访问时预期的下一个未命中页号
+        self._run = 0  # 当前顺序未命中序列的长度
+        self._window = min(READAHEAD_MIN_PAGES, max_pages)
+        self._hints = 0  # 嵌套的顺序扫描提示数
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=1)
+        self._thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def hint(self) -> Iterator[None]:
+        """顺序扫描提示作用域，作用域内的未命中立即按最大窗口预读。"""
+        self._hints += 1
+        try:
+            yield
+        finally:
+            self._hints -= 1
+
+    def _window_for(self, page_num: int) -> int:
+        """根据未命中序列决定本次从page_num开始读取的页数。
+
+        Args:
+            page_num: 未命中的页号
+
+        Returns:
+            int: 要读取的页数，1表示不预读
+        """
+        if page_num != self._next:
+            self._run = 0
+            self._window = self.max_pages if self._hints else min(READAHEAD_MIN_PAGES, self.max_pages)
+        self._run += 1
+        if self._run < (1 if self._hints else self.trigger):
+            self._next = page_num + 1
+            return 1
+
+        count = min(self._window, self.pager.num_pages - page_num)
+        capacity = self.pager.buffer_pool.capacity
+        if capacity is not None:
+            # 预读的页面不能挤掉缓冲池中的大部分工作集
+            count = min(count, capacity // 4)
+        count = max(count, 1)
+        self._window = min(self._window * 2, self.max_pages)
+        self._next = page_num + count
+        return count
+
+    def read(self, page_num: int) -> bytes:
+        """读取未命中的页面，判定为顺序访问时顺带预读后续页面。
+
+        调用方需持有SHARED或更高的锁。
+
+        Args:
+            page_num: 页号
+
+        Returns:
+            页面数据
+
+        Raises:
+            ChecksumError: 如果请求的页面与页尾校验和不一致
+        """
+        count = self._window_for(page_num)
+        if count == 1 or self.background:
+            data = self.pager._read_from_file(page_num)
+            if count > 1:
+                self._schedule(page_num + 1, count - 1)
+            return data
+
+        generation = self.pager.write_generation
+        pages = self.pager._read_run(page_num, count)
+        data = pages[0] if pages else b''
+        self.pager._verify_page(page_num, data)
+        self.reads += 1
+        self._install(page_num + 1, pages[1:], generation)
+        return data
+
+    def _install(self, start: int, pages: List[bytes], generation: int) -> None:
+        """把预读的页面作为干净页帧放入缓冲池。
+
+        缓冲池中已有的页面（可能已被修改）保持不变；校验失败的页面及其后的
+        页面不放入缓冲池，等到真正读取时再报告错误。放入页帧可能淘汰并写回
+        窗口中后面的脏页，读取之后一旦有页面写回，窗口中剩余的数据可能已过期，
+        不再放入缓冲池。
+
+        Args:
+            start: 第一个页面的页号
+            pages: 页面数据
+            generation: 读取窗口之前分页管理器的写回代数
+        """
+        pager = self.pager
+        for offset, data in enumerate(pages):
+            page_num = start + offset
+            if page_num >= pager.num_pages or len(data) != pager.page_size \
+                    or pager.write_generation != generation:
+                break
+            try:
+                pager._verify_page(page_num, data)
+            except ChecksumError:
+                break
+            if pager.buffer_pool.prefetch(page_num, data):
+                self.pages_prefetched += 1
+
+    def _schedule(self, start: int, count: int) -> None:
+        """把预读窗口交给工作线程，上一次预读尚未完成时放弃本次预读。
+
+        Args:
+            start: 第一个页面的页号
+            count: 页数
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run_worker, name="pysqlit-readahead",
+                                            daemon=True)
+            self._thread.start()
+        job = (start, count, self.pager.cache_epoch, self.pager.write_generation)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            pass
+
+    def _run_worker(self) -> None:
+        """工作线程主循环。"""
+        pager = self.pager
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            start, count, epoch, generation = job
+            try:
+                pages = pager._read_run(start, count)
+            except (OSError, ValueError, AttributeError):
+                continue  # 文件已关闭
+
+            with pager.buffer_pool.lock:
+                # 读取期间其他连接提交或本连接写回过页面，读到的数据可能已过期
+                if (pager.cache_epoch != epoch or pager.write_generation != generation
+                        or pager.lock_state == LockState.UNLOCKED):
+                    self.discarded += 1
+                    continue
+                self.reads += 1
+                self._install(start, pages, generation)
+
+    def stop(self) -> None:
+        """停止工作线程并等待其退出。"""
+        if self._thread is None:
+            return
+        while True:
+            try:
+                self._queue.get_nowait()  # 丢弃尚未开始的预读
+            except queue.Empty:
+                break
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取预读统计信息。
+
+        Returns:
+            包含预读次数、预读页数和作废次数的字典
+        """
+        return {
+            'reads': self.reads,
+            'pages_prefetched': self.pages_prefetched,
+            'discarded': self.discarded,
+        }
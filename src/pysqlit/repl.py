@@ -266,6 +266,10 @@ class EnhancedREPL:
             self.rollback_transaction()
         elif command == '.status':
             self.print_status()
+        elif command == '.iostats':
+            self.print_io_stats()
+        elif command == '.iostats reset':
+            self.reset_io_stats()
         elif command == '.databases':
             self.print_databases()
         else:
@@ -459,6 +463,8 @@ class EnhancedREPL:
   .commit                  提交当前事务
   .rollback                回滚当前事务
   .status                  显示数据库状态
+  .iostats                 显示分页管理器I/O统计和延迟分布
+  .iostats reset           清零I/O统计
   .databases               列出所有数据库
 
 SQL命令示例:
@@ -649,6 +655,56 @@ DROP TABLE animal
         print(f"  活动事务: {info['active_transactions']}")
         print(f"  备份数量: {len(info['backups'])}")
     
+    def print_io_stats(self):
+        """打印分页管理器的I/O统计。
+        
+        显示逻辑页面请求、缓存命中率和替换策略的队列统计、物理读写量、刷新和fsync次数、
+        页面校验和的校验次数和耗时、顺序预读量，以及读、写、fsync的延迟分布。
+        """
+        if self.current_database is None:
+            print("数据库未初始化。")
+            return
+        
+        stats = self.current_database.pager.get_io_stats()
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        hit_rate = stats['cache_hits'] / lookups * 100 if lookups else 0.0
+        print("\nI/O统计:")
+        print(f"  逻辑页面请求: {stats['page_requests']}")
+        print(f"  缓存命中/未命中: {stats['cache_hits']}/{stats['cache_misses']} ({hit_rate:.1f}%), "
+              f"替换策略: {stats['cache_policy']}")
+        policy_stats = self.current_database.pager.get_cache_stats()['policy_stats']
+        if policy_stats:
+            print("  " + ", ".join(f"{name}={value}" for name, value in policy_stats.items()))
+        print(f"  物理读: {stats['physical_reads']} 次, {stats['bytes_read']} 字节")
+        print(f"  物理写: {stats['physical_writes']} 次, {stats['bytes_written']} 字节")
+        print(f"  刷新: {stats['flushes']} 次, fsync: {stats['fsyncs']} 次")
+        if stats['checksum_verifications']:
+            print(f"  校验和: {stats['checksum_verifications']} 次校验, "
+                  f"{stats['checksum_failures']} 次失败, 耗时 {stats['verify_latency']['total_us']}us")
+        if stats.get('read_ahead', {}).get('reads'):
+            print(f"  预读: {stats['read_ahead']['reads']} 次, "
+                  f"{stats['read_ahead']['pages_prefetched']} 页")
+        for label, key in (("读延迟", 'read_latency'), ("写延迟", 'write_latency'),
+                           ("fsync延迟", 'fsync_latency')):
+            histogram = stats[key]
+            if not histogram['count']:
+                print(f"  {label}: 无")
+                continue
+            print(f"  {label}: p50 <= {histogram['p50_us']}us, p99 <= {histogram['p99_us']}us, "
+                  f"最大 {histogram['max_us']}us")
+            for upper, count in histogram['buckets']:
+                bound = f"<= {upper}us" if upper is not None else "更慢"
+                print(f"    {bound:>12}: {count}")
+    
+    def reset_io_stats(self):
+        """清零当前数据库的I/O统计。"""
+        if self.current_database is None:
+            print("数据库未初始化。")
+            return
+        
+        self.current_database.reset_io_stats()
+        print("I/O统计已清零")
+    
     def close(self) -> None:
         """关闭数据库连接并退出程序。
         
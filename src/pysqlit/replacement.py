@@ -0,0 +1,395 @@
+"""缓冲池页面替换策略模块。
+
+缓冲池只负责页帧的内存、固定和回写，选择淘汰哪个页面由替换策略决定：
+- LRUPolicy: 最近最少使用，实现简单，但一次全表扫描就会把热点页面全部挤出缓存
+- TwoQPolicy: 2Q算法，首次访问的页面先进入FIFO试用队列，只有在被淘汰后
+  不久再次访问的页面才进入LRU主队列，扫描只会冲刷试用队列
+- ARCPolicy: 自适应替换缓存，根据两个幽灵队列的命中情况动态调整
+  "只访问过一次"和"多次访问"页面各自占用的缓存比例
+
+策略按名称选择（见create_policy），新的策略可以登记到POLICIES中。
+每个策略按队列统计命中次数，用于比较不同策略在实际负载下的命中率。
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Type
+
+from .constants import (REPLACEMENT_LRU, REPLACEMENT_2Q, REPLACEMENT_ARC, TWOQ_KIN_RATIO,
+                        TWOQ_KOUT_RATIO)
+from .exceptions import StorageError
+
+
+class ReplacementPolicy:
+    """页面替换策略的基类。
+
+    缓冲池在页面进入缓存（未命中、写入或预读）时调用admit，命中时调用touch，
+    页面因替换被淘汰时调用evicted，因其他原因离开缓存时调用forget；
+    需要淘汰页面时按victims给出的顺序依次尝试（跳过被固定的页面）。
+
+    Attributes:
+        name: 策略名称
+        capacity: 缓冲池容量（页数）
+    """
+
+    name = ''
+
+    def __init__(self, capacity: int) -> None:
+        """初始化替换策略。
+
+        Args:
+            capacity: 缓冲池容量（页数）
+        """
+        self.capacity = capacity
+
+    def admit(self, page_num: int) -> None:
+        """记录页面进入缓存。
+
+        Args:
+            page_num: 页号
+        """
+        raise NotImplementedError
+
+    def touch(self, page_num: int) -> None:
+        """记录缓存命中。
+
+        Args:
+            page_num: 页号
+        """
+        raise NotImplementedError
+
+    def evicted(self, page_num: int) -> None:
+        """记录页面被替换出缓存。
+
+        Args:
+            page_num: 页号
+        """
+        self.forget(page_num)
+
+    def forget(self, page_num: int) -> None:
+        """记录页面因丢弃或清空缓存而离开缓存（不保留任何历史）。
+
+        Args:
+            page_num: 页号
+        """
+        raise NotImplementedError
+
+    def victims(self) -> Iterator[int]:
+        """按淘汰优先级给出缓存中的页面。
+
+        Returns:
+            页号迭代器，调用方在修改策略状态之前停止迭代
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """清空所有状态。"""
+        raise NotImplementedError
+
+    def hot_pages(self, limit: int) -> List[int]:
+        """按保留优先级（淘汰顺序的逆序）给出最热的页面。
+
+        Args:
+            limit: 最多返回的页数
+
+        Returns:
+            页号列表，最热的页面在前
+        """
+        return list(self.victims())[::-1][:limit]
+
+    def reset_stats(self) -> None:
+        """重置策略的命中统计。"""
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取策略的队列长度和按队列统计的命中次数。
+
+        Returns:
+            统计字典
+        """
+        return {}
+
+
+class LRUPolicy(ReplacementPolicy):
+    """最近最少使用替换策略。"""
+
+    name = REPLACEMENT_LRU
+
+    def __init__(self, capacity: int) -> None:
+        """初始化LRU策略。
+
+        Args:
+            capacity: 缓冲池容量（页数）
+        """
+        super().__init__(capacity)
+        self._order: 'OrderedDict[int, None]' = OrderedDict()
+
+    def admit(self, page_num: int) -> None:
+        """新页面放在最近使用的一端。"""
+        self._order[page_num] = None
+        self._order.move_to_end(page_num)
+
+    def touch(self, page_num: int) -> None:
+        """命中的页面移到最近使用的一端。"""
+        self._order.move_to_end(page_num)
+
+    def forget(self, page_num: int) -> None:
+        """移除页面。"""
+        self._order.pop(page_num, None)
+
+    def victims(self) -> Iterator[int]:
+        """从最久未用的页面开始。"""
+        return iter(self._order)
+
+    def clear(self) -> None:
+        """清空访问顺序。"""
+        self._order.clear()
+
+
+class TwoQPolicy(ReplacementPolicy):
+    """2Q替换策略（Johnson和Shasha提出的完整版本）。
+
+    首次访问的页面进入FIFO试用队列A1in，在A1in中再次命中不会提升页面；
+    页面从A1in被淘汰时只把页号记入幽灵队列A1out。未命中的页面如果在A1out中，
+    说明它在较长的时间间隔内被访问了两次，直接进入LRU主队列Am。
+    一次性扫描的页面只经过A1in，不会挤出Am中的热点页面。
+
+    Attributes:
+        kin: A1in的目标长度
+        kout: A1out最多记住的页号数
+        a1in_hits: 在A1in中的命中次数
+        am_hits: 在Am中的命中次数
+        ghost_hits: 未命中但在A1out中（被提升到Am）的次数
+    """
+
+    name = REPLACEMENT_2Q
+
+    def __init__(self, capacity: int) -> None:
+        """初始化2Q策略。
+
+        Args:
+            capacity: 缓冲池容量（页数）
+        """
+        super().__init__(capacity)
+        self.kin = max(1, int(capacity * TWOQ_KIN_RATIO))
+        self.kout = max(1, int(capacity * TWOQ_KOUT_RATIO))
+        self._a1in: 'OrderedDict[int, None]' = OrderedDict()
+        self._a1out: 'OrderedDict[int, None]' = OrderedDict()
+        self._am: 'OrderedDict[int, None]' = OrderedDict()
+        self.reset_stats()
+
+    def admit(self, page_num: int) -> None:
+        """新页面进入A1in，刚从A1in淘汰过的页面直接进入Am。"""
+        if page_num in self._a1in or page_num in self._am:
+            return
+        if page_num in self._a1out:
+            self.ghost_hits += 1
+            del self._a1out[page_num]
+            self._am[page_num] = None
+        else:
+            self._a1in[page_num] = None
+
+    def touch(self, page_num: int) -> None:
+        """Am中的页面移到最近使用的一端，A1in中的页面保持FIFO顺序。"""
+        if page_num in self._am:
+            self.am_hits += 1
+            self._am.move_to_end(page_num)
+        elif page_num in self._a1in:
+            self.a1in_hits += 1  # 短时间内的相关访问，不提升
+
+    def evicted(self, page_num: int) -> None:
+        """从A1in淘汰的页面记入A1out。"""
+        if page_num in self._a1in:
+            del self._a1in[page_num]
+            self._a1out[page_num] = None
+            while len(self._a1out) > self.kout:
+                self._a1out.popitem(last=False)
+        else:
+            self._am.pop(page_num, None)
+
+    def forget(self, page_num: int) -> None:
+        """移除页面，不记入A1out。"""
+        self._a1in.pop(page_num, None)
+        self._am.pop(page_num, None)
+
+    def victims(self) -> Iterator[int]:
+        """A1in超过目标长度时先给出试用页面，否则先给出Am中最久未用的页面。"""
+        if len(self._a1in) > self.kin:
+            yield from self._a1in
+            yield from self._am
+        else:
+            yield from self._am
+            yield from self._a1in
+
+    def clear(self) -> None:
+        """清空所有队列。"""
+        self._a1in.clear()
+        self._a1out.clear()
+        self._am.clear()
+
+    def reset_stats(self) -> None:
+        """重置按队列统计的命中次数。"""
+        self.a1in_hits = 0
+        self.am_hits = 0
+        self.ghost_hits = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取队列长度和按队列统计的命中次数。"""
+        return {
+            'a1in_pages': len(self._a1in),
+            'am_pages': len(self._am),
+            'a1out_ghosts': len(self._a1out),
+            'a1in_hits': self.a1in_hits,
+            'am_hits': self.am_hits,
+            'ghost_hits': self.ghost_hits,
+        }
+
+
+class ARCPolicy(ReplacementPolicy):
+    """自适应替换缓存（Megiddo和Modha提出的ARC算法）。
+
+    T1保存只访问过一次的页面，T2保存访问过至少两次的页面，两者都按LRU排序；
+    B1、B2分别记住最近从T1、T2淘汰的页号。B1中的页面再次被访问说明T1太小，
+    目标长度p增大；B2中的页面再次被访问则p减小。淘汰时T1超过p就从T1淘汰，
+    否则从T2淘汰。
+
+    Attributes:
+        target: T1的目标长度p
+        t1_hits: 在T1中的命中次数
+        t2_hits: 在T2中的命中次数
+        b1_hits: 未命中但在B1中的次数
+        b2_hits: 未命中但在B2中的次数
+    """
+
+    name = REPLACEMENT_ARC
+
+    def __init__(self, capacity: int) -> None:
+        """初始化ARC策略。
+
+        Args:
+            capacity: 缓冲池容量（页数）
+        """
+        super().__init__(capacity)
+        self.target = 0.0
+        self._t1: 'OrderedDict[int, None]' = OrderedDict()
+        self._t2: 'OrderedDict[int, None]' = OrderedDict()
+        self._b1: 'OrderedDict[int, None]' = OrderedDict()
+        self._b2: 'OrderedDict[int, None]' = OrderedDict()
+        self.reset_stats()
+
+    def admit(self, page_num: int) -> None:
+        """新页面进入T1；幽灵队列中的页面按命中的队列调整p后进入T2。"""
+        if page_num in self._t1 or page_num in self._t2:
+            return
+        if page_num in self._b1:
+            self.b1_hits += 1
+            self.target = min(float(self.capacity),
+                              self.target + max(len(self._b2) / len(self._b1), 1.0))
+            del self._b1[page_num]
+            self._t2[page_num] = None
+        elif page_num in self._b2:
+            self.b2_hits += 1
+            self.target = max(0.0, self.target - max(len(self._b1) / len(self._b2), 1.0))
+            del self._b2[page_num]
+            self._t2[page_num] = None
+        else:
+            self._t1[page_num] = None
+        self._trim_ghosts()
+
+    def _trim_ghosts(self) -> None:
+        """限制幽灵队列长度：|T1|+|B1|和|T2|+|B2|都不超过缓存容量。"""
+        while self._b1 and len(self._t1) + len(self._b1) > self.capacity:
+            self._b1.popitem(last=False)
+        while self._b2 and len(self._t2) + len(self._b2) > self.capacity:
+            self._b2.popitem(last=False)
+
+    def touch(self, page_num: int) -> None:
+        """命中的页面移到T2最近使用的一端。"""
+        if page_num in self._t1:
+            self.t1_hits += 1
+            del self._t1[page_num]
+            self._t2[page_num] = None
+        elif page_num in self._t2:
+            self.t2_hits += 1
+            self._t2.move_to_end(page_num)
+
+    def evicted(self, page_num: int) -> None:
+        """淘汰的页面记入对应的幽灵队列。"""
+        if page_num in self._t1:
+            del self._t1[page_num]
+            self._b1[page_num] = None
+        elif page_num in self._t2:
+            del self._t2[page_num]
+            self._b2[page_num] = None
+        self._trim_ghosts()
+
+    def forget(self, page_num: int) -> None:
+        """移除页面，不记入幽灵队列。"""
+        self._t1.pop(page_num, None)
+        self._t2.pop(page_num, None)
+
+    def victims(self) -> Iterator[int]:
+        """T1超过目标长度p时先给出T1的页面，否则先给出T2的页面。"""
+        if self._t1 and len(self._t1) > self.target:
+            yield from self._t1
+            yield from self._t2
+        else:
+            yield from self._t2
+            yield from self._t1
+
+    def clear(self) -> None:
+        """清空所有队列并重置目标长度。"""
+        self.target = 0.0
+        for queue in (self._t1, self._t2, self._b1, self._b2):
+            queue.clear()
+
+    def reset_stats(self) -> None:
+        """重置按队列统计的命中次数。"""
+        self.t1_hits = 0
+        self.t2_hits = 0
+        self.b1_hits = 0
+        self.b2_hits = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取队列长度、目标长度和按队列统计的命中次数。"""
+        return {
+            't1_pages': len(self._t1),
+            't2_pages': len(self._t2),
+            'b1_ghosts': len(self._b1),
+            'b2_ghosts': len(self._b2),
+            'target_t1_pages': int(self.target),
+            't1_hits': self.t1_hits,
+            't2_hits': self.t2_hits,
+            'b1_hits': self.b1_hits,
+            'b2_hits': self.b2_hits,
+        }
+
+
+POLICIES: Dict[str, Type[ReplacementPolicy]] = {
+    REPLACEMENT_LRU: LRUPolicy,
+    REPLACEMENT_2Q: TwoQPolicy,
+    REPLACEMENT_ARC: ARCPolicy,
+}
+
+
+def create_policy(name: Optional[str], capacity: Optional[int]) -> ReplacementPolicy:
+    """按名称创建替换策略。
+
+    不限制容量的缓冲池从不淘汰页面，始终使用开销最小的LRU策略。
+
+    Args:
+        name: 策略名称（'lru'、'2q'或'arc'），None表示LRU
+        capacity: 缓冲池容量（页数），None表示不限制
+
+    Returns:
+        ReplacementPolicy: 替换策略
+
+    Raises:
+        StorageError: 如果策略名称未知
+    """
+    name = name or REPLACEMENT_LRU
+    if name not in POLICIES:
+        raise StorageError(
+            f"Unknown page replacement policy {name!r}: expected one of {sorted(POLICIES)}"
+        )
+    if capacity is None:
+        return LRUPolicy(0)
+    return POLICIES[name](capacity)
@@ -17,29 +17,104 @@
 
 import os
 import struct
-from typing import Optional, List
+import time
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator, Optional, List, Dict, Set, Tuple
 from dataclasses import dataclass
 
 from .constants import (
-    PAGE_SIZE, TABLE_MAX_PAGES, INVALID_PAGE_NUM,
+    PAGE_SIZE, INVALID_PAGE_NUM,
     ROW_SIZE, ID_SIZE, USERNAME_SIZE, EMAIL_SIZE,
     ID_OFFSET, USERNAME_OFFSET, EMAIL_OFFSET
 )
 from .models import Row
 from .exceptions import StorageError
+from .header import check_page_size
+from .iostats import IOStats
+
+
+# 单次向量写入允许的最大缓冲区数量
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+
+def coalesce_page_runs(page_nums: Iterable[int], max_run: int = IOV_MAX) -> Iterator[List[int]]:
+    """将页号合并为连续的页号段。
+    
+    Args:
+        page_nums: 页号集合
+        max_run: 每段最多包含的页数
+        
+    Yields:
+        List[int]: 按页号递增排列的连续页号列表
+        
+    Examples:
+        >>> list(coalesce_page_runs([7, 1, 2, 3, 5]))
+        [[1, 2, 3], [5], [7]]
+    """
+    run: List[int] = []
+    for page_num in sorted(page_nums):
+        if run and (page_num != run[-1] + 1 or len(run) >= max_run):
+            yield run
+            run = []
+        run.append(page_num)
+    if run:
+        yield run
+
+
+def write_page_run(fileno: int, offset: int, buffers: List[bytes]) -> None:
+    """将一段连续页面以单次向量写入写到文件的指定偏移处。
+    
+    支持os.pwritev的平台上一段页面只需一次系统调用；
+    其他平台退化为逐页的os.pwrite或seek+write。
+    
+    Args:
+        fileno: 文件描述符
+        offset: 写入的起始字节偏移
+        buffers: 各页面的数据
+    """
+    if hasattr(os, 'pwritev'):
+        total = sum(len(buf) for buf in buffers)
+        written = os.pwritev(fileno, buffers, offset)
+        if written < total:
+            # 短写：剩余部分逐次补写
+            remaining = memoryview(b''.join(buffers))[written:]
+            offset += written
+            while remaining:
+                count = os.pwrite(fileno, remaining, offset)
+                remaining = remaining[count:]
+                offset += count
+        return
+    
+    for buf in buffers:
+        if hasattr(os, 'pwrite'):
+            os.pwrite(fileno, buf, offset)
+        else:
+            os.lseek(fileno, offset, os.SEEK_SET)
+            os.write(fileno, buf)
+        offset += len(buf)
 
 
 class Pager:
     """分页管理器，负责文件I/O和页面缓存。
     
     提供数据库文件的分页读写功能，支持页面缓存和自动刷新。
+    修改过的页面记录在脏页集合中，刷新时只写脏页，
+    并将页号连续的脏页合并为一次向量写入。
     
     Attributes:
         filename: 数据库文件名
         file_descriptor: 文件描述符
         file_length: 文件长度（字节）
         num_pages: 页面数量
-        pages: 页面缓存数组
+        page_size: 页面大小（字节）
+        pages: 页面缓存（页号 -> 页面数据）
+        dirty_pages: 脏页页号集合
+        io_stats: I/O计数器和延迟直方图
     
     Examples:
         >>> with Pager("test.db") as pager:
@@ -47,20 +122,34 @@ class Pager:
         ...     # 使用页面数据
     """
     
-    def __init__(self, filename: str) -> None:
+    first_data_page = 0  # 首个可用于数据的页号
+    
+    def __init__(self, filename: str, page_size: int = PAGE_SIZE) -> None:
         """初始化分页管理器。
         
         Args:
             filename: 数据库文件名
+            page_size: 页面大小（1KB到64KB之间的2的幂）
+            
+        Raises:
+            StorageError: 如果页面大小无效
         """
         self.filename = filename
         self.file_descriptor = None
         self.file_length = 0
         self.num_pages = 0
-        self.pages = [None] * TABLE_MAX_PAGES
+        self.page_size = check_page_size(page_size)
+        self.pages: Dict[int, bytearray] = {}
+        self.dirty_pages: Set[int] = set()
+        self.io_stats = IOStats()
         
         self._open_file()
     
+    @property
+    def usable_size(self) -> int:
+        """每页可供存放数据的字节数（基础分页管理器不保留页尾空间）。"""
+        return self.page_size
+    
     def _open_file(self) -> None:
         """打开数据库文件。
         
@@ -68,15 +157,16 @@ class Pager:
         """
         try:
             if os.path.exists(self.filename):
-                self.file_descriptor = open(self.filename, 'r+b')
+                # 不使用用户态缓冲，页面缓存由分页管理器自身负责
+                self.file_descriptor = open(self.filename, 'r+b', buffering=0)
                 self.file_descriptor.seek(0, 2)  # 移动到文件末尾
                 self.file_length = self.file_descriptor.tell()
-                self.num_pages = self.file_length // PAGE_SIZE
+                self.num_pages = self.file_length // self.page_size
                 
-                if self.file_length % PAGE_SIZE != 0:
+                if self.file_length % self.page_size != 0:
                     raise StorageError("Database file is not a whole number of pages")
             else:
-                self.file_descriptor = open(self.filename, 'w+b')
+                self.file_descriptor = open(self.filename, 'w+b', buffering=0)
                 self.file_length = 0
                 self.num_pages = 0
         except IOError as e:
@@ -92,22 +182,22 @@ class Pager:
             
         Returns:
             bytearray: 页面数据
-            
-        Raises:
-            StorageError: 如果页面编号超出最大限制
         """
-        if page_num >= TABLE_MAX_PAGES:
-            raise StorageError(f"Page number {page_num} exceeds maximum {TABLE_MAX_PAGES}")
-        
-        if self.pages[page_num] is None:
+        self.io_stats.page_requests += 1
+        if page_num in self.pages:
+            self.io_stats.cache_hits += 1
+        else:
             # 缓存未命中 - 从文件加载
-            page = bytearray(PAGE_SIZE)
+            self.io_stats.cache_misses += 1
+            page = bytearray(self.page_size)
             
             if page_num < self.num_pages:
                 # 页面存在于文件中
-                self.file_descriptor.seek(page_num * PAGE_SIZE)
-                data = self.file_descriptor.read(PAGE_SIZE)
-                if len(data) == PAGE_SIZE:
+                started = time.perf_counter()
+                self.file_descriptor.seek(page_num * self.page_size)
+                data = self.file_descriptor.read(self.page_size)
+                self.io_stats.record_read(len(data), time.perf_counter() - started)
+                if len(data) == self.page_size:
                     page[:] = data
                 elif len(data) > 0:
                     # 部分页面 - 对于有效文件不应发生
@@ -116,10 +206,102 @@ class Pager:
             self.pages[page_num] = page
             
             if page_num >= self.num_pages:
+                # 新页面尚未写入文件
                 self.num_pages = page_num + 1
+                self.dirty_pages.add(page_num)
         
         return self.pages[page_num]
     
+    def write_page(self, page_num: int, data: bytes) -> None:
+        """将数据写入页面缓存并标记为脏页。
+        
+        Args:
+            page_num: 页面编号
+            data: 页面数据，长度不足时用零填充
+        """
+        page = self.get_page(page_num)
+        if data is not page:
+            data = bytes(data[:self.page_size])
+            page[:len(data)] = data
+            page[len(data):] = bytes(self.page_size - len(data))
+        self.dirty_pages.add(page_num)
+    
+    def mark_dirty(self, page_num: int) -> None:
+        """将已就地修改的页面标记为脏页。
+        
+        Args:
+            page_num: 页面编号
+        """
+        if page_num in self.pages:
+            self.dirty_pages.add(page_num)
+    
+    def get_writable_page(self, page_num: int) -> bytearray:
+        """获取可就地修改的页面。
+        
+        缓存页面本身就是可写的字节数组；内存映射分页管理器会在此返回
+        只读映射页的可写副本。
+        
+        Args:
+            page_num: 页面编号
+            
+        Returns:
+            bytearray: 可写的页面数据
+        """
+        return self.get_page(page_num)
+    
+    def allocate_page(self) -> int:
+        """在文件末尾分配一个新页面。
+        
+        Returns:
+            int: 新页面的页号
+        """
+        page_num = self.num_pages
+        self.get_page(page_num)
+        return page_num
+    
+    def pinned(self):
+        """返回页面固定作用域。
+        
+        基础分页管理器从不淘汰缓存页面，因此作用域不做任何事情；
+        带缓冲池的分页管理器会在作用域内固定访问过的页面。
+        
+        Returns:
+            上下文管理器
+        """
+        return nullcontext()
+    
+    def sequential_scan(self):
+        """返回顺序扫描提示作用域。
+        
+        基础分页管理器没有预读，因此作用域不做任何事情；
+        带缓冲池的分页管理器在作用域内对未命中的页面按最大窗口预读。
+        
+        Returns:
+            上下文管理器
+        """
+        return nullcontext()
+    
+    def reading(self):
+        """返回读取作用域。
+        
+        基础分页管理器没有文件锁，因此作用域不做任何事情；
+        带文件锁的分页管理器在作用域结束时释放作用域内获取的共享锁。
+        
+        Returns:
+            上下文管理器
+        """
+        return nullcontext()
+    
+    def free_page(self, page_num: int) -> None:
+        """释放页面。
+        
+        基础分页管理器没有空闲页链表，释放的页面只是不再被引用，不会被复用；
+        带空闲页链表的分页管理器会把页面放入链表供之后的分配复用。
+        
+        Args:
+            page_num: 页号
+        """
+    
     def flush_page(self, page_num: int) -> None:
         """将页面刷新到磁盘。
         
@@ -129,18 +311,75 @@ class Pager:
         if page_num >= self.num_pages:
             return
         
-        if self.pages[page_num] is None:
+        if page_num not in self.pages:
             return
         
-        self.file_descriptor.seek(page_num * PAGE_SIZE)
-        self.file_descriptor.write(self.pages[page_num])
-        self.file_descriptor.flush()
+        started = time.perf_counter()
+        write_page_run(self.file_descriptor.fileno(), page_num * self.page_size, [self.pages[page_num]])
+        self.io_stats.record_write(self.page_size, time.perf_counter() - started)
+        self.dirty_pages.discard(page_num)
+        self.file_length = max(self.file_length, (page_num + 1) * self.page_size)
     
     def flush_all_pages(self) -> None:
+        """将所有脏页面刷新到磁盘。
+        
+        脏页按页号排序，连续的页面合并为一次写入；干净页面不会被写入。
+        """
+        if not self.dirty_pages:
+            return
+        
+        self._write_pages(self.dirty_pages, self.pages.__getitem__)
+        self.dirty_pages.clear()
+        self.io_stats.flushes += 1
+    
+    def _write_pages(self, page_nums: Iterable[int],
+                     get_data: Callable[[int], bytes]) -> int:
+        """将页面按连续段写入文件。
+        
+        Args:
+            page_nums: 要写入的页号
+            get_data: 根据页号返回页面数据的函数
+            
+        Returns:
+            int: 执行的写入次数（每个连续段一次）
+        """
+        fileno = self.file_descriptor.fileno()
+        writes = 0
+        last_page = -1
+        for run in coalesce_page_runs(page_nums):
+            buffers = [get_data(num) for num in run]
+            started = time.perf_counter()
+            write_page_run(fileno, run[0] * self.page_size, buffers)
+            self.io_stats.record_write(len(run) * self.page_size, time.perf_counter() - started)
+            writes += 1
+            last_page = run[-1]
+        self.file_length = max(self.file_length, (last_page + 1) * self.page_size)
+        return writes
+    
+    def flush(self) -> None:
         """将所有脏页面刷新到磁盘。"""
-        for i in range(self.num_pages):
-            if self.pages[i] is not None:
-                self.flush_page(i)
+        self.flush_all_pages()
+    
+    def sync(self) -> None:
+        """刷新脏页并调用fsync，确保数据到达持久存储。"""
+        self.flush()
+        if self.file_descriptor is None:
+            return
+        started = time.perf_counter()
+        os.fsync(self.file_descriptor.fileno())
+        self.io_stats.record_fsync(time.perf_counter() - started)
+    
+    def get_io_stats(self) -> Dict[str, object]:
+        """获取I/O统计信息。
+        
+        Returns:
+            计数器和延迟直方图快照，见IOStats.snapshot
+        """
+        return self.io_stats.snapshot()
+    
+    def reset_io_stats(self) -> None:
+        """将I/O统计信息清零。"""
+        self.io_stats.reset()
     
     def close(self) -> None:
         """关闭分页管理器并清理资源。
@@ -265,50 +504,34 @@ class Table:
         if pager.file_length > 0:
             self.num_rows = pager.file_length // ROW_SIZE
         
-        # 从计数器文件加载max_id
-        self._load_max_id()
+        # 从现有数据恢复max_id（不再使用.cnt计数器文件）
+        self._find_max_id()
     
-    def _load_max_id(self) -> None:
-        """从计数器文件加载max_id，如果不存在则初始化。
+    def _find_max_id(self) -> None:
+        """扫描现有数据找到最大ID。
+        
+        max_id完全由表数据推导，打开表时计算一次，插入时不再写任何额外文件。
         
-        如果计数器文件不存在，则扫描现有数据找到最大ID。
+        Raises:
+            StorageError: 如果读取数据失败
         """
-        counter_file = self.pager.filename + ".cnt"
         try:
-            if os.path.exists(counter_file):
-                with open(counter_file, 'r') as f:
-                    self.max_id = int(f.read().strip())
-            else:
-                # 在现有数据中找到最大ID
-                max_id = 0
-                for i in range(self.num_rows):
-                    row_position = i * ROW_SIZE
-                    page_num = row_position // PAGE_SIZE
-                    byte_offset = row_position % PAGE_SIZE
-                    
-                    page = self.pager.get_page(page_num)
-                    id_bytes = bytes(page[byte_offset:byte_offset + ID_SIZE])
-                    row_id = struct.unpack('<I', id_bytes)[0]
-                    if row_id > max_id:
-                        max_id = row_id
+            max_id = 0
+            for i in range(self.num_rows):
+                row_position = i * ROW_SIZE
+                page_num = row_position // self.pager.page_size
+                byte_offset = row_position % self.pager.page_size
                 
-                self.max_id = max_id
-                self._save_max_id()
+                page = self.pager.get_page(page_num)
+                id_bytes = bytes(page[byte_offset:byte_offset + ID_SIZE])
+                row_id = struct.unpack('<I', id_bytes)[0]
+                if row_id > max_id:
+                    max_id = row_id
+            
+            self.max_id = max_id
         except Exception as e:
             raise StorageError(f"Failed to load max_id: {e}")
     
-    def _save_max_id(self) -> None:
-        """将max_id保存到计数器文件。
-        
-        确保在程序异常退出时也能正确保存最大ID值。
-        """
-        counter_file = self.pager.filename + ".cnt"
-        try:
-            with open(counter_file, 'w') as f:
-                f.write(str(self.max_id))
-        except Exception as e:
-            raise StorageError(f"Failed to save max_id: {e}")
-    
     def insert_row(self, row: Row) -> None:
         """向表中插入一行数据，支持自动增量ID。
         
@@ -318,11 +541,8 @@ class Table:
             row: 要插入的Row对象
             
         Raises:
-            StorageError: 如果表已满、数据类型错误或重复值
+            StorageError: 如果数据类型错误或重复值
         """
-        if self.num_rows >= TABLE_MAX_PAGES * (PAGE_SIZE // ROW_SIZE):
-            raise StorageError("Table is full")
-        
         # 确保所有数值字段都是正确的类型
         for field in ['id', 'age']:  # 添加其他数值字段
             if hasattr(row, field):
@@ -346,9 +566,6 @@ class Table:
             # 当id属性不存在时，自动生成ID
             self.max_id += 1
             row.id = self.max_id
-        
-        # 保存更新后的max_id
-        self._save_max_id()
 
         # 检查重复名称（用户名列）
         existing_rows = self.select_all()
@@ -358,11 +575,11 @@ class Table:
         
         # 计算位置
         row_position = self.num_rows * ROW_SIZE
-        page_num = row_position // PAGE_SIZE
-        byte_offset = row_position % PAGE_SIZE
+        page_num = row_position // self.pager.page_size
+        byte_offset = row_position % self.pager.page_size
         
         # 检查是否需要处理页面边界
-        if byte_offset + ROW_SIZE > PAGE_SIZE:
+        if byte_offset + ROW_SIZE > self.pager.page_size:
             raise StorageError("Row would span page boundary")
         
         # 获取页面并写入行数据
@@ -370,6 +587,7 @@ class Table:
         serialized = RowSerializer.serialize(row)
         
         page[byte_offset:byte_offset + ROW_SIZE] = serialized
+        self.pager.mark_dirty(page_num)
         self.num_rows += 1
     
     def select_all(self) -> List[Row]:
@@ -382,8 +600,8 @@ class Table:
         
         for i in range(self.num_rows):
             row_position = i * ROW_SIZE
-            page_num = row_position // PAGE_SIZE
-            byte_offset = row_position % PAGE_SIZE
+            page_num = row_position // self.pager.page_size
+            byte_offset = row_position % self.pager.page_size
             
             page = self.pager.get_page(page_num)
             row_data = bytes(page[byte_offset:byte_offset + ROW_SIZE])
@@ -418,8 +636,8 @@ class Table:
         # 收集除要删除的行外的所有有效行
         for i in range(self.num_rows):
             row_position = i * ROW_SIZE
-            page_num = row_position // PAGE_SIZE
-            byte_offset = row_position % PAGE_SIZE
+            page_num = row_position // self.pager.page_size
+            byte_offset = row_position % self.pager.page_size
             
             page = self.pager.get_page(page_num)
             row_data = bytes(page[byte_offset:byte_offset + ROW_SIZE])
@@ -433,11 +651,11 @@ class Table:
                 if row.id == row_id:
                     # 通过设置为全零标记为已删除
                     page[byte_offset:byte_offset + ROW_SIZE] = bytearray(ROW_SIZE)
+                    self.pager.mark_dirty(page_num)
                     found = True
                     # 如果删除了max_id行，更新max_id
                     if row_id == self.max_id:
                         self._find_max_id()
-                        self._save_max_id()
                 else:
                     new_rows.append((page_num, byte_offset, row))
             except StorageError:
@@ -462,8 +680,8 @@ class Table:
         
         for i in range(self.num_rows):
             row_position = i * ROW_SIZE
-            page_num = row_position // PAGE_SIZE
-            byte_offset = row_position % PAGE_SIZE
+            page_num = row_position // self.pager.page_size
+            byte_offset = row_position % self.pager.page_size
             
             page = self.pager.get_page(page_num)
             row_data = bytes(page[byte_offset:byte_offset + ROW_SIZE])
@@ -474,11 +692,11 @@ class Table:
                 
             # 标记为已删除
             page[byte_offset:byte_offset + ROW_SIZE] = bytearray(ROW_SIZE)
+            self.pager.mark_dirty(page_num)
             deleted_count += 1
         
         self.num_rows = 0
         self.max_id = 0
-        self._save_max_id()
         return deleted_count
     
     def close(self) -> None:
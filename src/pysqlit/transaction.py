@@ -281,7 +281,8 @@ class TransactionManager:
             transaction_id: 要提交的事务ID
             
         Raises:
-            TransactionError: 如果事务不存在或不处于活动状态
+            TransactionError: 如果事务不存在、不处于活动状态或提交失败
+                （提交失败时事务已被回滚并移除）
         """
         with self.global_lock:
             if transaction_id not in self.transactions:
@@ -304,7 +305,13 @@ class TransactionManager:
                 del self.transactions[transaction_id]
                 
             except Exception as e:
-                transaction.rollback(self.pager)
+                # 提交失败时事务同样结束，不留下既不能提交也不能回滚的事务
+                try:
+                    transaction.rollback(self.pager)
+                finally:
+                    self.active_transactions -= 1
+                    self.lock_manager.release_all_locks(transaction_id)
+                    del self.transactions[transaction_id]
                 raise TransactionError(f"Commit failed: {e}")
                 
     def rollback_transaction(self, transaction_id: int):
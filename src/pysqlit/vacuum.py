@@ -0,0 +1,287 @@
+"""数据库整理模块，回收空闲页并缩小数据库文件。
+
+提供两种整理方式：
+- 完全整理（VACUUM）：将所有仍在使用的页面按B树顺序复制到临时文件，
+  重建系统目录和模式页链，然后在独占锁下原地写回原文件。整理后文件中没有空闲页，
+  每棵树的叶子节点在文件中连续存放。
+- 增量整理：把文件末尾仍在使用的页面搬到前部的空闲页中，
+  更新所有指向它们的页号，然后截断文件尾部。每次最多处理指定数量的页面，
+  适合在提交后自动运行（auto_vacuum模式）。
+
+两种方式都需要知道每个页面被谁引用，页号引用只存在于以下位置：
+文件头（目录根页、模式页链和页面版本表的起始页）、系统目录记录（各树的根页）、
+模式页链和版本页链的next指针，以及B树节点的父节点、子节点和下一个叶子指针。
+"""
+
+import os
+from typing import Dict, List
+
+from .btree import EnhancedBTree, EnhancedBTreeNode, EnhancedInternalNode, EnhancedLeafNode
+from .catalog import CATALOG_PAGE_HEADER, CATALOG_TABLE, SchemaStore, SystemCatalog
+from .concurrent_storage import ConcurrentPager, LockState
+from .constants import NODE_LEAF, NODE_OVERFLOW
+from .exceptions import DatabaseError
+from .overflow import OVERFLOW_PAGE_HEADER
+from .warmup import remap_hot_pages
+
+
+def _remap_node(pager, page_num: int, mapping: Dict[int, int]) -> None:
+    """按页号映射改写B树节点（或溢出页）中的页号引用。
+
+    Args:
+        pager: 节点所在的分页管理器
+        page_num: 节点页号
+        mapping: 旧页号到新页号的映射
+    """
+    node = EnhancedBTreeNode(pager, page_num)
+    if node.get_node_type() == NODE_OVERFLOW:
+        page_type, next_page = OVERFLOW_PAGE_HEADER.unpack_from(node.page)
+        if next_page in mapping:
+            OVERFLOW_PAGE_HEADER.pack_into(pager.get_writable_page(page_num), 0, page_type,
+                                           mapping[next_page])
+            pager.mark_dirty(page_num)
+        return
+
+    parent = node.get_parent()
+    if parent in mapping:
+        node.set_parent(mapping[parent])
+
+    if node.get_node_type() == NODE_LEAF:
+        leaf = EnhancedLeafNode(pager, page_num)
+        next_leaf = leaf.next_leaf()
+        if next_leaf in mapping:
+            leaf.set_next_leaf(mapping[next_leaf])
+        for cell_num in range(leaf.num_cells()):
+            if leaf.is_overflow(cell_num) and leaf.overflow_page(cell_num) in mapping:
+                leaf.set_overflow_page(cell_num, mapping[leaf.overflow_page(cell_num)])
+        return
+
+    internal = EnhancedInternalNode(pager, page_num)
+    for i in range(internal.num_keys() + 1):
+        child = internal.child(i)
+        if child in mapping:
+            internal.set_child(i, mapping[child])
+
+
+def _remap_chain_page(pager, page_num: int, mapping: Dict[int, int]) -> None:
+    """按页号映射改写页链中一页的next指针。
+
+    模式页链和页面版本表的页头布局相同（next指针在前），都用此函数改写。
+
+    Args:
+        pager: 分页管理器
+        page_num: 链上的页号
+        mapping: 旧页号到新页号的映射
+    """
+    next_page, payload = CATALOG_PAGE_HEADER.unpack_from(pager.get_page(page_num))
+    if next_page in mapping:
+        page = pager.get_writable_page(page_num)
+        CATALOG_PAGE_HEADER.pack_into(page, 0, mapping[next_page], payload)
+        pager.mark_dirty(page_num)
+
+
+class VacuumManager:
+    """数据库整理管理器。
+
+    Attributes:
+        database: 要整理的数据库
+
+    Examples:
+        >>> manager = VacuumManager(database)
+        >>> manager.vacuum()
+        >>> manager.incremental_vacuum(max_pages=64)
+        0
+    """
+
+    def __init__(self, database) -> None:
+        """初始化整理管理器。
+
+        Args:
+            database: EnhancedDatabase实例
+        """
+        self.database = database
+
+    @staticmethod
+    def _tree_pages(pager, roots: List[int]) -> List[int]:
+        """收集若干B树的全部页面。
+
+        Args:
+            pager: 分页管理器
+            roots: B树根页号列表
+
+        Returns:
+            每棵树先内部节点（层序）、再叶子节点（叶子链表顺序）、最后溢出页排列的页号
+        """
+        pages = []
+        for root_page in roots:
+            btree = EnhancedBTree(pager, root_page_num=root_page)
+            internal_pages, leaf_pages = btree.node_pages()
+            pages.extend(internal_pages + leaf_pages + btree.overflow_pages(leaf_pages))
+        return pages
+
+    def _check_idle(self) -> None:
+        """整理会移动页面，不能在事务中进行。
+
+        Raises:
+            DatabaseError: 如果有活动事务
+        """
+        if self.database.in_transaction:
+            raise DatabaseError("cannot VACUUM from within a transaction")
+
+    def vacuum(self) -> None:
+        """完全整理数据库。
+
+        所有仍在使用的页面复制到临时文件并连续存放，空闲页全部丢弃；
+        临时文件写完后原地写回原文件并截断、fsync。整个过程持有EXCLUSIVE锁，
+        文件的inode不变，其他连接下次加锁时从变更计数器发现变化并丢弃全部缓存页面。
+        内存数据库没有文件可以改写，改为整理到不再有空闲页为止。
+
+        Raises:
+            DatabaseError: 如果有活动事务
+            LockError: 如果其他连接的读写在超时时间内没有结束
+        """
+        self._check_idle()
+        database = self.database
+        source = database.pager
+        if source.is_memory_db:
+            self.incremental_vacuum()
+            return
+
+        source.flush()
+        source.begin_write()  # 读取其他连接的最新提交，并阻止它们写入
+        try:
+            source.file_lock.acquire(LockState.EXCLUSIVE)  # 文件将被改写，其他连接也不能读取
+            database.refresh_schema()
+            mapping = self._compact(source, database.filename + "-vacuum")
+            database._reopen_catalog()
+            database._schema_version = source.header.schema_version
+            if source.warm_cache:
+                # 保存的热点页列表使用整理前的页号
+                remap_hot_pages(source.hot_pages_path, source.page_size, mapping)
+        finally:
+            source.file_lock.release()
+            source.end_read()
+
+    def _compact(self, source, temp_path: str) -> Dict[int, int]:
+        """把仍在使用的页面整理到临时文件，再写回原文件。
+
+        Args:
+            source: 持有EXCLUSIVE锁的分页管理器
+            temp_path: 临时文件路径
+
+        Returns:
+            旧页号到新页号的映射
+        """
+        database = self.database
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        target = ConcurrentPager(temp_path, track_page_versions=source.page_versions.enabled,
+                                 page_size=source.page_size, compression=source.compression,
+                                 checksums=source.checksums)
+        try:
+            # 系统目录和模式页链在目标文件中重新生成，只复制各表和索引的B树
+            entries = database.catalog.entries()
+            mapping: Dict[int, int] = {}
+            for page_num in self._tree_pages(source, [entry.root_page for entry in entries]):
+                mapping[page_num] = target.allocate_page()
+
+            for old_page, new_page in mapping.items():
+                target.write_page(new_page, bytes(source.get_page(old_page)))
+                _remap_node(target, new_page, mapping)
+
+            catalog = SystemCatalog(target)
+            for entry in entries:
+                if entry.kind == CATALOG_TABLE:
+                    copied = catalog.add_table(entry.name, mapping[entry.root_page])
+                else:
+                    copied = catalog.add_index(entry.name, entry.table_name, mapping[entry.root_page])
+                if entry.sequence:
+                    copied.sequence = entry.sequence
+                    catalog.update(copied)
+
+            SchemaStore(target).save(database.schema_store.load())
+            # 根页号都变了：模式版本递增，其他连接由此重新打开系统目录和各表的B树
+            target.header.schema_version = source.header.schema_version + 1
+            # 计数器继续递增，其他连接由此发现文件被改写
+            target.header.change_counter = source.header.change_counter + 1
+            target.update_header()
+            # 每个页面的内容都可能变化：全部记录为新版本，按版本表失效的连接丢弃所有缓存页面
+            target.page_versions.record(range(target.first_data_page, target.num_pages),
+                                        target.header.change_counter)
+            target.shrink(target.num_pages)  # 去掉按区段预分配的尾部空间
+            target.close()
+            source.overwrite_from(temp_path)
+        finally:
+            target.close()
+            # 临时文件只由本连接使用，其保留锁旁路文件无需保留
+            for path in (temp_path, temp_path + ".lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+        return mapping
+
+    def incremental_vacuum(self, max_pages: int = None) -> int:
+        """增量整理：把文件末尾的页面搬到空闲页中并截断文件。
+
+        Args:
+            max_pages: 最多从文件末尾回收的页数，None表示回收全部空闲页
+
+        Returns:
+            int: 回收的页数
+
+        Raises:
+            DatabaseError: 如果有活动事务
+        """
+        self._check_idle()
+        database = self.database
+        pager = database.pager
+        free_pages = set(pager.freelist.pages())
+        if not free_pages:
+            return 0
+
+        # 从末尾向前处理：空闲页直接丢弃，使用中的页面搬到最前面的空闲页
+        mapping: Dict[int, int] = {}
+        end = pager.num_pages
+        released = 0
+        while free_pages and (max_pages is None or released < max_pages):
+            last = end - 1
+            if last in free_pages:
+                free_pages.discard(last)
+            else:
+                destination = min(free_pages)
+                free_pages.discard(destination)
+                mapping[last] = destination
+            end -= 1
+            released += 1
+
+        if mapping:
+            with pager.pinned():
+                roots = [entry.root_page for entry in database.catalog.entries()]
+                if pager.header.catalog_root:
+                    roots.append(pager.header.catalog_root)
+                for page_num in self._tree_pages(pager, roots):
+                    _remap_node(pager, page_num, mapping)
+                for page_num in database.schema_store._chain() + pager.page_versions.chain():
+                    _remap_chain_page(pager, page_num, mapping)
+                for old_page, new_page in mapping.items():
+                    pager.write_page(new_page, bytes(pager.get_page(old_page)))
+
+            header = pager.header
+            header.catalog_root = mapping.get(header.catalog_root, header.catalog_root)
+            header.schema_root = mapping.get(header.schema_root, header.schema_root)
+            header.page_versions_root = mapping.get(header.page_versions_root, header.page_versions_root)
+            pager.update_header()
+
+        pager.freelist.rebuild(free_pages)
+        pager.shrink(end)
+
+        if mapping:
+            # 目录记录中的根页号最后更新，此时目录B树已位于新位置
+            database._reopen_catalog()
+            for entry in database.catalog.entries():
+                if entry.root_page in mapping:
+                    entry.root_page = mapping[entry.root_page]
+                    database.catalog.update(entry)
+            pager.flush()
+
+        return released
@@ -0,0 +1,264 @@
+"""缓存预热模块，重新打开数据库后在后台把上次的热点页面读回缓冲池。
+
+进程重启后缓冲池是空的，最初的每个查询都要从磁盘读取页面。
+关闭连接（或检查点）时，分页管理器按替换策略的保留优先级取出缓冲池中
+最热的页面，把页号写入数据库文件旁的热点页列表文件（"<数据库文件>.warm"）。
+下次打开时预热线程读取该列表，按页号排序、合并为大块读取，
+把页面作为干净页帧放入缓冲池。
+
+预热线程使用自己的文件锁，每次读取时短暂持有SHARED锁，
+无法立即获得时跳过这一段，绝不让写入者等待。读取期间其他连接
+提交过（变更计数器与本连接缓存对应的不同）或本连接写回过页面时，
+读到的页面作废。缓冲池已满时停止预热，不挤出前台查询加载的页面。
+"""
+
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .concurrent_storage import FileLock, LockState
+from .constants import HEADER_PAGE_NUM, WARMUP_MAGIC, WARMUP_READ_PAGES
+from .exceptions import ChecksumError, LockError, StorageError
+from .header import DatabaseHeader
+
+# 热点页列表文件：魔数(8) + 页面大小(4) + 页数(4)，之后是按热度排列的页号(各4字节)
+HOT_PAGES_STRUCT = struct.Struct('<8sII')
+HOT_PAGE_ENTRY = struct.Struct('<I')
+
+
+def save_hot_pages(path: str, page_size: int, pages: List[int]) -> None:
+    """写入热点页列表文件（先写临时文件再替换，不会留下半个列表）。
+
+    Args:
+        path: 列表文件路径
+        page_size: 数据库的页面大小
+        pages: 按热度从高到低排列的页号
+
+    Raises:
+        StorageError: 如果无法写入列表文件
+    """
+    data = HOT_PAGES_STRUCT.pack(WARMUP_MAGIC, page_size, len(pages))
+    data += b''.join(HOT_PAGE_ENTRY.pack(page_num) for page_num in pages)
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        raise StorageError(f"Unable to save hot page list: {e}")
+
+
+def load_hot_pages(path: str, page_size: int) -> List[int]:
+    """读取热点页列表文件。
+
+    列表只是优化提示，文件不存在、已损坏或属于不同页面大小的数据库时返回空列表。
+
+    Args:
+        path: 列表文件路径
+        page_size: 数据库的页面大小
+
+    Returns:
+        按热度从高到低排列的页号
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    if len(data) < HOT_PAGES_STRUCT.size:
+        return []
+    magic, saved_page_size, count = HOT_PAGES_STRUCT.unpack_from(data)
+    if (magic != WARMUP_MAGIC or saved_page_size != page_size
+            or len(data) != HOT_PAGES_STRUCT.size + count * HOT_PAGE_ENTRY.size):
+        return []
+    return [page_num for (page_num,) in HOT_PAGE_ENTRY.iter_unpack(data[HOT_PAGES_STRUCT.size:])]
+
+
+def remap_hot_pages(path: str, page_size: int, mapping: Dict[int, int]) -> None:
+    """页面被整理移动后按新旧页号的对应关系改写热点页列表。
+
+    没有出现在对应关系中的页面（已被丢弃）从列表中删除。
+
+    Args:
+        path: 列表文件路径
+        page_size: 数据库的页面大小
+        mapping: 旧页号到新页号的映射
+    """
+    pages = load_hot_pages(path, page_size)
+    if pages:
+        save_hot_pages(path, page_size,
+                       [mapping[page_num] for page_num in pages if page_num in mapping])
+
+
+class CacheWarmer:
+    """把热点页面读回缓冲池的后台线程。
+
+    Attributes:
+        pager: 所属的分页管理器
+        pages: 要预热的页号（按页号排序）
+        max_pages: 一次合并读取的最大页数
+        reads: 执行的合并读取次数
+        pages_warmed: 放入缓冲池的页数
+        busy: 因其他连接正在写入而跳过的读取次数
+        discarded: 因读取期间缓存失效而作废的读取次数
+
+    Examples:
+        >>> warmer = CacheWarmer(pager, load_hot_pages(pager.hot_pages_path, pager.page_size))
+        >>> warmer.start()
+        >>> warmer.stop()
+    """
+
+    def __init__(self, pager, pages: List[int], max_pages: int = WARMUP_READ_PAGES) -> None:
+        """初始化预热线程（不会自动启动）。
+
+        Args:
+            pager: 所属的分页管理器（ConcurrentPager及其子类）
+            pages: 要预热的页号
+            max_pages: 一次合并读取的最大页数
+        """
+        self.pager = pager
+        self.pages = sorted(set(page_num for page_num in pages if page_num != HEADER_PAGE_NUM))
+        self.max_pages = max_pages
+        self.reads = 0
+        self.pages_warmed = 0
+        self.busy = 0
+        self.discarded = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """预热线程是否在运行。"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动预热线程（已在运行时不做任何事）。"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pysqlit-warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止预热线程并等待其退出。"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待预热完成。
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            bool: 预热线程已结束时返回True
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def _runs(self) -> Iterator[Tuple[int, int]]:
+        """把排好序的页号切分为页号连续的读取段。
+
+        Returns:
+            (起始页号, 页数)迭代器
+        """
+        start = count = None
+        for page_num in self.pages:
+            if start is not None and page_num == start + count and count < self.max_pages:
+                count += 1
+                continue
+            if start is not None:
+                yield start, count
+            start, count = page_num, 1
+        if start is not None:
+            yield start, count
+
+    def _run(self) -> None:
+        """预热线程主体。"""
+        try:
+            self.run()
+        except (OSError, ValueError, AttributeError):
+            pass  # 连接已关闭
+
+    def run(self) -> int:
+        """按页号顺序预热所有页面（在调用线程中执行）。
+
+        Returns:
+            int: 放入缓冲池的页数
+        """
+        pager = self.pager
+        pool = pager.buffer_pool
+        lock = FileLock(pager.filename)
+        try:
+            for start, count in self._runs():
+                if self._stop.is_set() or self._pool_full():
+                    break
+                epoch, generation = pager.cache_epoch, pager.write_generation
+                try:
+                    lock.acquire(LockState.SHARED, timeout=0)
+                except LockError:
+                    self.busy += 1
+                    continue
+                try:
+                    header = DatabaseHeader.unpack(
+                        os.pread(pager.file_descriptor.fileno(), pager.page_size, 0))
+                    pages = pager._read_run(start, count)
+                finally:
+                    lock.release()
+
+                with pool.lock:
+                    # 磁盘上的文件与本连接缓存对应的版本不同，读到的页面可能已过期
+                    if (header.change_counter != pager.header.change_counter
+                            or pager.cache_epoch != epoch or pager.write_generation != generation):
+                        self.discarded += 1
+                        continue
+                    self.reads += 1
+                    self._install(start, pages)
+        finally:
+            lock.close()
+        return self.pages_warmed
+
+    def _pool_full(self) -> bool:
+        """缓冲池是否已满（预热不淘汰任何页面）。"""
+        capacity = self.pager.buffer_pool.capacity
+        return capacity is not None and len(self.pager.buffer_pool) >= capacity
+
+    def _install(self, start: int, pages: List[bytes]) -> None:
+        """把读到的页面作为干净页帧放入缓冲池。
+
+        缓冲池中已有的页面保持不变；校验失败的页面及其后的页面不放入缓冲池。
+
+        Args:
+            start: 第一个页面的页号
+            pages: 页面数据
+        """
+        pager = self.pager
+        for offset, data in enumerate(pages):
+            page_num = start + offset
+            if page_num >= pager.num_pages or len(data) != pager.page_size or self._pool_full():
+                break
+            try:
+                pager._verify_page(page_num, data)
+            except ChecksumError:
+                break
+            if pager.buffer_pool.prefetch(page_num, data):
+                self.pages_warmed += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取预热统计信息。
+
+        Returns:
+            包含列表页数、合并读取次数、预热页数、跳过和作废次数的字典
+        """
+        return {
+            'pages_listed': len(self.pages),
+            'reads': self.reads,
+            'pages_warmed': self.pages_warmed,
+            'busy': self.busy,
+            'discarded': self.discarded,
+        }
@@ -0,0 +1,103 @@
+"""Unit tests for pysqlit/bgwriter.py module."""
+
+import time
+
+from pysqlit.bgwriter import BackgroundWriter
+from pysqlit.concurrent_storage import ConcurrentPager, LockState
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+
+
+def dirty_pages(pager, count, fill=1):
+    """Allocate count pages and fill each with the given byte."""
+    pages = [pager.allocate_page() for _ in range(count)]
+    for page_num in pages:
+        pager.write_page(page_num, bytes([fill]) * pager.page_size)
+    return pages
+
+
+class TestBackgroundWriter:
+    """Test cases for BackgroundWriter class."""
+
+    def test_writes_in_page_order_with_budget(self, temp_db_path):
+        """Test each round writes at most batch_size pages, resuming after the last one."""
+        pager = ConcurrentPager(temp_db_path, cache_size=100)
+        writer = BackgroundWriter(pager, pages_per_second=100, dirty_ratio=0.0, interval=0.04)
+        assert writer.batch_size == 4
+        pages = dirty_pages(pager, 10)
+
+        assert writer.run_once() == 4
+        assert not any(pager.buffer_pool.is_dirty(p) for p in pages[:4])
+        assert all(pager.buffer_pool.is_dirty(p) for p in pages[4:])
+        assert writer.run_once() == 4
+        assert writer.run_once() == 2
+        assert pager.buffer_pool.dirty_pages() == []
+        assert pager.lock_state == LockState.EXCLUSIVE
+
+        # 提交时只剩文件头页需要写出
+        pager.reset_io_stats()
+        pager.flush()
+        assert pager.get_io_stats()['bytes_written'] == pager.page_size
+        pager.close()
+
+        pager = ConcurrentPager(temp_db_path)
+        assert all(pager.get_page(p)[0] == 1 for p in pages)
+        pager.close()
+
+    def test_skips_pinned_pages_and_low_ratio(self, temp_db_path):
+        """Test pinned pages are left alone and nothing is written below the threshold."""
+        pager = ConcurrentPager(temp_db_path, cache_size=100)
+        writer = BackgroundWriter(pager, dirty_ratio=0.5)
+        pages = dirty_pages(pager, 10)
+        assert writer.run_once() == 0
+
+        writer.dirty_ratio = 0.0
+        pager.pin(pages[0])
+        assert writer.run_once() == 9
+        assert pager.buffer_pool.is_dirty(pages[0])
+        pager.unpin(pages[0])
+        pager.close()
+
+    def test_busy_when_reader_holds_shared(self, temp_db_path):
+        """Test a round is skipped instead of waiting when another connection is reading."""
+        pager = ConcurrentPager(temp_db_path)
+        reader = ConcurrentPager(temp_db_path)
+        writer = BackgroundWriter(pager, dirty_ratio=0.0)
+        dirty_pages(pager, 3)
+        reader.begin_read()
+
+        assert writer.run_once() == 0
+        assert writer.busy_rounds == 1
+        assert pager.lock_state == LockState.RESERVED
+
+        reader.end_read()
+        assert writer.run_once() == 3
+        pager.close()
+        reader.close()
+
+    def test_thread_drains_dirty_pages(self, temp_db_path):
+        """Test the pager-owned thread writes dirty pages without a flush."""
+        pager = ConcurrentPager(temp_db_path, cache_size=20, background_writer=True)
+        pager.background_writer.dirty_ratio = 0.0
+        pages = dirty_pages(pager, 10)
+        pager.background_writer.wake()
+
+        deadline = time.monotonic() + 5
+        while pager.buffer_pool.dirty_pages() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pager.buffer_pool.dirty_pages() == []
+        assert pager.get_io_stats()['background_writer']['pages_written'] >= len(pages)
+        pager.close()
+        assert not pager.background_writer.running
+
+    def test_database_with_background_writer(self, temp_db_path):
+        """Test SQL workloads commit correctly with the background writer enabled."""
+        db = EnhancedDatabase(temp_db_path, cache_size=16, background_writer=True)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 61):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path)
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 60
+        db.close()
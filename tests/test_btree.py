@@ -4,10 +4,29 @@ import pytest
 import tempfile
 import os
 
-from pysqlit.btree import EnhancedBTree
+import random
+
+from pysqlit.btree import EnhancedBTree, EnhancedBTreeNode, EnhancedInternalNode, EnhancedLeafNode
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.constants import LEAF_NODE_HEADER_SIZE, NODE_INTERNAL, NODE_LEAF
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import BTreeError
 from pysqlit.storage import Pager
 
 
+def tree_depth(pager, page_num, parent=None):
+    """Return the depth of a subtree, checking parent pointers and uniform leaf depth."""
+    node = EnhancedBTreeNode(pager, page_num)
+    if parent is not None:
+        assert node.get_parent() == parent
+    if node.get_node_type() == NODE_LEAF:
+        return 1
+    depths = {tree_depth(pager, child, page_num)
+              for child in EnhancedInternalNode(pager, page_num).children()}
+    assert len(depths) == 1
+    return depths.pop() + 1
+
+
 class TestEnhancedBTree:
     """Test cases for EnhancedBTree class."""
     
@@ -126,6 +145,34 @@ class TestEnhancedBTree:
             results = btree.select_all()
             assert len(results) == num_keys
     
+    def test_leaf_capacity_follows_page_size(self, temp_db_path):
+        """Test leaf capacity is computed from the page size and row size."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager, row_size=100)
+            root = EnhancedLeafNode(pager, btree.root_page_num)
+            assert root.max_cells(100) == (1024 - LEAF_NODE_HEADER_SIZE) // EnhancedLeafNode.cell_space(100)
+            
+            for i in range(10):
+                btree.insert(i, f"value{i}".encode().ljust(100, b"."))
+            assert pager.get_page(btree.root_page_num)[0] == NODE_INTERNAL
+            assert [key for key, _ in btree.select_all()] == list(range(10))
+        
+        with Pager(temp_db_path + "-default", page_size=4096) as pager:
+            btree = EnhancedBTree(pager, row_size=100)
+            root = EnhancedLeafNode(pager, btree.root_page_num)
+            # Slotted layout: 22-byte header, 2-byte pointer and 8-byte header per cell (the old formula gives 39)
+            assert root.max_cells(100) == (4096 - LEAF_NODE_HEADER_SIZE) // EnhancedLeafNode.cell_space(100)
+            assert root.max_cells(100) == 37
+        os.remove(temp_db_path + "-default")
+        
+        with Pager(temp_db_path + "-large", page_size=65536) as pager:
+            btree = EnhancedBTree(pager, row_size=100)
+            for i in range(600):
+                btree.insert(i, f"value{i}".encode())
+            assert pager.get_page(btree.root_page_num)[0] == NODE_LEAF
+            assert len(btree.select_all()) == 600
+        os.remove(temp_db_path + "-large")
+    
     def test_negative_keys(self, temp_db_path):
         """Test inserting negative keys."""
         with Pager(temp_db_path) as pager:
@@ -203,4 +250,271 @@ class TestEnhancedBTree:
                 assert result is True
             
             results = btree.select_all()
-            assert len(results) == len(edge_keys)
\ No newline at end of file
+            assert len(results) == len(edge_keys)
+
+
+class TestEnhancedLeafNode:
+    """Test cases for EnhancedLeafNode class."""
+    
+    def test_cells_take_their_encoded_size(self, temp_db_path):
+        """Test short rows pack densely instead of reserving a fixed row size."""
+        with Pager(temp_db_path) as pager:
+            btree = EnhancedBTree(pager, row_size=291)
+            for key in range(100):
+                btree.insert(key, f"row{key}".encode())
+            root = EnhancedLeafNode(pager, btree.root_page_num)
+            assert pager.get_page(btree.root_page_num)[0] == NODE_LEAF
+            assert root.num_cells() == 100
+            assert root.value(42) == b"row42"
+            assert root.free_space() == root.capacity() - sum(
+                root.cell_space(len(value)) for _, value in root.cells())
+    
+    def test_delete_leaves_fragments_reclaimed_by_compaction(self, temp_db_path):
+        """Test space freed by deletes is reused after in-page compaction."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            leaf = EnhancedLeafNode(pager, pager.allocate_page())
+            for key in range(9):
+                leaf.insert_cell(key, key, bytes([key]) * 100)
+            assert not leaf.has_room(100)
+            
+            leaf.delete_cell(4)
+            leaf.delete_cell(2)
+            assert leaf.fragmented_bytes() == 2 * 108
+            assert leaf.has_room(200)
+            
+            leaf.insert_cell(2, 10, b"x" * 200)
+            assert leaf.fragmented_bytes() == 0
+            assert [key for key, _ in leaf.cells()] == [0, 1, 10, 3, 5, 6, 7, 8]
+            assert leaf.value(2) == b"x" * 200
+            assert leaf.value(7) == bytes([8]) * 100
+    
+    def test_delete_front_cell_shrinks_content(self, temp_db_path):
+        """Test deleting the cell at the content start leaves no fragment."""
+        with Pager(temp_db_path) as pager:
+            leaf = EnhancedLeafNode(pager, pager.allocate_page())
+            leaf.insert_cell(0, 1, b"first")
+            leaf.insert_cell(1, 2, b"second")
+            leaf.delete_cell(1)
+            assert leaf.fragmented_bytes() == 0
+            leaf.delete_cell(0)
+            assert leaf.num_cells() == 0
+            assert leaf.free_space() == leaf.capacity()
+    
+    def test_update_changes_cell_size(self, temp_db_path):
+        """Test updates may grow or shrink a row, splitting the leaf when needed."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager)
+            for key in range(11):
+                btree.insert(key, b"a" * 80)
+            assert btree.update(3, b"b")
+            assert btree.update(5, b"c" * 230)
+            assert pager.get_page(btree.root_page_num)[0] == NODE_INTERNAL
+            values = dict(btree.scan())
+            assert values[3] == b"b"
+            assert values[5] == b"c" * 230
+            assert len(values) == 11
+    
+    def test_oversized_row_overflows(self, temp_db_path):
+        """Test a row larger than the inline limit keeps only a prefix in the leaf."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager)
+            btree.insert(1, b"x" * 5000)
+            leaf = EnhancedLeafNode(pager, btree.root_page_num)
+            assert leaf.is_overflow(0)
+            assert leaf.free_space() > leaf.capacity() - 100
+            assert bytes(leaf.value(0)) == b"x" * 5000
+    
+    def test_uneven_cells_split_into_fitting_leaves(self, temp_db_path):
+        """Test a large row landing between large rows still splits into valid leaves."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager)
+            for key in (1, 2, 4, 5):
+                btree.insert(key, bytes([key]) * 230)
+            btree.insert(3, b"c" * 230)
+            assert [len(value) for _, value in btree.scan()] == [230] * 5
+            assert tree_depth(pager, btree.root_page_num) == 2
+
+
+class TestSplitPropagation:
+    """Test cases for splits propagating through internal nodes."""
+    
+    def test_random_inserts_build_multi_level_tree(self, temp_db_path):
+        """Test splits of non-root leaves and internal nodes keep every key reachable."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager, row_size=100)
+            keys = list(range(2000))
+            random.Random(7).shuffle(keys)
+            for key in keys:
+                btree.insert(key, f"value{key}".encode().ljust(100, b"."))
+            
+            assert [key for key, _ in btree.scan()] == list(range(2000))
+            assert tree_depth(pager, btree.root_page_num) > 2
+            for key in range(0, 2000, 37):
+                page_num, cell_num = btree.find(key)
+                assert EnhancedLeafNode(pager, page_num).key(cell_num) == key
+    
+    def test_split_keeps_inserted_key_in_left_half(self, temp_db_path):
+        """Test a key inserted into the left half of a splitting leaf is not lost."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager, row_size=100)
+            for key in range(100, 0, -1):
+                btree.insert(key, f"value{key}".encode().ljust(100, b"."))
+            assert [key for key, _ in btree.scan()] == list(range(1, 101))
+    
+    def test_duplicate_key_in_full_leaf(self, temp_db_path):
+        """Test a duplicate key is rejected even when its leaf is full."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager, row_size=100)
+            for key in range(9):
+                btree.insert(key, b"v" * 100)
+            with pytest.raises(BTreeError):
+                btree.insert(4, b"again")
+            assert len(btree.scan()) == 9
+    
+    def test_table_rows_survive_growth(self, temp_db_path):
+        """Test a table keeps every row after growing past two leaves."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 301):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        assert len(executor.execute("SELECT * FROM t")[1]) == 300
+        executor.execute("DELETE FROM t WHERE id > 10")
+        assert len(executor.execute("SELECT * FROM t")[1]) == 10
+        db.close()
+
+
+class TestEnhancedInternalNode:
+    """Test cases for EnhancedInternalNode class."""
+    
+    def test_capacity_follows_page_size(self, temp_db_path):
+        """Test internal node capacity fills the page instead of a fixed key count."""
+        with Pager(temp_db_path) as pager:
+            btree = EnhancedBTree(pager)
+            assert EnhancedInternalNode(pager, btree.root_page_num).max_keys() == 510
+        with Pager(temp_db_path + "-small", page_size=1024) as pager:
+            btree = EnhancedBTree(pager)
+            assert EnhancedInternalNode(pager, btree.root_page_num).max_keys() == 126
+        os.remove(temp_db_path + "-small")
+    
+    def test_find_child_index(self, temp_db_path):
+        """Test the binary search picks the first separator not below the key."""
+        with Pager(temp_db_path) as pager:
+            node = EnhancedInternalNode(pager, pager.allocate_page())
+            node.set_node_type(NODE_INTERNAL)
+            node.set_cells([10, 20, 30], [5, 6, 7, 8])
+            assert node.keys() == [10, 20, 30]
+            assert node.children() == [5, 6, 7, 8]
+            assert [node.find_child_index(key) for key in (1, 10, 11, 30, 31)] == [0, 0, 1, 2, 3]
+    
+    def test_wide_fanout_keeps_tree_shallow(self, temp_db_path):
+        """Test thousands of rows fit in a two-level tree on 4KB pages."""
+        with Pager(temp_db_path) as pager:
+            btree = EnhancedBTree(pager)
+            for key in range(3000):
+                btree.insert(key, f"value{key}".encode())
+            assert tree_depth(pager, btree.root_page_num) == 2
+            assert EnhancedInternalNode(pager, btree.root_page_num).num_keys() > 3
+            assert len(btree.scan()) == 3000
+
+
+class TestDeleteRebalancing:
+    """Test cases for merging and redistributing nodes after deletes."""
+    
+    def test_heavy_deletes_merge_leaves_and_free_pages(self, temp_db_path):
+        """Test deleting most keys shortens the leaf chain and returns pages to the freelist."""
+        pager = ConcurrentPager(temp_db_path, page_size=1024)
+        btree = EnhancedBTree.create(pager)
+        keys = list(range(3000))
+        random.Random(3).shuffle(keys)
+        for key in keys:
+            btree.insert(key, f"value{key}".encode().ljust(100, b"."))
+        assert tree_depth(pager, btree.root_page_num) == 3
+        leaves_before = len(btree.node_pages()[1])
+        
+        for key in keys[:2900]:
+            assert btree.delete(key)
+        internal_pages, leaf_pages = btree.node_pages()
+        assert len(leaf_pages) < leaves_before // 10
+        assert pager.header.freelist_count >= leaves_before - len(leaf_pages)
+        assert tree_depth(pager, btree.root_page_num) == 2
+        for page_num in leaf_pages:
+            leaf = EnhancedLeafNode(pager, page_num)
+            assert leaf.capacity() - leaf.free_space() >= btree.fill_factor * leaf.capacity()
+        remaining = sorted(keys[2900:])
+        assert [key for key, _ in btree.scan()] == remaining
+        for key in remaining:
+            page_num, cell_num = btree.find(key)
+            assert EnhancedLeafNode(pager, page_num).key(cell_num) == key
+        pager.close()
+    
+    def test_delete_all_collapses_to_root_leaf(self, temp_db_path):
+        """Test the tree shrinks back to a single leaf on the original root page."""
+        pager = ConcurrentPager(temp_db_path, page_size=1024)
+        btree = EnhancedBTree.create(pager)
+        root_page_num = btree.root_page_num
+        for key in range(1000):
+            btree.insert(key, b"v" * 100)
+        for key in range(1000):
+            assert btree.delete(key)
+        assert btree.root_page_num == root_page_num
+        assert btree.node_pages() == ([], [root_page_num])
+        assert EnhancedBTreeNode(pager, root_page_num).is_root()
+        btree.insert(5, b"again")
+        assert btree.scan() == [(5, b"again")]
+        pager.close()
+    
+    def test_underfull_leaf_borrows_from_full_sibling(self, temp_db_path):
+        """Test a leaf below the fill factor takes cells from a sibling that cannot be merged."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager, fill_factor=0.5)
+            for key in range(14):
+                btree.insert(key, b"v" * 100)
+            root = EnhancedInternalNode(pager, btree.root_page_num)
+            children = root.children()
+            assert len(children) == 2
+            assert EnhancedLeafNode(pager, children[1]).num_cells() == 9
+            for key in (1, 2, 3, 4):
+                assert btree.delete(key)
+            
+            root = EnhancedInternalNode(pager, btree.root_page_num)
+            assert root.children() == children
+            left, right = (EnhancedLeafNode(pager, page_num) for page_num in children)
+            assert left.num_cells() == right.num_cells() == 5
+            assert root.key(0) == left.key(4)
+            assert [key for key, _ in btree.scan()] == [0] + list(range(5, 14))
+    
+    def test_zero_fill_factor_only_reclaims_empty_leaves(self, temp_db_path):
+        """Test a fill factor of 0 keeps sparse leaves but frees empty ones."""
+        with Pager(temp_db_path, page_size=1024) as pager:
+            btree = EnhancedBTree(pager, fill_factor=0)
+            for key in range(100):
+                btree.insert(key, b"v" * 100)
+            leaves_before = len(btree.node_pages()[1])
+            for key in range(100):
+                if key % 3:
+                    btree.delete(key)
+            assert len(btree.node_pages()[1]) == leaves_before
+            for key in range(0, 100, 3):
+                btree.delete(key)
+            assert btree.node_pages()[1] == [btree.root_page_num]
+    
+    def test_invalid_fill_factor(self, temp_db_path):
+        """Test fill factors outside 0-0.5 are rejected."""
+        with Pager(temp_db_path) as pager:
+            with pytest.raises(BTreeError):
+                EnhancedBTree(pager, fill_factor=0.8)
+    
+    def test_database_fill_factor(self, temp_db_path):
+        """Test tables use the fill factor configured on the database."""
+        db = EnhancedDatabase(temp_db_path, fill_factor=0.5)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 401):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        assert db.tables["t"].btree.fill_factor == 0.5
+        executor.execute("DELETE FROM t WHERE id > 20")
+        assert db.pager.header.freelist_count > 0
+        assert len(db.tables["t"].btree.node_pages()[1]) == 1
+        assert len(executor.execute("SELECT * FROM t")[1]) == 20
+        db.close()
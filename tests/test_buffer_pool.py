@@ -0,0 +1,222 @@
+"""Unit tests for pysqlit/buffer_pool.py module."""
+
+import pytest
+
+from pysqlit.btree import EnhancedBTree
+from pysqlit.buffer_pool import BufferPool
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.exceptions import StorageError
+
+
+PAGE = 64
+
+
+class FakeStore:
+    """In-memory backing store recording loads and write-backs."""
+
+    def __init__(self):
+        self.loads = []
+        self.writes = {}
+
+    def load(self, page_num):
+        self.loads.append(page_num)
+        return bytearray(self.writes.get(page_num, bytes(PAGE)))
+
+    def write(self, page_num, data):
+        self.writes[page_num] = bytes(data)
+
+
+class TestBufferPool:
+    """Test cases for BufferPool class."""
+
+    def test_hits_and_misses(self):
+        """Test hit/miss counters."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=4)
+        pool.get(0)
+        pool.get(0)
+        pool.get(1)
+        stats = pool.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 2
+        assert store.loads == [0, 1]
+
+    def test_lru_eviction_order(self):
+        """Test that the least recently used page is evicted first."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=2)
+        pool.get(0)
+        pool.get(1)
+        pool.get(0)  # page 1 becomes LRU
+        pool.get(2)
+        assert 0 in pool
+        assert 1 not in pool
+        assert len(pool) == 2
+
+    def test_only_dirty_frames_written_back(self):
+        """Test eviction writes back dirty pages and drops clean ones."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=1)
+        page = pool.get(0)
+        page[0] = 7
+        pool.mark_dirty(0)
+        pool.get(1)  # evicts dirty page 0
+        pool.get(2)  # evicts clean page 1
+        assert store.writes == {0: bytes([7]) + bytes(PAGE - 1)}
+        assert pool.get_stats()['writebacks'] == 1
+        assert pool.get_stats()['evictions'] == 2
+
+    def test_pinned_pages_not_evicted(self):
+        """Test pinned pages survive eviction until unpinned."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=1)
+        pool.pin(0)
+        pool.get(1)
+        pool.get(2)
+        assert 0 in pool
+        pool.unpin(0)
+        pool.get(3)
+        assert 0 not in pool
+
+    def test_pinned_scope(self):
+        """Test pages fetched inside pinned() stay resident until exit."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=2)
+        with pool.pinned():
+            for page_num in range(5):
+                pool.get(page_num)
+            assert len(pool) == 5  # temporarily over capacity
+        assert len(pool) == 2
+        assert pool.get_stats()['pinned_pages'] == 0
+
+    def test_put_updates_frame_in_place(self):
+        """Test put keeps existing page references valid."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=4)
+        page = pool.get(0)
+        pool.put(0, b'\x01' * PAGE)
+        assert page == bytearray(b'\x01' * PAGE)
+        assert pool.dirty_pages() == [0]
+
+    def test_byte_budget(self):
+        """Test capacity derived from a byte budget."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_bytes=PAGE * 3)
+        assert pool.capacity == 3
+
+    def test_invalid_capacity(self):
+        """Test that a zero capacity is rejected."""
+        with pytest.raises(StorageError):
+            BufferPool(PAGE, FakeStore().load, max_pages=0)
+
+    def test_dirty_pages_without_writer_are_kept(self):
+        """Test dirty pages are never dropped when there is no backing store."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, None, max_pages=1)
+        pool.get(0)
+        pool.mark_dirty(0)
+        pool.get(1)
+        assert 0 in pool
+
+    def test_frames_reuse_arena_slots(self):
+        """Test frames are views of the preallocated arena and slots are recycled."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=2)
+        first = pool.get(0)
+        assert isinstance(first, memoryview)
+        assert first.obj is pool._arena.obj
+        slot = pool.frames[0].slot
+
+        pool.get(1)
+        pool.get(2)  # 淘汰页面0，其槽位由页面2复用
+        assert pool.frames[2].slot == slot
+        with pytest.raises(ValueError):
+            first[0]  # 被淘汰页帧的视图已释放
+
+    def test_pinned_overflow_uses_standalone_frames(self):
+        """Test frames beyond capacity are allocated separately and slots are returned."""
+        store = FakeStore()
+        pool = BufferPool(PAGE, store.load, store.write, max_pages=1)
+        with pool.pinned():
+            pool.get(0)
+            pool.get(1)
+            assert pool.frames[1].slot is None
+        pool.get(2)
+        assert len(pool) == 1
+        assert pool.frames[2].slot is not None
+
+
+class TestConcurrentPagerBufferPool:
+    """Test cases for ConcurrentPager backed by a bounded buffer pool."""
+
+    def test_evicted_pages_persist(self, temp_db_path):
+        """Test pages evicted from a tiny cache are written back and reloaded."""
+        pager = ConcurrentPager(temp_db_path, cache_size=2)
+        for page_num in range(1, 6):
+            pager.write_page(page_num, bytes([page_num]) * pager.page_size)
+        assert len(pager.buffer_pool) <= 2
+
+        for page_num in range(1, 6):
+            assert pager.get_page(page_num)[0] == page_num
+        assert pager.get_cache_stats()['misses'] > 0
+        pager.close()
+
+    def test_flush_clears_dirty_pages(self, temp_db_path):
+        """Test flush writes dirty frames and clears their dirty flag."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.write_page(1, b'\x05' * pager.page_size)
+        assert pager.get_cache_stats()['dirty_pages'] >= 1
+        pager.flush()
+        assert pager.get_cache_stats()['dirty_pages'] == 0
+        pager.close()
+
+        with open(temp_db_path, 'rb') as f:
+            f.seek(pager.page_size)
+            assert f.read(1) == b'\x05'
+    
+    def test_flush_coalesces_contiguous_dirty_pages(self, temp_db_path):
+        """Test contiguous dirty pages are flushed with a single write."""
+        pager = ConcurrentPager(temp_db_path)
+        for _ in range(4):
+            pager.allocate_page()
+        pager.flush()
+        
+        calls = []
+        original = pager._write_pages
+        
+        def counting_write_pages(page_nums, get_data):
+            writes = original(page_nums, get_data)
+            calls.append(writes)
+            return writes
+        
+        pager._write_pages = counting_write_pages
+        for page_num in (1, 2, 3):
+            pager.write_page(page_num, bytes([page_num]) * pager.page_size)
+        pager.flush()
+        assert calls == [1]
+        
+        pager.flush()  # nothing dirty, nothing written
+        assert calls == [1]
+        pager.close()
+
+    def test_btree_writes_modify_frames_in_place(self, temp_db_path):
+        """Test B-tree modifications dirty the cached frame without whole-page writes."""
+        pager = ConcurrentPager(temp_db_path, cache_size=8)
+        btree = EnhancedBTree(pager)
+        btree.insert(1, b'one')
+
+        writes = []
+        original = pager.write_page
+        pager.write_page = lambda page_num, data: writes.append(page_num) or original(page_num, data)
+        btree.insert(2, b'two')
+        btree.update(1, b'uno')
+        btree.delete(2)
+        assert writes == []
+        assert pager.buffer_pool.is_dirty(btree.root_page_num)
+        rows = btree.scan()
+        assert [key for key, _ in rows] == [1]
+        pager.close()
+
+        pager = ConcurrentPager(temp_db_path)
+        assert EnhancedBTree(pager).scan() == rows
+        pager.close()
@@ -0,0 +1,106 @@
+"""Unit tests for pysqlit/catalog.py module."""
+
+import os
+import pytest
+
+from pysqlit.catalog import SchemaStore, SystemCatalog
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase
+from pysqlit.exceptions import StorageError
+from pysqlit.models import Row
+
+
+class TestSystemCatalog:
+    """Test cases for SystemCatalog class."""
+    
+    def test_tables_and_indexes(self, temp_db_path):
+        """Test table and index entries round-trip through the catalog B-tree."""
+        pager = ConcurrentPager(temp_db_path)
+        catalog = SystemCatalog(pager)
+        assert catalog.get_table("users") is None
+        catalog.add_table("users", root_page=pager.allocate_page())
+        catalog.add_index("idx_users_name", "users", root_page=pager.allocate_page())
+        entry = catalog.get_table("users")
+        entry.sequence = 7
+        catalog.update(entry)
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        catalog = SystemCatalog(pager)
+        assert catalog.get_table("users").sequence == 7
+        assert [e.name for e in catalog.indexes_for("users")] == ["idx_users_name"]
+        
+        catalog.remove(catalog.get_table("users"))
+        assert catalog.get_table("users") is None
+        pager.close()
+    
+    def test_duplicate_entry(self, temp_db_path):
+        """Test that registering a table twice is rejected."""
+        pager = ConcurrentPager(temp_db_path)
+        catalog = SystemCatalog(pager)
+        catalog.add_table("users", root_page=pager.allocate_page())
+        with pytest.raises(StorageError):
+            catalog.add_table("users", root_page=pager.allocate_page())
+        pager.close()
+
+
+class TestSchemaStore:
+    """Test cases for SchemaStore class."""
+    
+    def test_empty_store(self, temp_db_path):
+        """Test a new database has no schemas."""
+        pager = ConcurrentPager(temp_db_path)
+        assert SchemaStore(pager).load() == {}
+        pager.close()
+    
+    def test_save_and_load_multi_page(self, temp_db_path):
+        """Test schemas larger than a page span a chain of pages."""
+        pager = ConcurrentPager(temp_db_path)
+        store = SchemaStore(pager)
+        schemas = {f"table_{i}": {"columns": "x" * 500} for i in range(20)}
+        store.save(schemas)
+        pages_used = pager.num_pages
+        assert pager.header.schema_version == 1
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        store = SchemaStore(pager)
+        assert store.load() == schemas
+        
+        # a smaller schema reuses the existing pages
+        store.save({"table_0": schemas["table_0"]})
+        assert store.load() == {"table_0": schemas["table_0"]}
+        assert pager.num_pages == pages_used
+        pager.close()
+
+
+class TestSelfDescribingDatabase:
+    """Test cases for schema and table roots stored in the database file."""
+    
+    def test_no_sidecar_files(self, temp_db_path):
+        """Test schema survives reopen without a .schema file."""
+        db = EnhancedDatabase(temp_db_path)
+        db.create_table("users", {"id": "INTEGER", "name": "TEXT"}, primary_key="id")
+        db.create_table("tags", {"id": "INTEGER", "name": "TEXT"}, primary_key="id")
+        db.close()
+        
+        assert not os.path.exists(temp_db_path + ".schema")
+        
+        db = EnhancedDatabase(temp_db_path)
+        assert sorted(db.list_tables()) == ["tags", "users"]
+        roots = {name: db.catalog.get_table(name).root_page for name in db.list_tables()}
+        assert roots["users"] != roots["tags"]
+        db.close()
+    
+    def test_tables_do_not_share_pages(self, temp_db_path):
+        """Test each table scans only its own rows and keeps a stable root."""
+        db = EnhancedDatabase(temp_db_path)
+        db.create_table("users", {"id": "INTEGER", "name": "TEXT"}, primary_key="id")
+        db.create_table("tags", {"id": "INTEGER", "name": "TEXT"}, primary_key="id")
+        users = db.tables["users"]
+        root = users.btree.root_page_num
+        for i in range(1, 16):
+            users.insert_row(Row(id=i, name=f"u{i}"))
+        assert users.btree.root_page_num == root
+        assert db.tables["tags"].get_row_count() == 0
+        db.close()
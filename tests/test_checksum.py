@@ -0,0 +1,128 @@
+"""Unit tests for pysqlit/checksum.py module."""
+
+import os
+
+import pytest
+
+from pysqlit.btree import EnhancedLeafNode
+from pysqlit.checksum import checksum_valid, page_checksum, stamp_checksum
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.constants import CHECKSUM_SAMPLE_INTERVAL, PAGE_CHECKSUM_SIZE
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import ChecksumError, StorageError
+from pysqlit.mmap_storage import MmapPager
+
+
+def write_pages(path, count, **kwargs):
+    """Create a checksummed database with count filled pages."""
+    pager = ConcurrentPager(path, checksums=True, **kwargs)
+    pages = [pager.allocate_page() for _ in range(count)]
+    for page_num in pages:
+        pager.write_page(page_num, bytes([page_num]) * pager.page_size)
+    pager.close()
+    return pages, pager.page_size
+
+
+def corrupt(path, offset):
+    """Flip one byte of the file at offset."""
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        byte = f.read(1)[0]
+        f.seek(offset)
+        f.write(bytes([byte ^ 0xFF]))
+
+
+class TestPageChecksum:
+    """Test cases for page checksum helpers."""
+
+    def test_stamp_and_verify(self):
+        """Test a stamped page verifies and any changed byte is detected."""
+        page = stamp_checksum(b'\x07' * 4096)
+        assert checksum_valid(page)
+        assert int.from_bytes(page[-PAGE_CHECKSUM_SIZE:], 'little') == page_checksum(page)
+        page[100] ^= 1
+        assert not checksum_valid(page)
+
+    def test_unwritten_page_is_valid(self):
+        """Test an all-zero page that was never written passes verification."""
+        assert checksum_valid(bytes(4096))
+
+
+class TestPagerChecksums:
+    """Test cases for checksum verification in the pagers."""
+
+    @pytest.mark.parametrize("pager_class", [ConcurrentPager, MmapPager])
+    def test_detects_corrupted_page(self, temp_db_path, pager_class):
+        """Test a corrupted page raises ChecksumError on first read and is counted."""
+        pages, page_size = write_pages(temp_db_path, 3)
+        corrupt(temp_db_path, pages[1] * page_size + 10)
+
+        pager = pager_class(temp_db_path)
+        assert pager.checksums
+        assert pager.get_page(pages[0])[0] == pages[0]
+        with pytest.raises(ChecksumError):
+            pager.get_page(pages[1])
+        stats = pager.get_io_stats()
+        assert stats['checksum_failures'] == 1
+        assert stats['checksum_verifications'] >= 2
+        assert stats['verify_latency']['count'] == stats['checksum_verifications']
+        pager.close()
+
+    def test_detects_corrupted_header(self, temp_db_path):
+        """Test the header page is verified when the file is opened."""
+        write_pages(temp_db_path, 1)
+        corrupt(temp_db_path, 200)
+        with pytest.raises(ChecksumError):
+            ConcurrentPager(temp_db_path)
+
+    def test_sampled_and_off_modes(self, temp_db_path):
+        """Test sampled mode verifies a subset of reads and off mode skips verification."""
+        pages, page_size = write_pages(temp_db_path, 2 * CHECKSUM_SAMPLE_INTERVAL)
+
+        pager = ConcurrentPager(temp_db_path, verify_checksums='sampled')
+        pager.begin_read()
+        pager.reset_io_stats()
+        for page_num in pages:
+            pager.get_page(page_num)
+        assert pager.get_io_stats()['checksum_verifications'] == 2
+        pager.close()
+
+        corrupt(temp_db_path, pages[0] * page_size + 10)
+        pager = ConcurrentPager(temp_db_path, verify_checksums='off')
+        assert pager.get_page(pages[0])[10] == pages[0] ^ 0xFF
+        assert pager.get_io_stats()['checksum_verifications'] == 0
+        pager.close()
+
+        with pytest.raises(StorageError):
+            ConcurrentPager(temp_db_path, verify_checksums='sometimes')
+
+    def test_trailer_reserved_from_capacity(self, temp_db_path):
+        """Test checksummed files leave the trailer out of node capacity."""
+        plain = ConcurrentPager(temp_db_path + "-plain")
+        checked = ConcurrentPager(temp_db_path, checksums=True)
+        assert plain.usable_size == plain.page_size
+        assert checked.usable_size == checked.page_size - PAGE_CHECKSUM_SIZE
+        row_size = plain.page_size // 8
+        assert (EnhancedLeafNode(checked, 1).max_cells(row_size)
+                <= EnhancedLeafNode(plain, 1).max_cells(row_size))
+        plain.close()
+        checked.close()
+        os.remove(temp_db_path + "-plain")
+
+    @pytest.mark.parametrize("compression", [None, 'zlib'])
+    def test_database_with_checksums(self, temp_db_path, compression):
+        """Test SQL workloads and VACUUM keep pages verifiable."""
+        db = EnhancedDatabase(temp_db_path, checksums=True, compression=compression)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 61):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        db.vacuum()
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path, cache_size=4)
+        assert db.get_database_info()['checksums']
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 60
+        stats = db.get_database_info()['io_stats']
+        assert stats['checksum_verifications'] > 0 and stats['checksum_failures'] == 0
+        db.close()
@@ -0,0 +1,155 @@
+"""Unit tests for pysqlit/compression.py module."""
+
+import os
+
+import pytest
+
+from pysqlit.compression import compress_page, compression_id, decompress_page
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.constants import COMPRESSION_LZMA, COMPRESSION_ZLIB
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import StorageError
+from pysqlit.integrity import IntegrityChecker
+from pysqlit.mmap_storage import MmapPager
+
+
+def padded_page(pager, page_num):
+    """Build a mostly zero page that compresses well."""
+    return f"row-{page_num}".encode().ljust(pager.page_size, b'\x00')
+
+
+class TestCodecs:
+    """Test cases for the page codec helpers."""
+
+    @pytest.mark.parametrize("algorithm", [COMPRESSION_ZLIB, COMPRESSION_LZMA])
+    def test_roundtrip(self, algorithm):
+        """Test compressed pages decompress to the original bytes."""
+        data = b'abc'.ljust(4096, b'\x00')
+        compressed = compress_page(algorithm, data)
+        assert len(compressed) < 100
+        assert decompress_page(algorithm, compressed) == data
+
+    def test_unknown_algorithm(self, temp_db_path):
+        """Test unsupported algorithm names and corrupt data are rejected."""
+        with pytest.raises(StorageError):
+            compression_id('snappy')
+        with pytest.raises(StorageError):
+            ConcurrentPager(temp_db_path, compression='snappy')
+        with pytest.raises(StorageError):
+            decompress_page(COMPRESSION_ZLIB, b'not zlib data')
+
+
+class TestPageMap:
+    """Test cases for PageMap class and compressed pagers."""
+
+    @pytest.mark.parametrize("algorithm", ['zlib', 'lzma'])
+    def test_pages_roundtrip_compressed(self, temp_db_path, algorithm):
+        """Test pages survive a reopen and take far less space than raw pages."""
+        pager = ConcurrentPager(temp_db_path, compression=algorithm)
+        pages = [pager.allocate_page() for _ in range(50)]
+        for page_num in pages:
+            pager.write_page(page_num, padded_page(pager, page_num))
+        pager.close()
+        assert os.path.getsize(temp_db_path) < 51 * pager.page_size // 4
+
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.compression == algorithm
+        assert all(bytes(pager.get_page(p)) == padded_page(pager, p) for p in pages)
+        stats = pager.get_io_stats()['compression']
+        assert stats['pages'] == 50
+        assert stats['stored_bytes'] < stats['logical_bytes'] // 10
+        pager.close()
+
+    def test_incompressible_pages_and_relocation(self, temp_db_path):
+        """Test incompressible pages are stored raw and moved when they grow."""
+        pager = ConcurrentPager(temp_db_path, compression='zlib')
+        first, second = pager.allocate_page(), pager.allocate_page()
+        pager.write_page(first, padded_page(pager, first))
+        pager.write_page(second, padded_page(pager, second))
+        pager.flush()
+        sector, length = pager.page_map.locate(first)
+        assert length < pager.page_size
+
+        noise = os.urandom(pager.page_size)
+        pager.write_page(first, noise)
+        pager.flush()
+        moved_sector, moved_length = pager.page_map.locate(first)
+        assert moved_length == pager.page_size
+        assert moved_sector != sector
+        pager.close()
+
+        pager = ConcurrentPager(temp_db_path)
+        assert bytes(pager.get_page(first)) == noise
+        assert bytes(pager.get_page(second)) == padded_page(pager, second)
+        pager.close()
+
+    def test_rewrites_reuse_space(self, temp_db_path):
+        """Test repeatedly rewriting pages does not grow the file."""
+        pager = ConcurrentPager(temp_db_path, compression='zlib')
+        pages = [pager.allocate_page() for _ in range(20)]
+        for round_num in range(5):
+            for page_num in pages:
+                pager.write_page(page_num, padded_page(pager, page_num * 100 + round_num))
+            pager.flush()
+            if round_num == 0:
+                size = pager.get_file_size()
+        assert pager.get_file_size() == size
+        pager.close()
+
+    def test_other_connection_sees_moved_pages(self, temp_db_path):
+        """Test a second connection reloads the page map after another commit."""
+        writer = ConcurrentPager(temp_db_path, compression='zlib')
+        page_num = writer.allocate_page()
+        writer.write_page(page_num, padded_page(writer, page_num))
+        writer.flush()
+
+        reader = ConcurrentPager(temp_db_path)
+        reader.begin_read()
+        assert bytes(reader.get_page(page_num)) == padded_page(writer, page_num)
+        reader.end_read()
+
+        noise = os.urandom(writer.page_size)
+        writer.write_page(page_num, noise)
+        writer.flush()
+
+        reader.begin_read()
+        assert bytes(reader.get_page(page_num)) == noise
+        reader.end_read()
+        writer.close()
+        reader.close()
+
+    def test_shrink_truncates_file(self, temp_db_path):
+        """Test shrinking a compressed database releases its trailing sectors."""
+        pager = ConcurrentPager(temp_db_path, compression='zlib')
+        pages = [pager.allocate_page() for _ in range(10)]
+        for page_num in pages:
+            pager.write_page(page_num, os.urandom(pager.page_size))
+        pager.flush()
+        size = pager.get_file_size()
+
+        pager.shrink(pages[5])
+        assert pager.get_file_size() < size
+        assert pager.page_map.locate(pages[5]) == (0, 0)
+        pager.close()
+        assert IntegrityChecker.check_database_integrity(temp_db_path)['page_size_valid']
+
+    def test_mmap_rejects_compressed_database(self, temp_db_path):
+        """Test memory-mapped mode refuses compressed files."""
+        ConcurrentPager(temp_db_path, compression='zlib').close()
+        with pytest.raises(StorageError):
+            MmapPager(temp_db_path)
+
+    def test_database_with_compression(self, temp_db_path):
+        """Test SQL workloads and VACUUM on a compressed database."""
+        db = EnhancedDatabase(temp_db_path, compression='zlib')
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 41):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        db.vacuum()
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path)
+        assert db.get_database_info()['compression'] == 'zlib'
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 40
+        db.close()
@@ -0,0 +1,202 @@
+"""Unit tests for pysqlit/concurrent_storage.py locking."""
+
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from pysqlit.concurrent_storage import ConcurrentPager, FileLock, LockState
+from pysqlit.database import EnhancedDatabase, PrepareResult, SQLExecutor
+from pysqlit.exceptions import BusyError, LockError
+
+
+def insert_rows(path, start, count):
+    """Insert rows one autocommit statement at a time (run in a child process)."""
+    db = EnhancedDatabase(path)
+    executor = SQLExecutor(db)
+    for i in range(start, start + count):
+        result, _ = executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        assert result == PrepareResult.SUCCESS
+    db.close()
+
+
+class TestFileLock:
+    """Test cases for FileLock class."""
+    
+    def test_state_transitions(self, temp_db_path):
+        """Test locks escalate and downgrade through SQLite-style states."""
+        open(temp_db_path, 'wb').close()
+        lock = FileLock(temp_db_path)
+        lock.acquire(LockState.EXCLUSIVE)
+        assert lock.state == LockState.EXCLUSIVE
+        lock.downgrade(LockState.SHARED)
+        assert lock.state == LockState.SHARED
+        lock.release()
+        assert lock.state == LockState.UNLOCKED
+        lock.close()
+    
+    def test_held_lock_costs_no_syscalls(self, temp_db_path):
+        """Test re-acquiring a held state does not touch the file."""
+        open(temp_db_path, 'wb').close()
+        lock = FileLock(temp_db_path)
+        lock.acquire(LockState.SHARED)
+        operations = lock.lock_operations
+        for _ in range(10):
+            lock.acquire(LockState.SHARED)
+        assert lock.lock_operations == operations
+        lock.close()
+    
+    def test_single_reserved_holder(self, temp_db_path):
+        """Test only one connection can hold RESERVED while readers continue."""
+        open(temp_db_path, 'wb').close()
+        writer = FileLock(temp_db_path, timeout=0.05)
+        other = FileLock(temp_db_path, timeout=0.05)
+        writer.acquire(LockState.RESERVED)
+        other.acquire(LockState.SHARED)
+        with pytest.raises(LockError):
+            other.acquire(LockState.RESERVED)
+        assert other.state == LockState.SHARED
+        writer.close()
+        other.close()
+    
+    def test_shared_upgrade_fails_fast(self, temp_db_path):
+        """Test upgrading SHARED to RESERVED does not wait for the other writer."""
+        open(temp_db_path, 'wb').close()
+        writer = FileLock(temp_db_path, timeout=5)
+        other = FileLock(temp_db_path, timeout=5)
+        writer.acquire(LockState.RESERVED)
+        other.acquire(LockState.SHARED)
+        started = time.monotonic()
+        with pytest.raises(BusyError):
+            other.acquire(LockState.RESERVED)
+        assert time.monotonic() - started < 1
+        assert other.state == LockState.SHARED
+        writer.close()
+        other.close()
+    
+    def test_waiting_writer_holds_no_shared_lock(self, temp_db_path):
+        """Test a writer waiting for RESERVED does not block the current writer's commit."""
+        open(temp_db_path, 'wb').close()
+        writer = FileLock(temp_db_path, timeout=5)
+        waiter = FileLock(temp_db_path, timeout=5)
+        writer.acquire(LockState.RESERVED)
+        thread = threading.Thread(target=waiter.acquire, args=(LockState.RESERVED,))
+        thread.start()
+        time.sleep(0.05)
+        writer.acquire(LockState.EXCLUSIVE, timeout=0.5)
+        writer.release()
+        thread.join(5)
+        assert waiter.state == LockState.RESERVED
+        writer.close()
+        waiter.close()
+    
+    def test_exclusive_waits_for_readers(self, temp_db_path):
+        """Test EXCLUSIVE cannot be taken while another connection reads."""
+        open(temp_db_path, 'wb').close()
+        writer = FileLock(temp_db_path, timeout=0.05)
+        reader = FileLock(temp_db_path, timeout=0.05)
+        reader.acquire(LockState.SHARED)
+        writer.acquire(LockState.RESERVED)
+        with pytest.raises(LockError):
+            writer.acquire(LockState.EXCLUSIVE)
+        assert writer.state == LockState.RESERVED
+        
+        reader.release()
+        writer.acquire(LockState.EXCLUSIVE)
+        assert not reader.acquire_shared(timeout=0.05)
+        writer.close()
+        reader.close()
+
+
+class TestConcurrentPagerLocking:
+    """Test cases for connection-held locking in ConcurrentPager."""
+    
+    def test_read_path_locks_once(self, temp_db_path):
+        """Test cache misses inside a read transaction share one SHARED lock."""
+        pager = ConcurrentPager(temp_db_path)
+        for _ in range(20):
+            pager.allocate_page()
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        operations = pager.file_lock.lock_operations
+        pager.begin_read()
+        for page_num in range(1, 21):
+            pager.get_page(page_num)
+        assert pager.lock_state == LockState.SHARED
+        assert pager.file_lock.lock_operations == operations + 1
+        pager.end_read()
+        assert pager.lock_state == LockState.UNLOCKED
+        pager.close()
+    
+    def test_write_then_flush_releases(self, temp_db_path):
+        """Test writes take RESERVED and flush returns to the resting state."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.write_page(1, b'\x01' * pager.page_size)
+        assert pager.lock_state == LockState.RESERVED
+        pager.flush()
+        assert pager.lock_state == LockState.UNLOCKED
+        
+        pager.begin_read()
+        pager.write_page(1, b'\x02' * pager.page_size)
+        pager.flush()
+        assert pager.lock_state == LockState.SHARED
+        pager.end_read()
+        pager.close()
+    
+    def test_second_writer_is_busy(self, temp_db_path):
+        """Test a second connection cannot start writing while one is writing."""
+        first = ConcurrentPager(temp_db_path)
+        second = ConcurrentPager(temp_db_path)
+        second.file_lock.timeout = 0.05
+        first.write_page(1, b'\x01' * first.page_size)
+        with pytest.raises(LockError):
+            second.write_page(1, b'\x02' * second.page_size)
+        first.close()
+        second.close()
+    
+    def test_busy_upgrade_releases_shared(self, temp_db_path):
+        """Test a failed upgrade outside a read transaction lets the writer commit."""
+        first = ConcurrentPager(temp_db_path)
+        second = ConcurrentPager(temp_db_path)
+        first.write_page(1, b'\x01' * first.page_size)
+        second.file_lock.acquire(LockState.SHARED)
+        with pytest.raises(BusyError):
+            second.write_page(1, b'\x02' * second.page_size)
+        assert second.lock_state == LockState.UNLOCKED
+        first.file_lock.timeout = 0.5
+        first.flush()
+        assert first.lock_state == LockState.UNLOCKED
+        first.close()
+        second.close()
+    
+    def test_concurrent_autocommit_writers(self, temp_db_path):
+        """Test two processes inserting concurrently neither deadlock nor lose rows."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        
+        context = multiprocessing.get_context("fork")
+        children = [context.Process(target=insert_rows, args=(temp_db_path, start, 30))
+                    for start in (1, 31)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join(60)
+            assert child.exitcode == 0
+        
+        rows = executor.execute("SELECT * FROM t")[1]
+        assert sorted(row['id'] for row in rows) == list(range(1, 61))
+        db.close()
+    
+    def test_memory_database_has_no_lock_file(self, tmp_path, monkeypatch):
+        """Test memory databases never create lock files."""
+        monkeypatch.chdir(tmp_path)
+        pager = ConcurrentPager(":memory:")
+        pager.write_page(1, b'\x01' * pager.page_size)
+        pager.flush()
+        assert pager.lock_state == LockState.UNLOCKED
+        assert os.listdir(tmp_path) == []
+        pager.close()
@@ -5,9 +5,10 @@ import tempfile
 import os
 from unittest.mock import patch, MagicMock
 
+from pysqlit.concurrent_storage import LockState
 from pysqlit.database import EnhancedDatabase, EnhancedTable, SQLExecutor
 from pysqlit.models import Row, DataType, TableSchema, ColumnDefinition
-from pysqlit.exceptions import DatabaseError
+from pysqlit.exceptions import DatabaseError, TransactionError
 
 
 class TestEnhancedTable:
@@ -271,6 +272,48 @@ class TestDatabaseTransactions:
         database.rollback_transaction(tx_id)
         # Should not raise any exceptions
     
+    def test_failed_commit_is_rolled_back(self, database, temp_db_path, monkeypatch):
+        """Test a commit failure discards the changes and releases every lock."""
+        executor = SQLExecutor(database)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO t (id, name) VALUES (1, 'kept')")
+        
+        tx_id = database.begin_transaction(write=True)
+        executor.execute("INSERT INTO t (id, name) VALUES (2, 'lost')", tx_id)
+        
+        def failing_flush():
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(database.pager, "flush", failing_flush)
+        with pytest.raises(TransactionError, match="disk full"):
+            database.commit_transaction(tx_id)
+        monkeypatch.undo()
+        
+        assert database.in_transaction is False
+        assert database.pager.lock_state == LockState.UNLOCKED
+        assert database.pager.buffer_pool.dirty_pages() == []
+        assert database.transaction_manager.get_transaction(tx_id) is None
+        
+        other = EnhancedDatabase(temp_db_path)
+        other.pager.file_lock.timeout = 0.5
+        SQLExecutor(other).execute("INSERT INTO t (id, name) VALUES (3, 'other')")
+        other.close()
+        executor.execute("INSERT INTO t (id, name) VALUES (4, 'after')")
+        rows = executor.execute("SELECT * FROM t")[1]
+        assert [row['name'] for row in rows] == ['kept', 'other', 'after']
+    
+    def test_rollback_discards_changes(self, database):
+        """Test rolled back changes are not written by a later commit."""
+        executor = SQLExecutor(database)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        tx_id = database.begin_transaction(write=True)
+        executor.execute("INSERT INTO t (id, name) VALUES (1, 'lost')", tx_id)
+        database.rollback_transaction(tx_id)
+        assert database.pager.lock_state == LockState.UNLOCKED
+        
+        executor.execute("INSERT INTO t (id, name) VALUES (2, 'kept')")
+        assert [row['name'] for row in executor.execute("SELECT * FROM t")[1]] == ['kept']
+    
     def test_transaction_with_isolation_level(self, database):
         """Test transaction with specific isolation level."""
         from pysqlit.transaction import IsolationLevel
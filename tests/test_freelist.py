@@ -0,0 +1,230 @@
+"""Unit tests for pysqlit/freelist.py and pysqlit/vacuum.py modules."""
+
+import os
+import pytest
+
+from pysqlit.concurrent_storage import ConcurrentPager, LockState
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import DatabaseError, LockError, StorageError
+from pysqlit.models import PrepareResult
+
+
+def populate(executor, table_name, rows):
+    """Create a table and insert the given number of rows (about 14 per 4KB leaf)."""
+    executor.execute(f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, name TEXT, body TEXT)")
+    body = "x" * 250
+    for i in range(1, rows + 1):
+        executor.execute(f"INSERT INTO {table_name} (id, name, body) VALUES ({i}, 'row{i}', '{body}')")
+
+
+class TestFreelist:
+    """Test cases for Freelist class."""
+    
+    def test_freed_pages_are_reused(self, temp_db_path):
+        """Test allocate_page hands out freed pages before growing the file."""
+        pager = ConcurrentPager(temp_db_path)
+        pages = [pager.allocate_page() for _ in range(4)]
+        pager.free_page(pages[1])
+        pager.free_page(pages[2])
+        assert pager.header.freelist_count == 2
+        
+        assert sorted([pager.allocate_page(), pager.allocate_page()]) == pages[1:3]
+        assert pager.header.freelist_count == 0
+        assert pager.allocate_page() == pages[-1] + 1
+        pager.close()
+    
+    def test_trunk_overflow_and_persistence(self, temp_db_path):
+        """Test a full trunk page chains to a new trunk and survives reopening."""
+        pager = ConcurrentPager(temp_db_path)
+        capacity = pager.freelist.capacity
+        pages = [pager.allocate_page() for _ in range(capacity + 3)]
+        for page_num in pages:
+            pager.free_page(page_num)
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.header.freelist_count == len(pages)
+        assert sorted(pager.freelist.pages()) == pages
+        reused = {pager.allocate_page() for _ in pages}
+        assert reused == set(pages)
+        assert pager.header.freelist_head == 0
+        pager.close()
+    
+    def test_rebuild_prefers_low_pages(self, temp_db_path):
+        """Test rebuild keeps every page and hands out the lowest one first."""
+        pager = ConcurrentPager(temp_db_path)
+        pages = [pager.allocate_page() for _ in range(6)]
+        pager.freelist.rebuild(pages[2:])
+        assert sorted(pager.freelist.pages()) == pages[2:]
+        assert pager.allocate_page() == pages[2]
+        pager.close()
+    
+    def test_invalid_page_rejected(self, temp_db_path):
+        """Test the header page and unallocated pages cannot be freed."""
+        pager = ConcurrentPager(temp_db_path)
+        with pytest.raises(StorageError):
+            pager.free_page(0)
+        with pytest.raises(StorageError):
+            pager.free_page(pager.num_pages)
+        pager.close()
+
+
+class TestVacuum:
+    """Test cases for page reclamation and VACUUM."""
+    
+    def test_delete_all_and_drop_table_free_pages(self, temp_db_path):
+        """Test DELETE without WHERE and DROP TABLE feed the freelist."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        populate(executor, "t", 100)
+        high_water = db.pager.num_pages
+        
+        executor.execute("DELETE FROM t")
+        freed = db.pager.header.freelist_count
+        assert freed > 0
+        executor.execute("DROP TABLE t")
+        assert db.pager.header.freelist_count == freed + 1
+        
+        # 新表复用空闲页，文件不再增长
+        populate(executor, "u", 50)
+        assert db.pager.num_pages == high_water
+        assert len(executor.execute("SELECT * FROM u")[1]) == 50
+        db.close()
+    
+    def test_vacuum_rebuilds_file(self, temp_db_path):
+        """Test VACUUM shrinks the file and keeps data, sequences and schema."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        populate(executor, "t", 100)
+        populate(executor, "u", 40)
+        executor.execute("DELETE FROM t")
+        executor.execute("DROP TABLE t")
+        size_before = os.path.getsize(temp_db_path)
+        
+        assert executor.execute("VACUUM") == (PrepareResult.SUCCESS, True)
+        assert os.path.getsize(temp_db_path) < size_before
+        assert os.path.getsize(temp_db_path) == db.pager.num_pages * db.pager.page_size
+        assert db.pager.header.freelist_count == 0
+        assert len(executor.execute("SELECT * FROM u")[1]) == 40
+        db.close()
+        
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        assert db.list_tables() == ["u"]
+        assert executor.execute("SELECT id, name FROM u WHERE id = 7")[1] == [{'id': 7, 'name': 'row7'}]
+        assert db.catalog.get_table("u").sequence == 40
+        db.close()
+    
+    @pytest.mark.parametrize("track_page_versions", [False, True])
+    def test_vacuum_with_second_connection(self, temp_db_path, track_page_versions):
+        """Test a connection open during VACUUM keeps sharing the rewritten file."""
+        db = EnhancedDatabase(temp_db_path, track_page_versions=track_page_versions)
+        executor = SQLExecutor(db)
+        populate(executor, "t", 100)
+        populate(executor, "u", 40)
+        other = EnhancedDatabase(temp_db_path, track_page_versions=track_page_versions)
+        other_executor = SQLExecutor(other)
+        assert len(other_executor.execute("SELECT * FROM u")[1]) == 40  # caches pre-VACUUM pages
+        inode = os.stat(temp_db_path).st_ino
+        
+        executor.execute("DROP TABLE t")
+        assert executor.execute("VACUUM") == (PrepareResult.SUCCESS, True)
+        assert os.stat(temp_db_path).st_ino == inode
+        assert db.pager.page_versions.enabled == track_page_versions
+        
+        assert other_executor.execute("SELECT id, name FROM u WHERE id = 7")[1] == [
+            {'id': 7, 'name': 'row7'}]
+        assert len(other_executor.execute("SELECT * FROM u")[1]) == 40
+        other_executor.execute("INSERT INTO u (id, name, body) VALUES (41, 'other', 'b')")
+        executor.execute("INSERT INTO u (id, name, body) VALUES (42, 'first', 'a')")
+        assert [row['name'] for row in other_executor.execute("SELECT * FROM u")[1]][-2:] == [
+            'other', 'first']
+        assert len(executor.execute("SELECT * FROM u")[1]) == 42
+        other.close()
+        db.close()
+        
+        db = EnhancedDatabase(temp_db_path)
+        assert len(SQLExecutor(db).execute("SELECT * FROM u")[1]) == 42
+        db.close()
+    
+    def test_vacuum_waits_for_readers(self, temp_db_path):
+        """Test VACUUM does not rewrite the file while another connection reads it."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        populate(executor, "u", 40)
+        executor.execute("DELETE FROM u WHERE id > 20")
+        other = EnhancedDatabase(temp_db_path)
+        tx_id = other.begin_transaction()
+        db.pager.file_lock.timeout = 0.05
+        size_before = os.path.getsize(temp_db_path)
+        
+        with pytest.raises(LockError):
+            db.vacuum()
+        assert db.pager.lock_state == LockState.UNLOCKED
+        assert os.path.getsize(temp_db_path) == size_before
+        
+        other.rollback_transaction(tx_id)
+        db.vacuum()
+        assert os.path.getsize(temp_db_path) < size_before
+        assert len(SQLExecutor(other).execute("SELECT * FROM u")[1]) == 20
+        other.close()
+        db.close()
+    
+    def test_incremental_vacuum_relocates_tail_pages(self, temp_db_path):
+        """Test incremental vacuum moves live tail pages into free slots."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        populate(executor, "t", 100)
+        populate(executor, "u", 60)  # u occupies the tail of the file
+        executor.execute("DELETE FROM t")
+        executor.execute("DROP TABLE t")
+        free = db.pager.header.freelist_count
+        pages = db.pager.num_pages
+        
+        assert db.incremental_vacuum(max_pages=5) == 5
+        assert db.pager.num_pages == pages - 5
+        assert db.incremental_vacuum() == free - 5
+        assert db.pager.header.freelist_count == 0
+        assert os.path.getsize(temp_db_path) == db.pager.num_pages * db.pager.page_size
+        assert len(executor.execute("SELECT * FROM u")[1]) == 60
+        db.close()
+        
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        assert executor.execute("SELECT id, name FROM u WHERE id = 3")[1] == [{'id': 3, 'name': 'row3'}]
+        db.close()
+    
+    def test_auto_vacuum_truncates_after_commit(self, temp_db_path):
+        """Test auto_vacuum reclaims freed pages when a transaction commits."""
+        db = EnhancedDatabase(temp_db_path, auto_vacuum=True)
+        executor = SQLExecutor(db)
+        populate(executor, "t", 100)
+        populate(executor, "u", 20)
+        pages = db.pager.num_pages
+        
+        executor.execute("DELETE FROM t")
+        assert db.pager.header.freelist_count == 0
+        assert db.pager.num_pages < pages
+        assert len(executor.execute("SELECT * FROM u")[1]) == 20
+        db.close()
+    
+    def test_vacuum_inside_transaction_rejected(self, temp_db_path):
+        """Test VACUUM cannot run inside an explicit transaction."""
+        db = EnhancedDatabase(temp_db_path)
+        transaction_id = db.begin_transaction()
+        with pytest.raises(DatabaseError):
+            db.vacuum()
+        db.commit_transaction(transaction_id)
+        db.close()
+    
+    def test_vacuum_memory_database(self):
+        """Test VACUUM on a memory database compacts in place."""
+        db = EnhancedDatabase(":memory:")
+        executor = SQLExecutor(db)
+        populate(executor, "t", 50)
+        populate(executor, "u", 10)
+        executor.execute("DELETE FROM t")
+        executor.execute("VACUUM")
+        assert db.pager.header.freelist_count == 0
+        assert len(executor.execute("SELECT * FROM u")[1]) == 10
+        db.close()
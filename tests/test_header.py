@@ -0,0 +1,230 @@
+"""Unit tests for pysqlit/header.py and the ConcurrentPager page allocator."""
+
+import os
+import pytest
+
+from pysqlit.header import DatabaseHeader, check_page_size
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.constants import PAGE_SIZE, TABLE_MAX_PAGES, ALLOCATION_EXTENT_PAGES
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import StorageError
+from pysqlit.integrity import IntegrityChecker
+
+
+class TestDatabaseHeader:
+    """Test cases for DatabaseHeader class."""
+    
+    def test_pack_unpack_roundtrip(self):
+        """Test header serialization round trip."""
+        header = DatabaseHeader(page_size=PAGE_SIZE, page_count=42)
+        data = header.pack()
+        assert len(data) == PAGE_SIZE
+        assert DatabaseHeader.unpack(data) == header
+    
+    def test_invalid_magic(self):
+        """Test that a page without the magic is rejected."""
+        assert not DatabaseHeader.is_valid(bytes(PAGE_SIZE))
+        with pytest.raises(StorageError):
+            DatabaseHeader.unpack(bytes(PAGE_SIZE))
+    
+    def test_catalog_fields_roundtrip(self):
+        """Test freelist and catalog fields survive serialization."""
+        header = DatabaseHeader(page_count=9, freelist_head=7, freelist_count=2,
+                                catalog_root=2, schema_root=3, schema_version=5)
+        assert DatabaseHeader.unpack(header.pack()) == header
+    
+    def test_coherence_fields_roundtrip(self):
+        """Test change counter and page version root survive serialization."""
+        header = DatabaseHeader(page_count=9, change_counter=0xFFFFFFFF, page_versions_root=4)
+        assert DatabaseHeader.unpack(header.pack()) == header
+    
+    def test_physical_pages_roundtrip(self):
+        """Test the physical size survives serialization next to the logical size."""
+        header = DatabaseHeader(page_count=9, physical_pages=32, page_map=[8])
+        assert DatabaseHeader.unpack(header.pack()) == header
+    
+    def test_page_map_directory_roundtrip(self):
+        """Test the compression fields and page map directory survive serialization."""
+        header = DatabaseHeader(page_count=9, compression=1, page_map=[8, 16, 24])
+        assert DatabaseHeader.unpack(header.pack()) == header
+    
+    def test_unsupported_version(self):
+        """Test that other format versions are rejected."""
+        data = DatabaseHeader(format_version=99).pack()
+        with pytest.raises(StorageError):
+            DatabaseHeader.unpack(data)
+
+
+class TestPageAllocator:
+    """Test cases for the ConcurrentPager page allocator."""
+    
+    def test_new_file_has_header(self, temp_db_path):
+        """Test that a new database starts with a header page."""
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.num_pages == 1
+        pager.close()
+        
+        with open(temp_db_path, 'rb') as f:
+            assert DatabaseHeader.is_valid(f.read(PAGE_SIZE))
+    
+    def test_allocate_beyond_old_ceiling(self, temp_db_path):
+        """Test allocating more pages than the old TABLE_MAX_PAGES limit."""
+        pager = ConcurrentPager(temp_db_path)
+        pages = [pager.allocate_page() for _ in range(TABLE_MAX_PAGES + 50)]
+        assert pages == list(range(1, TABLE_MAX_PAGES + 51))
+        
+        last = pager.get_page(pages[-1])
+        last[0] = 0xAB
+        pager.mark_dirty(pages[-1])
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.num_pages == TABLE_MAX_PAGES + 51
+        assert pager.get_page(pages[-1])[0] == 0xAB
+        assert pager.allocate_page() == TABLE_MAX_PAGES + 51
+        pager.close()
+    
+    def test_file_grows_in_extents(self, temp_db_path):
+        """Test that the file is extended a whole extent at a time."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.allocate_page()
+        extent = ALLOCATION_EXTENT_PAGES * PAGE_SIZE
+        assert pager.get_file_size() == extent
+        
+        for _ in range(ALLOCATION_EXTENT_PAGES - 2):
+            pager.allocate_page()
+        assert pager.get_file_size() == extent
+        
+        pager.allocate_page()
+        assert pager.get_file_size() == 2 * extent
+        pager.close()
+    
+    def test_configured_extent_size(self, temp_db_path):
+        """Test extent_size is rounded up to whole pages and used for growth."""
+        pager = ConcurrentPager(temp_db_path, extent_size=1024 * 1024 + 1, extent_growth=0)
+        pager.allocate_page()
+        assert pager.get_file_size() == 1024 * 1024 + PAGE_SIZE
+        pager.close()
+    
+    def test_extents_grow_with_file_size(self, temp_db_path):
+        """Test proportional extents keep the number of extensions low for bulk loads."""
+        pager = ConcurrentPager(temp_db_path, extent_growth=0.5)
+        for _ in range(2000):
+            pager.allocate_page()
+        extensions = pager.get_io_stats()['file_extensions']
+        assert extensions < 2000 // ALLOCATION_EXTENT_PAGES // 4
+        assert pager.physical_pages * PAGE_SIZE == pager.get_file_size()
+        pager.close()
+    
+    def test_preallocated_extents_have_blocks(self, temp_db_path):
+        """Test posix_fallocate backs the extent with disk blocks."""
+        if not hasattr(os, 'posix_fallocate'):
+            pytest.skip("posix_fallocate is not available")
+        pager = ConcurrentPager(temp_db_path, extent_size=1024 * 1024)
+        pager.allocate_page()
+        assert os.stat(temp_db_path).st_blocks * 512 >= 1024 * 1024
+        pager.close()
+    
+    def test_logical_and_physical_size_in_header(self, temp_db_path):
+        """Test the header records the high-water mark and the preallocated file size."""
+        pager = ConcurrentPager(temp_db_path, preallocate=False)
+        for _ in range(3):
+            pager.allocate_page()
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.header.page_count == 4
+        assert pager.header.physical_pages == ALLOCATION_EXTENT_PAGES
+        pager.shrink(2)
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.header.physical_pages == 2
+        assert pager.get_file_size() == 2 * PAGE_SIZE
+        pager.close()
+    
+    def test_write_page_beyond_high_water_mark_grows_by_extent(self, temp_db_path):
+        """Test writing past the end extends the file by an extent, not page by page."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.write_page(5, b'\x01' * PAGE_SIZE)
+        assert pager.get_file_size() == ALLOCATION_EXTENT_PAGES * PAGE_SIZE
+        pager.close()
+    
+    def test_invalid_extent_configuration(self, temp_db_path):
+        """Test non-positive extent sizes and negative growth ratios are rejected."""
+        with pytest.raises(StorageError):
+            ConcurrentPager(temp_db_path, extent_size=0)
+        with pytest.raises(StorageError):
+            ConcurrentPager(temp_db_path, extent_growth=-1)
+    
+    def test_reject_foreign_file(self, temp_db_path):
+        """Test that a file without a PySQLit header is rejected."""
+        with open(temp_db_path, 'wb') as f:
+            f.write(b'\x01' * PAGE_SIZE)
+        
+        with pytest.raises(StorageError):
+            ConcurrentPager(temp_db_path)
+    
+    def test_header_changes_persist(self, temp_db_path):
+        """Test header updates are written on flush."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.header.catalog_root = pager.allocate_page()
+        pager.update_header()
+        pager.close()
+        
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.header.catalog_root == 1
+        pager.close()
+
+
+class TestPageSize:
+    """Test cases for per-database page sizes."""
+    
+    @pytest.mark.parametrize("page_size", [1024, 4096, 65536])
+    def test_valid_page_sizes(self, page_size):
+        """Test powers of two between 1 KB and 64 KB are accepted."""
+        assert check_page_size(page_size) == page_size
+    
+    @pytest.mark.parametrize("page_size", [512, 3000, 131072])
+    def test_invalid_page_sizes(self, temp_db_path, page_size):
+        """Test sizes outside the range or not a power of two are rejected."""
+        with pytest.raises(StorageError):
+            check_page_size(page_size)
+        with pytest.raises(StorageError):
+            ConcurrentPager(temp_db_path, page_size=page_size)
+    
+    @pytest.mark.parametrize("page_size", [1024, 65536])
+    def test_page_size_recorded_in_file(self, temp_db_path, page_size):
+        """Test the page size chosen at creation is used when the file is reopened."""
+        pager = ConcurrentPager(temp_db_path, page_size=page_size)
+        page_num = pager.allocate_page()
+        pager.write_page(page_num, b'\x07' * page_size)
+        pager.close()
+        assert os.path.getsize(temp_db_path) % page_size == 0
+        
+        # 已有文件忽略调用方要求的页面大小
+        pager = ConcurrentPager(temp_db_path, page_size=8192)
+        assert pager.page_size == page_size
+        assert pager.header.page_size == page_size
+        assert bytes(pager.get_page(page_num)) == b'\x07' * page_size
+        pager.close()
+        
+        result = IntegrityChecker.check_database_integrity(temp_db_path)
+        assert result['page_size'] == page_size
+        assert result['page_size_valid']
+    
+    @pytest.mark.parametrize("page_size", [1024, 65536])
+    def test_database_with_page_size(self, temp_db_path, page_size):
+        """Test SQL workloads on small and large pages."""
+        db = EnhancedDatabase(temp_db_path, page_size=page_size)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 31):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        db.close()
+        
+        db = EnhancedDatabase(temp_db_path)
+        assert db.get_database_info()['page_size'] == page_size
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 30
+        db.close()
+
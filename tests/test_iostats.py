@@ -0,0 +1,138 @@
+"""Unit tests for pysqlit/iostats.py module."""
+
+import pytest
+
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.iostats import IOStats, LatencyHistogram
+from pysqlit.mmap_storage import MmapPager
+from pysqlit.storage import Pager
+
+
+class TestLatencyHistogram:
+    """Test cases for LatencyHistogram class."""
+
+    def test_power_of_two_buckets(self):
+        """Test durations land in the bucket whose upper bound covers them."""
+        histogram = LatencyHistogram(buckets=8)
+        histogram.record(0.0000005)  # 0.5us -> <= 1us
+        histogram.record(0.000003)   # 3us -> <= 4us
+        histogram.record(0.000004)   # 4us -> <= 4us
+        histogram.record(1.0)        # overflow bucket
+        assert histogram.counts == [1, 0, 2, 0, 0, 0, 0, 1]
+        assert histogram.count == 4
+        assert histogram.max == 1.0
+
+    def test_percentiles(self):
+        """Test percentiles report bucket upper bounds and the max for the last bucket."""
+        histogram = LatencyHistogram(buckets=8)
+        assert histogram.percentile(0.5) is None
+        for _ in range(99):
+            histogram.record(0.00001)  # 10us -> <= 16us
+        histogram.record(0.5)
+        assert histogram.percentile(0.5) == 16
+        assert histogram.percentile(0.99) == 16
+        assert histogram.percentile(1.0) == 500000
+
+        snapshot = histogram.snapshot()
+        assert snapshot['buckets'] == [(16, 99), (None, 1)]
+        histogram.reset()
+        assert histogram.count == 0 and histogram.snapshot()['buckets'] == []
+
+
+class TestIOStats:
+    """Test cases for IOStats class and pager instrumentation."""
+
+    def test_record_and_reset(self):
+        """Test counters accumulate and reset to zero."""
+        stats = IOStats()
+        stats.record_read(4096, 0.00001)
+        stats.record_write(8192, 0.00002)
+        stats.record_fsync(0.001)
+        snapshot = stats.snapshot()
+        assert snapshot['physical_reads'] == 1 and snapshot['bytes_read'] == 4096
+        assert snapshot['physical_writes'] == 1 and snapshot['bytes_written'] == 8192
+        assert snapshot['fsyncs'] == 1 and snapshot['fsync_latency']['count'] == 1
+
+        stats.reset()
+        assert all(stats.snapshot()[name] == 0 for name in IOStats.COUNTERS)
+
+    @pytest.mark.parametrize("pager_class", [ConcurrentPager, MmapPager])
+    def test_pager_counts_reads_and_writes(self, temp_db_path, pager_class):
+        """Test flush writes and cache misses show up as physical I/O."""
+        pager = pager_class(temp_db_path)
+        pages = [pager.allocate_page() for _ in range(4)]
+        for page_num in pages:
+            pager.write_page(page_num, b'\x01' * pager.page_size)
+        pager.reset_io_stats()
+        pager.flush()
+
+        stats = pager.get_io_stats()
+        assert stats['flushes'] == 1
+        # 文件头页和数据页页号连续，合并为一次向量写入
+        assert stats['physical_writes'] == 1
+        assert stats['bytes_written'] == 5 * pager.page_size
+        assert stats['write_latency']['count'] == 1
+        pager.close()
+
+        pager = pager_class(temp_db_path, read_ahead=0)  # 逐页计数，不合并顺序读取
+        pager.begin_read()  # 获取锁时检查文件头的那次读取不计入
+        pager.reset_io_stats()
+        for page_num in pages:
+            pager.get_writable_page(page_num)
+        pager.get_writable_page(pages[0])
+        stats = pager.get_io_stats()
+        assert stats['page_requests'] == 5
+        assert stats['cache_misses'] == 4 and stats['cache_hits'] == 1
+        assert stats['physical_reads'] == 4
+        assert stats['bytes_read'] == 4 * pager.page_size
+        pager.close()
+
+    def test_clean_flush_does_not_count(self, temp_db_path):
+        """Test flushing with no dirty pages is not counted as a flush."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.reset_io_stats()
+        pager.flush()
+        assert pager.get_io_stats()['flushes'] == 0
+        pager.close()
+
+    def test_sync_counts_fsync(self, temp_db_path):
+        """Test sync flushes and records an fsync."""
+        pager = ConcurrentPager(temp_db_path)
+        pager.write_page(1, b'\x02' * pager.page_size)
+        pager.reset_io_stats()
+        pager.sync()
+        stats = pager.get_io_stats()
+        assert stats['flushes'] == 1
+        assert stats['fsyncs'] == 1
+        assert stats['fsync_latency']['count'] == 1
+        pager.close()
+
+    def test_legacy_pager_stats(self, temp_db_path):
+        """Test the basic Pager keeps its own hit and miss counters."""
+        with Pager(temp_db_path) as pager:
+            pager.write_page(0, b'\x03' * pager.page_size)
+            pager.flush()
+
+        with Pager(temp_db_path) as pager:
+            pager.get_page(0)
+            pager.get_page(0)
+            stats = pager.get_io_stats()
+            assert stats['page_requests'] == 2
+            assert stats['cache_misses'] == 1 and stats['cache_hits'] == 1
+            assert stats['physical_reads'] == 1
+
+    def test_database_info_includes_io_stats(self, temp_db_path):
+        """Test get_database_info exposes pager I/O statistics."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO t (id, name) VALUES (1, 'a')")
+
+        info = db.get_database_info()
+        assert info['io_stats']['physical_writes'] > 0
+        assert info['io_stats']['page_requests'] > 0
+
+        db.reset_io_stats()
+        assert db.get_database_info()['io_stats']['physical_writes'] == 0
+        db.close()
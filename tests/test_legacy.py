@@ -0,0 +1,130 @@
+"""Unit tests for pysqlit/legacy.py module."""
+
+import json
+import os
+import struct
+
+import pytest
+
+from pysqlit.database import EnhancedDatabase
+from pysqlit.exceptions import LegacyFormatError, StorageError
+from pysqlit.legacy import convert_legacy_database, is_legacy_database, main
+from pysqlit.models import ColumnDefinition, DataType, Row, TableSchema
+
+
+def users_schema(name='users'):
+    """Create the schema the old release wrote for a users table."""
+    schema = TableSchema(name)
+    schema.add_column(ColumnDefinition("id", DataType.INTEGER, is_primary=True, is_autoincrement=True))
+    schema.add_column(ColumnDefinition("name", DataType.TEXT, max_length=100, is_nullable=False))
+    schema.add_column(ColumnDefinition("age", DataType.INTEGER))
+    return schema
+
+
+def write_legacy(path, schemas, leaves):
+    """Write a headerless database: a chain of leaf pages starting at page 0 plus the .schema file.
+
+    Rows are serialized with the first schema, as the old release kept every table in one tree.
+    """
+    schema = next(iter(schemas.values()))
+    row_size = schema.get_row_size()
+    with open(path, 'wb') as f:
+        for page_num, rows in enumerate(leaves):
+            next_leaf = page_num + 1 if page_num + 1 < len(leaves) else 0
+            page = bytearray(4096)
+            struct.pack_into('<BBIII', page, 0, 0, int(page_num == 0), 0, len(rows), next_leaf)
+            for i, (key, row) in enumerate(rows):
+                offset = 14 + i * (4 + row_size)
+                struct.pack_into('<I', page, offset, key)
+                value = row.serialize(schema)  # the old release zero-padded values to row_size
+                page[offset + 4:offset + 4 + len(value)] = value
+            f.write(page)
+    with open(path + '.schema', 'w') as f:
+        json.dump({name: schema.to_dict() for name, schema in schemas.items()}, f)
+
+
+class TestLegacyDetection:
+    """Test cases for recognising legacy database files."""
+
+    def test_open_raises_clear_error(self, temp_db_path):
+        """Test opening a legacy file names the conversion command."""
+        write_legacy(temp_db_path, {'users': users_schema()},
+                     [[(1, Row(id=1, name='alice', age=30))]])
+        assert is_legacy_database(temp_db_path)
+        with pytest.raises(LegacyFormatError, match="python -m pysqlit.legacy"):
+            EnhancedDatabase(temp_db_path)
+
+    def test_empty_file_with_schema_is_legacy(self, temp_db_path):
+        """Test a schema-only legacy database is not silently reopened as a new database."""
+        write_legacy(temp_db_path, {'users': users_schema()}, [])
+        assert os.path.getsize(temp_db_path) == 0
+        with pytest.raises(LegacyFormatError):
+            EnhancedDatabase(temp_db_path)
+
+    def test_current_format_is_not_legacy(self, temp_db_path):
+        """Test databases with a file header and missing files are not reported as legacy."""
+        assert not is_legacy_database(temp_db_path)
+        EnhancedDatabase(temp_db_path).close()
+        assert not is_legacy_database(temp_db_path)
+        assert main([temp_db_path]) == 1
+
+
+class TestConvertLegacyDatabase:
+    """Test cases for convert_legacy_database function."""
+
+    def test_convert_rows_and_schema(self, temp_db_path):
+        """Test rows on the leaf chain keep their ids and the schema moves into the file."""
+        leaves = [[(i, Row(id=i, name=f'user{i}', age=20 + i)) for i in range(1, 8)],
+                  [(i, Row(id=i, name=f'user{i}', age=20 + i)) for i in range(8, 12)]]
+        write_legacy(temp_db_path, {'users': users_schema()}, leaves)
+
+        assert convert_legacy_database(temp_db_path) == {'users': 11}
+        assert os.path.exists(temp_db_path + '.legacy')
+        assert os.path.exists(temp_db_path + '.schema.legacy')
+        assert not os.path.exists(temp_db_path + '.schema')
+
+        db = EnhancedDatabase(temp_db_path)
+        try:
+            table = db.tables['users']
+            assert db.schemas['users'].columns['name'].max_length == 100
+            assert [(row.id, row.name, row.age) for row in table.select_all()] == \
+                [(i, f'user{i}', 20 + i) for i in range(1, 12)]
+            table.insert_row(Row(name='new', age=1))
+            assert max(row.id for row in table.select_all()) == 12
+        finally:
+            db.close()
+
+    def test_schema_only_database(self, temp_db_path):
+        """Test tables of an empty legacy database are recreated."""
+        write_legacy(temp_db_path, {'users': users_schema(), 'pets': users_schema('pets')}, [])
+        assert convert_legacy_database(temp_db_path) == {'users': 0, 'pets': 0}
+        db = EnhancedDatabase(temp_db_path)
+        try:
+            assert sorted(db.list_tables()) == ['pets', 'users']
+        finally:
+            db.close()
+
+    def test_shared_tree_with_several_tables_refused(self, temp_db_path):
+        """Test rows that cannot be attributed to a table leave the original files untouched."""
+        schemas = {'users': users_schema(), 'pets': users_schema('pets')}
+        write_legacy(temp_db_path, schemas, [[(1, Row(id=1, name='alice', age=30))]])
+        with open(temp_db_path, 'rb') as f:
+            original = f.read()
+
+        with pytest.raises(StorageError, match="several tables"):
+            convert_legacy_database(temp_db_path)
+        with open(temp_db_path, 'rb') as f:
+            assert f.read() == original
+        assert os.path.exists(temp_db_path + '.schema')
+        assert not os.path.exists(temp_db_path + '.legacy')
+
+    def test_existing_backup_not_overwritten(self, temp_db_path):
+        """Test conversion refuses to replace an earlier .legacy copy."""
+        write_legacy(temp_db_path, {'users': users_schema()}, [])
+        with open(temp_db_path + '.legacy', 'wb') as f:
+            f.write(b'keep')
+        with pytest.raises(StorageError, match="already exists"):
+            convert_legacy_database(temp_db_path)
+        with open(temp_db_path + '.legacy', 'rb') as f:
+            assert f.read() == b'keep'
+        assert is_legacy_database(temp_db_path)
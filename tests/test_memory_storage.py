@@ -0,0 +1,162 @@
+"""Unit tests for pysqlit/memory_storage.py module."""
+
+import multiprocessing
+import os
+import uuid
+
+import pytest
+
+from pysqlit.concurrent_storage import LockState
+from pysqlit.constants import MEMORY_SEGMENT_PAGES
+from pysqlit.database import EnhancedDatabase, PrepareResult, SQLExecutor
+from pysqlit.exceptions import BusyError, LockError
+from pysqlit.memory_storage import MemoryPager, PageArena, _open_segment
+
+
+@pytest.fixture
+def shared_name():
+    """Provide a unique shared memory database name."""
+    return f"test_{uuid.uuid4().hex[:12]}"
+
+
+def insert_rows(name, start, count):
+    """Insert rows into a shared in-memory database (run in a child process)."""
+    db = EnhancedDatabase(":memory:", shared_memory=name)
+    executor = SQLExecutor(db)
+    for i in range(start, start + count):
+        result, _ = executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        assert result == PrepareResult.SUCCESS
+    db.close()
+
+
+class TestPageArena:
+    """Test cases for PageArena class."""
+
+    def test_pages_are_views_into_segments(self):
+        """Test pages are stable views and the arena grows one segment at a time."""
+        arena = PageArena(1024, segment_pages=4)
+        first = arena.page(1)
+        first[:] = b'\x01' * 1024
+        assert arena.nbytes == 4 * 1024
+
+        arena.page(9)  # 第三个段
+        assert arena.nbytes == 12 * 1024
+        assert bytes(arena.page(1)) == b'\x01' * 1024
+        assert first.obj is arena.page(1).obj
+
+        arena.truncate(5)
+        assert arena.nbytes == 8 * 1024
+
+
+class TestMemoryPager:
+    """Test cases for MemoryPager class."""
+
+    def test_private_database_has_no_files_or_locks(self, tmp_path, monkeypatch):
+        """Test private memory databases never touch the file system or lock."""
+        monkeypatch.chdir(tmp_path)
+        pager = MemoryPager()
+        assert pager.file_lock is None
+        page_num = pager.allocate_page()
+        pager.write_page(page_num, b'\x02' * pager.page_size)
+        pager.flush()
+        assert pager.lock_state == LockState.UNLOCKED
+        assert os.listdir(tmp_path) == []
+
+        page = pager.get_page(page_num)
+        assert isinstance(page, memoryview) and page[0] == 2
+        assert pager.get_cache_stats()['arena_bytes'] == MEMORY_SEGMENT_PAGES * pager.page_size
+        pager.close()
+
+    def test_shared_database_between_connections(self, shared_name):
+        """Test commits are visible to other connections and writers exclude readers."""
+        first = MemoryPager(shared_name=shared_name, page_size=1024)
+        second = MemoryPager(shared_name=shared_name)
+        assert first.owner and not second.owner
+        assert second.page_size == 1024
+
+        page_num = first.allocate_page()
+        first.write_page(page_num, b'\x03' * first.page_size)
+        second.file_lock.timeout = 0.05
+        with pytest.raises(LockError):
+            second.get_page(page_num)
+        first.flush()
+
+        assert second.get_page(page_num)[0] == 3
+        assert second.num_pages == first.num_pages
+        second.end_read()
+        second.close()
+        first.close()
+        with pytest.raises(FileNotFoundError):
+            _open_segment(f"pysqlit_{shared_name}_0")
+
+    def test_shared_database_grows_across_segments(self, shared_name):
+        """Test segments appended by one connection are attached by another."""
+        first = MemoryPager(shared_name=shared_name, page_size=1024)
+        pages = [first.allocate_page() for _ in range(MEMORY_SEGMENT_PAGES + 2)]
+        first.write_page(pages[-1], b'\x04' * first.page_size)
+        first.flush()
+
+        second = MemoryPager(shared_name=shared_name)
+        assert second.get_page(pages[-1])[0] == 4
+        second.close()
+        first.close()
+
+    def test_upgrade_after_concurrent_commit_is_busy(self, shared_name):
+        """Test a SHARED to EXCLUSIVE upgrade that raced with a commit is rejected."""
+        first = MemoryPager(shared_name=shared_name)
+        second = MemoryPager(shared_name=shared_name)
+        page_num = first.allocate_page()
+        first.flush()
+
+        second.begin_read()
+        assert second.get_page(page_num)[0] == 0
+        # Simulate the gap flock leaves while converting SHARED to EXCLUSIVE
+        second.file_lock.release()
+        first.write_page(page_num, b'\x05' * first.page_size)
+        first.flush()
+        second.file_lock.acquire(LockState.SHARED)
+
+        with pytest.raises(BusyError):
+            second.write_page(page_num, b'\x06' * second.page_size)
+        assert second.lock_state == LockState.SHARED
+        assert second.header.change_counter == first.header.change_counter
+        assert second.get_page(page_num)[0] == 5
+        second.end_read()
+        second.close()
+        first.close()
+
+    def test_concurrent_writer_processes(self, shared_name):
+        """Test two processes inserting concurrently keep every row and id unique."""
+        db = EnhancedDatabase(":memory:", shared_memory=shared_name)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+
+        context = multiprocessing.get_context("fork")
+        children = [context.Process(target=insert_rows, args=(shared_name, start, 30))
+                    for start in (1, 31)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join(60)
+            assert child.exitcode == 0
+
+        rows = executor.execute("SELECT * FROM t")[1]
+        assert len(rows) == 60
+        assert sorted(row['id'] for row in rows) == list(range(1, 61))
+        assert len({row['name'] for row in rows}) == 60
+        db.close()
+
+    def test_database_shared_across_processes(self, shared_name):
+        """Test another process can open the database by name and write to it."""
+        db = EnhancedDatabase(":memory:", shared_memory=shared_name)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute("INSERT INTO t (id, name) VALUES (1, 'parent')")
+
+        child = multiprocessing.get_context("fork").Process(target=insert_rows,
+                                                            args=(shared_name, 2, 20))
+        child.start()
+        child.join(30)
+        assert child.exitcode == 0
+        assert len(executor.execute("SELECT * FROM t")[1]) == 21
+        db.close()
@@ -0,0 +1,79 @@
+"""Unit tests for pysqlit/mmap_storage.py module."""
+
+import pytest
+
+from pysqlit.btree import EnhancedBTree
+from pysqlit.exceptions import StorageError
+from pysqlit.mmap_storage import MmapPager
+
+
+class TestMmapPager:
+    """Test cases for MmapPager class."""
+
+    def test_memory_database_rejected(self):
+        """Test that memory-mapped mode requires a file."""
+        with pytest.raises(StorageError):
+            MmapPager(":memory:")
+
+    def test_clean_pages_are_zero_copy_views(self, temp_db_path):
+        """Test unmodified pages come straight from the mapping."""
+        pager = MmapPager(temp_db_path)
+        page_num = pager.allocate_page()
+        pager.write_page(page_num, b'\x07' * pager.page_size)
+        pager.flush()
+        pager.buffer_pool.clear()
+
+        page = pager.get_page(page_num)
+        assert isinstance(page, memoryview)
+        assert page.readonly
+        assert page[0] == 7
+        assert pager.get_cache_stats()['mapped_reads'] == 1
+        pager.close()
+
+    def test_writes_go_through_dirty_frames(self, temp_db_path):
+        """Test writable pages are copies tracked as dirty frames."""
+        pager = MmapPager(temp_db_path)
+        page_num = pager.allocate_page()
+        pager.flush()
+        pager.buffer_pool.clear()
+
+        page = pager.get_writable_page(page_num)
+        assert not memoryview(page).readonly
+        page[0] = 9
+        pager.mark_dirty(page_num)
+        assert pager.get_page(page_num)[0] == 9
+        pager.close()
+
+        pager = MmapPager(temp_db_path)
+        assert pager.get_page(page_num)[0] == 9
+        pager.close()
+
+    def test_growth_remaps_in_chunks(self, temp_db_path):
+        """Test the file grows in large chunks and is remapped."""
+        pager = MmapPager(temp_db_path)
+        for _ in range(pager.allocation_extent_pages + 1):
+            pager.allocate_page()
+        assert pager.mapped_pages == 2 * pager.allocation_extent_pages
+        pager.close()
+
+    def test_btree_on_mapped_pages(self, temp_db_path):
+        """Test B-tree nodes copy mapped pages before modifying them."""
+        pager = MmapPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        for key in range(1, 6):
+            btree.insert(key, bytes([key]) * 10)
+        pager.close()
+
+        pager = MmapPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        assert btree.update(3, b'\xff' * 10)
+        assert btree.delete(4)
+        assert [key for key, _ in btree.scan()] == [1, 2, 3, 5]
+        pager.close()
+
+        pager = MmapPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        data = dict(btree.scan())
+        assert data[3][:10] == b'\xff' * 10
+        assert 4 not in data
+        pager.close()
@@ -0,0 +1,176 @@
+"""Unit tests for pysqlit/overflow.py module."""
+
+import pytest
+
+from pysqlit.btree import EnhancedBTree
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import StorageError
+from pysqlit.models import ColumnDefinition, DataType, Row, TableSchema
+from pysqlit.overflow import (OverflowValue, free_overflow, overflow_capacity, overflow_chain,
+                              read_overflow, write_overflow)
+
+
+def make_schema():
+    """Create a schema with a small leading column and a large text column."""
+    schema = TableSchema("docs")
+    schema.add_column(ColumnDefinition("id", DataType.INTEGER, is_primary=True))
+    schema.add_column(ColumnDefinition("title", DataType.TEXT))
+    schema.add_column(ColumnDefinition("body", DataType.TEXT))
+    return schema
+
+
+class TestOverflowChain:
+    """Test cases for overflow page chain functions."""
+
+    def test_roundtrip(self, temp_db_path):
+        """Test data spanning several pages is read back unchanged."""
+        pager = ConcurrentPager(temp_db_path)
+        data = bytes(range(256)) * 40
+        first_page = write_overflow(pager, data)
+        pages = overflow_chain(pager, first_page)
+        assert len(pages) == -(-len(data) // overflow_capacity(pager))
+        assert read_overflow(pager, first_page, len(data)) == data
+        assert free_overflow(pager, first_page) == len(pages)
+        assert pager.header.freelist_count == len(pages)
+        pager.close()
+
+    def test_non_overflow_page_rejected(self, temp_db_path):
+        """Test following a chain into a B-tree page raises an error."""
+        pager = ConcurrentPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        with pytest.raises(StorageError):
+            overflow_chain(pager, btree.root_page_num)
+        pager.close()
+
+
+class TestOverflowValue:
+    """Test cases for OverflowValue class."""
+
+    def test_btree_values_spill_and_free(self, temp_db_path):
+        """Test large values use overflow pages that are freed on delete and update."""
+        pager = ConcurrentPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        btree.insert(1, b"a" * 10000)
+        btree.insert(2, b"b" * 10000)
+        value = btree.scan()[0][1]
+        assert isinstance(value, OverflowValue)
+        assert not value.loaded
+        assert value.read() == b"a" * 10000
+        chain = len(btree.overflow_pages())
+
+        btree.update(1, b"small")
+        assert pager.header.freelist_count == chain // 2
+        btree.delete(2)
+        assert pager.header.freelist_count == chain
+        assert btree.overflow_pages() == []
+        assert btree.scan() == [(1, b"small")]
+        pager.close()
+
+    def test_stale_value_rejected(self, temp_db_path):
+        """Test a value is not read after the cache it came from was invalidated."""
+        pager = ConcurrentPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        btree.insert(1, b"a" * 10000)
+        value = btree.scan()[0][1]
+        pager.cache_epoch += 1
+        with pytest.raises(StorageError):
+            value.read()
+        pager.close()
+
+
+class TestLazyRow:
+    """Test cases for rows deserialized from overflow values."""
+
+    def test_leading_columns_decoded_without_chain(self, temp_db_path):
+        """Test columns inside the inline prefix are read without loading the chain."""
+        pager = ConcurrentPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        schema = make_schema()
+        btree.insert(1, Row(id=1, title="intro", body="x" * 20000).serialize(schema))
+        value = btree.scan()[0][1]
+
+        row = Row.deserialize(value, schema)
+        assert row.id == 1
+        assert row.get_value("title") == "intro"
+        assert not value.loaded
+        assert not row.loaded
+        assert row.body == "x" * 20000
+        assert value.loaded
+        assert row.to_dict() == {"id": 1, "title": "intro", "body": "x" * 20000}
+        pager.close()
+
+    def test_load_errors_propagate(self, temp_db_path):
+        """Test errors while loading the chain surface unchanged instead of recursing."""
+        pager = ConcurrentPager(temp_db_path)
+        btree = EnhancedBTree(pager)
+        schema = make_schema()
+        btree.insert(1, Row(id=1, title="intro", body="x" * 20000).serialize(schema))
+        value = btree.scan()[0][1]
+        row = Row.deserialize(value, schema)
+        pager.cache_epoch += 1
+        with pytest.raises(StorageError):
+            row.body
+
+        def broken_read():
+            raise AttributeError("broken")
+
+        value.read = broken_read
+        with pytest.raises(AttributeError):
+            row.data
+        with pytest.raises(AttributeError, match="broken"):
+            row.body
+        pager.close()
+
+
+class TestDatabaseOverflow:
+    """Test cases for large rows stored through SQL."""
+
+    def test_large_text_roundtrip(self, temp_db_path):
+        """Test long text survives insert, update, delete, vacuum and reopen."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, body TEXT)")
+        for i in range(1, 6):
+            executor.execute(f"INSERT INTO docs (id, body) VALUES ({i}, '{chr(96 + i) * 20000}')")
+        rows = executor.execute("SELECT * FROM docs WHERE id = 3")[1]
+        assert rows[0]['body'] == 'c' * 20000
+
+        executor.execute("UPDATE docs SET body = 'short' WHERE id = 2")
+        executor.execute("DELETE FROM docs WHERE id = 4")
+        assert db.pager.header.freelist_count > 0
+        assert executor.execute("VACUUM")[1] is True
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path)
+        rows = SQLExecutor(db).execute("SELECT * FROM docs")[1]
+        assert [(row['id'], len(row['body'])) for row in rows] == [
+            (1, 20000), (2, 5), (3, 20000), (5, 20000)]
+        assert rows[3]['body'] == 'e' * 20000
+        assert db.pager.header.freelist_count == 0
+        db.close()
+
+    def test_incremental_vacuum_moves_overflow_pages(self, temp_db_path):
+        """Test overflow pages relocated from the end of the file stay linked."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, body TEXT)")
+        executor.execute(f"INSERT INTO docs (id, body) VALUES (1, '{'a' * 30000}')")
+        executor.execute(f"INSERT INTO docs (id, body) VALUES (2, '{'b' * 30000}')")
+        executor.execute("DELETE FROM docs WHERE id = 1")
+        assert db.incremental_vacuum() > 0
+        rows = executor.execute("SELECT * FROM docs")[1]
+        assert rows == [{'id': 2, 'body': 'b' * 30000}]
+        db.close()
+
+    def test_memory_database(self):
+        """Test long text in a private in-memory database, which has no file lock."""
+        db = EnhancedDatabase(":memory:")
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, body TEXT)")
+        executor.execute(f"INSERT INTO docs (id, body) VALUES (1, '{'m' * 20000}')")
+        rows = executor.execute("SELECT * FROM docs")[1]
+        assert rows == [{'id': 1, 'body': 'm' * 20000}]
+        executor.execute("DELETE FROM docs WHERE id = 1")
+        assert executor.execute("SELECT * FROM docs")[1] == []
+        db.close()
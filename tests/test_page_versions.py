@@ -0,0 +1,172 @@
+"""Unit tests for pysqlit/page_versions.py module and pager cache coherence."""
+
+import pytest
+
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.page_versions import PageVersionTable
+
+
+def write_pages(pager, page_nums, fill):
+    """Write every page in page_nums filled with the given byte."""
+    for page_num in page_nums:
+        pager.write_page(page_num, bytes([fill]) * pager.page_size)
+
+
+class TestPageVersionTable:
+    """Test cases for PageVersionTable class."""
+
+    def test_disabled_by_default(self, temp_db_path):
+        """Test files carry no version table unless requested."""
+        pager = ConcurrentPager(temp_db_path)
+        assert not pager.page_versions.enabled
+        pager.close()
+
+        pager = ConcurrentPager(temp_db_path, track_page_versions=True)
+        assert pager.page_versions.enabled
+        root = pager.header.page_versions_root
+        pager.close()
+
+        # 启用后对文件永久有效
+        pager = ConcurrentPager(temp_db_path)
+        assert pager.header.page_versions_root == root
+        pager.close()
+
+    def test_flush_records_dirty_pages(self, temp_db_path):
+        """Test each flush bumps the change counter and versions the written pages."""
+        pager = ConcurrentPager(temp_db_path, track_page_versions=True)
+        write_pages(pager, [5, 6], 1)
+        pager.flush()
+        first = pager.header.change_counter
+
+        write_pages(pager, [6], 2)
+        pager.flush()
+        assert pager.header.change_counter == first + 1
+
+        stale = pager.page_versions.stale_pages([5, 6], first, pager._read_from_file)
+        assert stale == {6}
+        pager.close()
+
+    def test_chain_grows_for_high_pages(self, temp_db_path):
+        """Test recording a page beyond the first version page extends the chain."""
+        pager = ConcurrentPager(temp_db_path, track_page_versions=True)
+        versions = PageVersionTable(pager)
+        high_page = versions.entries_per_page + 3
+        write_pages(pager, [high_page], 1)
+        pager.flush()
+        assert len(versions.chain()) == 2
+
+        since = pager.header.change_counter - 1
+        assert high_page in versions.stale_pages([high_page], since, pager._read_from_file)
+        pager.close()
+
+    def test_clean_flush_keeps_counter(self, temp_db_path):
+        """Test flushing without changes does not bump the change counter."""
+        pager = ConcurrentPager(temp_db_path)
+        counter = pager.header.change_counter
+        pager.flush()
+        assert pager.header.change_counter == counter
+        pager.close()
+
+
+class TestCacheCoherence:
+    """Test cases for cross-connection cache invalidation."""
+
+    def test_commit_invalidates_whole_cache(self, temp_db_path):
+        """Test without a version table another connection's commit drops every cached page."""
+        writer = ConcurrentPager(temp_db_path)
+        write_pages(writer, range(1, 6), 1)
+        writer.flush()
+
+        reader = ConcurrentPager(temp_db_path)
+        reader.begin_read()
+        assert all(reader.get_page(p)[0] == 1 for p in range(1, 6))
+        reader.end_read()
+
+        write_pages(writer, [3], 2)
+        writer.flush()
+
+        reader.begin_read()
+        assert reader.get_page(3)[0] == 2
+        assert reader.cache_epoch == 1
+        assert reader.cache_invalidations >= 5
+        reader.end_read()
+        writer.close()
+        reader.close()
+
+    def test_version_table_invalidates_selectively(self, temp_db_path):
+        """Test with a version table only the pages written by the other connection are dropped."""
+        writer = ConcurrentPager(temp_db_path, track_page_versions=True)
+        write_pages(writer, range(2, 12), 1)
+        writer.flush()
+
+        reader = ConcurrentPager(temp_db_path)
+        reader.begin_read()
+        for page_num in range(2, 12):
+            reader.get_page(page_num)
+        reader.end_read()
+
+        write_pages(writer, [4, 9], 2)
+        writer.flush()
+
+        reader.begin_read()
+        assert reader.get_page(4)[0] == 2
+        assert reader.get_page(9)[0] == 2
+        assert reader.get_page(5)[0] == 1
+        # 被修改的两页、文件头页和版本页失效，其余缓存保留
+        assert reader.cache_invalidations <= 4
+        assert 5 in reader.buffer_pool and 10 in reader.buffer_pool
+        reader.end_read()
+        writer.close()
+        reader.close()
+
+    def test_unchanged_file_keeps_cache(self, temp_db_path):
+        """Test re-acquiring the lock without intervening commits keeps the cache."""
+        pager = ConcurrentPager(temp_db_path)
+        write_pages(pager, [1, 2], 1)
+        pager.flush()
+
+        pager.begin_read()
+        pager.get_page(1)
+        pager.end_read()
+        pager.begin_read()
+        pager.get_page(1)
+        pager.end_read()
+        assert pager.cache_epoch == 0
+        pager.close()
+
+    @pytest.mark.parametrize("track_page_versions", [False, True])
+    def test_database_sees_other_connection(self, temp_db_path, track_page_versions):
+        """Test a database connection sees tables and rows committed by another one."""
+        first = EnhancedDatabase(temp_db_path, track_page_versions=track_page_versions)
+        second = EnhancedDatabase(temp_db_path)
+        first_executor = SQLExecutor(first)
+        second_executor = SQLExecutor(second)
+
+        first_executor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        first_executor.execute("INSERT INTO users (id, name) VALUES (1, 'Alice')")
+        _, rows = second_executor.execute("SELECT * FROM users")
+        assert [row['name'] for row in rows] == ['Alice']
+
+        second_executor.execute("INSERT INTO users (id, name) VALUES (2, 'Bob')")
+        _, rows = first_executor.execute("SELECT * FROM users")
+        assert sorted(row['name'] for row in rows) == ['Alice', 'Bob']
+        first.close()
+        second.close()
+
+    def test_incremental_vacuum_keeps_version_chain(self, temp_db_path):
+        """Test incremental vacuum relocates version pages and keeps them reachable."""
+        db = EnhancedDatabase(temp_db_path, track_page_versions=True)
+        executor = SQLExecutor(db)
+        for table_name, rows in (("t", 100), ("u", 60)):
+            executor.execute(f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY, name TEXT)")
+            for i in range(1, rows + 1):
+                executor.execute(f"INSERT INTO {table_name} (id, name) VALUES ({i}, 'row{i}')")
+        executor.execute("DELETE FROM t")
+        executor.execute("DROP TABLE t")
+        assert db.incremental_vacuum() > 0
+
+        chain = db.pager.page_versions.chain()
+        assert chain and all(page_num < db.pager.num_pages for page_num in chain)
+        assert len(executor.execute("SELECT * FROM u")[1]) == 60
+        db.close()
@@ -9,6 +9,7 @@ from pysqlit.parser import (
     DeleteStatement,
     CreateTableStatement,
     DropTableStatement,
+    VacuumStatement,
     WhereCondition,
     PrepareResult
 )
@@ -142,6 +143,15 @@ class TestEnhancedSQLParser:
         assert isinstance(statement, DropTableStatement)
         assert statement.table_name == "users"
     
+    def test_parse_vacuum_statement(self):
+        """Test parsing VACUUM statement."""
+        result, statement = EnhancedSQLParser.parse_statement("vacuum;")
+        assert result == PrepareResult.SUCCESS
+        assert isinstance(statement, VacuumStatement)
+        
+        result, _ = EnhancedSQLParser.parse_statement("VACUUM users")
+        assert result == PrepareResult.SYNTAX_ERROR
+    
     def test_parse_invalid_syntax(self):
         """Test parsing invalid SQL syntax."""
         sql = "INVALID SQL SYNTAX"
@@ -0,0 +1,144 @@
+"""Unit tests for pysqlit/readahead.py module."""
+
+import random
+import time
+
+import pytest
+
+from pysqlit.btree import EnhancedBTree
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+
+
+def create_pages(path, count, **kwargs):
+    """Create a database whose page n is filled with byte n."""
+    pager = ConcurrentPager(path, **kwargs)
+    pages = [pager.allocate_page() for _ in range(count)]
+    for page_num in pages:
+        pager.write_page(page_num, bytes([page_num]) * pager.page_size)
+    pager.close()
+    return pages
+
+
+class TestReadAhead:
+    """Test cases for ReadAhead class."""
+
+    def test_sequential_misses_are_coalesced(self, temp_db_path):
+        """Test sequential misses switch to growing multi-page reads."""
+        pages = create_pages(temp_db_path, 40)
+        pager = ConcurrentPager(temp_db_path, cache_size=100, read_ahead=16)
+        pager.begin_read()
+        pager.reset_io_stats()
+        for page_num in pages:
+            assert pager.get_page(page_num)[0] == page_num
+
+        stats = pager.get_io_stats()
+        # 1、2触发预读（2-5），之后窗口按8、16增长
+        assert stats['physical_reads'] == 5
+        assert stats['bytes_read'] == 40 * pager.page_size
+        assert stats['cache_misses'] == 5
+        assert stats['read_ahead']['pages_prefetched'] == 35
+        pager.close()
+
+    def test_random_access_reads_single_pages(self, temp_db_path):
+        """Test non-sequential misses never read ahead."""
+        pages = create_pages(temp_db_path, 20)
+        pager = ConcurrentPager(temp_db_path, cache_size=100)
+        pager.begin_read()
+        pager.reset_io_stats()
+        for page_num in pages[::3]:
+            pager.get_page(page_num)
+        stats = pager.get_io_stats()
+        assert stats['physical_reads'] == len(pages[::3])
+        assert stats['read_ahead']['reads'] == 0
+        pager.close()
+
+    def test_scan_hint_and_dirty_pages(self, temp_db_path):
+        """Test a scan hint reads ahead on the first miss without touching modified pages."""
+        pages = create_pages(temp_db_path, 10)
+        pager = ConcurrentPager(temp_db_path, cache_size=100)
+        pager.write_page(pages[3], b'\xee' * pager.page_size)
+        pager.reset_io_stats()
+        with pager.sequential_scan():
+            assert pager.get_page(pages[0])[0] == pages[0]
+        assert pager.get_io_stats()['physical_reads'] == 1
+        assert pager.get_page(pages[3])[0] == 0xEE
+        assert all(pager.get_page(p)[0] == p for p in pages if p != pages[3])
+        pager.close()
+
+    def test_page_written_back_during_install_is_not_stale(self, temp_db_path):
+        """Test a dirty page evicted while installing the window keeps its new contents."""
+        pages = create_pages(temp_db_path, 40)
+        pager = ConcurrentPager(temp_db_path, cache_size=16, read_ahead=16)
+        pager.begin_read()
+        pager.write_page(pages[3], b'\xee' * pager.page_size)  # least recently used frame
+        for page_num in pages[::-2]:
+            if len(pager.buffer_pool) >= 16:
+                break
+            pager.get_page(page_num)
+
+        # The window covers pages[1:5]; installing pages[2] evicts and writes back pages[3]
+        with pager.sequential_scan():
+            assert pager.get_page(pages[1])[0] == pages[1]
+        assert pager.get_page(pages[3])[0] == 0xEE
+        pager.close()
+
+    @pytest.mark.parametrize("seed", [3, 6])
+    def test_scan_with_small_cache(self, temp_db_path, seed):
+        """Test scans see every key while evictions write back pages inside read-ahead windows."""
+        pager = ConcurrentPager(temp_db_path, cache_size=64, page_size=1024,
+                                replacement_policy='2q')
+        btree = EnhancedBTree(pager, row_size=100)
+        keys = list(range(1, 400))
+        random.Random(seed).shuffle(keys)
+        for key in keys:
+            btree.insert(key, bytes([key % 256]) * 100)
+        assert [key for key, _ in btree.scan()] == sorted(keys)
+        pager.close()
+
+    def test_capacity_limits_window(self, temp_db_path):
+        """Test read-ahead never fills more than a quarter of the buffer pool."""
+        pages = create_pages(temp_db_path, 20)
+        pager = ConcurrentPager(temp_db_path, cache_size=8)
+        pager.begin_read()
+        with pager.sequential_scan():
+            pager.get_page(pages[0])
+        assert pager.get_io_stats()['read_ahead']['pages_prefetched'] == 1
+        pager.close()
+
+    def test_background_read_ahead(self, temp_db_path):
+        """Test the worker thread installs prefetched pages and stale reads are dropped."""
+        pages = create_pages(temp_db_path, 60)
+        pager = ConcurrentPager(temp_db_path, cache_size=100, read_ahead_background=True)
+        pager.begin_read()
+        with pager.sequential_scan():
+            pager.get_page(pages[0])
+
+        deadline = time.monotonic() + 5
+        while pager.read_ahead.reads == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pages[1] in pager.buffer_pool
+        assert pager.get_page(pages[5])[0] == pages[5]
+
+        # 读取期间写入文件的预读结果被丢弃
+        pager.read_ahead._queue.put((pages[40], 2, pager.cache_epoch, pager.write_generation - 1))
+        deadline = time.monotonic() + 5
+        while pager.read_ahead.discarded == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pages[40] not in pager.buffer_pool
+        pager.close()
+
+    def test_database_scan_uses_read_ahead(self, temp_db_path):
+        """Test full-table scans are served by read-ahead after reopening."""
+        db = EnhancedDatabase(temp_db_path)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 201):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path)
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 200
+        stats = db.get_database_info()['io_stats']
+        assert stats['read_ahead']['pages_prefetched'] > 0
+        db.close()
@@ -133,6 +133,20 @@ class TestEnhancedREPL:
         
         repl.close()
     
+    def test_repl_iostats_command(self, temp_db_path):
+        """Test REPL .iostats command prints and resets pager statistics."""
+        repl = EnhancedREPL(temp_db_path)
+        
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            assert repl.process_meta_command('.iostats')
+            assert repl.process_meta_command('.iostats reset')
+            output = mock_stdout.getvalue()
+            assert "I/O" in output
+            assert "fsync" in output
+        assert repl.current_database.get_database_info()['io_stats']['physical_writes'] == 0
+        
+        repl.close()
+    
     def test_repl_meta_command_case_insensitive(self, temp_db_path):
         """Test REPL meta command case insensitivity."""
         repl = EnhancedREPL(temp_db_path)
@@ -0,0 +1,170 @@
+"""Unit tests for pysqlit/replacement.py module."""
+
+import pytest
+
+from pysqlit.buffer_pool import BufferPool
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.exceptions import StorageError
+from pysqlit.replacement import ARCPolicy, LRUPolicy, TwoQPolicy, create_policy
+
+
+PAGE = 64
+HOT = range(5)
+
+
+def make_pool(policy, capacity=20):
+    """Create a pool over an all-zero store."""
+    return BufferPool(PAGE, lambda page_num: bytes(PAGE), lambda page_num, data: None,
+                      max_pages=capacity, policy=policy)
+
+
+def warm_then_scan(pool):
+    """Make pages 0-4 hot (re-referenced across time), then run a long scan."""
+    for page_num in HOT:
+        pool.get(page_num)
+    for page_num in range(100, 120):
+        pool.get(page_num)
+    for _ in range(2):
+        for page_num in HOT:
+            pool.get(page_num)
+    for page_num in range(200, 300):
+        pool.get(page_num)
+    pool.reset_stats()
+    for page_num in HOT:
+        pool.get(page_num)
+    return pool.get_stats()
+
+
+class TestCreatePolicy:
+    """Test cases for create_policy function."""
+
+    def test_policies_by_name(self):
+        """Test each name maps to its policy and unbounded pools use LRU."""
+        assert isinstance(create_policy(None, 10), LRUPolicy)
+        assert isinstance(create_policy('2q', 10), TwoQPolicy)
+        assert isinstance(create_policy('arc', 10), ARCPolicy)
+        assert isinstance(create_policy('arc', None), LRUPolicy)
+
+    def test_unknown_policy(self):
+        """Test an unknown name is rejected."""
+        with pytest.raises(StorageError):
+            create_policy('mru', 10)
+        with pytest.raises(StorageError):
+            make_pool('mru')
+
+
+class TestScanResistance:
+    """Test cases for hot pages surviving a full scan."""
+
+    def test_lru_scan_flushes_hot_pages(self):
+        """Test a scan larger than the pool evicts every hot page under LRU."""
+        stats = warm_then_scan(make_pool('lru'))
+        assert stats['hits'] == 0
+        assert stats['policy'] == 'lru'
+
+    @pytest.mark.parametrize("policy", ['2q', 'arc'])
+    def test_hot_pages_survive_scan(self, policy):
+        """Test re-referenced pages stay cached while a scan streams through the pool."""
+        stats = warm_then_scan(make_pool(policy))
+        assert stats['hits'] == len(HOT)
+        assert stats['hit_rate'] == 1.0
+        assert stats['policy'] == policy
+        assert stats['cached_pages'] <= 20
+
+
+class TestTwoQPolicy:
+    """Test cases for TwoQPolicy class."""
+
+    def test_ghost_hit_promotes_to_main_queue(self):
+        """Test a page evicted from A1in and requested again goes to Am."""
+        pool = make_pool('2q', capacity=4)
+        for page_num in range(6):
+            pool.get(page_num)
+        pool.get(0)
+        stats = pool.get_stats()['policy_stats']
+        assert stats['ghost_hits'] == 1
+        assert stats['am_pages'] == 1
+
+        pool.get(0)
+        assert pool.get_stats()['policy_stats']['am_hits'] == 1
+
+    def test_correlated_hits_do_not_promote(self):
+        """Test repeated hits in A1in keep the page on probation."""
+        pool = make_pool('2q', capacity=4)
+        pool.get(1)
+        pool.get(1)
+        stats = pool.get_stats()['policy_stats']
+        assert stats['a1in_hits'] == 1
+        assert stats['am_pages'] == 0
+
+    def test_discard_leaves_no_ghost(self):
+        """Test discarded pages are forgotten rather than remembered as ghosts."""
+        pool = make_pool('2q', capacity=4)
+        pool.get(1)
+        pool.discard(1)
+        assert pool.get_stats()['policy_stats']['a1out_ghosts'] == 0
+
+
+class TestARCPolicy:
+    """Test cases for ARCPolicy class."""
+
+    def test_second_access_moves_to_t2(self):
+        """Test a hit in T1 moves the page to the frequency queue."""
+        pool = make_pool('arc', capacity=4)
+        pool.get(1)
+        pool.get(1)
+        stats = pool.get_stats()['policy_stats']
+        assert stats['t1_pages'] == 0 and stats['t2_pages'] == 1
+        assert stats['t1_hits'] == 1
+
+    def test_b1_hit_grows_recency_target(self):
+        """Test a ghost hit in B1 raises the T1 target size."""
+        pool = make_pool('arc', capacity=4)
+        pool.get(1)
+        pool.get(1)  # T2 = {1}
+        for page_num in range(2, 6):
+            pool.get(page_num)  # 页面2从T1淘汰，记入B1
+        assert pool.policy.target == 0
+        pool.get(2)
+        stats = pool.get_stats()['policy_stats']
+        assert stats['b1_hits'] == 1
+        assert stats['target_t1_pages'] >= 1
+
+    def test_pinned_pages_skipped(self):
+        """Test the pool moves on to the next victim when the preferred one is pinned."""
+        pool = make_pool('arc', capacity=2)
+        pool.pin(1)
+        pool.get(2)
+        pool.get(3)
+        assert 1 in pool
+        assert len(pool) == 2
+        pool.unpin(1)
+
+
+class TestPagerReplacementPolicy:
+    """Test cases for replacement policies configured on pagers and databases."""
+
+    def test_pager_policy_in_stats(self, temp_db_path):
+        """Test the configured policy is reported in cache and I/O statistics."""
+        pager = ConcurrentPager(temp_db_path, cache_size=8, replacement_policy='2q')
+        for _ in range(20):
+            pager.allocate_page()
+        assert pager.get_cache_stats()['policy'] == '2q'
+        assert pager.get_io_stats()['cache_policy'] == '2q'
+        pager.close()
+
+    def test_database_with_scan_resistant_policy(self, temp_db_path):
+        """Test SQL workloads run unchanged with a small ARC pool."""
+        db = EnhancedDatabase(temp_db_path, cache_size=8, replacement_policy='arc')
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 61):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        assert len(executor.execute("SELECT * FROM t")[1]) == 60
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path, replacement_policy='arc')
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 60
+        assert db.pager.get_cache_stats()['policy'] == 'arc'
+        db.close()
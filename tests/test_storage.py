@@ -5,7 +5,7 @@ import tempfile
 import os
 from unittest.mock import patch, MagicMock
 
-from pysqlit.storage import Pager
+from pysqlit.storage import Pager, coalesce_page_runs
 from pysqlit.constants import PAGE_SIZE, TABLE_MAX_PAGES
 
 
@@ -17,8 +17,7 @@ class TestPager:
         pager = Pager(temp_db_path)
         assert pager.filename == temp_db_path
         assert pager.file_length == 0
-        assert len(pager.pages) == TABLE_MAX_PAGES
-        assert all(page is None for page in pager.pages)
+        assert pager.pages == {}
         pager.close()
     
     def test_get_page_new_file(self, temp_db_path):
@@ -152,9 +151,10 @@ class TestPager:
             page = pager.get_page(TABLE_MAX_PAGES - 1)
             assert isinstance(page, bytearray)
             
-            # Test invalid page number
-            with pytest.raises(Exception):
-                pager.get_page(TABLE_MAX_PAGES)
+            # The old fixed page ceiling no longer applies
+            page = pager.get_page(TABLE_MAX_PAGES)
+            assert isinstance(page, bytearray)
+            assert pager.num_pages == TABLE_MAX_PAGES + 1
     
     def test_pager_initialization_with_existing_file(self, temp_db_path):
         """Test pager initialization with existing file."""
@@ -205,4 +205,48 @@ class TestPager:
         
         pager = Pager(temp_db_path)
         assert pager.file_length == 0
-        pager.close()
\ No newline at end of file
+        pager.close()
+    
+    def test_allocate_page(self, temp_db_path):
+        """Test allocating pages at the end of the file."""
+        with Pager(temp_db_path) as pager:
+            assert pager.allocate_page() == 0
+            assert pager.allocate_page() == 1
+            assert pager.num_pages == 2
+
+
+class TestDirtyPageFlush:
+    """Test cases for dirty-page tracking and coalesced flushing."""
+    
+    def test_coalesce_page_runs(self):
+        """Test grouping page numbers into contiguous runs."""
+        assert list(coalesce_page_runs([7, 1, 2, 3, 5])) == [[1, 2, 3], [5], [7]]
+        assert list(coalesce_page_runs([0, 1, 2, 3], max_run=2)) == [[0, 1], [2, 3]]
+        assert list(coalesce_page_runs([])) == []
+    
+    def test_write_page_marks_dirty(self, temp_db_path):
+        """Test write_page and mark_dirty maintain the dirty set."""
+        with Pager(temp_db_path) as pager:
+            pager.write_page(0, b'\x01' * PAGE_SIZE)
+            assert pager.dirty_pages == {0}
+            pager.flush()
+            assert pager.dirty_pages == set()
+            
+            pager.get_page(0)[0] = 2
+            pager.mark_dirty(0)
+            assert pager.dirty_pages == {0}
+    
+    def test_flush_writes_only_dirty_runs(self, temp_db_path):
+        """Test flush issues one write per contiguous run of dirty pages."""
+        with Pager(temp_db_path) as pager:
+            for page_num in range(6):
+                pager.write_page(page_num, bytes([page_num]) * PAGE_SIZE)
+            pager.flush()
+            
+            for page_num in (1, 2, 3, 5):
+                pager.write_page(page_num, bytes([page_num + 10]) * PAGE_SIZE)
+            assert pager._write_pages(sorted(pager.dirty_pages), pager.pages.__getitem__) == 2
+        
+        with open(temp_db_path, 'rb') as f:
+            data = f.read()
+        assert [data[n * PAGE_SIZE] for n in range(6)] == [0, 11, 12, 13, 4, 15]
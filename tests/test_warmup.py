@@ -0,0 +1,136 @@
+"""Unit tests for pysqlit/warmup.py module."""
+
+import os
+
+from pysqlit.concurrent_storage import ConcurrentPager
+from pysqlit.database import EnhancedDatabase, SQLExecutor
+from pysqlit.warmup import CacheWarmer, load_hot_pages, remap_hot_pages, save_hot_pages
+
+
+def populate(path, pages=40):
+    """Create a database with pages tagged by their page number."""
+    pager = ConcurrentPager(path)
+    for _ in range(pages):
+        page_num = pager.allocate_page()
+        page = pager.get_page(page_num)
+        page[0] = page_num % 256
+        pager.mark_dirty(page_num)
+    pager.close()
+
+
+class TestHotPageList:
+    """Test cases for the hot page list file."""
+
+    def test_roundtrip(self, temp_db_path):
+        """Test pages are read back in the saved order."""
+        path = temp_db_path + '.warm'
+        save_hot_pages(path, 4096, [7, 3, 12])
+        assert load_hot_pages(path, 4096) == [7, 3, 12]
+        assert not os.path.exists(path + '.tmp')
+
+    def test_invalid_lists_ignored(self, temp_db_path):
+        """Test missing, truncated and mismatched lists are treated as empty."""
+        path = temp_db_path + '.warm'
+        assert load_hot_pages(path, 4096) == []
+        save_hot_pages(path, 4096, [1, 2, 3])
+        assert load_hot_pages(path, 8192) == []
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 2)
+        assert load_hot_pages(path, 4096) == []
+
+    def test_remap(self, temp_db_path):
+        """Test page numbers are rewritten and dropped pages removed."""
+        path = temp_db_path + '.warm'
+        save_hot_pages(path, 4096, [9, 5, 7])
+        remap_hot_pages(path, 4096, {9: 2, 7: 3})
+        assert load_hot_pages(path, 4096) == [2, 3]
+
+
+class TestCacheWarmer:
+    """Test cases for CacheWarmer class."""
+
+    def test_runs_coalesce_contiguous_pages(self, temp_db_path):
+        """Test sorted page numbers are split into contiguous bounded runs."""
+        populate(temp_db_path, pages=5)
+        pager = ConcurrentPager(temp_db_path)
+        warmer = CacheWarmer(pager, [9, 3, 4, 5, 1, 10, 11, 0], max_pages=2)
+        assert list(warmer._runs()) == [(1, 1), (3, 2), (5, 1), (9, 2), (11, 1)]
+        pager.close()
+
+    def test_saved_on_close_and_warmed_on_open(self, temp_db_path):
+        """Test the hot pages of one session are cached at the start of the next."""
+        populate(temp_db_path)
+        pager = ConcurrentPager(temp_db_path, warm_cache=True)
+        for page_num in (5, 6, 7, 30):
+            pager.get_page(page_num)
+        pager.close()
+        assert set(load_hot_pages(temp_db_path + '.warm', pager.page_size)) >= {5, 6, 7, 30}
+
+        pager = ConcurrentPager(temp_db_path, warm_cache=True)
+        assert pager.cache_warmer is not None
+        assert pager.cache_warmer.wait(10)
+        for page_num in (5, 6, 7, 30):
+            assert page_num in pager.buffer_pool
+        assert pager.get_page(30)[0] == 30
+        stats = pager.get_io_stats()['warmup']
+        assert stats['pages_warmed'] >= 4
+        assert stats['reads'] < stats['pages_listed']
+        pager.close()
+
+    def test_disabled_by_default(self, temp_db_path):
+        """Test no list is written or read unless warm-up is enabled."""
+        populate(temp_db_path)
+        pager = ConcurrentPager(temp_db_path)
+        pager.get_page(5)
+        pager.close()
+        assert not os.path.exists(temp_db_path + '.warm')
+        assert pager.cache_warmer is None
+
+    def test_stops_when_pool_full(self, temp_db_path):
+        """Test warm-up never evicts pages to make room."""
+        populate(temp_db_path)
+        pager = ConcurrentPager(temp_db_path, cache_size=4)
+        pager.get_page(1)
+        warmer = CacheWarmer(pager, range(2, 30))
+        assert warmer.run() == 3
+        assert len(pager.buffer_pool) == 4
+        assert 1 in pager.buffer_pool
+        pager.close()
+
+    def test_discarded_after_local_write(self, temp_db_path):
+        """Test pages read before a local write-back are not installed."""
+        populate(temp_db_path)
+        pager = ConcurrentPager(temp_db_path)
+        warmer = CacheWarmer(pager, [5])
+        read_run = pager._read_run
+
+        def write_during_read(start, count):
+            pages = read_run(start, count)
+            pager._write_pages([5], lambda page_num: bytes(pager.page_size))
+            return pages
+
+        pager._read_run = write_during_read
+        assert warmer.run() == 0
+        assert warmer.get_stats()['discarded'] == 1
+        pager.close()
+
+
+class TestDatabaseWarmup:
+    """Test cases for cache warm-up on EnhancedDatabase."""
+
+    def test_checkpoint_and_reopen(self, temp_db_path):
+        """Test a checkpoint saves the list and a reopened database warms its cache."""
+        db = EnhancedDatabase(temp_db_path, warm_cache=True)
+        executor = SQLExecutor(db)
+        executor.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 51):
+            executor.execute(f"INSERT INTO t (id, name) VALUES ({i}, 'row{i}')")
+        db.checkpoint()
+        assert load_hot_pages(temp_db_path + '.warm', db.pager.page_size)
+        db.close()
+
+        db = EnhancedDatabase(temp_db_path, warm_cache=True)
+        assert db.pager.cache_warmer.wait(10)
+        assert db.pager.get_io_stats()['warmup']['pages_warmed'] > 0
+        assert len(SQLExecutor(db).execute("SELECT * FROM t")[1]) == 50
+        db.close()